@@ -0,0 +1,630 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export processed models to files, several at a time.
+"""
+import os
+import gzip
+import json
+import time
+import shutil
+import logging
+import zipfile
+from datetime import timedelta
+from contextlib import nullcontext
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.db import connection, connections
+from django.db.models import Max
+from django.utils import timezone
+from calaccess_raw import get_data_directory
+
+from calaccess_processed.fields import get_copy_to_field_names
+from calaccess_processed.parquet import get_pyarrow, write_parquet
+from calaccess_processed.telemetry import get_size, record_step
+from calaccess_processed_filings.partitions import get_cycle_bounds
+
+logger = logging.getLogger(__name__)
+
+# The extension added to files written with each kind of compression
+COMPRESSION_EXTENSIONS = {
+    None: "",
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# The name of the ZIP with every archived file
+ZIP_NAME = "calaccess-processed-data.zip"
+
+# The name of the manifest describing what's in every archived file
+MANIFEST_NAME = "manifest.json"
+
+# The name of the file listing the files a model is split into, one per cycle
+INDEX_NAME = "index.json"
+
+# Name of the file with a split model's rows that fall in no election cycle
+OTHER_CYCLE = "other"
+
+# Counts the exported rows and adds up the md5 of each one, in two 64-bit halves.
+# Unlike an md5 of every row strung together, the sum doesn't need the rows
+# sorted or held in memory, and any change to a row changes it.
+CHECKSUM_SQL = """
+SELECT
+    COUNT(*),
+    md5(
+        COALESCE(SUM(('x' || LEFT(h, 16))::bit(64)::bigint::numeric), 0)::text
+        || ':' ||
+        COALESCE(SUM(('x' || RIGHT(h, 16))::bit(64)::bigint::numeric), 0)::text
+    )
+FROM ({}) AS t, LATERAL md5(t::text) AS h;
+"""
+
+
+def check_compression(compression):
+    """
+    Raises an error if files can't be written with a kind of compression.
+
+    zstd compression requires the zstandard package.
+    """
+    if compression not in COMPRESSION_EXTENSIONS:
+        raise ValueError(f"Unknown compression: {compression}")
+    if compression == "zstd":
+        try:
+            import zstandard  # noqa: F401
+        except ImportError:
+            raise ImportError("zstd compression requires the zstandard package")
+
+
+def get_compressor(compression, f):
+    """
+    Returns a context manager with a stream that compresses into a file object.
+
+    What's written to the stream is compressed on its way into f.
+    """
+    check_compression(compression)
+    if compression == "gzip":
+        # mtime is left out so the same data makes the same file
+        return gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0)
+    if compression == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor().stream_writer(f, closefd=False)
+    return nullcontext(f)
+
+
+def check_format(format, compression=None):
+    """
+    Raises an error if files can't be written in a format with a kind of compression.
+
+    Parquet files require the pyarrow package.
+    """
+    if format == "parquet":
+        get_pyarrow()
+    elif format == "csv":
+        check_compression(compression)
+    else:
+        raise ValueError(f"Unknown format: {format}")
+
+
+def copy_zip_entries(path, zip_file, skip_set):
+    """
+    Copy every entry in the ZIP at path into zip_file, other than those in skip_set.
+
+    Each entry is streamed across with the compression it had.
+    """
+    with zipfile.ZipFile(path) as source:
+        for info in source.infolist():
+            if info.filename in skip_set:
+                continue
+            with source.open(info) as src, zip_file.open(
+                info, "w", force_zip64=True
+            ) as dst:
+                shutil.copyfileobj(src, dst)
+
+
+class ArchiveFile(object):
+    """
+    A file exported from a processed model, along with how long it took.
+    """
+
+    def __init__(self, name, model, compression=None, format="csv", cycle=None):
+        """
+        Create a new file.
+
+        Args:
+            name (str): Name of the file, without its extension.
+            model (Model): The model or proxy to export.
+            compression (str): Optional compression for the file, "gzip" or "zstd".
+            format (str): The format of the file, "csv" or "parquet". Parquet files
+                compress their data themselves, so they keep their extension.
+            cycle (int): Optional election cycle of the rows to export, for models
+                split into a file per cycle, or OTHER_CYCLE for the rest. The file
+                is named for its cycle, in a folder named for the model.
+        """
+        self.name = name
+        self.model = model
+        self.compression = compression
+        self.format = format
+        self.cycle = cycle
+        self.group = model().klass_group.lower()
+        if cycle is None:
+            self.file_name = f"{name}.{format}"
+            self.key = f"{self.group}/{self.file_name}"
+        else:
+            self.file_name = f"{name}-{cycle}.{format}"
+            self.key = f"{self.group}/{name}/{self.file_name}"
+        if format == "csv":
+            self.file_name += COMPRESSION_EXTENSIONS[compression]
+            self.key += COMPRESSION_EXTENSIONS[compression]
+        self.path = os.path.join(
+            get_data_directory(), "processed", *self.key.split("/")
+        )
+        self.rows = None
+        self.size = None
+        self.started = None
+        self.finished = None
+        self.state = None
+        self.skipped = False
+
+    @property
+    def duration(self):
+        """
+        Returns the number of seconds the export took, if it has run.
+        """
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    @property
+    def bytes_per_second(self):
+        """
+        Returns how many bytes were written each second, if the export has run.
+        """
+        if not self.duration:
+            return None
+        return self.size / self.duration
+
+    def get_copy_to_fields(self):
+        """
+        Returns a tuple with the names of the fields to export, or an empty one for all.
+        """
+        return get_copy_to_field_names(self.model)
+
+    def get_state(self):
+        """
+        Returns a dictionary describing what's in the model's table now.
+
+        It has the number of rows to export, the largest id and updated_at, where
+        the model has them, and a checksum of the exported rows, all computed in
+        the database.
+        """
+        queryset = self.get_queryset()
+        field_names = self.get_copy_to_fields() or [
+            f.attname for f in self.model._meta.concrete_fields
+        ]
+        sql, params = queryset.values_list(*field_names).query.sql_with_params()
+        with connection.cursor() as c:
+            c.execute(CHECKSUM_SQL.format(sql), params)
+            rows, checksum = c.fetchone()
+
+        aggregates = {}
+        # UUIDs have no order in Postgres
+        if self.model._meta.pk.get_internal_type() != "UUIDField":
+            aggregates["max_id"] = Max("pk")
+        if "updated_at" in [f.name for f in self.model._meta.concrete_fields]:
+            aggregates["max_updated_at"] = Max("updated_at")
+        state = queryset.aggregate(**aggregates)
+        if state.get("max_updated_at"):
+            state["max_updated_at"] = state["max_updated_at"].isoformat()
+        state.update(rows=rows, checksum=checksum)
+        return state
+
+    def get_queryset(self):
+        """
+        Returns the rows to export.
+        """
+        queryset = self.model.objects.all()
+        if self.cycle is None:
+            return queryset
+        cycle = None if self.cycle == OTHER_CYCLE else self.cycle
+        return queryset.filter(self.model.objects.get_cycle_filter(cycle))
+
+    def get_order_by(self):
+        """
+        Returns the date column to sort a Parquet file on, if the model has one.
+
+        That's the column the model's table can be partitioned on.
+        """
+        return getattr(self.model.objects, "partition_column", None)
+
+    def write(self, f):
+        """
+        Stream the model's rows from the database into a file object.
+        """
+        if self.format == "parquet":
+            self.rows = write_parquet(
+                self.get_queryset(),
+                f,
+                self.get_copy_to_fields(),
+                compression=self.compression,
+                order_by=self.get_order_by(),
+            )
+            return
+        with get_compressor(self.compression, f) as stream:
+            self.get_queryset().to_csv(stream, *self.get_copy_to_fields())
+
+    def count_rows(self):
+        """
+        Set the number of rows exported to a CSV file, if it isn't known yet.
+
+        Rows are only counted for files split by cycle, which are listed in
+        an index along with their number of rows.
+        """
+        if self.rows is not None:
+            return
+        if self.state is not None:
+            self.rows = self.state["rows"]
+        elif self.cycle is not None:
+            self.rows = self.get_queryset().count()
+
+    def export(self):
+        """
+        Stream the model's rows from the database straight into the file.
+
+        If the file is compressed, the rows are compressed on the way.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self.started = time.perf_counter()
+        with record_step(
+            "archive", self.file_name, [self.model._meta.db_table]
+        ) as step:
+            with open(self.path, "wb") as f:
+                self.write(f)
+            self.count_rows()
+            step.rows_affected = self.rows
+        self.finished = time.perf_counter()
+        self.size = os.path.getsize(self.path)
+        return self
+
+    def export_to_zip(self, zip_file):
+        """
+        Stream the model's rows from the database straight into a new file in a ZIP.
+        """
+        self.path = self.key
+        self.started = time.perf_counter()
+        with record_step(
+            "archive", self.file_name, [self.model._meta.db_table]
+        ) as step:
+            with zip_file.open(self.path, "w", force_zip64=True) as stream:
+                self.write(stream)
+            self.count_rows()
+            step.rows_affected = self.rows
+        self.finished = time.perf_counter()
+        self.size = zip_file.getinfo(self.path).compress_size
+        return self
+
+    def __str__(self):
+        return self.file_name
+
+
+class Manifest(object):
+    """
+    A record of what was in each archived file when it was exported.
+
+    It is saved as JSON in the processed data directory, next to the files, with
+    an entry for each file keyed by its path within the directory.
+    """
+
+    def __init__(self, path):
+        """
+        Create a manifest, loading the entries saved at the path if there are any.
+        """
+        self.path = path
+        self.entries = {}
+        if os.path.exists(path):
+            with open(path) as f:
+                self.entries = json.load(f)
+
+    def get_key(self, archive_file):
+        """
+        Returns the key of a file's entry.
+        """
+        return archive_file.key
+
+    def get_path_list(self):
+        """
+        Returns the paths of the files in the manifest.
+        """
+        directory = os.path.dirname(self.path)
+        return [os.path.join(directory, *key.split("/")) for key in self.entries]
+
+    def is_unchanged(self, archive_file):
+        """
+        Returns True if a file already holds what's in its model's table now.
+
+        That's when its model's table has the same rows as when the file was last
+        exported and the file is still there, the same size.
+        """
+        entry = self.entries.get(self.get_key(archive_file))
+        if entry is None or archive_file.state is None:
+            return False
+        if any(entry.get(k) != v for k, v in archive_file.state.items()):
+            return False
+        try:
+            return os.path.getsize(archive_file.path) == entry["size"]
+        except OSError:
+            return False
+
+    def update(self, archive_file):
+        """
+        Record a file that has just been exported.
+        """
+        entry = dict(
+            model=archive_file.model.__name__,
+            table=archive_file.model._meta.db_table,
+            size=archive_file.size,
+            exported_at=timezone.now().isoformat(),
+        )
+        entry.update(archive_file.state or {})
+        self.entries[self.get_key(archive_file)] = entry
+
+    def save(self):
+        """
+        Save the manifest, replacing the one there in one go.
+        """
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.entries, f, indent=2, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+
+class Archive(object):
+    """
+    Exports a file for each of a list of processed models.
+
+    The files are exported at the same time on a pool of database connections,
+    one per worker, largest tables first.
+
+    Files can instead be written straight into a ZIP, which only takes one at a time.
+
+    With a manifest, files whose tables haven't changed since they were last
+    exported are skipped.
+    """
+
+    def __init__(
+        self,
+        compression=None,
+        zip_path=None,
+        format="csv",
+        manifest_path=None,
+        force=False,
+        split_cycles=False,
+    ):
+        """
+        Create a new archive.
+
+        Args:
+            compression (str): Optional compression for each file, "gzip" or "zstd".
+            zip_path (str): Optional path of a ZIP to add the files to, rather than
+                writing them to the processed data directory. They are added to
+                the ZIP already there, unless it has files with the same names.
+                The ZIP compresses CSV files itself, so compression is ignored.
+            format (str): The format of each file, "csv" or "parquet".
+            manifest_path (str): Optional path of a manifest to record each file
+                in, and to check for files that don't need exporting again.
+                Files written into a ZIP are recorded but never skipped.
+            force (bool): Export every file, even those the manifest says
+                are unchanged.
+            split_cycles (bool): Split models that can be partitioned by election
+                cycle into a file per cycle, each exported on its own, with an
+                index of the files alongside them.
+        """
+        if zip_path and format == "csv":
+            compression = None
+        check_format(format, compression)
+        self.compression = compression
+        self.zip_path = zip_path
+        self.format = format
+        self.manifest = Manifest(manifest_path) if manifest_path else None
+        self.force = force
+        self.split_cycles = split_cycles
+        self.file_list = []
+
+    def add(self, name, model):
+        """
+        Add a model to the archive, to be exported to a file with the given name.
+        """
+        partition_column = getattr(model.objects, "partition_column", None)
+        if not self.split_cycles or not partition_column:
+            cycle_list = [None]
+        else:
+            cycle_list = [
+                OTHER_CYCLE if c is None else c
+                for c in model.objects.get_cycle_list()
+            ]
+        for cycle in cycle_list:
+            self.file_list.append(
+                ArchiveFile(
+                    name,
+                    model,
+                    compression=self.compression,
+                    format=self.format,
+                    cycle=cycle,
+                )
+            )
+
+    def get_index_lookup(self):
+        """
+        Returns a dictionary with the index of each model split by cycle.
+
+        Each index lists the files the model is split into, along with the dates
+        they cover, their number of rows and their size in bytes. They are keyed
+        by their path, in the folder with the files.
+        """
+        index_lookup = {}
+        for f in self.file_list:
+            if f.cycle is None:
+                continue
+            key = f"{f.group}/{f.name}/{INDEX_NAME}"
+            index = index_lookup.setdefault(
+                key,
+                dict(
+                    model=f.name,
+                    date_column=f.model.objects.partition_column,
+                    files=[],
+                ),
+            )
+            if f.cycle == OTHER_CYCLE:
+                start, end = None, None
+            else:
+                start, end = get_cycle_bounds(f.cycle)
+                end -= timedelta(days=1)
+            index["files"].append(
+                dict(
+                    name=f.file_name,
+                    cycle=f.cycle,
+                    start_date=start and start.isoformat(),
+                    end_date=end and end.isoformat(),
+                    rows=f.rows,
+                    size=f.size,
+                )
+            )
+        return index_lookup
+
+    def write_indexes(self, zip_file=None):
+        """
+        Write the index of each model split by cycle, next to its files.
+        """
+        for key, index in self.get_index_lookup().items():
+            data = json.dumps(index, indent=2)
+            if zip_file is not None:
+                zip_file.writestr(key, data)
+                continue
+            path = os.path.join(get_data_directory(), "processed", *key.split("/"))
+            with open(path, "w") as f:
+                f.write(data)
+
+    def get_ordered_list(self):
+        """
+        Returns the files sorted by the size of their tables, largest first.
+        """
+        with connection.cursor() as c:
+            sizes = dict(
+                (f.name, get_size(c, [f.model._meta.db_table])) for f in self.file_list
+            )
+        return sorted(self.file_list, key=lambda f: sizes[f.name], reverse=True)
+
+    def _export_file(self, archive_file):
+        """
+        Export a file on the current thread's connection, unless it is unchanged.
+        """
+        try:
+            if self.manifest is not None:
+                archive_file.state = archive_file.get_state()
+                if not self.force and self.manifest.is_unchanged(archive_file):
+                    archive_file.skipped = True
+                    archive_file.rows = archive_file.state["rows"]
+                    archive_file.size = os.path.getsize(archive_file.path)
+                    return archive_file
+            return archive_file.export()
+        finally:
+            connections.close_all()
+
+    def _record_file(self, archive_file, callback=None):
+        """
+        Record a finished file in the manifest and pass it to the callback.
+        """
+        if self.manifest is not None and not archive_file.skipped:
+            self.manifest.update(archive_file)
+        if callback:
+            callback(archive_file)
+
+    def _save_manifest(self):
+        """
+        Save the manifest, if there is one.
+        """
+        if self.manifest is not None:
+            self.manifest.save()
+
+    def run(self, workers=1, callback=None):
+        """
+        Export every file.
+
+        Args:
+            workers (int): Number of files to export at the same time.
+            callback (callable): Optional function called with each file as it finishes.
+
+        If a file fails, the rest are still exported and the error is re-raised
+        at the end.
+        """
+        if self.zip_path:
+            self.run_zip(callback=callback)
+            return
+
+        error = None
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(self._export_file, f) for f in self.get_ordered_list()
+            ]
+            for future in as_completed(futures):
+                try:
+                    archive_file = future.result()
+                except Exception as e:
+                    error = error or e
+                    continue
+                if archive_file.skipped:
+                    logger.debug(f"Skipped {archive_file}, which is unchanged")
+                else:
+                    logger.debug(
+                        f"Exported {archive_file} in {archive_file.duration:.2f}s"
+                    )
+                self._record_file(archive_file, callback)
+        self._save_manifest()
+        if error is not None:
+            raise error
+        self.write_indexes()
+
+    def run_zip(self, callback=None):
+        """
+        Export every file into the archive's ZIP, one after another.
+
+        The files are compressed as they are written, with nothing written to disk
+        outside the ZIP. If the ZIP already has any of them, from an earlier run, a
+        new ZIP is written with everything else in the old one copied over, so the
+        files other commands added to it are kept.
+        """
+        key_set = set(f.key for f in self.file_list) | set(self.get_index_lookup())
+        mode = "w"
+        path = self.zip_path
+        if os.path.exists(self.zip_path):
+            with zipfile.ZipFile(self.zip_path) as zip_file:
+                name_list = zip_file.namelist()
+            if key_set.isdisjoint(name_list):
+                mode = "a"
+            else:
+                # Write the new ZIP next to the old one, then swap it in
+                path = self.zip_path + ".tmp"
+
+        try:
+            with zipfile.ZipFile(
+                path, mode, compression=zipfile.ZIP_DEFLATED, compresslevel=6
+            ) as zip_file:
+                if path != self.zip_path:
+                    copy_zip_entries(self.zip_path, zip_file, key_set)
+                try:
+                    for archive_file in self.get_ordered_list():
+                        if self.manifest is not None:
+                            archive_file.state = archive_file.get_state()
+                        archive_file.export_to_zip(zip_file)
+                        self._record_file(archive_file, callback)
+                    self.write_indexes(zip_file)
+                finally:
+                    self._save_manifest()
+        except BaseException:
+            # Leave the old ZIP as it was
+            if path != self.zip_path and os.path.exists(path):
+                os.remove(path)
+            raise
+        if path != self.zip_path:
+            os.replace(path, self.zip_path)
@@ -0,0 +1,455 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Bundle processed models into a single SQLite or DuckDB database file.
+"""
+import os
+import json
+import time
+import uuid
+import sqlite3
+import logging
+import tempfile
+import itertools
+from datetime import date, datetime, time as datetime_time
+from decimal import Decimal
+
+from calaccess_processed.fields import get_copy_to_field_names, get_export_columns
+from calaccess_processed.telemetry import record_step
+
+logger = logging.getLogger(__name__)
+
+# The name of the bundle, without its extension
+BUNDLE_NAME = "calaccess-processed-data"
+
+# Rows read from the database and inserted into the bundle at a time
+BATCH_SIZE = 10000
+
+# The name of the table describing every other table and column in the bundle
+METADATA_TABLE = "metadata"
+
+# Columns indexed in every table that has them, along with any ending in them
+INDEX_COLUMNS = ("filing_id", "filer_id")
+
+
+def get_internal_type(field):
+    """
+    Returns the internal type of a Django field, or None if there isn't one.
+
+    Relations take the type of the field they point to.
+    """
+    if field is None:
+        return None
+    if field.is_relation and field.target_field is not None:
+        return get_internal_type(field.target_field)
+    return field.get_internal_type()
+
+
+def is_index_column(name, field):
+    """
+    Returns True if a column should be indexed.
+
+    That's filing and filer ids, which link tables together, and dates.
+    """
+    if name in INDEX_COLUMNS or name.endswith(tuple(f"_{c}" for c in INDEX_COLUMNS)):
+        return True
+    return get_internal_type(field) == "DateField"
+
+
+def to_sqlite(value):
+    """
+    Returns a value as one SQLite can store.
+    """
+    if isinstance(value, Decimal):
+        # stored as a number by columns with NUMERIC affinity
+        return str(value)
+    if isinstance(value, (date, datetime, datetime_time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+
+class BundleTable(object):
+    """
+    A table in a bundle, with the rows of a processed model.
+    """
+
+    def __init__(self, name, model):
+        """
+        Create a new table.
+
+        Args:
+            name (str): Name of the table, the same as the model's processed file.
+            model (Model): The model or proxy to export.
+        """
+        self.name = name
+        self.model = model
+        self.queryset = model.objects.all()
+        self.column_list = get_export_columns(
+            self.queryset, get_copy_to_field_names(model)
+        )
+        self.rows = None
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        """
+        Returns the number of seconds loading the table took, if it has run.
+        """
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def get_description(self):
+        """
+        Returns the model's documentation.
+        """
+        doc = self.model().doc
+        # the doc of a processed model is a method, while a proxy's is a property
+        return doc() if callable(doc) else doc
+
+    def get_help_text_lookup(self):
+        """
+        Returns a dictionary with the help text of each column.
+        """
+        try:
+            field_list = self.model().get_field_list()
+        except AttributeError:
+            field_list = self.model._meta.fields
+        lookup = {}
+        for f in field_list:
+            try:
+                help_text = str(f.help_text or "")
+            except AttributeError:
+                help_text = ""
+            lookup[f.name] = help_text
+            if getattr(f, "column", None):
+                lookup.setdefault(f.column, help_text)
+        return lookup
+
+    def get_batches(self, batch_size):
+        """
+        Yields the model's rows in lists, read from a server-side cursor.
+        """
+        value_iterator = self.queryset.values_list(
+            *[lookup for name, lookup, field in self.column_list]
+        ).iterator(chunk_size=batch_size)
+        while True:
+            batch = list(itertools.islice(value_iterator, batch_size))
+            if not batch:
+                return
+            yield batch
+
+    def __str__(self):
+        return self.name
+
+
+class Bundle(object):
+    """
+    A single database file with a table for each of a list of processed models.
+
+    The file is built next to its final path and moved into place once it's done,
+    so a half-built bundle never replaces a good one.
+
+    Subclasses connect to a kind of database and load the rows into it.
+    """
+
+    # The extension of the bundle's file
+    extension = None
+
+    # The column type for each internal type of a Django field
+    type_lookup = {}
+
+    # The column type for everything else
+    default_type = None
+
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        """
+        Create a new bundle.
+
+        Args:
+            path (str): Path of the database file to create.
+            batch_size (int): Number of rows to read and insert at a time.
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.table_list = []
+
+    def add(self, name, model):
+        """
+        Add a model to the bundle, to be loaded into a table with the given name.
+        """
+        self.table_list.append(BundleTable(name, model))
+
+    def connect(self, path):
+        """
+        Returns a connection to a new database file.
+        """
+        raise NotImplementedError
+
+    def load_table(self, db, table):
+        """
+        Load the rows of a table into the database.
+
+        Returns the number of rows loaded.
+        """
+        raise NotImplementedError
+
+    def get_type(self, field):
+        """
+        Returns the column type for a Django field.
+        """
+        return self.type_lookup.get(get_internal_type(field), self.default_type)
+
+    def create_table(self, db, table):
+        """
+        Create a table in the database.
+        """
+        column_sql = ", ".join(
+            f'"{name}" {self.get_type(field)}'
+            for name, lookup, field in table.column_list
+        )
+        db.execute(f'CREATE TABLE "{table.name}" ({column_sql})')
+
+    def create_indexes(self, db, table):
+        """
+        Index a table's filing id, filer id and date columns.
+        """
+        for name, lookup, field in table.column_list:
+            if is_index_column(name, field):
+                db.execute(
+                    f'CREATE INDEX "{table.name}_{name}" ON "{table.name}" ("{name}")'
+                )
+
+    def create_metadata(self, db):
+        """
+        Create a table describing each table and column in the bundle.
+
+        Tables are listed with their documentation, without a column name, and
+        columns with their type and help text.
+        """
+        db.execute(
+            f'CREATE TABLE "{METADATA_TABLE}" (table_name TEXT, column_name TEXT, '
+            "data_type TEXT, description TEXT)"
+        )
+        row_list = []
+        for table in self.table_list:
+            row_list.append((table.name, None, None, table.get_description()))
+            help_text_lookup = table.get_help_text_lookup()
+            for name, lookup, field in table.column_list:
+                row_list.append(
+                    (
+                        table.name,
+                        name,
+                        self.get_type(field),
+                        help_text_lookup.get(name) or help_text_lookup.get(lookup),
+                    )
+                )
+        db.executemany(
+            f'INSERT INTO "{METADATA_TABLE}" VALUES (?, ?, ?, ?)', row_list
+        )
+
+    def finish(self, db):
+        """
+        Finish off the database once every table is loaded.
+        """
+        pass
+
+    def build(self, callback=None):
+        """
+        Build the bundle, loading one table after another.
+
+        Args:
+            callback (callable): Optional function called with each table as it
+                finishes.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+        db = self.connect(temp_path)
+        try:
+            for table in self.table_list:
+                table.started = time.perf_counter()
+                name = f"{os.path.basename(self.path)}:{table.name}"
+                with record_step("archive", name) as step:
+                    self.create_table(db, table)
+                    table.rows = self.load_table(db, table)
+                    self.create_indexes(db, table)
+                    step.rows_affected = table.rows
+                table.finished = time.perf_counter()
+                logger.debug(f"Bundled {table.rows} rows into {table}")
+                if callback:
+                    callback(table)
+            self.create_metadata(db)
+            self.finish(db)
+        finally:
+            db.close()
+        os.replace(temp_path, self.path)
+
+
+class SQLiteBundle(Bundle):
+    """
+    A bundle in a SQLite database file.
+    """
+
+    extension = ".sqlite"
+
+    type_lookup = {
+        "AutoField": "INTEGER",
+        "SmallAutoField": "INTEGER",
+        "BigAutoField": "INTEGER",
+        "IntegerField": "INTEGER",
+        "SmallIntegerField": "INTEGER",
+        "BigIntegerField": "INTEGER",
+        "PositiveIntegerField": "INTEGER",
+        "PositiveSmallIntegerField": "INTEGER",
+        "PositiveBigIntegerField": "INTEGER",
+        "BooleanField": "INTEGER",
+        "NullBooleanField": "INTEGER",
+        "FloatField": "REAL",
+        "DecimalField": "NUMERIC",
+    }
+
+    default_type = "TEXT"
+
+    # Column types whose values are stored as they come out of the database
+    plain_types = ("INTEGER", "REAL")
+
+    def connect(self, path):
+        """
+        Returns a connection to a new SQLite file, tuned for loading it in bulk.
+
+        Nothing is journaled or synced, since a failed build is thrown away.
+        """
+        db = sqlite3.connect(path, isolation_level=None)
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("PRAGMA synchronous = OFF")
+        db.execute("PRAGMA locking_mode = EXCLUSIVE")
+        db.execute("PRAGMA temp_store = MEMORY")
+        db.execute("PRAGMA cache_size = -262144")
+        return db
+
+    def load_table(self, db, table):
+        """
+        Insert the rows of a table in batches, all in one transaction.
+        """
+        placeholders = ", ".join("?" for c in table.column_list)
+        sql = f'INSERT INTO "{table.name}" VALUES ({placeholders})'
+        convert_list = [
+            i
+            for i, (name, lookup, field) in enumerate(table.column_list)
+            if field is None or self.get_type(field) not in self.plain_types
+        ]
+        row_count = 0
+        db.execute("BEGIN")
+        for batch in table.get_batches(self.batch_size):
+            if convert_list:
+                batch = [list(row) for row in batch]
+                for row in batch:
+                    for i in convert_list:
+                        row[i] = to_sqlite(row[i])
+            db.executemany(sql, batch)
+            row_count += len(batch)
+        db.execute("COMMIT")
+        return row_count
+
+    def create_metadata(self, db):
+        """
+        Create the metadata table in one transaction.
+        """
+        db.execute("BEGIN")
+        super(SQLiteBundle, self).create_metadata(db)
+        db.execute("COMMIT")
+
+    def finish(self, db):
+        """
+        Gather the statistics SQLite uses to plan queries.
+        """
+        db.execute("ANALYZE")
+
+
+class DuckDBBundle(Bundle):
+    """
+    A bundle in a DuckDB database file.
+
+    Requires the duckdb package.
+    """
+
+    extension = ".duckdb"
+
+    type_lookup = {
+        "AutoField": "INTEGER",
+        "SmallAutoField": "SMALLINT",
+        "BigAutoField": "BIGINT",
+        "IntegerField": "INTEGER",
+        "SmallIntegerField": "SMALLINT",
+        "BigIntegerField": "BIGINT",
+        "PositiveIntegerField": "BIGINT",
+        "PositiveSmallIntegerField": "INTEGER",
+        "PositiveBigIntegerField": "BIGINT",
+        "BooleanField": "BOOLEAN",
+        "NullBooleanField": "BOOLEAN",
+        "FloatField": "DOUBLE",
+        "DateField": "DATE",
+        "DateTimeField": "TIMESTAMPTZ",
+        "TimeField": "TIME",
+        "UUIDField": "UUID",
+    }
+
+    default_type = "VARCHAR"
+
+    def get_type(self, field):
+        """
+        Returns the column type for a Django field.
+        """
+        if get_internal_type(field) == "DecimalField":
+            while field.is_relation:
+                field = field.target_field
+            return f"DECIMAL({min(field.max_digits, 38)}, {field.decimal_places})"
+        return super(DuckDBBundle, self).get_type(field)
+
+    def connect(self, path):
+        """
+        Returns a connection to a new DuckDB file.
+        """
+        try:
+            import duckdb
+        except ImportError:
+            raise ImportError("DuckDB bundles require the duckdb package")
+        return duckdb.connect(path)
+
+    def load_table(self, db, table):
+        """
+        Stream the rows of a table out of PostgreSQL into a CSV, then load it.
+
+        DuckDB loads a CSV far faster than it inserts rows one batch at a time.
+        """
+        lookup_list = [lookup for name, lookup, field in table.column_list]
+        with tempfile.TemporaryDirectory() as temp_dir:
+            csv_path = os.path.join(temp_dir, f"{table.name}.csv")
+            table.queryset.to_csv(csv_path, *lookup_list)
+            # empty strings are quoted in PostgreSQL's CSVs, unlike nulls
+            db.execute(
+                f"COPY \"{table.name}\" FROM '{csv_path}' "
+                "(FORMAT CSV, HEADER TRUE, ALLOW_QUOTED_NULLS FALSE)"
+            )
+        return db.execute(f'SELECT COUNT(*) FROM "{table.name}"').fetchone()[0]
+
+    def finish(self, db):
+        """
+        Write everything to the database file.
+        """
+        db.execute("CHECKPOINT")
+
+
+def get_bundle_class(format):
+    """
+    Returns the bundle class for a format, "sqlite" or "duckdb".
+    """
+    return {"sqlite": SQLiteBundle, "duckdb": DuckDBBundle}[format]
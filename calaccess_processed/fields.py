@@ -3,7 +3,44 @@
 """
 Custom fields.
 """
-from django.core.exceptions import FieldDoesNotExist
+from django.core.exceptions import FieldDoesNotExist, FieldError
+
+
+def get_copy_to_field_names(model):
+    """
+    Returns the names of the fields a model exports, or an empty tuple for all.
+    """
+    try:
+        return tuple(i[0] for i in model.copy_to_fields)
+    except AttributeError:
+        return tuple()
+
+
+def get_export_columns(queryset, field_names=()):
+    """
+    Returns a list with a tuple for each column exported from a queryset.
+
+    Each has the name of the column, the name of the field or annotation it comes
+    from on the queryset and the Django field, or None if it can't be resolved.
+
+    Args:
+        queryset (QuerySet): The rows to export.
+        field_names (tuple): Optional names of fields or annotations to export,
+            like a model's copy_to_fields. Otherwise every field is exported,
+            named after its column like they are in the CSV files.
+    """
+    if not field_names:
+        return [
+            (f.column, f.attname, f) for f in queryset.model._meta.concrete_fields
+        ]
+    column_list = []
+    for name in field_names:
+        try:
+            field = queryset.query.resolve_ref(name).output_field
+        except FieldError:
+            field = None
+        column_list.append((name, name, field))
+    return column_list
 
 
 class CopyToField(object):
@@ -4,8 +4,10 @@ import re
 
 from django.utils import timezone
 from django.utils.termcolors import colorize
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 from calaccess_raw import get_data_directory
+from calaccess_processed.archive import MANIFEST_NAME, ZIP_NAME, Archive
+from calaccess_processed.telemetry import record_run
 
 
 class CalAccessCommand(BaseCommand):
@@ -13,6 +15,22 @@ class CalAccessCommand(BaseCommand):
     Base class for all custom CalAccess-related management commands.
     """
 
+    # Record each run of the command and how long its steps took
+    record_telemetry = True
+
+    def execute(self, *args, **options):
+        """
+        Runs the command, recording it as a processing run.
+
+        When another command is already being recorded, this one is recorded as
+        a step of its run instead.
+        """
+        if not self.record_telemetry:
+            return super(CalAccessCommand, self).execute(*args, **options)
+        name = " ".join([str(self)] + [str(a) for a in args])
+        with record_run(name):
+            return super(CalAccessCommand, self).execute(*args, **options)
+
     def handle(self, *args, **options):
         """
         Sets options common to all commands.
@@ -85,5 +103,99 @@ class CalAccessCommand(BaseCommand):
         duration = timezone.now() - self.start_datetime
         self.stdout.write("Duration: {}".format(str(duration)))
 
+    def add_archive_arguments(self, parser):
+        """
+        Adds the arguments for how processed files are archived.
+        """
+        parser.add_argument(
+            "--compression",
+            dest="compression",
+            choices=("gzip", "zstd"),
+            default=None,
+            help="Compress each archived file as it is written (zstd requires the "
+            "zstandard package for CSV files)",
+        )
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=("csv", "parquet"),
+            default="csv",
+            help="Format of the archived files (parquet requires the pyarrow package)",
+        )
+        parser.add_argument(
+            "--zip",
+            action="store_true",
+            dest="zip",
+            default=False,
+            help=f"Write the archived files straight into {ZIP_NAME} in the "
+            "processed data directory rather than as separate files",
+        )
+        parser.add_argument(
+            "--split-cycles",
+            action="store_true",
+            dest="split_cycles",
+            default=False,
+            help="Split the largest filings models into a file for each election "
+            "cycle, listed in an index.json next to them",
+        )
+        parser.add_argument(
+            "--force-archive",
+            action="store_true",
+            dest="force_archive",
+            default=False,
+            help=f"Export every file, even those {MANIFEST_NAME} says are unchanged "
+            "since they were last archived",
+        )
+
+    def archive_files(
+        self,
+        lookup,
+        workers=1,
+        compression=None,
+        zip=False,
+        format="csv",
+        force=False,
+        split_cycles=False,
+    ):
+        """
+        Export a file for each model in a dictionary keyed by file name.
+
+        Files are exported at the same time when there is more than one worker,
+        unless they are written into the ZIP. Each is recorded in the manifest,
+        and those with tables unchanged since they were last archived are skipped
+        unless forced. Models partitioned by election cycle can be split into
+        a file per cycle.
+        """
+        zip_path = os.path.join(self.processed_data_dir, ZIP_NAME) if zip else None
+        try:
+            archive = Archive(
+                compression=compression,
+                zip_path=zip_path,
+                format=format,
+                manifest_path=os.path.join(self.processed_data_dir, MANIFEST_NAME),
+                force=force,
+                split_cycles=split_cycles,
+            )
+        except ImportError as e:
+            raise CommandError(e)
+        for name, model in lookup.items():
+            archive.add(name, model)
+        archive.run(workers=workers, callback=self.log_archive_file)
+
+    def log_archive_file(self, archive_file):
+        """
+        Log the size and speed of an archived file once it is exported.
+        """
+        if self.verbosity < 1:
+            return
+        if archive_file.skipped:
+            self.log(f" Skipped {archive_file}, which is unchanged")
+            return
+        rate = archive_file.bytes_per_second or 0
+        self.log(
+            f" Archived {archive_file} ({archive_file.size / 1e6:.1f} MB) in "
+            f"{archive_file.duration:.2f}s ({rate / 1e6:.1f} MB/s)"
+        )
+
     def __str__(self):
         return re.sub(r"(.+\.)*", "", self.__class__.__module__)
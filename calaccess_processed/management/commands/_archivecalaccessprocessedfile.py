@@ -1,18 +1,17 @@
-"""Export and archive a .csv file for a given model."""
-import os
-
+"""Export and archive a .csv or .parquet file for a given model."""
 from django.apps import apps
-from calaccess_raw import get_data_directory
+from django.core.management.base import CommandError
 
+from calaccess_processed.archive import ArchiveFile, check_format
 from calaccess_processed.management.commands import CalAccessCommand
 
 
 class Command(CalAccessCommand):
     """
-    Export and archive a .csv file for a given model.
+    Export and archive a .csv or .parquet file for a given model.
     """
 
-    help = "Export and archive a .csv file for a given model."
+    help = "Export and archive a .csv or .parquet file for a given model."
 
     def add_arguments(self, parser):
         """
@@ -20,6 +19,21 @@ class Command(CalAccessCommand):
         """
         super(Command, self).add_arguments(parser)
         parser.add_argument("model_name", help="Name of the model to archive")
+        parser.add_argument(
+            "--compression",
+            dest="compression",
+            choices=("gzip", "zstd"),
+            default=None,
+            help="Compress the file as it is written (zstd requires the "
+            "zstandard package for CSV files)",
+        )
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=("csv", "parquet"),
+            default="csv",
+            help="Format of the file (parquet requires the pyarrow package)",
+        )
 
     def get_model(self, processed_file):
         """
@@ -36,24 +50,23 @@ class Command(CalAccessCommand):
         # Parse model name
         self.model_name = options["model_name"]
 
-        # Log out what we're doing ...
-        self.log(" Archiving %s.csv" % self.model_name)
+        try:
+            check_format(options["format"], options["compression"])
+        except ImportError as e:
+            raise CommandError(e)
 
         # Get the data obj that is paired with the processed_file obj
         lookup = apps.get_app_config("calaccess_processed").get_processed_file_lookup()
         data_model = lookup[self.model_name]
-
-        # Figure out the path where we will save the file
-        csv_dir = os.path.join(
-            get_data_directory(), "processed", data_model().klass_group.lower()
+        archive_file = ArchiveFile(
+            self.model_name,
+            data_model,
+            compression=options["compression"],
+            format=options["format"],
         )
-        os.path.exists(csv_dir) or os.mkdir(csv_dir)
-        csv_name = f"{self.model_name}.csv"
-        csv_path = os.path.join(csv_dir, csv_name)
+
+        # Log out what we're doing ...
+        self.log(f" Archiving {archive_file}")
 
         # Export a new one
-        try:
-            copy_to_fields = tuple(i[0] for i in data_model.copy_to_fields)
-        except AttributeError:
-            copy_to_fields = tuple()
-        data_model.objects.to_csv(csv_path, *copy_to_fields)
+        archive_file.export()
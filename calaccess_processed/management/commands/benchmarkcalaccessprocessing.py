@@ -0,0 +1,167 @@
+"""Time each processing stage against synthetic raw data at several scales."""
+import os
+import json
+import time
+
+from django.db import connection
+from django.utils import timezone
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from calaccess_processed.models import ProcessingRun
+from calaccess_processed.synthetic import SyntheticRawData
+from calaccess_processed.management.commands import CalAccessCommand
+
+
+class Command(CalAccessCommand):
+    """
+    Time each processing stage against synthetic raw data at several scales.
+    """
+
+    help = "Time each processing stage against synthetic raw data at several scales."
+
+    # Each stage records its own run, which is copied into the results
+    record_telemetry = False
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--scales",
+            dest="scales",
+            nargs="+",
+            type=int,
+            default=[1, 10, 50],
+            help="Scales to generate synthetic raw data at, each a multiple of the "
+            "raw data already loaded (default: 1 10 50)",
+        )
+        parser.add_argument(
+            "--stages",
+            dest="stages",
+            nargs="+",
+            default=[
+                "processcalaccessfilings",
+                "processcalaccesselections",
+                "processcalaccessflatfiles",
+            ],
+            help="Commands to time at each scale, in order (default: "
+            "processcalaccessfilings processcalaccesselections "
+            "processcalaccessflatfiles)",
+        )
+        parser.add_argument(
+            "--seed",
+            dest="seed",
+            type=int,
+            default=0,
+            help="Seed for the synthetic data, so runs can be compared (default: 0)",
+        )
+        parser.add_argument(
+            "--output",
+            dest="output",
+            default=None,
+            help="Path of the JSON file to write the results to "
+            "(default: benchmark.json in the data directory)",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            dest="keep",
+            default=False,
+            help="Leave the synthetic data from the last scale in the raw tables",
+        )
+
+    def handle(self, *args, **options):
+        """Make it happen."""
+        super(Command, self).handle(*args, **options)
+        output = options["output"] or os.path.join(self.data_dir, "benchmark.json")
+        if min(options["scales"]) < 1:
+            raise CommandError("Every scale must be at least 1.")
+
+        with connection.cursor() as c:
+            c.execute("SHOW server_version")
+            server_version = c.fetchone()[0]
+        results = dict(
+            start_datetime=timezone.now().isoformat(),
+            server_version=server_version,
+            seed=options["seed"],
+            scales=[],
+        )
+
+        try:
+            for scale in options["scales"]:
+                results["scales"].append(
+                    self.benchmark_scale(scale, options["seed"], options["stages"])
+                )
+                # write as we go, so a failure doesn't lose the scales that finished
+                with open(output, "w") as f:
+                    json.dump(results, f, indent=2)
+        finally:
+            if not options["keep"]:
+                SyntheticRawData().flush()
+
+        self.success(f"Results written to {output}")
+
+    def benchmark_scale(self, scale, seed, stage_list):
+        """
+        Generate synthetic data at a scale and time each stage against it.
+
+        Returns a dictionary with the results.
+        """
+        self.header(f"Benchmarking at {scale}x")
+        start = time.perf_counter()
+        try:
+            rows = SyntheticRawData(scale=scale, seed=seed).generate()
+        except ValueError as e:
+            raise CommandError(e)
+        generate_duration = time.perf_counter() - start
+        if self.verbosity >= 2:
+            self.log(
+                f" Generated {sum(rows.values())} rows in {generate_duration:.2f}s"
+            )
+
+        result = dict(
+            scale=scale, rows=rows, generate_duration=generate_duration, stages=[]
+        )
+        for stage in stage_list:
+            result["stages"].append(self.benchmark_stage(stage))
+        return result
+
+    def benchmark_stage(self, stage):
+        """
+        Run a stage and return a dictionary with how long it and each of its steps took.
+
+        A stage that fails is recorded with its error, and the benchmark moves on.
+        """
+        start_datetime = timezone.now()
+        start = time.perf_counter()
+        error = None
+        try:
+            call_command(stage, verbosity=self.verbosity, no_color=self.no_color)
+        except Exception as e:
+            error = f"{e.__class__.__name__}: {e}"
+        duration = time.perf_counter() - start
+
+        if error:
+            self.failure(f" {stage} failed in {duration:.2f}s: {error}")
+        elif self.verbosity >= 2:
+            self.log(f" {stage} took {duration:.2f}s")
+
+        run = ProcessingRun.objects.filter(
+            command=stage, start_datetime__gte=start_datetime
+        ).first()
+        step_list = [
+            dict(
+                kind=s.kind,
+                name=s.name,
+                duration=s.duration,
+                rows_affected=s.rows_affected,
+                size_before=s.size_before,
+                size_after=s.size_after,
+                buffer_hits=s.buffer_hits,
+                buffer_reads=s.buffer_reads,
+            )
+            for s in (run.steps.all() if run else [])
+        ]
+        return dict(command=stage, duration=duration, error=error, steps=step_list)
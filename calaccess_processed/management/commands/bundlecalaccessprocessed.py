@@ -0,0 +1,75 @@
+"""Bundle the processed data into a single SQLite or DuckDB database file."""
+import os
+
+from django.apps import apps
+from django.core.management.base import CommandError
+
+from calaccess_processed.bundle import BATCH_SIZE, BUNDLE_NAME, get_bundle_class
+from calaccess_processed.management.commands import CalAccessCommand
+
+
+class Command(CalAccessCommand):
+    """
+    Bundle the processed data into a single SQLite or DuckDB database file.
+    """
+
+    help = "Bundle the processed data into a single SQLite or DuckDB database file."
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--format",
+            dest="format",
+            choices=("sqlite", "duckdb"),
+            default="sqlite",
+            help="Kind of database to bundle the data into (duckdb requires the "
+            "duckdb package)",
+        )
+        parser.add_argument(
+            "--output",
+            dest="output",
+            default=None,
+            help=f"Path of the database file (default: {BUNDLE_NAME} in the "
+            "processed data directory)",
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=BATCH_SIZE,
+            help=f"Number of rows to insert at a time (default: {BATCH_SIZE})",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+        bundle_class = get_bundle_class(options["format"])
+        path = options["output"] or os.path.join(
+            self.processed_data_dir, BUNDLE_NAME + bundle_class.extension
+        )
+        bundle = bundle_class(path, batch_size=options["batch_size"])
+        lookup = apps.get_app_config("calaccess_processed").get_processed_file_lookup()
+        for name, model in lookup.items():
+            bundle.add(name, model)
+
+        self.header(f"Bundling {len(bundle.table_list)} tables into {path}")
+        try:
+            bundle.build(callback=self.log_table)
+        except ImportError as e:
+            raise CommandError(e)
+
+        self.success(f"Bundled {sum(t.rows for t in bundle.table_list)} rows")
+        self.duration()
+
+    def log_table(self, table):
+        """
+        Log the size and speed of a table once it is loaded.
+        """
+        if self.verbosity < 2:
+            return
+        self.log(f" Bundled {table} ({table.rows} rows) in {table.duration:.2f}s")
@@ -5,6 +5,7 @@ from django.core.management import call_command
 from django.core.management.base import CommandError
 
 from calaccess_scraped.models import PropositionElection
+from calaccess_processed.archive import MANIFEST_NAME, Manifest
 from calaccess_processed.management.commands import CalAccessCommand
 
 
@@ -15,6 +16,21 @@ class Command(CalAccessCommand):
         "Load data into processed CAL-ACCESS models, archive processed files and ZIP."
     )
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=1,
+            help="Number of models to load or archive at the same time, each on "
+            "its own database connection (default: 1)",
+        )
+        self.add_archive_arguments(parser)
+
     def handle(self, *args, **options):
         """Make it happen."""
         # Throw an error if the scraper hasn't been run.
@@ -26,12 +42,19 @@ class Command(CalAccessCommand):
         # Set options
         super(Command, self).handle(*args, **options)
 
-        # Clear it out
+        # Clear it out, keeping the files in the manifest that may not need
+        # exporting again, unless they are all being archived anyway
         if self.verbosity > 2:
             self.log("Flushing local copies of processed data files.")
+        manifest_path = os.path.join(self.processed_data_dir, MANIFEST_NAME)
+        keep_list = []
+        if not options["force_archive"]:
+            keep_list = Manifest(manifest_path).get_path_list() + [manifest_path]
         for dirpath, dirnames, filenames in os.walk(self.processed_data_dir):
             file_paths = [os.path.join(dirpath, i) for i in filenames]
             for file_path in file_paths:
+                if file_path in keep_list:
+                    continue
                 try:
                     os.remove(file_path)
                 except OSError:
@@ -42,16 +65,34 @@ class Command(CalAccessCommand):
             "processcalaccessfilings",
             verbosity=self.verbosity,
             no_color=self.no_color,
+            workers=options["workers"],
+            compression=options["compression"],
+            zip=options["zip"],
+            format=options["format"],
+            force_archive=options["force_archive"],
+            split_cycles=options["split_cycles"],
         )
         call_command(
             "processcalaccesselections",
             verbosity=self.verbosity,
             no_color=self.no_color,
+            workers=options["workers"],
+            compression=options["compression"],
+            zip=options["zip"],
+            format=options["format"],
+            force_archive=options["force_archive"],
+            split_cycles=options["split_cycles"],
         )
         call_command(
             "processcalaccessflatfiles",
             verbosity=self.verbosity,
             no_color=self.no_color,
+            workers=options["workers"],
+            compression=options["compression"],
+            zip=options["zip"],
+            format=options["format"],
+            force_archive=options["force_archive"],
+            split_cycles=options["split_cycles"],
         )
 
         # then verify
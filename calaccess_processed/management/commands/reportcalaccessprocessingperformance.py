@@ -0,0 +1,155 @@
+"""Compare the latest processing run against the runs before it."""
+from statistics import median
+
+from django.core.management.base import CommandError
+
+from calaccess_processed.models import ProcessingRun
+from calaccess_processed.management.commands import CalAccessCommand
+
+
+class Command(CalAccessCommand):
+    """
+    Compare the latest processing run against the runs before it.
+    """
+
+    help = "Compare the latest processing run against the runs before it."
+
+    # Reading the records shouldn't add to them
+    record_telemetry = False
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--command",
+            dest="command",
+            default=None,
+            help="Only compare runs of this command, such as processcalaccessdata "
+            "(default: the command of the latest run)",
+        )
+        parser.add_argument(
+            "--runs",
+            dest="runs",
+            type=int,
+            default=5,
+            help="Number of previous runs to compare against (default: 5)",
+        )
+        parser.add_argument(
+            "--threshold",
+            dest="threshold",
+            type=float,
+            default=20,
+            help="Percent slower than the previous runs a step must be to be flagged "
+            "as a regression (default: 20)",
+        )
+        parser.add_argument(
+            "--min-seconds",
+            dest="min_seconds",
+            type=float,
+            default=1,
+            help="Ignore steps faster than this many seconds, which vary too much "
+            "to compare (default: 1)",
+        )
+        parser.add_argument(
+            "--fail",
+            action="store_true",
+            dest="fail",
+            default=False,
+            help="Exit with an error if any regressions are found",
+        )
+
+    def handle(self, *args, **options):
+        """Make it happen."""
+        super(Command, self).handle(*args, **options)
+        self.threshold = options["threshold"] / 100
+        self.min_seconds = options["min_seconds"]
+
+        run_list = ProcessingRun.objects.filter(finish_datetime__isnull=False)
+        if options["command"]:
+            run_list = run_list.filter(command=options["command"])
+        try:
+            latest = run_list.latest()
+        except ProcessingRun.DoesNotExist:
+            raise CommandError("No finished processing runs found.")
+        previous_list = list(
+            run_list.filter(
+                command=latest.command, start_datetime__lt=latest.start_datetime
+            ).order_by("-start_datetime")[: options["runs"]]
+        )
+
+        self.header(f"Comparing {latest} against {len(previous_list)} previous runs")
+        if not previous_list:
+            self.warn(" No previous runs to compare against.")
+
+        # the run itself goes first, then its steps in the order they started
+        rows = [
+            ("run", latest.command, latest.duration, [p.duration for p in previous_list])
+        ]
+        previous_totals = [self.get_step_totals(p) for p in previous_list]
+        for key, duration in self.get_step_totals(latest).items():
+            history = [t[key] for t in previous_totals if key in t]
+            rows.append(key + (duration, history))
+
+        run_regressed = False
+        regression_list = []
+        for kind, name, duration, history in rows:
+            baseline = median(history) if history else None
+            change = (duration - baseline) / baseline if baseline else None
+            line = f"  {kind:<7} {name[:60]:<60} {duration:>9.2f}s"
+            if change is not None:
+                line += f" {baseline:>9.2f}s {change:>+8.1%}"
+            if self.is_regression(duration, baseline):
+                if kind == "run":
+                    run_regressed = True
+                else:
+                    regression_list.append(name)
+                self.failure(line)
+            elif self.verbosity >= 2:
+                self.log(line)
+
+        message = self.get_regression_message(run_regressed, regression_list)
+        if message:
+            if options["fail"]:
+                raise CommandError(message)
+            self.warn(message)
+        else:
+            self.success("No regressions found")
+
+    def get_regression_message(self, run_regressed, regression_list):
+        """
+        Returns a summary of the regressions found, or None if there weren't any.
+
+        The whole run is reported apart from its steps, which it would be counted with.
+        """
+        count = len(regression_list)
+        if count:
+            message = f"{count} step{'' if count == 1 else 's'} regressed"
+            if run_regressed:
+                message += ", and so did the whole run"
+            return message
+        if run_regressed:
+            return "The whole run regressed, though no single step did"
+        return None
+
+    def get_step_totals(self, run):
+        """
+        Returns a dictionary with the seconds each step of a run took.
+
+        The dictionary is keyed by each step's kind and name.
+        Steps that ran more than once are added up.
+        """
+        totals = {}
+        for step in run.steps.all():
+            key = (step.kind, step.name)
+            totals[key] = totals.get(key, 0) + step.duration
+        return totals
+
+    def is_regression(self, duration, baseline):
+        """
+        Returns True if a duration is more than the threshold slower than its baseline.
+        """
+        if baseline is None or max(duration, baseline) < self.min_seconds:
+            return False
+        return duration > baseline * (1 + self.threshold)
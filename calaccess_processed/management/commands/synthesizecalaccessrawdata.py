@@ -0,0 +1,65 @@
+"""Fill the raw CAL-ACCESS tables with synthetic filings for testing at scale."""
+from django.core.management.base import CommandError
+
+from calaccess_processed.synthetic import SyntheticRawData
+from calaccess_processed.management.commands import CalAccessCommand
+
+
+class Command(CalAccessCommand):
+    """
+    Fill the raw CAL-ACCESS tables with synthetic filings for testing at scale.
+    """
+
+    help = "Fill the raw CAL-ACCESS tables with synthetic filings for testing at scale."
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--scale",
+            dest="scale",
+            type=int,
+            default=1,
+            help="Number of synthetic rows to create for each row of raw data already "
+            "loaded (default: 1)",
+        )
+        parser.add_argument(
+            "--seed",
+            dest="seed",
+            type=int,
+            default=None,
+            help="Seed for the random choices, so the same data can be generated again",
+        )
+        parser.add_argument(
+            "--flush",
+            action="store_true",
+            dest="flush",
+            default=False,
+            help="Delete the synthetic rows without generating new ones",
+        )
+
+    def handle(self, *args, **options):
+        """Make it happen."""
+        super(Command, self).handle(*args, **options)
+        generator = SyntheticRawData(scale=options["scale"], seed=options["seed"])
+
+        if options["flush"]:
+            counts = generator.flush()
+            if self.verbosity >= 2:
+                self.log(f" Deleted {sum(counts.values())} synthetic rows")
+            self.success("Done!")
+            return
+
+        if options["scale"] < 1:
+            raise CommandError("The scale must be at least 1.")
+        self.header(f"Generating synthetic raw data at {options['scale']}x")
+        try:
+            counts = generator.generate()
+        except ValueError as e:
+            raise CommandError(e)
+        if self.verbosity >= 2:
+            for table, count in counts.items():
+                self.log(f" {count} rows in {table}")
+        self.success("Done!")
@@ -0,0 +1,152 @@
+# Generated by Django 4.0.10 on 2026-10-18 05:12
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        (
+            "calaccess_processed",
+            "0017_remove_processeddataversion_raw_version_and_more",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ProcessingRun",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "command",
+                    models.CharField(
+                        help_text="Name of the management command that was run",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "start_datetime",
+                    models.DateTimeField(help_text="Date and time the run started"),
+                ),
+                (
+                    "finish_datetime",
+                    models.DateTimeField(
+                        help_text="Date and time the run finished. Null if it failed or is running.",
+                        null=True,
+                    ),
+                ),
+                (
+                    "duration",
+                    models.FloatField(
+                        help_text="Number of seconds the run took", null=True
+                    ),
+                ),
+            ],
+            options={
+                "get_latest_by": "start_datetime",
+            },
+        ),
+        migrations.CreateModel(
+            name="ProcessingStep",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("command", "Management command"),
+                            ("sql", "Loading query"),
+                            ("archive", "Archived file"),
+                        ],
+                        help_text="Kind of step",
+                        max_length=10,
+                    ),
+                ),
+                (
+                    "name",
+                    models.CharField(
+                        help_text="Name of the command, model or file the step processed",
+                        max_length=200,
+                    ),
+                ),
+                (
+                    "start_datetime",
+                    models.DateTimeField(help_text="Date and time the step started"),
+                ),
+                (
+                    "finish_datetime",
+                    models.DateTimeField(help_text="Date and time the step finished"),
+                ),
+                (
+                    "duration",
+                    models.FloatField(help_text="Number of seconds the step took"),
+                ),
+                (
+                    "rows_affected",
+                    models.BigIntegerField(
+                        help_text="Number of rows the step inserted, updated or deleted, if known",
+                        null=True,
+                    ),
+                ),
+                (
+                    "size_before",
+                    models.BigIntegerField(
+                        help_text="Size in bytes of the tables the step wrote to, or of the whole database, before the step",
+                        null=True,
+                    ),
+                ),
+                (
+                    "size_after",
+                    models.BigIntegerField(
+                        help_text="Size in bytes of the tables the step wrote to, or of the whole database, after the step",
+                        null=True,
+                    ),
+                ),
+                (
+                    "buffer_hits",
+                    models.BigIntegerField(
+                        help_text="Number of blocks the step found in the database's shared buffers",
+                        null=True,
+                    ),
+                ),
+                (
+                    "buffer_reads",
+                    models.BigIntegerField(
+                        help_text="Number of blocks the step had to read from outside the buffers",
+                        null=True,
+                    ),
+                ),
+                (
+                    "run",
+                    models.ForeignKey(
+                        help_text="Run the step was part of",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="steps",
+                        to="calaccess_processed.processingrun",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("start_datetime",),
+            },
+        ),
+    ]
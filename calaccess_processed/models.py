@@ -104,3 +104,105 @@ class CalAccessBaseModel(models.Model):
 
         abstract = True
         app_label = "calaccess_processed"
+
+
+class ProcessingRun(models.Model):
+    """
+    A single run of a processing command, along with the steps it took.
+    """
+
+    command = models.CharField(
+        max_length=100,
+        help_text="Name of the management command that was run",
+    )
+    start_datetime = models.DateTimeField(
+        help_text="Date and time the run started",
+    )
+    finish_datetime = models.DateTimeField(
+        null=True,
+        help_text="Date and time the run finished. Null if it failed or is running.",
+    )
+    duration = models.FloatField(
+        null=True,
+        help_text="Number of seconds the run took",
+    )
+
+    class Meta:
+        """
+        Meta model options.
+        """
+
+        app_label = "calaccess_processed"
+        get_latest_by = "start_datetime"
+
+    def __str__(self):
+        return f"{self.command} ({self.start_datetime})"
+
+
+class ProcessingStep(models.Model):
+    """
+    A single step of a processing run, like a loading query or an archived file.
+    """
+
+    KIND_CHOICES = (
+        ("command", "Management command"),
+        ("sql", "Loading query"),
+        ("archive", "Archived file"),
+    )
+    run = models.ForeignKey(
+        ProcessingRun,
+        related_name="steps",
+        on_delete=models.CASCADE,
+        help_text="Run the step was part of",
+    )
+    kind = models.CharField(
+        max_length=10,
+        choices=KIND_CHOICES,
+        help_text="Kind of step",
+    )
+    name = models.CharField(
+        max_length=200,
+        help_text="Name of the command, model or file the step processed",
+    )
+    start_datetime = models.DateTimeField(
+        help_text="Date and time the step started",
+    )
+    finish_datetime = models.DateTimeField(
+        help_text="Date and time the step finished",
+    )
+    duration = models.FloatField(
+        help_text="Number of seconds the step took",
+    )
+    rows_affected = models.BigIntegerField(
+        null=True,
+        help_text="Number of rows the step inserted, updated or deleted, if known",
+    )
+    size_before = models.BigIntegerField(
+        null=True,
+        help_text="Size in bytes of the tables the step wrote to, or of the whole "
+        "database, before the step",
+    )
+    size_after = models.BigIntegerField(
+        null=True,
+        help_text="Size in bytes of the tables the step wrote to, or of the whole "
+        "database, after the step",
+    )
+    buffer_hits = models.BigIntegerField(
+        null=True,
+        help_text="Number of blocks the step found in the database's shared buffers",
+    )
+    buffer_reads = models.BigIntegerField(
+        null=True,
+        help_text="Number of blocks the step had to read from outside the buffers",
+    )
+
+    class Meta:
+        """
+        Meta model options.
+        """
+
+        app_label = "calaccess_processed"
+        ordering = ("start_datetime",)
+
+    def __str__(self):
+        return f"{self.kind} {self.name}"
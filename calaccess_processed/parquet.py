@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Export processed models to typed Apache Parquet files.
+
+Requires the pyarrow package.
+"""
+import json
+import uuid
+import logging
+
+from calaccess_processed.fields import get_export_columns
+
+logger = logging.getLogger(__name__)
+
+# Rows read from the database and written to the file at a time.
+# Each batch becomes a row group, with the min and max of each column for
+# readers to skip the groups a filter rules out.
+ROW_GROUP_SIZE = 50000
+
+# Text columns no longer than this are codes, stored once per row group in a dictionary
+CODE_MAX_LENGTH = 3
+
+
+def get_pyarrow():
+    """
+    Returns the pyarrow module and its parquet module.
+    """
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet files require the pyarrow package")
+    return pyarrow, pyarrow.parquet
+
+
+def get_arrow_type(field):
+    """
+    Returns the Apache Arrow type for a Django field.
+
+    Relations take the type of the field they point to. Anything not recognized
+    is stored as text.
+    """
+    pa, pq = get_pyarrow()
+    if field.is_relation and field.target_field is not None:
+        return get_arrow_type(field.target_field)
+    internal_type = field.get_internal_type()
+    if internal_type == "ArrayField":
+        return pa.list_(get_arrow_type(field.base_field))
+    if internal_type == "DecimalField":
+        return pa.decimal128(field.max_digits, field.decimal_places)
+    return {
+        "AutoField": pa.int32(),
+        "SmallAutoField": pa.int16(),
+        "BigAutoField": pa.int64(),
+        "IntegerField": pa.int32(),
+        "SmallIntegerField": pa.int16(),
+        "BigIntegerField": pa.int64(),
+        "PositiveIntegerField": pa.int64(),
+        "PositiveSmallIntegerField": pa.int32(),
+        "PositiveBigIntegerField": pa.int64(),
+        "BooleanField": pa.bool_(),
+        "NullBooleanField": pa.bool_(),
+        "FloatField": pa.float64(),
+        "DateField": pa.date32(),
+        "DateTimeField": pa.timestamp("us", tz="UTC"),
+        "TimeField": pa.time64("us"),
+        "DurationField": pa.duration("us"),
+    }.get(internal_type, pa.string())
+
+
+def is_code_field(field):
+    """
+    Returns True if a field holds a short code, like a state or a transaction type.
+    """
+    if field is None or field.get_internal_type() not in ("CharField", "TextField"):
+        return False
+    return bool(field.choices) or (field.max_length or 0) <= CODE_MAX_LENGTH
+
+
+def to_text(value):
+    """
+    Returns a value that isn't a string as text.
+    """
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return str(value)
+
+
+class ParquetColumn(object):
+    """
+    A column of a Parquet file, along with the field its values come from.
+    """
+
+    def __init__(self, name, lookup, field):
+        """
+        Create a new column.
+
+        Args:
+            name (str): Name of the column in the file.
+            lookup (str): Name of the field or annotation on the queryset.
+            field (Field): The Django field, or None if it is unknown.
+        """
+        self.name = name
+        self.lookup = lookup
+        self.field = field
+        if field is not None:
+            self.type = get_arrow_type(field)
+        else:
+            self.type = get_pyarrow()[0].string()
+
+    @property
+    def is_code(self):
+        """
+        Returns True if the column should be dictionary encoded.
+        """
+        return is_code_field(self.field)
+
+    def to_array(self, value_list):
+        """
+        Returns an Arrow array of the column's values.
+        """
+        pa, pq = get_pyarrow()
+        if pa.types.is_string(self.type):
+            value_list = [to_text(v) for v in value_list]
+        return pa.array(value_list, type=self.type)
+
+
+def get_column_list(queryset, field_names=()):
+    """
+    Returns a list of a ParquetColumn for each column to export.
+
+    Args:
+        queryset (QuerySet): The rows to export.
+        field_names (tuple): Optional names of fields or annotations to export.
+            Otherwise every field is exported.
+    """
+    return [ParquetColumn(*c) for c in get_export_columns(queryset, field_names)]
+
+
+def write_parquet(queryset, f, field_names=(), compression=None, order_by=None):
+    """
+    Stream the rows of a queryset into a Parquet file.
+
+    The rows are read in batches from a server-side cursor, so memory use doesn't
+    grow with the size of the table.
+
+    Args:
+        queryset (QuerySet): The rows to export.
+        f (str or file): The path or file object to write to.
+        field_names (tuple): Optional names of the fields or annotations to export.
+        compression (str): Optional compression for the file, "gzip" or "zstd".
+            Snappy is used by default.
+        order_by (str): Optional date column to sort the rows on, so the min and
+            max recorded for each row group let readers skip to the dates they want.
+
+    Returns the number of rows written.
+    """
+    pa, pq = get_pyarrow()
+    column_list = get_column_list(queryset, field_names)
+    schema = pa.schema([(c.name, c.type) for c in column_list])
+    if order_by:
+        queryset = queryset.order_by(order_by, "pk")
+
+    row_count = 0
+    writer = pq.ParquetWriter(
+        f,
+        schema,
+        compression=compression or "snappy",
+        use_dictionary=[c.name for c in column_list if c.is_code],
+    )
+    try:
+        value_iterator = queryset.values_list(
+            *[c.lookup for c in column_list]
+        ).iterator(chunk_size=ROW_GROUP_SIZE)
+        batch = []
+        for row in value_iterator:
+            batch.append(row)
+            if len(batch) == ROW_GROUP_SIZE:
+                row_count += write_batch(writer, schema, column_list, batch)
+                batch = []
+        if batch or not row_count:
+            row_count += write_batch(writer, schema, column_list, batch)
+    finally:
+        writer.close()
+    return row_count
+
+
+def write_batch(writer, schema, column_list, batch):
+    """
+    Write a batch of rows to a Parquet file as a row group.
+
+    Returns the number of rows written.
+    """
+    pa, pq = get_pyarrow()
+    value_lists = list(zip(*batch)) if batch else [[] for c in column_list]
+    table = pa.Table.from_arrays(
+        [c.to_array(v) for c, v in zip(column_list, value_lists)], schema=schema
+    )
+    writer.write_table(table, row_group_size=ROW_GROUP_SIZE)
+    logger.debug(f"Wrote {len(batch)} rows to Parquet")
+    return len(batch)
@@ -0,0 +1,428 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Generate synthetic CAL-ACCESS raw data from the raw data already in the database.
+"""
+import random
+import logging
+
+from django.apps import apps
+from django.db import connection, transaction
+
+logger = logging.getLogger(__name__)
+
+# Synthetic rows get ids far above any real ones, so they can be told apart
+FILING_ID_BASE = 1000000000
+FORM501_FILING_ID_BASE = 1500000000
+FILER_ID_BASE = 900000000
+LEGACY_XREF_ID_BASE = 800000000
+
+# The table with the cover sheet of each filing and the one with its Form 501s
+COVER_TABLE = "CVR_CAMPAIGN_DISCLOSURE_CD"
+FORM501_TABLE = "F501_502_CD"
+XREF_TABLE = "FILER_XREF_CD"
+
+# The form of the cover sheet each item table's rows are filed with,
+# keyed by the item's form type, along with the form of any others.
+# Items from forms that aren't generated, like lobbying reports, are left out.
+ITEM_TABLES = {
+    "RCPT_CD": ({"F496P3": "F496", "F401A": "F401"}, "F460"),
+    "EXPN_CD": ({"F461P5": "F461", "F465P3": "F465", "F450P5": "F450"}, "F460"),
+    "LOAN_CD": ({}, "F460"),
+    "S496_CD": ({}, "F496"),
+    "S497_CD": ({}, "F497"),
+    "SMRY_CD": (
+        dict(
+            [(f, "F460") for f in "F460 A B1 B2 B3 C D E F G H H1 H2 H3 I".split()]
+            + [("F461", "F461"), ("F465", "F465"), ("F450", "F450")]
+            + [("F401", "F401"), ("401B", "F401")]
+        ),
+        None,
+    ),
+}
+
+
+class SyntheticRawData(object):
+    """
+    Fills the raw CAL-ACCESS tables with synthetic filings.
+
+    The synthetic data is a multiple of the size of the raw data already loaded,
+    which serves as the seed. That can be the sample in the test data. Every
+    synthetic row copies the values of a seed row picked at random, so the mix of
+    forms, amounts, dates and codes follows the seed. What's rewritten are the ids
+    that link the tables together:
+
+    * Each filing gets a range of amendments drawn from how often the seed's cover
+      sheets were amended, and every version is filed by a synthetic filer.
+    * Each filer is cross-referenced in FILER_XREF_CD. Some also have a legacy id,
+      like real filers, that some of their cover sheets use instead.
+    * Each item is attached to a version of a filing of the form it belongs to.
+      Filings are picked unevenly, so a few are long and most are short.
+
+    Synthetic rows are given ids above any real ones, so they can be flushed
+    without touching the seed.
+    """
+
+    def __init__(self, scale=1, seed=None):
+        """
+        Create a new generator.
+
+        Args:
+            scale (int): Number of synthetic rows to create for each row of the seed.
+            seed (int): Optional seed for the random choices, to repeat a data set.
+        """
+        self.scale = scale
+        self.seed = seed
+
+    def get_model(self, table):
+        """
+        Returns the calaccess_raw model for a table.
+        """
+        for m in apps.get_app_config("calaccess_raw").get_models():
+            if m._meta.db_table == table:
+                return m
+        raise LookupError(f"No raw model uses the {table} table")
+
+    def get_columns(self, table):
+        """
+        Returns a list of the names of a raw table's columns, other than its primary key.
+        """
+        model = self.get_model(table)
+        return [f.column for f in model._meta.concrete_fields if not f.primary_key]
+
+    def flush(self):
+        """
+        Delete every synthetic row from the raw tables.
+
+        Returns a dictionary with the number of rows deleted, keyed by table.
+        """
+        counts = {}
+        with connection.cursor() as c:
+            for table in [COVER_TABLE, FORM501_TABLE] + list(ITEM_TABLES):
+                c.execute(
+                    f'DELETE FROM "{table}" WHERE "FILING_ID" >= %s', [FILING_ID_BASE]
+                )
+                counts[table] = c.rowcount
+            c.execute(
+                f'DELETE FROM "{XREF_TABLE}" WHERE "FILER_ID" >= %s', [FILER_ID_BASE]
+            )
+            counts[XREF_TABLE] = c.rowcount
+        return counts
+
+    def generate(self):
+        """
+        Replace any synthetic rows with a new set at the generator's scale.
+
+        Everything is generated in a single transaction.
+
+        Returns a dictionary with the number of rows created, keyed by table.
+        """
+        counts = {}
+        with transaction.atomic(), connection.cursor() as c:
+            self.flush()
+            # random() can only be repeated when a single process calls it
+            c.execute("SET LOCAL max_parallel_workers_per_gather = 0")
+            if self.seed is not None:
+                c.execute("SELECT setseed(%s)", [random.Random(self.seed).uniform(-1, 1)])
+
+            filers, legacy_filers = self.get_filer_counts(c)
+            counts[XREF_TABLE] = self.generate_xrefs(c, filers, legacy_filers)
+            counts[COVER_TABLE] = self.generate_filings(
+                c, COVER_TABLE, FILING_ID_BASE, filers, legacy_filers
+            )
+            counts[FORM501_TABLE] = self.generate_filings(
+                c, FORM501_TABLE, FORM501_FILING_ID_BASE, filers
+            )
+
+            # number the versions of each form, for items to pick from
+            c.execute(
+                f"""
+                CREATE TEMPORARY TABLE synthetic_version ON COMMIT DROP AS
+                SELECT
+                    "FILING_ID" AS filing_id,
+                    "AMEND_ID" AS amend_id,
+                    UPPER("FORM_TYPE") AS form_type,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY UPPER("FORM_TYPE") ORDER BY "FILING_ID", "AMEND_ID"
+                    ) AS rn
+                FROM "{COVER_TABLE}"
+                WHERE "FILING_ID" >= %s
+                """,
+                [FILING_ID_BASE],
+            )
+            c.execute(
+                "CREATE TEMPORARY TABLE synthetic_form ON COMMIT DROP AS "
+                "SELECT form_type, COUNT(*) AS versions FROM synthetic_version "
+                "GROUP BY form_type"
+            )
+            c.execute("CREATE INDEX ON synthetic_version (form_type, rn)")
+            c.execute("ANALYZE synthetic_version")
+
+            for table, (form_lookup, default_form) in ITEM_TABLES.items():
+                counts[table] = self.generate_items(c, table, form_lookup, default_form)
+            c.execute("DROP TABLE synthetic_version, synthetic_form")
+
+        with connection.cursor() as c:
+            for table in counts:
+                c.execute(f'ANALYZE "{table}"')
+        return counts
+
+    def get_filer_counts(self, cursor):
+        """
+        Returns a tuple with the number of filers to create and how many have a legacy id.
+        """
+        cursor.execute(
+            f'SELECT COUNT(DISTINCT "FILER_ID") FROM "{COVER_TABLE}" '
+            'WHERE "FILING_ID" < %s',
+            [FILING_ID_BASE],
+        )
+        filers = cursor.fetchone()[0] * self.scale
+        if not filers:
+            raise ValueError(f"{COVER_TABLE} has no rows to use as a seed")
+        cursor.execute(
+            f'SELECT COUNT(*), COUNT(*) FILTER (WHERE "XREF_ID" <> "FILER_ID"::text) '
+            f'FROM "{XREF_TABLE}" WHERE "FILER_ID" < %s',
+            [FILER_ID_BASE],
+        )
+        xrefs, legacy_xrefs = cursor.fetchone()
+        legacy_filers = int(filers * legacy_xrefs / xrefs) if xrefs else 0
+        return filers, legacy_filers
+
+    def get_amendment_weights(self, cursor, table):
+        """
+        Returns the number of filings in a seed table and the odds of each AMEND_ID.
+
+        The tuple's list holds the odds a filing was amended no further than each
+        AMEND_ID. A filing with three versions leaves a row with AMEND_ID 0, 1 and 2,
+        so the odds of stopping at an AMEND_ID are the drop in rows from it to the
+        next one.
+        """
+        cursor.execute(
+            f'SELECT "AMEND_ID", COUNT(*) FROM "{table}" '
+            'WHERE "FILING_ID" < %s AND "AMEND_ID" >= 0 GROUP BY 1 ORDER BY 1',
+            [FILING_ID_BASE],
+        )
+        counts = dict(cursor.fetchall())
+        if not counts:
+            return 0, []
+        top = max(counts)
+        weights = [
+            max(counts.get(i, 0) - counts.get(i + 1, 0), 0) for i in range(top + 1)
+        ]
+        total = sum(weights) or 1
+        odds = [sum(weights[: i + 1]) / total for i in range(top)] + [1.0]
+        return counts.get(0, sum(counts.values())), odds
+
+    def generate_xrefs(self, cursor, filers, legacy_filers):
+        """
+        Cross-reference each synthetic filer's id, and any legacy id, to the filer.
+
+        Returns the number of rows created.
+        """
+        templates = self.get_seed_count(cursor, XREF_TABLE, "FILER_ID")
+        if not templates:
+            raise ValueError(f"{XREF_TABLE} has no rows to use as a seed")
+        column_list = self.get_columns(XREF_TABLE)
+        select_list = [
+            {
+                "FILER_ID": f"{FILER_ID_BASE} + f.n",
+                "XREF_ID": "CASE WHEN x.legacy "
+                f"THEN ({LEGACY_XREF_ID_BASE} + f.n)::text "
+                f"ELSE ({FILER_ID_BASE} + f.n)::text END",
+            }.get(col, f't."{col}"')
+            for col in column_list
+        ]
+        cursor.execute(
+            f"""
+            INSERT INTO "{XREF_TABLE}" ({", ".join(f'"{c}"' for c in column_list)})
+            SELECT {", ".join(select_list)}
+            FROM (
+                SELECT n, 1 + FLOOR(RANDOM() * %(templates)s)::int AS template
+                FROM generate_series(0, %(filers)s - 1) n
+            ) f
+            JOIN (
+                SELECT *, ROW_NUMBER() OVER (ORDER BY id) AS rn
+                FROM "{XREF_TABLE}"
+                WHERE "FILER_ID" < %(filer_id_base)s
+            ) t
+            ON t.rn = f.template
+            JOIN (VALUES (false), (true)) AS x (legacy)
+            ON NOT x.legacy OR f.n < %(legacy_filers)s
+            """,
+            dict(
+                templates=templates,
+                filers=filers,
+                filer_id_base=FILER_ID_BASE,
+                legacy_filers=legacy_filers,
+            ),
+        )
+        return cursor.rowcount
+
+    def get_seed_count(self, cursor, table, id_column="FILING_ID"):
+        """
+        Returns the number of rows in a seed table.
+        """
+        base = FILER_ID_BASE if id_column == "FILER_ID" else FILING_ID_BASE
+        cursor.execute(
+            f'SELECT COUNT(*) FROM "{table}" WHERE "{id_column}" < %s', [base]
+        )
+        return cursor.fetchone()[0]
+
+    def generate_filings(self, cursor, table, filing_id_base, filers, legacy_filers=0):
+        """
+        Create synthetic filings, and their amendments, in a table of filings.
+
+        Filers with a legacy id use it on about half of their filings.
+
+        Returns the number of rows created.
+        """
+        filings, odds = self.get_amendment_weights(cursor, table)
+        if not filings:
+            return 0
+        if filings * self.scale >= FORM501_FILING_ID_BASE - FILING_ID_BASE:
+            raise ValueError(f"Too many filings in {table} to generate at this scale")
+
+        column_list = self.get_columns(table)
+        select_list = [
+            {
+                "FILING_ID": "f.filing_id",
+                "AMEND_ID": "v.amend_id",
+                "FILER_ID": "CASE WHEN f.legacy "
+                f"THEN ({LEGACY_XREF_ID_BASE} + f.filer)::text "
+                f"ELSE ({FILER_ID_BASE} + f.filer)::text END",
+            }.get(col, f't."{col}"')
+            for col in column_list
+        ]
+        cursor.execute(
+            f"""
+            INSERT INTO "{table}" ({", ".join(f'"{c}"' for c in column_list)})
+            SELECT {", ".join(select_list)}
+            FROM (
+                SELECT
+                    %(filing_id_base)s + n AS filing_id,
+                    1 + FLOOR(RANDOM() * %(templates)s)::int AS template,
+                    RANDOM() AS amend_odds,
+                    filer,
+                    filer < %(legacy_filers)s AND RANDOM() < 0.5 AS legacy
+                FROM (
+                    SELECT n, FLOOR(RANDOM() * %(filers)s)::int AS filer
+                    FROM generate_series(0, %(filings)s - 1) n
+                ) s
+            ) f
+            JOIN (
+                SELECT *, ROW_NUMBER() OVER (ORDER BY id) AS rn
+                FROM "{table}"
+                WHERE "FILING_ID" < %(seed_base)s
+            ) t
+            ON t.rn = f.template
+            CROSS JOIN LATERAL generate_series(
+                0,
+                (
+                    SELECT MIN(i) - 1
+                    FROM unnest(%(odds)s::float[]) WITH ORDINALITY AS w (odds, i)
+                    WHERE w.odds >= f.amend_odds
+                )
+            ) AS v (amend_id)
+            """,
+            dict(
+                filing_id_base=filing_id_base,
+                seed_base=FILING_ID_BASE,
+                templates=self.get_seed_count(cursor, table),
+                legacy_filers=legacy_filers,
+                filers=filers,
+                filings=filings * self.scale,
+                odds=odds,
+            ),
+        )
+        return cursor.rowcount
+
+    def generate_items(self, cursor, table, form_lookup, default_form=None):
+        """
+        Create synthetic items in a table, each filed with a synthetic filing.
+
+        Args:
+            table (str): Name of the raw table.
+            form_lookup (dict): The form of the filing each form type of item is
+                filed with.
+            default_form (str): The form of the filing any other items are filed with.
+                They are left out if None.
+
+        Items are spread unevenly across the versions of their form, so a few
+        filings are long and most are short. Numbered line items are renumbered
+        within each version, while the rest are only kept once per version.
+
+        Returns the number of rows created.
+        """
+        cursor.execute(
+            f"""
+            CREATE TEMPORARY TABLE synthetic_template ON COMMIT DROP AS
+            SELECT *, ROW_NUMBER() OVER (ORDER BY id) AS synthetic_rn
+            FROM (
+                SELECT *, COALESCE(
+                    (
+                        SELECT l.form
+                        FROM unnest(%s::text[], %s::text[]) AS l (item, form)
+                        WHERE l.item = UPPER("FORM_TYPE")
+                    ),
+                    %s
+                ) AS synthetic_form
+                FROM "{table}"
+                WHERE "FILING_ID" < %s
+            ) t
+            WHERE synthetic_form IN (SELECT form_type FROM synthetic_form)
+            """,
+            [list(form_lookup), list(form_lookup.values()), default_form, FILING_ID_BASE],
+        )
+        templates = cursor.rowcount
+
+        column_list = self.get_columns(table)
+        select_list = [
+            {
+                "FILING_ID": "x.synthetic_filing_id",
+                "AMEND_ID": "x.synthetic_amend_id",
+            }.get(col, f'x."{col}"')
+            for col in column_list
+        ]
+        field = self.get_model(table)._meta.get_field("line_item")
+        if field.get_internal_type() == "IntegerField":
+            select_list[column_list.index("LINE_ITEM")] = (
+                "ROW_NUMBER() OVER (PARTITION BY x.synthetic_filing_id, "
+                "x.synthetic_amend_id ORDER BY x.n)"
+            )
+            distinct = ""
+        else:
+            distinct = (
+                "DISTINCT ON (x.synthetic_filing_id, x.synthetic_amend_id, "
+                'UPPER(x."FORM_TYPE"), x."LINE_ITEM")'
+            )
+        cursor.execute(
+            f"""
+            INSERT INTO "{table}" ({", ".join(f'"{c}"' for c in column_list)})
+            SELECT {distinct} {", ".join(select_list)}
+            FROM (
+                SELECT
+                    t.*,
+                    p.n,
+                    v.filing_id AS synthetic_filing_id,
+                    v.amend_id AS synthetic_amend_id
+                FROM (
+                    SELECT
+                        n,
+                        1 + FLOOR(RANDOM() * %(templates)s)::int AS template,
+                        RANDOM() AS position
+                    FROM generate_series(1, %(rows)s) n
+                ) p
+                JOIN synthetic_template t
+                ON t.synthetic_rn = p.template
+                JOIN synthetic_form f
+                ON f.form_type = t.synthetic_form
+                JOIN synthetic_version v
+                ON v.form_type = f.form_type
+                AND v.rn = 1 + FLOOR(p.position * p.position * f.versions)::int
+            ) x
+            """,
+            dict(templates=templates, rows=templates * self.scale),
+        )
+        count = cursor.rowcount
+        cursor.execute("DROP TABLE synthetic_template")
+        return count
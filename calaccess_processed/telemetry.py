@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Record how long each step of a processing run takes and how much work it does.
+"""
+import time
+import logging
+from contextlib import contextmanager, nullcontext
+
+from django.utils import timezone
+from django.db import connection, transaction
+
+from calaccess_processed.models import ProcessingRun, ProcessingStep
+
+logger = logging.getLogger(__name__)
+
+# The run being recorded, shared by every thread the run starts
+_current_run = None
+
+# Matches the pg_class rows for a list of tables and their partitions
+RELATION_FILTER = (
+    "(c.relname = ANY(%s) OR c.oid IN ("
+    "SELECT i.inhrelid FROM pg_inherits i "
+    "JOIN pg_class p ON p.oid = i.inhparent WHERE p.relname = ANY(%s)))"
+)
+
+
+def get_current_run():
+    """
+    Returns the ProcessingRun being recorded, or None if there isn't one.
+    """
+    return _current_run
+
+
+@contextmanager
+def record_run(command):
+    """
+    Record a command as a new processing run.
+
+    If a run is already being recorded, the command is recorded as one of its
+    steps instead.
+
+    A run that raises an error is left without a finish_datetime.
+    """
+    global _current_run
+    if _current_run is not None:
+        with record_step("command", command):
+            yield _current_run
+        return
+
+    run = ProcessingRun.objects.create(command=command, start_datetime=timezone.now())
+    start = time.perf_counter()
+    _current_run = run
+    try:
+        yield run
+    finally:
+        _current_run = None
+    run.finish_datetime = timezone.now()
+    run.duration = time.perf_counter() - start
+    run.save()
+
+
+@contextmanager
+def record_step(kind, name, tables=None, read_tables=()):
+    """
+    Record a step of the current processing run.
+
+    Yields an unsaved ProcessingStep, so the caller can set rows_affected.
+    Nothing is saved if no run is being recorded or if the step raises an error.
+
+    Args:
+        kind (str): The kind of step, "command", "sql" or "archive".
+        name (str): Name of the command, model or file the step processes.
+        tables (list): Optional names of the tables the step writes to. Their size is
+            measured before and after, and the step is run in a transaction so the
+            blocks read from them and from read_tables can be counted. Otherwise the
+            size and blocks read of the whole database are measured.
+        read_tables (list): Optional names of other tables the step reads.
+    """
+    step = ProcessingStep(run=_current_run, kind=kind, name=name)
+    if _current_run is None:
+        yield step
+        return
+
+    tables = list(tables) if tables else []
+    if tables:
+        buffer_tables = tables + [t for t in read_tables if t not in tables]
+    else:
+        buffer_tables = []
+    with transaction.atomic() if tables else nullcontext():
+        with connection.cursor() as c:
+            step.size_before = get_size(c, tables)
+            hits, reads = get_buffers(c, buffer_tables)
+        step.start_datetime = timezone.now()
+        start = time.perf_counter()
+
+        yield step
+
+        step.duration = time.perf_counter() - start
+        step.finish_datetime = timezone.now()
+        with connection.cursor() as c:
+            step.size_after = get_size(c, tables)
+            after_hits, after_reads = get_buffers(c, buffer_tables)
+        step.buffer_hits = after_hits - hits
+        step.buffer_reads = after_reads - reads
+
+    step.save()
+    logger.debug(f"Recorded {step} in {step.duration:.2f}s")
+
+
+def get_size(cursor, tables):
+    """
+    Returns the total size in bytes of the tables, or of the database if there are none.
+    """
+    if not tables:
+        cursor.execute("SELECT pg_database_size(current_database())")
+        return cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT COALESCE(SUM(pg_total_relation_size(c.oid)), 0) FROM pg_class c "
+        f"WHERE c.relkind IN ('r', 'm') AND {RELATION_FILTER}",
+        [tables, tables],
+    )
+    return cursor.fetchone()[0]
+
+
+def get_buffers(cursor, tables):
+    """
+    Returns a tuple with the number of blocks found in and read outside the buffers.
+
+    For a list of tables, counts the blocks of the tables, their partitions and
+    their indexes read by the current transaction. Otherwise, counts the blocks
+    read by the whole database, which its statistics may report a little late.
+    """
+    if not tables:
+        cursor.execute("SELECT pg_stat_clear_snapshot()")
+        cursor.execute(
+            "SELECT blks_hit, blks_read FROM pg_stat_database "
+            "WHERE datname = current_database()"
+        )
+        return cursor.fetchone()
+    cursor.execute(
+        f"""
+        WITH relations AS (
+            SELECT c.oid FROM pg_class c WHERE {RELATION_FILTER}
+            UNION
+            SELECT x.indexrelid FROM pg_index x
+            JOIN pg_class c ON c.oid = x.indrelid
+            WHERE {RELATION_FILTER}
+        )
+        SELECT
+            COALESCE(SUM(pg_stat_get_xact_blocks_hit(oid)), 0),
+            COALESCE(SUM(
+                pg_stat_get_xact_blocks_fetched(oid) - pg_stat_get_xact_blocks_hit(oid)
+            ), 0)
+        FROM relations
+        """,
+        [tables, tables, tables, tables],
+    )
+    return cursor.fetchone()
@@ -0,0 +1,332 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for archiving processed files.
+"""
+import os
+import csv
+import gzip
+import json
+import zipfile
+import tempfile
+from datetime import date
+from importlib.util import find_spec
+from unittest import skipUnless
+
+from django.apps import apps
+from django.test import TestCase, TransactionTestCase, override_settings
+from opencivicdata.core.models import Division, Organization, Person
+from opencivicdata.elections.models import Candidacy, CandidateContest, Election
+
+from calaccess_processed.archive import Archive
+from calaccess_processed_filings.models import Form460Filing, Form460ScheduleAItem
+from calaccess_processed_filings.partitions import get_cycles
+
+
+def get_archive(**kwargs):
+    """
+    Returns an archive of the flat files.
+    """
+    archive = Archive(**kwargs)
+    lookup = apps.get_app_config(
+        "calaccess_processed_flatfiles"
+    ).get_flat_proxy_lookup()
+    for name, model in lookup.items():
+        archive.add(name, model)
+    return archive
+
+
+def create_candidacies():
+    """
+    Create two candidacies for governor, and the OCD records they need.
+    """
+    division = Division.objects.create(
+        id="ocd-division/country:us/state:ca", name="California"
+    )
+    organization = Organization.objects.create(
+        name="Governor", classification="executive"
+    )
+    post = organization.posts.create(label="GOVERNOR", role="Governor")
+    election = Election.objects.create(
+        name="2010 GENERAL", date=date(2010, 11, 2), division=division
+    )
+    contest = CandidateContest.objects.create(
+        name="GOVERNOR", election=election, division=division
+    )
+    for name, filer_id in [("EDMUND BROWN", "1001"), ("MEG WHITMAN", "1002")]:
+        person = Person.objects.create(name=name)
+        person.identifiers.create(scheme="calaccess_filer_id", identifier=filer_id)
+        Candidacy.objects.create(
+            person=person, post=post, contest=contest, candidate_name=name
+        )
+
+
+class ArchiveTest(TestCase):
+    """
+    Tests for exporting several processed files at once.
+    """
+
+    def get_archive(self, **kwargs):
+        """
+        Returns an archive of the flat files.
+        """
+        return get_archive(**kwargs)
+
+    def test_run(self):
+        """
+        Confirm every file is exported and measured.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                archive = self.get_archive()
+                finished = []
+                archive.run(workers=2, callback=finished.append)
+
+                self.assertCountEqual(finished, archive.file_list)
+                for f in archive.file_list:
+                    self.assertEqual(
+                        f.path, os.path.join(data_dir, "processed", "flat", f.file_name)
+                    )
+                    self.assertEqual(f.size, os.path.getsize(f.path))
+                    self.assertGreater(f.size, 0)
+                    self.assertIsNotNone(f.duration)
+
+    def test_compression(self):
+        """
+        Confirm compressed files and files in the ZIP hold the same data.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                archive = self.get_archive()
+                archive.run()
+                gzip_archive = self.get_archive(compression="gzip")
+                gzip_archive.run()
+                zip_path = os.path.join(data_dir, "test.zip")
+                self.get_archive(zip_path=zip_path).run()
+                # running again replaces the files rather than adding them twice
+                self.get_archive(zip_path=zip_path).run()
+
+                zip_file = zipfile.ZipFile(zip_path)
+                self.assertEqual(len(zip_file.namelist()), len(archive.file_list))
+                for f, gzip_f in zip(archive.file_list, gzip_archive.file_list):
+                    self.assertEqual(gzip_f.path, f.path + ".gz")
+                    with open(f.path, "rb") as csv_file:
+                        data = csv_file.read()
+                    with gzip.open(gzip_f.path) as gzip_file:
+                        self.assertEqual(gzip_file.read(), data)
+                    self.assertEqual(zip_file.read(f"flat/{f.file_name}"), data)
+
+    def test_zip_shared(self):
+        """
+        Confirm running again keeps the files other commands added to the ZIP.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                zip_path = os.path.join(data_dir, "test.zip")
+                with zipfile.ZipFile(
+                    zip_path, "w", compression=zipfile.ZIP_DEFLATED
+                ) as zip_file:
+                    zip_file.writestr("elections/Other.csv", "id\n1\n")
+                archive = self.get_archive(zip_path=zip_path)
+                archive.run()
+                self.get_archive(zip_path=zip_path).run()
+
+                self.assertEqual(os.listdir(data_dir), ["test.zip"])
+                with zipfile.ZipFile(zip_path) as zip_file:
+                    self.assertCountEqual(
+                        zip_file.namelist(),
+                        [f.key for f in archive.file_list] + ["elections/Other.csv"],
+                    )
+                    self.assertEqual(zip_file.read("elections/Other.csv"), b"id\n1\n")
+                    self.assertIsNone(zip_file.testzip())
+
+    def test_manifest(self):
+        """
+        Confirm files are recorded in the manifest and skipped when unchanged.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                manifest_path = os.path.join(data_dir, "processed", "manifest.json")
+                archive = self.get_archive(manifest_path=manifest_path)
+                archive.run()
+                with open(manifest_path) as f:
+                    entries = json.load(f)
+                self.assertEqual(len(entries), len(archive.file_list))
+                for f in archive.file_list:
+                    entry = entries[f"flat/{f.file_name}"]
+                    self.assertEqual(entry["rows"], 0)
+                    self.assertEqual(entry["size"], f.size)
+                    self.assertEqual(entry["checksum"], f.state["checksum"])
+
+                archive = self.get_archive(manifest_path=manifest_path)
+                archive.run()
+                self.assertTrue(all(f.skipped for f in archive.file_list))
+
+                # a missing file is exported again, as is everything when forced
+                os.remove(archive.file_list[0].path)
+                archive = self.get_archive(manifest_path=manifest_path)
+                archive.run()
+                self.assertEqual(
+                    [f.skipped for f in archive.file_list],
+                    [False] + [True] * (len(archive.file_list) - 1),
+                )
+                archive = self.get_archive(manifest_path=manifest_path, force=True)
+                archive.run()
+                self.assertFalse(any(f.skipped for f in archive.file_list))
+
+    @skipUnless(find_spec("pyarrow"), "requires pyarrow")
+    def test_parquet(self):
+        """
+        Confirm Parquet files are typed and have the same columns as the CSV files.
+        """
+        import pyarrow
+        import pyarrow.parquet
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                archive = self.get_archive(format="parquet", compression="zstd")
+                archive.run(workers=2)
+                for f in archive.file_list:
+                    self.assertTrue(f.path.endswith(".parquet"))
+                    table = pyarrow.parquet.read_table(f.path)
+                    self.assertEqual(table.num_rows, f.rows)
+                    self.assertEqual(f.rows, f.model.objects.count())
+                    self.assertEqual(
+                        table.column_names, [i[0] for i in f.model.copy_to_fields]
+                    )
+
+                f = next(f for f in archive.file_list if f.name == "Candidates")
+                schema = pyarrow.parquet.read_schema(f.path)
+                self.assertEqual(schema.field("ocd_person_id").type, pyarrow.string())
+                self.assertEqual(schema.field("election_date").type, pyarrow.date32())
+
+
+class ManifestTest(TransactionTestCase):
+    """
+    Tests for exporting again the files whose tables have changed.
+
+    The files are exported on threads with connections of their own, which can
+    only see rows that have been committed.
+    """
+
+    def setUp(self):
+        """
+        Create the candidacies exported to Candidates.csv.
+        """
+        create_candidacies()
+
+    def test_changed(self):
+        """
+        Confirm a file is exported again once a row in its table changes.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                manifest_path = os.path.join(data_dir, "processed", "manifest.json")
+
+                def run():
+                    archive = get_archive(manifest_path=manifest_path)
+                    archive.run(workers=2)
+                    return dict((f.name, f) for f in archive.file_list)
+
+                lookup = run()
+                self.assertFalse(lookup["Candidates"].skipped)
+                self.assertEqual(lookup["Candidates"].state["rows"], 2)
+                checksum = lookup["Candidates"].state["checksum"]
+
+                lookup = run()
+                self.assertTrue(all(f.skipped for f in lookup.values()))
+                self.assertEqual(lookup["Candidates"].rows, 2)
+
+                # a change that leaves the count and updated_at alone still counts
+                Candidacy.objects.filter(candidate_name="MEG WHITMAN").update(
+                    candidate_name="MARGARET WHITMAN"
+                )
+                lookup = run()
+                self.assertFalse(lookup["Candidates"].skipped)
+                self.assertNotEqual(lookup["Candidates"].state["checksum"], checksum)
+                self.assertEqual(
+                    [f.name for f in lookup.values() if not f.skipped], ["Candidates"]
+                )
+                with open(lookup["Candidates"].path) as f:
+                    self.assertIn("MARGARET WHITMAN", f.read())
+                with open(manifest_path) as f:
+                    entry = json.load(f)[lookup["Candidates"].key]
+                self.assertEqual(
+                    entry["checksum"], lookup["Candidates"].state["checksum"]
+                )
+
+                self.assertTrue(run()["Candidates"].skipped)
+
+
+class SplitCyclesTest(TransactionTestCase):
+    """
+    Tests for splitting the files of partitioned models by election cycle.
+    """
+
+    def setUp(self):
+        """
+        Create contributions from two cycles, one undated and one from before them.
+        """
+        filing = Form460Filing.objects.create(
+            filing_id=1,
+            amendment_count=0,
+            filer_id=10,
+            date_filed=date(2014, 6, 1),
+            from_date=date(2009, 1, 1),
+            thru_date=date(2014, 6, 1),
+        )
+        date_list = [
+            date(2010, 3, 1),
+            date(2009, 6, 1),
+            date(2014, 5, 1),
+            None,
+            date(1990, 1, 1),
+        ]
+        for line_item, date_received in enumerate(date_list, 1):
+            Form460ScheduleAItem.objects.create(
+                filing=filing,
+                line_item=line_item,
+                date_received=date_received,
+                amount=line_item,
+            )
+
+    def test_split_cycles(self):
+        """
+        Confirm partitioned models are split into a file per cycle with an index.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                archive = get_archive(split_cycles=True)
+                archive.add("Form460ScheduleAItem", Form460ScheduleAItem)
+                archive.run(workers=2)
+
+                directory = os.path.join(
+                    data_dir, "processed", "campaign", "Form460ScheduleAItem"
+                )
+                with open(os.path.join(directory, "index.json")) as f:
+                    index = json.load(f)
+                self.assertEqual(index["date_column"], "date_received")
+                self.assertEqual(
+                    [i["cycle"] for i in index["files"]], get_cycles() + ["other"]
+                )
+                self.assertEqual(index["files"][0]["start_date"], "1999-01-01")
+                self.assertEqual(index["files"][0]["end_date"], "2000-12-31")
+
+                # each row is in the file for its cycle, and only there
+                line_items = {}
+                for i in index["files"]:
+                    path = os.path.join(directory, i["name"])
+                    self.assertEqual(os.path.getsize(path), i["size"])
+                    with open(path) as f:
+                        row_list = list(csv.DictReader(f))
+                    self.assertEqual(len(row_list), i["rows"])
+                    if row_list:
+                        line_items[i["cycle"]] = sorted(
+                            int(r["line_item"]) for r in row_list
+                        )
+                self.assertEqual(line_items, {2010: [1, 2], 2014: [3], "other": [4, 5]})
+
+                # models that aren't partitioned are left whole
+                for f in archive.file_list:
+                    if f.model != Form460ScheduleAItem:
+                        self.assertIsNone(f.cycle)
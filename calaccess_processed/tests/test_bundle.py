@@ -0,0 +1,284 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for bundling processed data into a single database file.
+"""
+import os
+import uuid
+import sqlite3
+import tempfile
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from importlib.util import find_spec
+from unittest import skipUnless
+
+from django.apps import apps
+from django.test import SimpleTestCase, TestCase
+from opencivicdata.core.models import Division, Organization, Person
+from opencivicdata.elections.models import Candidacy, CandidateContest, Election
+
+from calaccess_processed.bundle import (
+    METADATA_TABLE,
+    DuckDBBundle,
+    SQLiteBundle,
+    to_sqlite,
+)
+from calaccess_processed_filings.models import (
+    Form460Filing,
+    Form460ScheduleAItem,
+    Form501Filing,
+)
+
+
+def create_rows():
+    """
+    Create a few candidacies, Form 501s and Schedule A items to bundle.
+    """
+    division = Division.objects.create(
+        id="ocd-division/country:us/state:ca", name="California"
+    )
+    organization = Organization.objects.create(
+        name="Governor", classification="executive"
+    )
+    post = organization.posts.create(label="GOVERNOR", role="Governor")
+    election = Election.objects.create(
+        name="2010 GENERAL", date=date(2010, 11, 2), division=division
+    )
+    contest = CandidateContest.objects.create(
+        name="GOVERNOR", election=election, division=division
+    )
+    for filing_id, name, filer_id in [
+        (1, "EDMUND BROWN", "1001"),
+        (2, "MEG WHITMAN", "1002"),
+        (3, "CHELENE NIGHTINGALE", "1003"),
+    ]:
+        person = Person.objects.create(name=name)
+        person.identifiers.create(scheme="calaccess_filer_id", identifier=filer_id)
+        Candidacy.objects.create(
+            person=person,
+            post=post,
+            contest=contest,
+            candidate_name=name,
+            is_incumbent=filing_id == 1,
+        )
+        Form501Filing.objects.create(
+            filing_id=filing_id,
+            amendment_count=0,
+            filer_id=filer_id,
+            last_name=name.split()[-1],
+            first_name=name.split()[0],
+            election_year=2010,
+            date_filed=date(2010, 1, filing_id),
+        )
+
+    filing = Form460Filing.objects.create(
+        filing_id=4,
+        amendment_count=0,
+        filer_id=1001,
+        date_filed=date(2010, 7, 31),
+        from_date=date(2010, 1, 1),
+        thru_date=date(2010, 6, 30),
+    )
+    for line_item, amount, date_received in [
+        (1, Decimal("12.50"), date(2010, 3, 1)),
+        (2, Decimal("-3.25"), None),
+    ]:
+        Form460ScheduleAItem.objects.create(
+            filing=filing,
+            line_item=line_item,
+            contributor_lastname="" if line_item == 1 else "DOE",
+            date_received=date_received,
+            amount=amount,
+        )
+
+
+def get_lookup():
+    """
+    Returns the models to bundle, keyed by the name of their table.
+    """
+    lookup = apps.get_app_config(
+        "calaccess_processed_flatfiles"
+    ).get_flat_proxy_lookup()
+    lookup["Form501Filing"] = Form501Filing
+    lookup["Form460ScheduleAItem"] = Form460ScheduleAItem
+    return lookup
+
+
+class BundleTest(TestCase):
+    """
+    Tests for bundling processed models.
+    """
+
+    def setUp(self):
+        """
+        Create rows in the models to bundle.
+        """
+        create_rows()
+
+    def test_sqlite(self):
+        """
+        Confirm every model gets a table, indexes and a description.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "bundle.sqlite")
+            bundle = SQLiteBundle(path, batch_size=2)
+            lookup = get_lookup()
+            for name, model in lookup.items():
+                bundle.add(name, model)
+            bundle.build()
+
+            self.assertFalse(os.path.exists(f"{path}.tmp"))
+            db = sqlite3.connect(path)
+            table_list = [
+                r[0]
+                for r in db.execute("SELECT name FROM sqlite_master WHERE type='table'")
+            ]
+            self.assertCountEqual(
+                table_list, list(lookup) + [METADATA_TABLE, "sqlite_stat1"]
+            )
+
+            column_list = [
+                r[1] for r in db.execute('PRAGMA table_info("Candidates")')
+            ]
+            self.assertEqual(
+                column_list,
+                [i[0] for i in lookup["Candidates"].copy_to_fields],
+            )
+            index_list = [
+                r[1] for r in db.execute('PRAGMA index_list("Form460ScheduleAItem")')
+            ]
+            self.assertIn("Form460ScheduleAItem_filing_id", index_list)
+            self.assertIn("Form460ScheduleAItem_date_received", index_list)
+
+            description, = db.execute(
+                f'SELECT description FROM "{METADATA_TABLE}" '
+                "WHERE table_name = 'Form460ScheduleAItem' "
+                "AND column_name = 'date_received'"
+            ).fetchone()
+            self.assertEqual(
+                description,
+                Form460ScheduleAItem._meta.get_field("date_received").help_text,
+            )
+
+            # every row is loaded, across more than one batch
+            for table in bundle.table_list:
+                count, = db.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()
+                self.assertEqual(count, table.model.objects.count())
+                self.assertEqual(table.rows, count)
+            self.assertEqual(bundle.table_list[0].rows, 3)
+
+            # values are stored with the type of their column
+            self.assertEqual(
+                db.execute(
+                    "SELECT amount, typeof(amount), date_received, typeof(line_item) "
+                    'FROM "Form460ScheduleAItem" ORDER BY line_item'
+                ).fetchall(),
+                [
+                    (12.5, "real", "2010-03-01", "integer"),
+                    (-3.25, "real", None, "integer"),
+                ],
+            )
+            self.assertEqual(
+                db.execute(
+                    "SELECT name, is_incumbent, election_date, "
+                    'latest_calaccess_filer_id FROM "Candidates" ORDER BY name'
+                ).fetchall(),
+                [
+                    ("CHELENE NIGHTINGALE", 0, "2010-11-02", "1003"),
+                    ("EDMUND BROWN", 1, "2010-11-02", "1001"),
+                    ("MEG WHITMAN", 0, "2010-11-02", "1002"),
+                ],
+            )
+            created_at, = db.execute(
+                'SELECT created_at FROM "Candidates" WHERE is_incumbent'
+            ).fetchone()
+            self.assertEqual(
+                created_at,
+                Candidacy.objects.get(is_incumbent=True).created_at.isoformat(),
+            )
+            self.assertEqual(
+                db.execute(
+                    'SELECT filer_id, date_filed FROM "Form501Filing" ORDER BY 1'
+                ).fetchall(),
+                [
+                    ("1001", "2010-01-01"),
+                    ("1002", "2010-01-02"),
+                    ("1003", "2010-01-03"),
+                ],
+            )
+            db.close()
+
+    @skipUnless(find_spec("duckdb"), "requires duckdb")
+    def test_duckdb(self):
+        """
+        Confirm every model is copied into a typed DuckDB table.
+        """
+        import duckdb
+
+        with tempfile.TemporaryDirectory() as data_dir:
+            path = os.path.join(data_dir, "bundle.duckdb")
+            bundle = DuckDBBundle(path)
+            lookup = get_lookup()
+            for name, model in lookup.items():
+                bundle.add(name, model)
+            bundle.build()
+
+            self.assertFalse(os.path.exists(f"{path}.tmp"))
+            db = duckdb.connect(path, read_only=True)
+            for table in bundle.table_list:
+                count, = db.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()
+                self.assertEqual(count, table.model.objects.count())
+                self.assertEqual(table.rows, count)
+
+            # empty strings stay empty, and nulls stay null
+            self.assertEqual(
+                db.execute(
+                    "SELECT amount, date_received, contributor_lastname "
+                    'FROM "Form460ScheduleAItem" ORDER BY line_item'
+                ).fetchall(),
+                [
+                    (Decimal("12.50"), date(2010, 3, 1), ""),
+                    (Decimal("-3.25"), None, "DOE"),
+                ],
+            )
+            self.assertEqual(
+                db.execute(
+                    "SELECT name, is_incumbent, election_date "
+                    'FROM "Candidates" ORDER BY name'
+                ).fetchall(),
+                [
+                    ("CHELENE NIGHTINGALE", False, date(2010, 11, 2)),
+                    ("EDMUND BROWN", True, date(2010, 11, 2)),
+                    ("MEG WHITMAN", False, date(2010, 11, 2)),
+                ],
+            )
+            description, = db.execute(
+                f'SELECT data_type FROM "{METADATA_TABLE}" '
+                "WHERE table_name = 'Form460ScheduleAItem' "
+                "AND column_name = 'amount'"
+            ).fetchone()
+            self.assertEqual(description, "DECIMAL(14, 2)")
+            db.close()
+
+
+class SQLiteValueTest(SimpleTestCase):
+    """
+    Tests for converting values into ones SQLite can store.
+    """
+
+    def test_to_sqlite(self):
+        """
+        Confirm each kind of value is stored as text or left alone.
+        """
+        value = uuid.UUID("12345678-1234-5678-1234-567812345678")
+        self.assertEqual(to_sqlite(value), "12345678-1234-5678-1234-567812345678")
+        self.assertEqual(to_sqlite(Decimal("12.50")), "12.50")
+        self.assertEqual(to_sqlite(date(2010, 3, 1)), "2010-03-01")
+        self.assertEqual(
+            to_sqlite(datetime(2010, 3, 1, 12, 30, tzinfo=timezone.utc)),
+            "2010-03-01T12:30:00+00:00",
+        )
+        self.assertEqual(to_sqlite({"a": [1, 2]}), '{"a": [1, 2]}')
+        self.assertEqual(to_sqlite([1, "b"]), '[1, "b"]')
+        for value in [None, 1, 1.5, "text", True]:
+            self.assertEqual(to_sqlite(value), value)
@@ -0,0 +1,50 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the corrections registry.
+"""
+from django.test import TestCase
+from opencivicdata.core.models import Organization
+from calaccess_processed_elections import corrections
+from calaccess_processed_elections.corrections import registry
+from calaccess_processed_elections.models import CandidatePartyCorrection
+
+
+class CandidatePartyCorrectionTest(TestCase):
+    """
+    Tests for correcting candidate parties from the file and the database.
+    """
+
+    key = ("WALDRON, MARIE", 2018, "PRIMARY", "ASSEMBLY 75")
+
+    def setUp(self):
+        """
+        Create the parties the corrections point to.
+        """
+        self.addCleanup(registry.clear)
+        for name in ["UNKNOWN", "REPUBLICAN", "DEMOCRATIC"]:
+            Organization.objects.create(name=name, classification="party")
+
+    def test_file(self):
+        """
+        Confirm corrections are read from the file.
+        """
+        self.assertEqual(corrections.candidate_party(*self.key).name, "REPUBLICAN")
+        self.assertIsNone(corrections.candidate_party("NOBODY", 2018, "PRIMARY", ""))
+
+    def test_database(self):
+        """
+        Confirm rows in the database replace the file, even after it has been read.
+        """
+        self.assertEqual(corrections.candidate_party(*self.key).name, "REPUBLICAN")
+        correction = CandidatePartyCorrection.objects.create(
+            candidate_name=self.key[0],
+            year=self.key[1],
+            election_type=self.key[2],
+            office=self.key[3],
+            party="DEMOCRATIC",
+        )
+        self.assertEqual(corrections.candidate_party(*self.key).name, "DEMOCRATIC")
+        correction.party = ""
+        correction.save()
+        self.assertIsNone(corrections.candidate_party(*self.key))
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for looking up filer types from memory.
+"""
+from datetime import date
+from django.test import TestCase
+from calaccess_raw.models import FilerToFilerTypeCd, LookupCodesCd
+from opencivicdata.core.models import Organization
+from calaccess_processed_elections.filertypes import use_filer_type_index
+from calaccess_processed_elections.models import FilerTypeHistory
+from calaccess_processed_elections.proxies import (
+    OCDPartyProxy,
+    RawFilerToFilerTypeCdProxy,
+)
+
+
+class FilerTypeIndexTest(TestCase):
+    """
+    Tests for the FilerToFilerTypeCd index and table.
+    """
+
+    def setUp(self):
+        """
+        Create a filer who changes party and office over time.
+        """
+        for code_id, code_desc in [(30013, "ASSEMBLY"), (17077, "76"), (16002, "D")]:
+            LookupCodesCd.objects.create(
+                code_type=code_id // 1000 * 1000, code_id=code_id, code_desc=code_desc
+            )
+        # A duplicated code can't be looked up
+        for i in range(2):
+            LookupCodesCd.objects.create(
+                code_type=30000, code_id=30001, code_desc="GOVERNOR"
+            )
+
+        for name in ["UNKNOWN", "DEMOCRATIC"]:
+            party = Organization.objects.create(name=name, classification="party")
+        party.identifiers.create(scheme="calaccess_lookup_code_id", identifier=16002)
+
+        fields = dict(
+            filer_id=1001,
+            filer_type_id=8,
+            active="A",
+            session_id=2000,
+            category=0,
+            category_type=0,
+            sub_category=0,
+            sub_category_type=0,
+            sub_category_a="",
+            county_cd=0,
+        )
+        for effect_dt, party_cd, race, district_cd in [
+            (date(2000, 1, 1), 16002, 30013, 17077),
+            (date(2010, 1, 1), 16007, 30001, 0),
+            (None, 16002, 30013, 17077),
+        ]:
+            FilerToFilerTypeCd.objects.create(
+                effect_dt=effect_dt,
+                party_cd=party_cd,
+                race=race,
+                district_cd=district_cd,
+                **fields,
+            )
+
+    def test_index(self):
+        """
+        Confirm the index gives the same answers as the database.
+        """
+        lookup_list = [
+            (filer_id, dt)
+            for filer_id in [1001, "1001", 1002, "A"]
+            for dt in [date(1999, 1, 1), date(2000, 1, 1), date(2020, 1, 1)]
+        ]
+
+        def lookup(filer_id, dt):
+            party = None
+            if str(filer_id).isdigit():
+                party = OCDPartyProxy.objects.get_by_filer_id(filer_id, dt).name
+            return (
+                party,
+                RawFilerToFilerTypeCdProxy.objects.get_office_by_filer_id_and_date(
+                    filer_id, dt
+                ),
+            )
+
+        expected = [lookup(*i) for i in lookup_list]
+        self.assertEqual(expected[1], ("DEMOCRATIC", "30013 17077"))
+        self.assertEqual(expected[2], ("UNKNOWN", None))
+        with use_filer_type_index():
+            self.assertEqual([lookup(*i) for i in lookup_list], expected)
+
+    def test_table(self):
+        """
+        Confirm the table has a row for each record in effect, with its codes.
+        """
+        self.assertEqual(FilerTypeHistory.objects.load(), 2)
+        first, last = FilerTypeHistory.objects.order_by("effect_dt")
+        self.assertEqual((first.office, first.district), ("ASSEMBLY", "76"))
+        self.assertEqual((last.office, last.district), (None, None))
@@ -0,0 +1,594 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the managers that load the filings models.
+"""
+import tempfile
+from datetime import date
+
+from django.apps import apps
+from django.db import IntegrityError, connection, transaction
+from django.test import (
+    SimpleTestCase,
+    TestCase,
+    TransactionTestCase,
+    override_settings,
+)
+from django.core.management import call_command
+from calaccess_raw.models import (
+    CvrCampaignDisclosureCd,
+    FilerFilingsCd,
+    FilerXrefCd,
+    RcptCd,
+)
+from calaccess_processed_filings.fanout import FanOutLoader
+from calaccess_processed_filings.indexes import IndexRebuild, RebuildStep
+from calaccess_processed_filings.partitions import get_cycles, get_cycle_bounds
+from calaccess_processed_filings.models import (
+    Form460Filing,
+    Form460FilingVersion,
+    Form460LatestFilingVersion,
+    Form460ScheduleAItem,
+    Form460ScheduleAItemVersion,
+    Form460ScheduleCItemVersion,
+    FilingsHighWaterMark,
+)
+
+
+def create_raw_filing(filing_id, amend_id, date_list):
+    """
+    Create the raw cover and Schedule A rows for a version of a Form 460.
+
+    The version covers and is filed on the first date in date_list, and each
+    date is given to a contribution of its own.
+    """
+    FilerFilingsCd.objects.create(
+        filing_id=filing_id,
+        filing_sequence=amend_id,
+        form_id="F460",
+        filing_date=date_list[0],
+        stmnt_type=10001,
+    )
+    CvrCampaignDisclosureCd.objects.create(
+        filing_id=filing_id,
+        amend_id=amend_id,
+        filer_id="10",
+        form_type="F460",
+        rpt_date=date_list[0],
+        from_date=date_list[0],
+        thru_date=date_list[0],
+    )
+    for line_item, date_received in enumerate(date_list, 1):
+        RcptCd.objects.create(
+            filing_id=filing_id,
+            amend_id=amend_id,
+            form_type="A",
+            line_item=line_item,
+            rcpt_date=date_received,
+            amount=5 * line_item,
+        )
+
+
+def get_index_names(table):
+    """
+    Returns the sorted names of the indexes on a table.
+    """
+    with connection.cursor() as c:
+        c.execute(
+            "SELECT indexname FROM pg_indexes WHERE tablename = %s ORDER BY 1", [table]
+        )
+        return [r[0] for r in c.fetchall()]
+
+
+def get_foreign_keys(table):
+    """
+    Returns the name, referenced table and validation of each foreign key on a table.
+    """
+    with connection.cursor() as c:
+        c.execute(
+            """
+            SELECT conname, confrelid::regclass::text, convalidated
+            FROM pg_constraint
+            WHERE conrelid = %s::regclass
+            AND contype = 'f'
+            ORDER BY 1
+            """,
+            [table],
+        )
+        return c.fetchall()
+
+
+class IncrementalLoadTest(SimpleTestCase):
+    """
+    Tests for limiting the loading queries to changed filings.
+    """
+
+    def test_changed_filter(self):
+        """
+        Confirm each kind of model is matched to the changed filings on the right keys.
+        """
+        self.assertIn(
+            "(src.filing_id, src.amend_id) IN",
+            Form460FilingVersion.objects.get_changed_filter("src"),
+        )
+        self.assertIn(
+            "JOIN calaccess_processed_filings_changed",
+            Form460ScheduleAItemVersion.objects.get_changed_filter("src"),
+        )
+        self.assertIn(
+            "calaccess_processed_filings_form460filingversion v",
+            Form460ScheduleAItemVersion.objects.get_changed_filter("src"),
+        )
+        for model in [Form460Filing, Form460LatestFilingVersion, Form460ScheduleAItem]:
+            self.assertTrue(
+                model.objects.get_changed_filter("src").startswith("src.filing_id IN")
+            )
+
+    def test_incremental_sql(self):
+        """
+        Confirm the loading query is wrapped and filtered without losing its columns.
+        """
+        sql = Form460ScheduleAItem.objects.get_incremental_sql()
+        self.assertTrue(
+            sql.startswith(
+                "INSERT INTO calaccess_processed_filings_form460scheduleaitem"
+            )
+        )
+        self.assertIn(") AS src (filing_id, line_item, date_received,", sql)
+        self.assertTrue(
+            sql.endswith(
+                "WHERE " + Form460ScheduleAItem.objects.get_changed_filter("src") + ";"
+            )
+        )
+        self.assertEqual(sql.count(";"), 1)
+
+
+class IncrementalReloadTest(TransactionTestCase):
+    """
+    Tests for reprocessing the filings changed since the last load in the database.
+    """
+
+    def setUp(self):
+        """
+        Load three Form 460s, one amended, into the filings models.
+        """
+        FilerXrefCd.objects.create(filer_id=10, xref_id="10")
+        create_raw_filing(1, 0, [date(2010, 1, 1)])
+        create_raw_filing(1, 1, [date(2010, 2, 1), date(2010, 2, 15)])
+        create_raw_filing(2, 0, [date(2012, 1, 1)])
+        create_raw_filing(5, 0, [date(2014, 1, 1)])
+        self.load()
+
+    def load(self, **kwargs):
+        """
+        Load the filings models from the raw data, archiving to a temporary directory.
+        """
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                call_command("processcalaccessfilings", verbosity=0, **kwargs)
+
+    def get_version_ids(self):
+        """
+        Returns the id of each loaded filing version and its items, keyed by version.
+        """
+        lookup = {}
+        for v in Form460FilingVersion.objects.all():
+            lookup[(v.filing_id, v.amend_id)] = (
+                v.id,
+                sorted(
+                    Form460ScheduleAItemVersion.objects.filter(
+                        filing_version=v
+                    ).values_list("id", flat=True)
+                ),
+            )
+        return lookup
+
+    def get_snapshot(self):
+        """
+        Returns the loaded filings and contributions without their generated ids.
+        """
+        return (
+            list(
+                Form460Filing.objects.order_by("filing_id").values_list(
+                    "filing_id", "amendment_count", "date_filed"
+                )
+            ),
+            list(
+                Form460ScheduleAItemVersion.objects.order_by(
+                    "filing_version__filing_id",
+                    "filing_version__amend_id",
+                    "line_item",
+                ).values_list(
+                    "filing_version__filing_id",
+                    "filing_version__amend_id",
+                    "line_item",
+                    "date_received",
+                )
+            ),
+            list(
+                Form460ScheduleAItem.objects.order_by(
+                    "filing_id", "line_item"
+                ).values_list("filing_id", "line_item", "date_received", "amount")
+            ),
+        )
+
+    def test_incremental(self):
+        """
+        Confirm only the rows of changed filings are replaced and the mark advances.
+        """
+        mark = FilingsHighWaterMark.objects.latest()
+        self.assertFalse(mark.incremental)
+        self.assertEqual(mark.max_filing_date, date(2014, 1, 1))
+        self.assertEqual(mark.max_filing_id, 5)
+        before = self.get_version_ids()
+
+        # amend one filing and add another, both filed after the last load
+        create_raw_filing(
+            1, 2, [date(2015, 1, 1), date(2015, 1, 2), date(2015, 1, 3)]
+        )
+        create_raw_filing(6, 0, [date(2015, 1, 1)])
+        self.load(incremental=True)
+
+        mark = FilingsHighWaterMark.objects.latest()
+        self.assertEqual(FilingsHighWaterMark.objects.count(), 2)
+        self.assertTrue(mark.incremental)
+        self.assertEqual(mark.max_filing_date, date(2015, 1, 1))
+        self.assertEqual(mark.max_filing_id, 6)
+        # the filing from the last day of the last load is checked again
+        self.assertEqual(mark.changed_filing_count, 3)
+
+        after = self.get_version_ids()
+        self.assertEqual(sorted(after), sorted(list(before) + [(1, 2), (6, 0)]))
+        for key in [(1, 0), (1, 1), (2, 0)]:
+            self.assertEqual(after[key], before[key])
+        self.assertNotEqual(after[(5, 0)][0], before[(5, 0)][0])
+        self.assertFalse(set(after[(5, 0)][1]) & set(before[(5, 0)][1]))
+        self.assertEqual(len(after[(1, 2)][1]), 3)
+
+        # the result matches a full load of the same raw data
+        snapshot = self.get_snapshot()
+        self.assertEqual(snapshot[0][0], (1, 2, date(2015, 1, 1)))
+        self.assertEqual(len(snapshot[2]), 6)
+        self.load()
+        self.assertEqual(self.get_snapshot(), snapshot)
+
+
+class ShadowLoadTest(SimpleTestCase):
+    """
+    Tests for building the filings models in shadow tables.
+    """
+
+    def test_shadow_table(self):
+        """
+        Confirm every shadow table name is unique and fits in a Postgres identifier.
+        """
+        config = apps.get_app_config("calaccess_processed_filings")
+        model_list = config.get_stage_models() + config.get_filing_models()
+        names = [m.objects.shadow_table for m in model_list]
+        self.assertEqual(len(names), len(set(names)))
+        for name in names:
+            self.assertLessEqual(len(name), 63)
+
+    def test_rename_tables(self):
+        """
+        Confirm tables are renamed without touching tables that share their prefix.
+        """
+        tables = {
+            Form460Filing._meta.db_table: Form460Filing.objects.shadow_table,
+            Form460LatestFilingVersion._meta.db_table: (
+                Form460LatestFilingVersion.objects.shadow_table
+            ),
+        }
+        sql = Form460ScheduleAItem.objects.rename_tables(
+            Form460ScheduleAItem.objects.get_sql(), tables
+        )
+        self.assertIn('FROM "shadow_filings_form460filing" filing', sql)
+        self.assertIn('JOIN "shadow_filings_form460latestfilingversion" latest', sql)
+        self.assertIn(
+            "JOIN calaccess_processed_filings_form460scheduleaitemversion", sql
+        )
+
+
+class ShadowSwapTest(TestCase):
+    """
+    Tests for loading a model through a shadow table in the database.
+    """
+
+    def setUp(self):
+        """
+        Load two Form 460s, one amended, and their contributions.
+        """
+        FilerXrefCd.objects.create(filer_id=10, xref_id="10")
+        create_raw_filing(1, 0, [date(2010, 1, 1)])
+        create_raw_filing(1, 1, [date(2010, 1, 1), date(2010, 2, 1)])
+        create_raw_filing(2, 0, [date(2014, 1, 1)])
+        # start the ids over like processcalaccessfilings does, as a swap will
+        with connection.cursor() as c:
+            c.execute(
+                f'TRUNCATE TABLE "{Form460FilingVersion._meta.db_table}" '
+                "RESTART IDENTITY CASCADE"
+            )
+        Form460FilingVersion.objects.load()
+        Form460ScheduleAItemVersion.objects.load()
+
+    def get_rows(self):
+        """
+        Returns the loaded versions and items, along with their keys.
+        """
+        return (
+            list(
+                Form460FilingVersion.objects.order_by("id").values_list(
+                    "id", "filing_id", "amend_id", "filer_id"
+                )
+            ),
+            list(
+                Form460ScheduleAItemVersion.objects.order_by("id").values_list(
+                    "filing_version_id", "line_item", "date_received", "amount"
+                )
+            ),
+        )
+
+    def test_swap(self):
+        """
+        Confirm the swapped-in table keeps its rows, indexes and foreign keys.
+        """
+        table = Form460FilingVersion._meta.db_table
+        child = Form460ScheduleAItemVersion._meta.db_table
+        rows = self.get_rows()
+        self.assertEqual(len(rows[0]), 3)
+        self.assertEqual(len(rows[1]), 4)
+        index_names = get_index_names(table)
+        foreign_keys = get_foreign_keys(child)
+        self.assertIn((foreign_keys[0][0], table, True), foreign_keys)
+
+        Form460FilingVersion.objects.load(shadow=True)
+        self.assertEqual(self.get_rows(), rows)
+        self.assertEqual(get_index_names(table), index_names)
+        self.assertEqual(get_foreign_keys(child), foreign_keys)
+        self.assertEqual(get_index_names(Form460FilingVersion.objects.shadow_table), [])
+        self.assertEqual(Form460FilingVersion.objects.get_validate_sql(), [])
+
+        # the foreign keys of a swapped-in child point at the swapped-in parent
+        Form460ScheduleAItemVersion.objects.load(shadow=True)
+        self.assertEqual(self.get_rows(), rows)
+        self.assertEqual(get_foreign_keys(child), foreign_keys)
+
+    def test_swap_invalid(self):
+        """
+        Confirm a swap that leaves rows referring to a missing row raises an error.
+        """
+        CvrCampaignDisclosureCd.objects.filter(filing_id=2).delete()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Form460FilingVersion.objects.load(shadow=True)
+
+    def test_swap_rebuild(self):
+        """
+        Confirm a swap within a rebuild leaves the foreign keys for it to validate.
+        """
+        child = Form460ScheduleAItemVersion._meta.db_table
+        foreign_keys = get_foreign_keys(child)
+
+        rebuild = IndexRebuild()
+        Form460FilingVersion.objects.load(shadow=True, rebuild=rebuild)
+        self.assertEqual(
+            get_foreign_keys(child), [(n, t, False) for n, t, v in foreign_keys]
+        )
+        rebuild.add_validation(Form460FilingVersion)
+        step_list = [(s.table, s.name) for s in rebuild.step_list]
+        self.assertIn((child, foreign_keys[0][0]), step_list)
+        self.assertEqual(len(step_list), len(set(step_list)))
+        self.assertTrue(all(s.is_foreign_key for s in rebuild.step_list))
+
+        Form460FilingVersion.objects.validate_foreign_keys()
+        self.assertEqual(get_foreign_keys(child), foreign_keys)
+
+
+class PartitionTest(SimpleTestCase):
+    """
+    Tests for splitting the largest filings tables by election cycle.
+    """
+
+    def test_cycle_bounds(self):
+        """
+        Confirm each cycle covers the two years that end with it.
+        """
+        start, end = get_cycle_bounds(2024)
+        self.assertEqual(start.isoformat(), "2023-01-01")
+        self.assertEqual(end.isoformat(), "2025-01-01")
+        self.assertEqual(get_cycles()[0], 2000)
+        with self.assertRaises(ValueError):
+            get_cycle_bounds(2023)
+
+    def test_partition_names(self):
+        """
+        Confirm every partition name is unique and fits in a Postgres identifier.
+        """
+        model_list = apps.get_app_config(
+            "calaccess_processed_filings"
+        ).get_partitioned_models()
+        self.assertIn(Form460ScheduleAItemVersion, model_list)
+        names = []
+        for m in model_list:
+            lookup = m.objects.get_shadow_partition_lookup()
+            names += list(lookup) + list(lookup.values())
+        self.assertEqual(len(names), len(set(names)))
+        for name in names:
+            self.assertLessEqual(len(name), 63)
+
+
+class PartitionLoadTest(TestCase):
+    """
+    Tests for splitting a loaded table by election cycle and reloading its partitions.
+    """
+
+    def setUp(self):
+        """
+        Load contributions from several cycles and split their table into partitions.
+        """
+        FilerXrefCd.objects.create(filer_id=10, xref_id="10")
+        create_raw_filing(1, 0, [date(2010, 3, 1), date(2009, 6, 1), date(2014, 5, 1)])
+        create_raw_filing(2, 0, [date(2022, 1, 1), None, date(1990, 1, 1)])
+        with connection.cursor() as c:
+            c.execute(
+                f'TRUNCATE TABLE "{Form460FilingVersion._meta.db_table}" '
+                "RESTART IDENTITY CASCADE"
+            )
+        Form460FilingVersion.objects.load()
+        Form460ScheduleAItemVersion.objects.load()
+        self.manager = Form460ScheduleAItemVersion.objects
+        self.table = Form460ScheduleAItemVersion._meta.db_table
+        self.index_names = get_index_names(self.table)
+        self.foreign_keys = get_foreign_keys(self.table)
+        self.manager.partition()
+
+    def get_counts(self):
+        """
+        Returns the number of rows in each partition, keyed by its cycle.
+        """
+        counts = {}
+        with connection.cursor() as c:
+            for cycle in self.manager.get_cycle_list():
+                partition = self.manager.get_partition_name(cycle)
+                c.execute(f'SELECT COUNT(*) FROM "{partition}"')
+                counts[cycle] = c.fetchone()[0]
+                self.assertEqual(
+                    counts[cycle],
+                    self.manager.filter(self.manager.get_cycle_filter(cycle)).count(),
+                )
+        return dict((k, v) for k, v in counts.items() if v)
+
+    def assertPartitions(self):
+        """
+        Assert every partition is attached with its own indexes and foreign keys.
+        """
+        with connection.cursor() as c:
+            partition_list = self.manager.get_partitions(c, self.table)
+        self.assertEqual(partition_list, sorted(self.manager.get_partition_list()))
+
+        # unique indexes are kept as plain ones, under the same names
+        self.assertEqual(get_index_names(self.table), self.index_names)
+        self.assertEqual(get_foreign_keys(self.table), self.foreign_keys)
+        for partition, _ in partition_list:
+            self.assertEqual(
+                get_index_names(partition),
+                sorted(
+                    self.manager.get_partition_index_name(partition, n)
+                    for n in self.index_names
+                ),
+            )
+            self.assertEqual(get_foreign_keys(partition), self.foreign_keys)
+        self.assertEqual(get_index_names(self.manager.shadow_table), [])
+
+    def test_partition(self):
+        """
+        Confirm the rows are routed to the partition for their cycle.
+        """
+        self.assertTrue(self.manager.is_partitioned())
+        self.assertEqual(self.get_counts(), {2010: 2, 2014: 1, 2022: 1, None: 2})
+        self.assertPartitions()
+        bounds = dict(self.manager.get_partition_list())
+        self.assertEqual(
+            bounds[self.manager.get_partition_name(2010)],
+            "FOR VALUES FROM ('2009-01-01') TO ('2011-01-01')",
+        )
+
+        # a full load is built and swapped in partitioned
+        RcptCd.objects.filter(filing_id=2, line_item=1).update(
+            rcpt_date=date(2020, 1, 1)
+        )
+        self.manager.load()
+        self.assertEqual(self.get_counts(), {2010: 2, 2014: 1, 2020: 1, None: 2})
+        self.assertPartitions()
+
+    def test_load_partition(self):
+        """
+        Confirm reloading a cycle's partition replaces its rows and nothing else.
+        """
+        queryset = self.manager.exclude(self.manager.get_cycle_filter(2010))
+        id_list = list(queryset.order_by("id").values_list("id", flat=True))
+        RcptCd.objects.create(
+            filing_id=1,
+            amend_id=0,
+            form_type="A",
+            line_item=4,
+            rcpt_date=date(2010, 6, 1),
+            amount=20,
+        )
+        self.manager.load_partition(2010)
+
+        # the other partitions keep the rows they had
+        self.assertEqual(self.get_counts(), {2010: 3, 2014: 1, 2022: 1, None: 2})
+        self.assertEqual(
+            list(queryset.order_by("id").values_list("id", flat=True)), id_list
+        )
+        self.assertPartitions()
+
+        with self.assertRaises(ValueError):
+            self.manager.load_partition(1998)
+
+
+class IndexRebuildTest(TestCase):
+    """
+    Tests for rebuilding the indexes and constraints dropped by a bulk load.
+    """
+
+    def test_restore_sql(self):
+        """
+        Confirm every dropped index and constraint is rebuilt exactly once.
+        """
+        sql_list = Form460ScheduleCItemVersion.objects.get_restore_sql()
+        self.assertEqual(len(sql_list), len(set(sql_list)))
+        self.assertFalse([sql for sql in sql_list if "DROP" in sql])
+
+        step_list = [RebuildStep(sql) for sql in sql_list]
+        table = Form460ScheduleCItemVersion._meta.db_table
+        self.assertEqual(set(s.table for s in step_list), set([table]))
+        self.assertEqual(len([s for s in step_list if s.is_foreign_key]), 1)
+        self.assertIn("UNIQUE", " ".join(sql_list))
+
+
+class FanOutLoaderTest(SimpleTestCase):
+    """
+    Tests for loading the models that share a raw table from a single scan.
+    """
+
+    def test_from_models(self):
+        """
+        Confirm the models are grouped by the raw table they read.
+        """
+        model_list = apps.get_app_config(
+            "calaccess_processed_filings"
+        ).get_filing_models()
+        loader_list, rest = FanOutLoader.from_models(model_list)
+        lookup = dict((loader.raw_table, loader) for loader in loader_list)
+        self.assertEqual(sorted(lookup), ["EXPN_CD", "RCPT_CD"])
+        self.assertIn(Form460ScheduleAItemVersion, lookup["RCPT_CD"].model_list)
+        self.assertNotIn(Form460ScheduleAItemVersion, rest)
+        self.assertEqual(
+            len(rest) + sum(len(loader.model_list) for loader in loader_list),
+            len(model_list),
+        )
+        self.assertEqual(
+            lookup["RCPT_CD"].get_form_types(),
+            ["'A'", "'A-1'", "'C'", "'F496P3'", "'I'"],
+        )
+
+    def test_sql(self):
+        """
+        Confirm the raw table is only read once by the combined statement.
+        """
+        loader = FanOutLoader(
+            "RCPT_CD", [Form460ScheduleAItemVersion, Form460ScheduleCItemVersion]
+        )
+        sql = loader.get_sql()
+        self.assertEqual(sql.count('"RCPT_CD"'), 1)
+        self.assertEqual(sql.count("INSERT INTO"), 2)
+        self.assertEqual(sql.count(";"), 1)
+        self.assertIn("FROM rcpt_cd rcpt", sql)
+
+    def test_dependent_models(self):
+        """
+        Confirm models that read each other's tables can't share a statement.
+        """
+        with self.assertRaises(ValueError):
+            FanOutLoader("RCPT_CD", [Form460ScheduleAItemVersion, Form460ScheduleAItem])
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for loading candidacies from Form 501 filings one election at a time.
+"""
+import tempfile
+from datetime import date
+from unittest import mock
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.core.management import call_command
+from django.utils import timezone
+from opencivicdata.core.models import Division, Organization, Person
+from opencivicdata.elections.models import Candidacy, CandidateContest
+from calaccess_processed_filings.models import Form501Filing
+from calaccess_processed_elections.form501s import (
+    Form501Result,
+    get_partitions,
+    reconcile_persons,
+)
+from calaccess_processed_elections.proxies import (
+    OCDElectionProxy,
+    OCDPersonProxy,
+    OCDPostProxy,
+)
+
+
+def create_form501s():
+    """
+    Create Form 501s for candidates in two elections, and the OCD records they need.
+    """
+    Division.objects.create(id="ocd-division/country:us/state:ca", name="California")
+    for name in ["UNKNOWN", "DEMOCRATIC", "REPUBLICAN"]:
+        Organization.objects.create(name=name, classification="party")
+    post = OCDPostProxy.objects.get_or_create_by_name("GOVERNOR")[0]
+    for name, dt in [
+        ("2010 GENERAL", date(2010, 11, 2)),
+        ("2014 GENERAL", date(2014, 11, 4)),
+    ]:
+        election = OCDElectionProxy.objects.create_from_calaccess(
+            name, dt, election_type="GENERAL"
+        )
+        contest = CandidateContest.objects.create(
+            name="GOVERNOR", election=election, division=post.division
+        )
+        contest.posts.create(post=post)
+
+    for filing_id, filer_id, last_name, first_name, year, party in [
+        (1, "1001", "BROWN", "EDMUND", 2010, "DEMOCRATIC"),
+        (2, "1002", "WHITMAN", "MEG", 2010, "REPUBLICAN"),
+        (3, "1001", "BROWN", "EDMUND", 2014, "DEMOCRATIC"),
+        (4, "1003", "KASHKARI", "NEEL", 2014, "REPUBLICAN"),
+        (5, "1003", "KASHKARI", "NEEL", 2014, "REPUBLICAN"),
+        (6, "1004", "DOE", "JANE", None, "REPUBLICAN"),
+    ]:
+        Form501Filing.objects.create(
+            filing_id=filing_id,
+            amendment_count=0,
+            filer_id=filer_id,
+            last_name=last_name,
+            first_name=first_name,
+            election_year=year,
+            election_type="GENERAL",
+            office="GOVERNOR",
+            party=party,
+            date_filed=date(year or 2010, 1, filing_id),
+        )
+
+
+def get_snapshot():
+    """
+    Returns the loaded candidacies and persons without their generated ids.
+    """
+    return sorted(
+        (
+            c.contest.election.name,
+            c.candidate_name,
+            c.party.name,
+            str(c.filed_date),
+            sorted(c.extras["form501_filing_ids"]),
+            sorted(c.form501_links.values_list("filing_id", flat=True)),
+            c.person.name,
+            sorted(
+                c.person.identifiers.filter(scheme="calaccess_filer_id").values_list(
+                    "identifier", flat=True
+                )
+            ),
+        )
+        for c in Candidacy.objects.all()
+    )
+
+
+class Form501LoaderTest(TestCase):
+    """
+    Tests for loading candidacies from Form 501s in one process.
+    """
+
+    def setUp(self):
+        """
+        Create the Form 501s and OCD records.
+        """
+        create_form501s()
+
+    def test_partitions(self):
+        """
+        Confirm the filings are split by election, leaving out those without one.
+        """
+        partition_list = get_partitions(Form501Filing.objects.all())
+        self.assertEqual(partition_list, [[3, 4, 5], [1, 2]])
+
+    def test_load(self):
+        """
+        Confirm each filing is loaded into a candidacy for its election.
+        """
+        call_command("loadocdcandidaciesfrom501s", verbosity=0)
+        self.assertEqual(
+            get_snapshot(),
+            [
+                (
+                    "2010 GENERAL",
+                    "EDMUND BROWN",
+                    "DEMOCRATIC",
+                    "2010-01-01",
+                    [1],
+                    [1],
+                    "EDMUND BROWN",
+                    ["1001"],
+                ),
+                (
+                    "2010 GENERAL",
+                    "MEG WHITMAN",
+                    "REPUBLICAN",
+                    "2010-01-02",
+                    [2],
+                    [2],
+                    "MEG WHITMAN",
+                    ["1002"],
+                ),
+                (
+                    "2014 GENERAL",
+                    "EDMUND BROWN",
+                    "DEMOCRATIC",
+                    "2014-01-03",
+                    [3],
+                    [3],
+                    "EDMUND BROWN",
+                    ["1001"],
+                ),
+                (
+                    "2014 GENERAL",
+                    "NEEL KASHKARI",
+                    "REPUBLICAN",
+                    "2014-01-04",
+                    [4, 5],
+                    [4, 5],
+                    "NEEL KASHKARI",
+                    ["1003"],
+                ),
+            ],
+        )
+        self.assertEqual(Person.objects.count(), 3)
+        self.assertEqual(
+            list(Form501Filing.objects.without_candidacy().values_list("filing_id")),
+            [(6,)],
+        )
+
+    def test_reconcile_persons(self):
+        """
+        Confirm persons created at once for one candidate are merged into the first.
+        """
+        started = timezone.now()
+        brown_list = [Person.objects.create(name="EDMUND BROWN") for i in range(2)]
+        whitman = Person.objects.create(name="MEG WHITMAN")
+        result_list = [
+            Form501Result(3, "1001", "EDMUND BROWN", 30, brown_list[0].id, True),
+            Form501Result(1, "1001", "EDMUND BROWN", 10, brown_list[1].id, True),
+            Form501Result(2, "1002", "MEG WHITMAN", 20, whitman.id, True),
+        ]
+        self.assertEqual(reconcile_persons(result_list, started).persons, 1)
+        self.assertEqual(
+            list(Person.objects.order_by("name").values_list("id", flat=True)),
+            [brown_list[1].id, whitman.id],
+        )
+
+    def test_reconcile_shared_person(self):
+        """
+        Confirm the copies left on a Person found by processes at once are removed.
+        """
+        started = timezone.now()
+        brown = OCDPersonProxy.objects.create(name="EDMUND BROWN")
+        # two processes each missed the filer_id and added it to the same Person
+        for i in range(2):
+            brown.identifiers.create(scheme="calaccess_filer_id", identifier="1001")
+            brown.other_names.create(name="JERRY BROWN", note="")
+        result_list = [
+            Form501Result(1, "1001", "EDMUND BROWN", 10, brown.id, False),
+            Form501Result(3, "1001", "EDMUND BROWN", 30, brown.id, False),
+        ]
+        self.assertEqual(reconcile_persons(result_list, started).persons, 0)
+        self.assertEqual(
+            list(brown.identifiers.values_list("identifier", flat=True)), ["1001"]
+        )
+        self.assertEqual(
+            list(brown.other_names.values_list("name", flat=True)), ["JERRY BROWN"]
+        )
+
+
+class ParallelForm501LoaderTest(TransactionTestCase):
+    """
+    Tests for loading candidacies from Form 501s on a pool of processes.
+    """
+
+    def setUp(self):
+        """
+        Create the Form 501s and OCD records.
+        """
+        create_form501s()
+
+    def test_workers(self):
+        """
+        Confirm the same candidacies are loaded one election at a time or in parallel.
+        """
+        call_command("loadocdcandidaciesfrom501s", verbosity=0)
+        expected = get_snapshot()
+        self.assertEqual(len(expected), 4)
+
+        Candidacy.objects.all().delete()
+        Person.objects.all().delete()
+        call_command("loadocdcandidaciesfrom501s", verbosity=0, workers=2)
+        self.assertEqual(get_snapshot(), expected)
+        self.assertEqual(Person.objects.count(), 3)
+
+    def test_workers_same_filer(self):
+        """
+        Confirm a candidate in many elections loaded at once ends up with one Person.
+        """
+        post = OCDPostProxy.objects.get_or_create_by_name("GOVERNOR")[0]
+        year_list = range(1994, 2010, 4)
+        for year in year_list:
+            election = OCDElectionProxy.objects.create_from_calaccess(
+                f"{year} GENERAL", date(year, 11, 1), election_type="GENERAL"
+            )
+            contest = CandidateContest.objects.create(
+                name="GOVERNOR", election=election, division=post.division
+            )
+            contest.posts.create(post=post)
+            Form501Filing.objects.create(
+                filing_id=year,
+                amendment_count=0,
+                filer_id="1001",
+                last_name="BROWN",
+                first_name="EDMUND",
+                election_year=year,
+                election_type="GENERAL",
+                office="GOVERNOR",
+                party="DEMOCRATIC",
+                date_filed=date(year, 1, 1),
+            )
+
+        call_command("loadocdcandidaciesfrom501s", verbosity=0, workers=4)
+        brown = Person.objects.filter(identifiers__identifier="1001").distinct().get()
+        self.assertEqual(
+            list(
+                brown.identifiers.filter(scheme="calaccess_filer_id").values_list(
+                    "identifier", flat=True
+                )
+            ),
+            ["1001"],
+        )
+        name_list = list(brown.other_names.values_list("name", flat=True))
+        self.assertEqual(len(name_list), len(set(name_list)))
+        self.assertEqual(
+            brown.candidacies.count(),
+            Form501Filing.objects.filter(filer_id="1001").count(),
+        )
+        self.assertEqual(Person.objects.count(), 3)
+
+    def test_pipeline_workers(self):
+        """
+        Confirm processcalaccesselections passes its workers to the Form 501 loader.
+        """
+        command = "calaccess_processed_elections.management.commands."
+        command += "processcalaccesselections.call_command"
+        with tempfile.TemporaryDirectory() as data_dir:
+            with override_settings(CALACCESS_DATA_DIR=data_dir):
+                with mock.patch(command) as mock_call_command:
+                    call_command("processcalaccesselections", verbosity=0, workers=2)
+        options = dict((c.args[0], c.kwargs) for c in mock_call_command.call_args_list)
+        self.assertEqual(options["loadocdcandidaciesfrom501s"]["workers"], 2)
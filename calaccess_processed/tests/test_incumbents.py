@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for setting membership terms and incumbent candidacies.
+"""
+from datetime import date
+from django.test import TestCase
+from opencivicdata.core.models import Division, Membership, Organization, Person
+from opencivicdata.elections.models import Candidacy, CandidateContest, Election
+from calaccess_processed_elections.proxies import (
+    OCDCandidacyProxy,
+    OCDMembershipProxy,
+)
+
+
+class IncumbentTest(TestCase):
+    """
+    Tests for the set-based Membership and Candidacy updates.
+    """
+
+    def setUp(self):
+        """
+        Create members of two posts, and candidacies for them.
+        """
+        division = Division.objects.create(
+            id="ocd-division/country:us/state:ca", name="California"
+        )
+        organization = Organization.objects.create(
+            name="California State Assembly", classification="lower"
+        )
+        self.posts = dict(
+            (label, organization.posts.create(label=label, role="Member"))
+            for label in ["A", "B"]
+        )
+        self.people = {}
+        for name, label, start_date in [
+            ("ALICE", "A", "2010"),
+            ("BOB", "A", "2014"),
+            ("CAROL", "A", "2014"),
+            ("DAN", "A", ""),
+            ("ERIN", "B", "2012"),
+            ("FRANK", None, ""),
+        ]:
+            person = Person.objects.create(name=name)
+            self.people[name] = person
+            if label:
+                Membership.objects.create(
+                    person=person,
+                    post=self.posts[label],
+                    organization=organization,
+                    start_date=start_date,
+                )
+
+        for year, label, name_list in [
+            (2010, "A", ["ALICE", "DAN"]),
+            (2012, "A", ["ALICE", "FRANK"]),
+            (2016, "A", ["ALICE", "BOB"]),
+            (2012, "B", ["ERIN"]),
+        ]:
+            election, created = Election.objects.get_or_create(
+                name=f"{year} GENERAL", date=date(year, 11, 1), division=division
+            )
+            contest = CandidateContest.objects.create(
+                name=f"{year} {label}", election=election, division=division
+            )
+            for name in name_list:
+                Candidacy.objects.create(
+                    person=self.people[name],
+                    post=self.posts[label],
+                    contest=contest,
+                    candidate_name=name,
+                )
+
+    def test_end_dates(self):
+        """
+        Confirm each member's term ends when their successor's begins.
+        """
+        self.assertEqual(OCDMembershipProxy.objects.set_end_dates(), 2)
+        self.assertEqual(
+            dict(Membership.objects.values_list("person__name", "end_date")),
+            dict(ALICE="2014", BOB="", CAROL="", DAN="2010", ERIN=""),
+        )
+        self.assertEqual(OCDMembershipProxy.objects.set_end_dates(), 0)
+
+    def test_incumbents(self):
+        """
+        Confirm candidacies during a member's term are marked as incumbent.
+        """
+        OCDMembershipProxy.objects.set_end_dates()
+        self.assertEqual(OCDCandidacyProxy.objects.set_incumbents(), 2)
+        self.assertEqual(
+            sorted(
+                Candidacy.objects.values_list(
+                    "contest__name", "candidate_name", "is_incumbent"
+                )
+            ),
+            [
+                ("2010 A", "ALICE", None),
+                ("2010 A", "DAN", None),
+                ("2012 A", "ALICE", True),
+                ("2012 A", "FRANK", False),
+                ("2012 B", "ERIN", None),
+                ("2016 A", "ALICE", False),
+                ("2016 A", "BOB", True),
+            ],
+        )
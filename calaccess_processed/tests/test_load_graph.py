@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for the dependency graph used to load filings in parallel.
+"""
+from unittest import TestCase
+from calaccess_processed_filings.graph import LoadGraph, LoadNode, parse_sql_tables
+
+
+class LoadGraphTest(TestCase):
+    """
+    Tests for parsing, ordering and running the load graph.
+    """
+
+    def get_graph(self, calls=None):
+        """
+        Return a small graph shaped like the Form 460 loaders.
+        """
+        calls = calls if calls is not None else []
+
+        def node(name, sql):
+            return LoadNode(name, sql, lambda: calls.append(name))
+
+        return LoadGraph(
+            [
+                node(
+                    "Item",
+                    "INSERT INTO item SELECT * FROM filing "
+                    "JOIN filing_version ON 1=1 JOIN item_version ON 1=1;",
+                ),
+                node("Filing", "INSERT INTO filing SELECT * FROM filing_version;"),
+                node(
+                    "ItemVersion",
+                    'INSERT INTO item_version SELECT * FROM "RCPT_CD" rcpt '
+                    "JOIN filing_version ON 1=1;",
+                ),
+                node(
+                    "FilingVersion",
+                    'INSERT INTO filing_version SELECT * FROM "CVR_CAMPAIGN_DISCLOSURE_CD"'
+                    ' -- JOIN filing\nJOIN "SMRY_CD" s ON 1=1;',
+                ),
+            ]
+        )
+
+    def test_parse_sql_tables(self):
+        """
+        Confirm writes and reads are pulled out of the SQL, ignoring comments.
+        """
+        writes, reads = parse_sql_tables(
+            'INSERT INTO filing_version SELECT * FROM "CVR_CAMPAIGN_DISCLOSURE_CD" '
+            '-- JOIN filing\nJOIN "SMRY_CD" s ON 1=1;'
+        )
+        self.assertEqual(writes, {"filing_version"})
+        self.assertEqual(reads, {"CVR_CAMPAIGN_DISCLOSURE_CD", "SMRY_CD"})
+
+    def test_dependencies(self):
+        """
+        Confirm nodes depend on the nodes that write the tables they read.
+        """
+        graph = self.get_graph()
+        self.assertEqual(graph.nodes["FilingVersion"].upstream, set())
+        self.assertEqual(graph.nodes["ItemVersion"].upstream, {"FilingVersion"})
+        self.assertEqual(
+            graph.nodes["Item"].upstream, {"Filing", "FilingVersion", "ItemVersion"}
+        )
+
+    def test_order(self):
+        """
+        Confirm every node follows its dependencies.
+        """
+        order = self.get_graph().order
+        self.assertEqual(order[0], "FilingVersion")
+        self.assertEqual(order[-1], "Item")
+
+    def test_cycle(self):
+        """
+        Confirm a cycle between nodes raises an error.
+        """
+        with self.assertRaises(ValueError):
+            LoadGraph(
+                [
+                    LoadNode("A", "INSERT INTO a SELECT * FROM b;", None),
+                    LoadNode("B", "INSERT INTO b SELECT * FROM a;", None),
+                ]
+            )
+
+    def test_run(self):
+        """
+        Confirm running the graph respects the dependencies and finds the critical path.
+        """
+        calls = []
+        graph = self.get_graph(calls)
+        graph.run(workers=4)
+        self.assertEqual(len(calls), 4)
+        for name in calls:
+            for upstream in graph.nodes[name].upstream:
+                self.assertLess(calls.index(upstream), calls.index(name))
+
+        path, total = graph.get_critical_path()
+        self.assertEqual(path[0], "FilingVersion")
+        self.assertEqual(path[-1], "Item")
+        self.assertGreaterEqual(total, 0)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for merging duplicate OCD Person records.
+"""
+
+from datetime import date
+from django.test import TestCase
+from django.core.management import call_command
+from opencivicdata.core.models import Division, Organization, Person
+from opencivicdata.elections.models import Candidacy, CandidateContest, Election
+from calaccess_processed_filings.models import Form501Filing
+from calaccess_processed_elections.dedupe import PersonDeduplicator
+from calaccess_processed_elections.merge import merge_person_pairs
+from calaccess_processed_elections.models import CandidacyForm501
+
+
+class MergePersonsTest(TestCase):
+    """
+    Tests for the commands that merge persons.
+    """
+
+    def setUp(self):
+        """
+        Create candidacies in one contest for persons who may be the same.
+        """
+        division = Division.objects.create(
+            id="ocd-division/country:us/state:ca", name="California"
+        )
+        assembly = Organization.objects.create(
+            name="California State Assembly", classification="lower"
+        )
+        post = assembly.posts.create(label="ASSEMBLY 01", role="Member")
+        parties = dict(
+            (name, Organization.objects.create(name=name, classification="party"))
+            for name in ["DEMOCRATIC", "REPUBLICAN"]
+        )
+        election = Election.objects.create(
+            name="2012 GENERAL", date=date(2012, 11, 6), division=division
+        )
+        contest = CandidateContest.objects.create(
+            name="ASSEMBLY 01", election=election, division=division
+        )
+
+        for name, candidate_name, party, filer_id, other_name in [
+            ("SMITH, JOHN", "SMITH, JOHN", None, "100", None),
+            ("JOHN SMITH", "SMITH, JOHN", None, None, None),
+            ("DOE, JANE", "DOE, JANE", "DEMOCRATIC", None, None),
+            ("DOE, JANE", "DOE, JANE", "REPUBLICAN", None, None),
+            ("ROE, RICHARD", "ROE, RICHARD", None, "200", None),
+            ("ROE, RICHARD", "ROE, RICHARD", None, "201", None),
+            ("LEE, ANN", "LEE, ANN", None, None, "ANN LEE"),
+            ("LEE, ANNIE", "LEE, ANNIE", None, None, "ANN LEE"),
+        ]:
+            person = Person.objects.create(name=name)
+            if filer_id:
+                person.identifiers.create(
+                    scheme="calaccess_filer_id", identifier=filer_id
+                )
+            if other_name:
+                person.other_names.create(name=other_name)
+            person.candidacies.create(
+                contest=contest,
+                post=post,
+                candidate_name=candidate_name,
+                party=parties.get(party),
+            )
+        # And one who hasn't run but shares a filer_id
+        Person.objects.create(name="DICK ROE").identifiers.create(
+            scheme="calaccess_filer_id", identifier="201"
+        )
+
+    def test_contest_and_name(self):
+        """
+        Confirm persons are merged only when their parties and filer_ids agree.
+        """
+        call_command("mergeocdpersonsbycontestandname", batch_size=1, verbosity=0)
+        self.assertEqual(
+            sorted(Person.objects.exclude(name__startswith="LEE").values_list("name")),
+            [
+                ("DICK ROE",),
+                ("DOE, JANE",),
+                ("DOE, JANE",),
+                ("ROE, RICHARD",),
+                ("ROE, RICHARD",),
+                ("SMITH, JOHN",),
+            ],
+        )
+        self.assertEqual(Person.objects.filter(name__startswith="LEE").count(), 1)
+        smith = Person.objects.get(name="SMITH, JOHN")
+        filer_id = smith.identifiers.get(scheme="calaccess_filer_id")
+        self.assertEqual(filer_id.identifier, "100")
+        self.assertEqual(smith.candidacies.count(), 1)
+
+    def test_deduplicator(self):
+        """
+        Confirm the persons merged all at once match those merged by each command.
+        """
+        deduplicator = PersonDeduplicator()
+        self.assertEqual(len(deduplicator.get_components()), 3)
+        self.assertEqual(deduplicator.run(), 3)
+        self.assertEqual(
+            sorted(Person.objects.exclude(name__startswith="LEE").values_list("name")),
+            [
+                ("DOE, JANE",),
+                ("DOE, JANE",),
+                ("ROE, RICHARD",),
+                ("ROE, RICHARD",),
+                ("SMITH, JOHN",),
+            ],
+        )
+        self.assertEqual(Person.objects.filter(name__startswith="LEE").count(), 1)
+        roe = Person.objects.get(identifiers__identifier="201")
+        self.assertEqual(roe.other_names.get().name, "DICK ROE")
+        self.assertEqual(roe.candidacies.count(), 1)
+        self.assertEqual(PersonDeduplicator().get_components(), [])
+
+    def test_merge_person_pairs(self):
+        """
+        Confirm many pairs of persons are merged at once, with their candidacies.
+        """
+        for filing_id in [1, 2, 3]:
+            Form501Filing.objects.create(
+                filing_id=filing_id,
+                amendment_count=0,
+                filer_id="100",
+                last_name="SMITH",
+                first_name="JOHN",
+                election_year=2012,
+                date_filed=date(2011, 12, 31 - filing_id),
+            )
+        for i, candidacy in enumerate(
+            Candidacy.objects.filter(candidate_name="SMITH, JOHN").order_by("id")
+        ):
+            candidacy.extras = {"form501_filing_ids": [i + 1, 3]}
+            candidacy.filed_date = date(2012, 1, 1 + i)
+            candidacy.save()
+            candidacy.sources.create(url="http://example.com/smith")
+            candidacy.sources.create(url="http://example.com/%s" % i)
+
+        smith_list = list(
+            Person.objects.filter(candidacies__candidate_name="SMITH, JOHN").order_by(
+                "-name"
+            )
+        )
+        lee_list = list(Person.objects.filter(name__startswith="LEE").order_by("name"))
+        pair_list = [
+            (smith_list[0], smith_list[1]),
+            (lee_list[0].id, lee_list[1].id),
+            (lee_list[1].id, lee_list[0].id),
+        ]
+        self.assertEqual(CandidacyForm501.objects.load(), 4)
+        self.assertFalse(Form501Filing.objects.without_candidacy().exists())
+        result = merge_person_pairs(pair_list)
+        self.assertEqual((result.persons, result.candidacies), (2, 2))
+        self.assertLess(result.queries, 35)
+
+        smith = Person.objects.get(id=smith_list[0].id)
+        self.assertEqual(
+            set(smith.identifiers.values_list("scheme", "identifier")),
+            {("calaccess_filer_id", "100"), ("", smith_list[1].id)},
+        )
+        self.assertEqual(smith.other_names.get().name, "JOHN SMITH")
+        candidacy = smith.candidacies.get()
+        self.assertEqual(candidacy.filed_date, date(2011, 12, 28))
+        self.assertEqual(sorted(candidacy.extras["form501_filing_ids"]), [1, 2, 3])
+        self.assertEqual(
+            sorted(candidacy.form501_links.values_list("filing_id", flat=True)),
+            [1, 2, 3],
+        )
+        self.assertEqual(
+            sorted(candidacy.sources.values_list("url", flat=True)),
+            [
+                "http://example.com/0",
+                "http://example.com/1",
+                "http://example.com/smith",
+            ],
+        )
+        self.assertFalse(Person.objects.filter(id=lee_list[1].id).exists())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for resolving scraped candidates in bulk.
+"""
+from datetime import date
+from django.test import TestCase
+from django.core.management import call_command
+from calaccess_scraped.models import Candidate, CandidateElection, IncumbentElection
+from opencivicdata.core.models import Division, Organization, Person
+from opencivicdata.elections.models import Candidacy, CandidateContest
+from calaccess_processed_filings.models import Form501Filing
+from calaccess_processed_elections.proxies import OCDElectionProxy
+
+
+class ScrapedCandidateResolverTest(TestCase):
+    """
+    Tests for loading candidate contests from in-memory indexes.
+    """
+
+    def setUp(self):
+        """
+        Create the scraped and OCD records the candidates are loaded against.
+        """
+        Division.objects.create(
+            id="ocd-division/country:us/state:ca", name="California"
+        )
+        for name in ["UNKNOWN", "NO PARTY PREFERENCE"]:
+            Organization.objects.create(name=name, classification="party")
+        democrat = Organization.objects.create(
+            name="DEMOCRATIC", classification="party"
+        )
+        democrat.other_names.create(name="D", note="abbreviation")
+
+        for scraped_id, name, dt in [
+            ("1", "2010 PRIMARY", date(2010, 6, 8)),
+            ("2", "2016 GENERAL", date(2016, 11, 8)),
+        ]:
+            CandidateElection.objects.create(name=name, scraped_id=scraped_id)
+            IncumbentElection.objects.create(name=name, date=dt, session=dt.year)
+            OCDElectionProxy.objects.create_from_calaccess(
+                name, dt, election_id=scraped_id, election_type=name[5:]
+            )
+
+        primary, general = CandidateElection.objects.order_by("scraped_id")
+        for name, scraped_id, office_name, election in [
+            ("BROWN, EDMUND G. JR", "1001", "GOVERNOR", primary),
+            ("WHITMAN, MEG", "1002", "GOVERNOR", primary),
+            ("BROWN, EDMUND G. JR", "1001", "GOVERNOR", general),
+            ("DOE, JANE", "", "GOVERNOR", general),
+            ("SMITH, JOHN", "", "SUPERINTENDENT OF PUBLIC INSTRUCTION", general),
+        ]:
+            Candidate.objects.create(
+                name=name,
+                scraped_id=scraped_id,
+                office_name=office_name,
+                election=election,
+                url=f"http://example.com/{scraped_id or name}",
+            )
+
+        for filing_id, filer_id, last_name, first_name, year, kwargs in [
+            (1, "1001", "BROWN", "EDMUND", 2010, dict(party="D")),
+            (2, "1002", "WHITMAN", "MEG", 2010, dict(party="REPUBLICAN")),
+            (3, "1003", "DOE", "JANE", 2016, dict(statement_type="10003")),
+            (4, "1003", "DOE", "JANE", 2014, dict(date_filed=None)),
+        ]:
+            fields = dict(
+                date_filed=date(year, 1, 1),
+                office="Governor",
+                election_type="GENERAL",
+            )
+            fields.update(kwargs)
+            Form501Filing.objects.create(
+                filing_id=filing_id,
+                amendment_count=0,
+                filer_id=filer_id,
+                last_name=last_name,
+                first_name=first_name,
+                election_year=year,
+                **fields,
+            )
+
+    def get_snapshot(self):
+        """
+        Returns the loaded contests and candidacies without their generated ids.
+        """
+        contest_list = sorted(
+            (
+                c.election.name,
+                c.name,
+                c.previous_term_unexpired,
+                c.party.name if c.party else None,
+                c.division_id,
+                sorted(p.post.label for p in c.posts.all()),
+                sorted((s.url, s.note) for s in c.sources.all()),
+            )
+            for c in CandidateContest.objects.all()
+        )
+        candidacy_list = sorted(
+            (
+                c.contest.name,
+                c.candidate_name,
+                c.party.name if c.party else None,
+                c.registration_status,
+                str(c.filed_date),
+                sorted(c.extras.get("form501_filing_ids", [])),
+                c.person.name,
+                sorted(i.identifier for i in c.person.identifiers.all()),
+                sorted((s.url, s.note) for s in c.sources.all()),
+            )
+            for c in Candidacy.objects.all()
+        )
+        return contest_list, candidacy_list
+
+    def test_bulk(self):
+        """
+        Confirm bulk mode loads the same contests and candidacies, even when run twice.
+        """
+        call_command("loadocdcandidatecontests", verbosity=0)
+        call_command("loadocdcandidatecontests", verbosity=0)
+        expected = self.get_snapshot()
+        self.assertEqual(len(expected[0]), 4)
+        self.assertEqual(len(expected[1]), 5)
+
+        Candidacy.objects.all().delete()
+        CandidateContest.objects.all().delete()
+        Person.objects.all().delete()
+        call_command("loadocdcandidatecontests", verbosity=0, bulk=True)
+        call_command("loadocdcandidatecontests", verbosity=0, bulk=True)
+        self.assertEqual(self.get_snapshot(), expected)
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for generating synthetic raw data.
+"""
+from django.test import TestCase
+from calaccess_raw.models import CvrCampaignDisclosureCd, FilerXrefCd, RcptCd
+
+from calaccess_processed.synthetic import FILING_ID_BASE, SyntheticRawData
+
+
+class SyntheticRawDataTest(TestCase):
+    """
+    Tests for the synthetic raw data generator.
+    """
+
+    def setUp(self):
+        """
+        Load a few seed rows.
+        """
+        for filing_id, amend_id, filer_id, form_type in [
+            (1, 0, "10", "F460"),
+            (1, 1, "10", "F460"),
+            (2, 0, "C11", "F497"),
+        ]:
+            CvrCampaignDisclosureCd.objects.create(
+                filing_id=filing_id,
+                amend_id=amend_id,
+                filer_id=filer_id,
+                form_type=form_type,
+            )
+        FilerXrefCd.objects.create(filer_id=10, xref_id="10")
+        FilerXrefCd.objects.create(filer_id=11, xref_id="C11")
+        for line_item in (1, 2):
+            RcptCd.objects.create(
+                filing_id=1, amend_id=0, form_type="A", line_item=line_item, amount=5
+            )
+
+    def test_generate(self):
+        """
+        Confirm the synthetic rows are linked together and can be flushed.
+        """
+        counts = SyntheticRawData(scale=3, seed=1).generate()
+        cover_list = CvrCampaignDisclosureCd.objects.filter(
+            filing_id__gte=FILING_ID_BASE
+        )
+        self.assertEqual(counts["CVR_CAMPAIGN_DISCLOSURE_CD"], cover_list.count())
+        self.assertEqual(cover_list.filter(amend_id=0).count(), 6)
+        self.assertEqual(counts["RCPT_CD"], 6)
+
+        # every cover is cross-referenced to a filer
+        xref_list = FilerXrefCd.objects.values_list("xref_id", flat=True)
+        for filer_id in cover_list.values_list("filer_id", flat=True):
+            self.assertIn(filer_id, xref_list)
+
+        # every item is numbered within a version of a Form 460
+        version_list = set(
+            cover_list.filter(form_type="F460").values_list("filing_id", "amend_id")
+        )
+        item_list = RcptCd.objects.filter(filing_id__gte=FILING_ID_BASE)
+        key_list = [(i.filing_id, i.amend_id, i.line_item) for i in item_list]
+        self.assertEqual(len(key_list), len(set(key_list)))
+        for filing_id, amend_id, line_item in key_list:
+            self.assertIn((filing_id, amend_id), version_list)
+
+        # the same seed makes the same data
+        value_list = sorted(cover_list.values_list("filing_id", "amend_id", "filer_id"))
+        SyntheticRawData(scale=3, seed=1).generate()
+        self.assertEqual(
+            sorted(cover_list.values_list("filing_id", "amend_id", "filer_id")),
+            value_list,
+        )
+
+        SyntheticRawData().flush()
+        self.assertFalse(cover_list.exists())
+        self.assertEqual(CvrCampaignDisclosureCd.objects.count(), 3)
+        self.assertEqual(RcptCd.objects.count(), 2)
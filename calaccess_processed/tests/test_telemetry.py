@@ -0,0 +1,144 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unittests for recording the performance of processing runs.
+"""
+from io import StringIO
+
+from django.db import connection
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from calaccess_processed.models import ProcessingRun, ProcessingStep
+from calaccess_processed.telemetry import record_run, record_step
+
+
+class TelemetryTest(TestCase):
+    """
+    Tests for recording processing runs and their steps.
+    """
+
+    def test_record_run(self):
+        """
+        Confirm a run and its steps are recorded, with commands nested inside it.
+        """
+        table = ProcessingRun._meta.db_table
+        with record_step("sql", "Outside"):
+            pass
+        with record_run("outer") as run:
+            with record_run("inner") as inner:
+                self.assertEqual(run, inner)
+            with record_step("sql", "Insert", [table]) as step:
+                with connection.cursor() as c:
+                    c.execute(
+                        f"INSERT INTO {table} (command, start_datetime) "
+                        "SELECT 'other', now() FROM generate_series(1, 1000)"
+                    )
+                    step.rows_affected = c.rowcount
+
+        run = ProcessingRun.objects.get(command="outer")
+        self.assertIsNotNone(run.finish_datetime)
+        self.assertFalse(ProcessingStep.objects.filter(name="Outside").exists())
+        self.assertEqual(
+            list(run.steps.values_list("kind", "name")),
+            [("command", "inner"), ("sql", "Insert")],
+        )
+        step = run.steps.get(name="Insert")
+        self.assertEqual(step.rows_affected, 1000)
+        self.assertGreater(step.size_after, step.size_before)
+        self.assertGreater(step.buffer_hits + step.buffer_reads, 0)
+
+    def test_failed_run(self):
+        """
+        Confirm a run that raises an error is left unfinished.
+        """
+        with self.assertRaises(ValueError):
+            with record_run("failed"):
+                raise ValueError
+        self.assertIsNone(ProcessingRun.objects.get(command="failed").finish_datetime)
+
+    def test_report(self):
+        """
+        Confirm a step slower than the runs before it is flagged as a regression.
+        """
+        with self.assertRaises(CommandError):
+            call_command("reportcalaccessprocessingperformance")
+
+        for duration in (10, 11, 20):
+            with record_run("processcalaccessfilings") as run:
+                with record_step("sql", "Form460Filing") as step:
+                    pass
+            ProcessingStep.objects.filter(pk=step.pk).update(duration=duration)
+            ProcessingRun.objects.filter(pk=run.pk).update(duration=duration)
+
+        out = StringIO()
+        call_command("reportcalaccessprocessingperformance", no_color=True, stdout=out)
+        self.assertIn("1 step regressed, and so did the whole run", out.getvalue())
+        with self.assertRaises(CommandError):
+            call_command("reportcalaccessprocessingperformance", fail=True, stdout=out)
+        call_command(
+            "reportcalaccessprocessingperformance", threshold=100, stdout=out
+        )
+        self.assertIn("No regressions found", out.getvalue())
+
+    def create_run(self, duration, step_durations):
+        """
+        Record a finished run of processcalaccessfilings with the given durations.
+
+        step_durations is a dictionary with the seconds each step took, keyed by name.
+        """
+        with record_run("processcalaccessfilings") as run:
+            for name in step_durations:
+                with record_step("sql", name):
+                    pass
+        ProcessingRun.objects.filter(pk=run.pk).update(duration=duration)
+        for name, step_duration in step_durations.items():
+            run.steps.filter(name=name).update(duration=step_duration)
+
+    def report(self, **options):
+        """
+        Returns the output of the report, at a verbosity that shows every step.
+        """
+        out = StringIO()
+        call_command(
+            "reportcalaccessprocessingperformance",
+            no_color=True,
+            verbosity=2,
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_report_threshold(self):
+        """
+        Confirm only steps slower than the threshold and the minimum are flagged.
+        """
+        for i in range(3):
+            self.create_run(20, dict(Slow=10, Steady=5, Quick=0.1))
+        # 50% slower, 10% slower and five times slower but under a second
+        self.create_run(21, dict(Slow=15, Steady=5.5, Quick=0.5))
+
+        output = self.report()
+        self.assertIn("1 step regressed\n", output)
+        self.assertNotIn("whole run", output)
+        self.assertIn("+50.0%", output)
+        self.assertIn("No regressions found", self.report(threshold=60))
+        self.assertIn("3 steps regressed", self.report(threshold=5, min_seconds=0))
+        self.assertIn("2 steps regressed", self.report(min_seconds=0.1))
+        self.assertIn("1 step regressed", self.report(min_seconds=6))
+        self.assertIn("No regressions found", self.report(min_seconds=20))
+
+    def test_report_run(self):
+        """
+        Confirm a slower run is reported apart from its steps.
+        """
+        for i in range(3):
+            self.create_run(20, dict(Steady=5))
+        self.create_run(30, dict(Steady=5))
+
+        output = self.report()
+        self.assertIn("The whole run regressed, though no single step did", output)
+        self.assertNotIn("steps regressed", output)
+        with self.assertRaises(CommandError):
+            self.report(fail=True)
@@ -11,6 +11,7 @@ from django.db import connection
 
 # Managers
 from calaccess_processed.managers import BulkLoadSQLManager
+from calaccess_processed.telemetry import record_step
 
 # Text
 import re
@@ -67,12 +68,21 @@ class CampaignFinanceManager(BulkLoadSQLManager):
         else:
             composed_sql = raw_sql
 
+        # Record the tables it writes to along with the run
+        tables = re.findall(
+            r'(?:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+"?(\w+)',
+            re.sub(r"--[^\n]*", "", raw_sql),
+            re.I,
+        )
+
         # Open a database connection
-        with connection.cursor() as cursor:
-            # Run the SQL
-            cursor.execute(composed_sql, params)
-            # Get the row row_count
-            row_count = cursor.rowcount
+        with record_step("sql", file_name, set(tables)) as step:
+            with connection.cursor() as cursor:
+                # Run the SQL
+                cursor.execute(composed_sql, params)
+                # Get the row row_count
+                row_count = cursor.rowcount
+            step.rows_affected = row_count
 
         # Log the result
         operation = self._extract_operation_from_sql(raw_sql)
@@ -0,0 +1,24 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Custom administration panels for elections models.
+"""
+from django.contrib import admin
+from calaccess_processed_elections import models
+
+
+@admin.register(models.CandidatePartyCorrection)
+class CandidatePartyCorrectionAdmin(admin.ModelAdmin):
+    """
+    Custom admin for the CandidatePartyCorrection model.
+    """
+
+    list_display = (
+        "candidate_name",
+        "year",
+        "election_type",
+        "office",
+        "party",
+    )
+    list_filter = ("year", "election_type")
+    search_fields = ("candidate_name", "office")
@@ -21,6 +21,30 @@ class CalAccessProcessedElectionsConfig(AppConfig):
     # Where SQL files are stored in this application
     sql_directory_path = os.path.join(os.path.dirname(__file__), "sql")
 
+    def ready(self):
+        """
+        Connect the signals that keep loaded corrections up to date.
+        """
+        from django.db.models.signals import post_delete, post_save
+        from . import proxies
+        from .corrections import registry
+        from .corrections.candidate_party import clear_parties
+
+        # Signals are sent by the class that was saved, so list the proxies too
+        party_models = (
+            apps.get_model("core", "Organization"),
+            apps.get_model("core", "OrganizationName"),
+            proxies.OCDOrganizationProxy,
+            proxies.OCDOrganizationNameProxy,
+            proxies.OCDPartyProxy,
+        )
+        for signal in (post_save, post_delete):
+            signal.connect(
+                registry.clear, sender=self.get_model("CandidatePartyCorrection")
+            )
+            for model in party_models:
+                signal.connect(clear_parties, sender=model)
+
     def get_ocd_models_list(self):
         """
         Returns a list of all the OCD models proxied by this app.
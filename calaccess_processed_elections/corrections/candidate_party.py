@@ -3,41 +3,64 @@
 """
 Utilities for correcting connection between candidates and parties.
 """
-import os
-import csv
-from django.apps import apps
+from django.db.models import F
+from .registry import CorrectionsFile
 
+corrections = CorrectionsFile(
+    "candidate_party.csv",
+    ("candidate_name", "year", "election_type", "office"),
+    "party",
+    model_name="CandidatePartyCorrection",
+)
 
-def candidate_party(candidate_name, year, election_type, office):
+# The OCD parties for every name in the corrections, and the lookup they came from
+party_cache = dict(lookup=None, parties={})
+
+
+def get_parties(name_list):
     """
-    Returns the correct OCD party organization object for a given candidate name, year, election_type and office.
+    Returns a dictionary of OCD party objects keyed by each of the provided names.
 
-    Returns None if no correction is found.
+    Names are matched the same way as OCDPartyProxy.objects.get_by_name, but all at
+    once. Names that don't match get the "UNKNOWN" party.
     """
     from calaccess_processed_elections.proxies import OCDPartyProxy
 
-    # Get the path to our corrections file
-    app = apps.get_app_config("calaccess_processed_elections")
-    module_dir = os.path.abspath(os.path.dirname(app.module.__file__))
-    corrections_path = os.path.join(module_dir, "corrections", "candidate_party.csv")
+    parties = {}
+    # Try an alternate name
+    other_name_qs = OCDPartyProxy.objects.filter(
+        other_names__name__in=name_list
+    ).annotate(other_name=F("other_names__name"))
+    for party in other_name_qs:
+        parties.setdefault(party.other_name, party)
+    # But prefer the full name
+    for party in OCDPartyProxy.objects.filter(name__in=name_list):
+        parties[party.name] = party
+    # And fill in the rest with the unknown party
+    missing = set(name_list).difference(parties)
+    if missing:
+        unknown = OCDPartyProxy.objects.unknown()
+        parties.update((name, unknown) for name in missing)
+    return parties
 
-    # Open up the corrections
-    with open(corrections_path, "r") as f:
-        corrections = csv.DictReader(f)
-        # Filter down to the ones we've corrected
-        corrections = [d for d in corrections if d["party"]]
 
+def clear_parties(**kwargs):
+    """
+    Forget the parties found for the corrections, so they are looked up again.
+
+    Can be connected to a signal.
+    """
+    party_cache["lookup"] = None
+
+
+def candidate_party(candidate_name, year, election_type, office):
+    """
+    Returns the correct OCD party organization object for a given candidate name, year, election_type and office.
+
+    Returns None if no correction is found.
+    """
     # Filter down to the ones that match
-    matches = [
-        d["party"]
-        for d in corrections
-        if (
-            d["candidate_name"] == candidate_name
-            and str(d["year"]) == str(year)
-            and d["election_type"] == election_type
-            and d["office"] == office
-        )
-    ]
+    matches = corrections.get(candidate_name, year, election_type, office)
 
     # If there's more than one result throw an error
     if len(matches) > 1:
@@ -45,6 +68,10 @@ def candidate_party(candidate_name, year, election_type, office):
     # If there's no match return None
     elif len(matches) == 0:
         return None
-    # If there's only one match return that
-    else:
-        return OCDPartyProxy.objects.get_by_name(matches[0])
+
+    # If there's only one match return its party, looking them all up if we haven't
+    lookup = corrections.get_lookup()
+    if party_cache["lookup"] is not lookup:
+        party_cache["parties"] = get_parties(corrections.get_value_list())
+        party_cache["lookup"] = lookup
+    return party_cache["parties"][matches[0]]
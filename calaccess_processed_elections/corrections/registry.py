@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+A registry of corrections files that are loaded once and indexed by key.
+"""
+import os
+import csv
+from collections import defaultdict
+
+# All the corrections files, by name
+registry = {}
+
+
+class CorrectionsFile(object):
+    """
+    A CSV file of corrections, indexed by its key columns.
+
+    The file is read the first time it is needed and again only if it has been
+    modified since. Rows without a value are ignored.
+
+    If a model is provided, its rows are read along with the file and take the place
+    of any rows in the file with the same key. A row with a blank value there
+    removes the correction.
+    """
+
+    def __init__(self, file_name, key_fields, value_field, model_name=None):
+        """
+        Create a new object and add it to the registry.
+        """
+        self.file_name = file_name
+        self.key_fields = key_fields
+        self.value_field = value_field
+        self.model_name = model_name
+        self.lookup = None
+        self.mtime = None
+        registry[file_name] = self
+
+    @property
+    def path(self):
+        """
+        Returns the path to the file.
+        """
+        return os.path.join(os.path.dirname(__file__), self.file_name)
+
+    @property
+    def model(self):
+        """
+        Returns the model with corrections kept in the database, if there is one.
+        """
+        from django.apps import apps
+
+        if not self.model_name:
+            return None
+        return apps.get_model("calaccess_processed_elections", self.model_name)
+
+    def get_key(self, row):
+        """
+        Returns the lookup key for a row, with every value as a string.
+        """
+        return tuple(str(row[f]) for f in self.key_fields)
+
+    def load(self):
+        """
+        Read the file, and the database table if there is one, into the lookup.
+        """
+        self.mtime = os.path.getmtime(self.path)
+        lookup = defaultdict(list)
+        with open(self.path, "r") as f:
+            for row in csv.DictReader(f):
+                if row[self.value_field]:
+                    lookup[self.get_key(row)].append(row[self.value_field])
+
+        if self.model:
+            fields = self.key_fields + (self.value_field,)
+            for row in self.model.objects.values(*fields):
+                key = self.get_key(row)
+                if row[self.value_field]:
+                    lookup[key] = [row[self.value_field]]
+                else:
+                    lookup.pop(key, None)
+
+        self.lookup = dict(lookup)
+
+    def clear(self):
+        """
+        Forget what has been loaded so it is read again the next time it is needed.
+        """
+        self.lookup = None
+
+    def get_lookup(self):
+        """
+        Returns the dictionary of values by key, loading it if necessary.
+        """
+        if self.lookup is None or os.path.getmtime(self.path) != self.mtime:
+            self.load()
+        return self.lookup
+
+    def get(self, *key):
+        """
+        Returns a list of the values with the provided key.
+        """
+        return self.get_lookup().get(tuple(str(i) for i in key), [])
+
+    def get_value_list(self):
+        """
+        Returns a set of every value in the lookup.
+        """
+        return {v for value_list in self.get_lookup().values() for v in value_list}
+
+
+def clear(**kwargs):
+    """
+    Forget every corrections file that has been loaded.
+
+    Can be connected to a signal.
+    """
+    for corrections_file in registry.values():
+        corrections_file.clear()
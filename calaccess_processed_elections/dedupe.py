@@ -0,0 +1,185 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Find and merge duplicate OCD Person records all at once.
+"""
+import logging
+from collections import defaultdict
+from opencivicdata.core.models import Person, PersonIdentifier, PersonName
+from opencivicdata.elections.models import Candidacy
+from .merge import merge_person_pairs
+
+logger = logging.getLogger(__name__)
+
+
+class UnionFind(object):
+    """
+    Disjoint sets of items, joined with union and looked up with find.
+    """
+
+    def __init__(self):
+        """
+        Create a new object with no items.
+        """
+        self.parent = {}
+
+    def find(self, item):
+        """
+        Returns the item that represents the set containing item.
+
+        Items not seen before are added in a set of their own.
+        """
+        root = self.parent.setdefault(item, item)
+        while self.parent[root] != root:
+            root = self.parent[root]
+        # Point everything on the path straight at the root
+        while item != root:
+            self.parent[item], item = root, self.parent[item]
+        return root
+
+    def union(self, item, other):
+        """
+        Join the sets containing item and other.
+
+        Returns the item that represents the joined set.
+        """
+        root, other_root = self.find(item), self.find(other)
+        if root != other_root:
+            self.parent[other_root] = root
+        return root
+
+    def groups(self):
+        """
+        Returns a list of the sets with more than one item.
+        """
+        group_lookup = defaultdict(list)
+        for item in self.parent:
+            group_lookup[self.find(item)].append(item)
+        return [g for g in group_lookup.values() if len(g) > 1]
+
+
+class PersonDeduplicator(object):
+    """
+    Merges OCD Person records that share a filer_id, or a name in a contest.
+
+    Persons sharing a CAL-ACCESS filer_id are always merged. Persons whose candidacies
+    in a CandidateContest share a candidate name, Person name or other name are merged
+    if the candidacies' parties agree and the merge wouldn't combine more than one
+    filer_id, like the mergeocdpersonsbyfilerid and mergeocdpersonsbycontestandname
+    commands. Every Person, identifier, name and candidacy is loaded at once and the
+    connected Persons are found with union-find, so each set of duplicates is merged
+    a single time.
+    """
+
+    def __init__(self):
+        """
+        Create a new object and load the records it links.
+        """
+        self.persons = dict(
+            (i, (name, created_at))
+            for i, name, created_at in Person.objects.values_list(
+                "id", "name", "created_at"
+            )
+        )
+        self.filer_ids = defaultdict(set)
+        for person_id, identifier in PersonIdentifier.objects.filter(
+            scheme="calaccess_filer_id"
+        ).values_list("person_id", "identifier"):
+            self.filer_ids[person_id].add(identifier)
+        self.other_names = defaultdict(set)
+        for person_id, name in PersonName.objects.values_list("person_id", "name"):
+            self.other_names[person_id].add(name)
+        self.candidacies = defaultdict(list)
+        for row in Candidacy.objects.values_list(
+            "person_id",
+            "contest_id",
+            "candidate_name",
+            "party_id",
+            "contest__election__date",
+        ):
+            self.candidacies[row[0]].append(row[1:])
+
+    def get_name_groups(self):
+        """
+        Returns lists of the persons with candidacies that share a name in a contest.
+
+        If the candidacies have more than one party, they are split by party.
+        """
+        group_lookup = defaultdict(dict)
+        for person_id, candidacy_list in self.candidacies.items():
+            name_list = [("person_name", self.persons[person_id][0])] + [
+                ("other_name", n) for n in self.other_names[person_id] if n
+            ]
+            for contest_id, candidate_name, party_id, date in candidacy_list:
+                for key in name_list + [("candidate_name", candidate_name)]:
+                    party_lookup = group_lookup[(contest_id,) + key]
+                    party_lookup.setdefault(party_id, set()).add(person_id)
+
+        for party_lookup in group_lookup.values():
+            if len(set(party_lookup).difference([None])) <= 1:
+                person_ids = set().union(*party_lookup.values())
+                if len(person_ids) > 1:
+                    yield person_ids
+            else:
+                for person_ids in party_lookup.values():
+                    if len(person_ids) > 1:
+                        yield person_ids
+
+    def get_components(self):
+        """
+        Returns lists of the ids of persons to be merged with each other.
+        """
+        union_find = UnionFind()
+
+        # Join every Person sharing a filer_id
+        filer_id_lookup = defaultdict(list)
+        for person_id, filer_ids in self.filer_ids.items():
+            for filer_id in filer_ids:
+                filer_id_lookup[filer_id].append(person_id)
+        for person_ids in filer_id_lookup.values():
+            for person_id in person_ids:
+                union_find.union(person_ids[0], person_id)
+        root_filer_ids = defaultdict(set)
+        for person_id, filer_ids in self.filer_ids.items():
+            root_filer_ids[union_find.find(person_id)].update(filer_ids)
+
+        # Then the persons sharing a name in a contest, unless their filer_ids differ
+        for person_ids in self.get_name_groups():
+            root_list = set(union_find.find(i) for i in person_ids)
+            filer_ids = set().union(*(root_filer_ids.get(r, ()) for r in root_list))
+            if len(root_list) == 1 or len(filer_ids) > 1:
+                continue
+            root_list = list(root_list)
+            for root in root_list[1:]:
+                union_find.union(root_list[0], root)
+            for root in root_list:
+                root_filer_ids.pop(root, None)
+            root_filer_ids[union_find.find(root_list[0])] = filer_ids
+
+        # Keep the oldest record in each set
+        return [
+            sorted(person_ids, key=lambda i: (self.persons[i][1], i))
+            for person_ids in union_find.groups()
+        ]
+
+    def merge(self, person_ids):
+        """
+        Merge the persons in person_ids into the first.
+
+        Returns a MergeResult from merge_person_pairs.
+        """
+        return merge_person_pairs([(person_ids[0], i) for i in person_ids[1:]])
+
+    def run(self):
+        """
+        Merge every set of duplicate persons.
+
+        Returns the number of persons merged away.
+        """
+        merged = 0
+        for person_ids in self.get_components():
+            logger.debug(
+                "Merging {} persons into {}".format(len(person_ids), person_ids[0])
+            )
+            merged += self.merge(person_ids).persons
+        return merged
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+An in-memory index of each filer's types over time, from FilerToFilerTypeCd.
+"""
+from bisect import bisect_right
+from collections import Counter, defaultdict, namedtuple
+from contextlib import contextmanager
+from calaccess_raw.models import FilerToFilerTypeCd, LookupCodesCd
+
+# The index answering lookups for the current run, shared by every thread
+_current_index = None
+
+# A filer's type as of its effect_dt
+FilerType = namedtuple("FilerType", ["effect_dt", "party_cd", "office_name"])
+
+
+def get_current_index():
+    """
+    Returns the FilerTypeIndex in use, or None if there isn't one.
+    """
+    return _current_index
+
+
+@contextmanager
+def use_filer_type_index(filer_id_list=None):
+    """
+    Answer FilerToFilerTypeCd lookups from a FilerTypeIndex until the block exits.
+
+    If an index is already in use, it is used for this block too.
+    """
+    global _current_index
+    if _current_index is not None:
+        yield _current_index
+        return
+
+    _current_index = FilerTypeIndex(filer_id_list=filer_id_list)
+    try:
+        yield _current_index
+    finally:
+        _current_index = None
+
+
+class FilerTypeIndex(object):
+    """
+    Each filer's FilerToFilerTypeCd records, sorted by effect_dt.
+
+    Finds the record in effect on a date by bisection, and gives the same answers as
+    OCDPartyManager.get_by_filer_id and
+    RawFilerToFilerTypeCdManager.get_office_by_filer_id_and_date.
+    """
+
+    def __init__(self, filer_id_list=None):
+        """
+        Create a new object and load its records.
+
+        If filer_id_list is provided, only those filers are loaded.
+        """
+        qs = FilerToFilerTypeCd.objects.filter(effect_dt__isnull=False)
+        if filer_id_list is not None:
+            qs = qs.filter(filer_id__in=filer_id_list)
+        row_list = list(
+            qs.order_by("filer_id", "effect_dt", "id").values_list(
+                "filer_id", "effect_dt", "party_cd", "race", "district_cd"
+            )
+        )
+
+        # Look up the codes for offices and districts, keeping those that are unique
+        code_id_list = {r[3] for r in row_list} | {r[4] for r in row_list if r[4]}
+        code_list = list(LookupCodesCd.objects.filter(code_id__in=code_id_list))
+        count = Counter(c.code_id for c in code_list)
+        self.code_lookup = dict(
+            (c.code_id, c) for c in code_list if count[c.code_id] == 1
+        )
+
+        self.date_lookup = defaultdict(list)
+        self.type_lookup = defaultdict(list)
+        for filer_id, effect_dt, party_cd, race, district_cd in row_list:
+            self.date_lookup[filer_id].append(effect_dt)
+            self.type_lookup[filer_id].append(
+                FilerType(effect_dt, party_cd, self.get_office_name(race, district_cd))
+            )
+
+    def get_office_name(self, race, district_cd):
+        """
+        Returns a string containing the office name and district number (if applicable).
+
+        Returns None if the codes aren't found.
+        """
+        try:
+            office = self.code_lookup[race]
+        except KeyError:
+            return None
+
+        # If we don't have a valid district code, just return the name.
+        if not district_cd:
+            return "{}".format(office).strip()
+
+        try:
+            district = self.code_lookup[district_cd]
+        except KeyError:
+            return None
+        return "{} {}".format(office, district).strip()
+
+    def get(self, filer_id, election_date):
+        """
+        Returns the FilerType for the given filer_id, effective before election_date.
+
+        Returns None if not found.
+        """
+        try:
+            filer_id = int(filer_id)
+        except (TypeError, ValueError):
+            return None
+        date_list = self.date_lookup.get(filer_id)
+        if not date_list:
+            return None
+        i = bisect_right(date_list, election_date)
+        if not i:
+            return None
+        return self.type_lookup[filer_id][i - 1]
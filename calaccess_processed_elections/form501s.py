@@ -0,0 +1,388 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Load OCD candidacies from Form 501 filings one election at a time.
+
+Models are imported where they are used, so worker processes can import this module
+before Django is set up.
+"""
+import logging
+import multiprocessing
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date
+
+import django
+from django.apps import apps
+from django.core.exceptions import MultipleObjectsReturned
+from django.db import connection, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# What loading a Form 501 did, sorted by filing_id
+Form501Result = namedtuple(
+    "Form501Result",
+    ["filing_id", "filer_id", "name", "candidacy_id", "person_id", "created"],
+)
+
+# The loader in each worker process, shared by every election it loads
+_worker_loader = None
+
+
+class Form501Loader(object):
+    """
+    Loads Form 501 filings into OCD candidacies, caching what the filings share.
+
+    Elections, posts and parties are looked up the first time they are needed, and
+    contests the first time they are needed in each election, rather than once for
+    every filing.
+    """
+
+    def __init__(self):
+        """
+        Create a new object with empty caches.
+        """
+        self.election_lookup = {}
+        self.post_lookup = {}
+        self.party_lookup = {}
+        self.contest_lookup = {}
+
+    def get_election(self, form501):
+        """
+        Returns the OCD Election for the Form 501, or None.
+        """
+        key = (form501.election_year, form501.election_type)
+        try:
+            return self.election_lookup[key]
+        except KeyError:
+            election = form501.ocd_election
+            self.election_lookup[key] = election
+            return election
+
+    def get_post_by_name(self, office_name):
+        """
+        Returns the OCD Post for the office name, or None.
+        """
+        from calaccess_processed_elections.proxies import (
+            OCDDivisionProxy,
+            OCDPostProxy,
+        )
+
+        try:
+            return self.post_lookup[office_name]
+        except KeyError:
+            pass
+        try:
+            post = OCDPostProxy.objects.get_by_name(office_name)
+            # Fetch the division now so it is cached along with the post
+            post.division
+        except (OCDPostProxy.DoesNotExist, OCDDivisionProxy.DoesNotExist):
+            post = None
+        self.post_lookup[office_name] = post
+        return post
+
+    def get_post(self, form501, election):
+        """
+        Returns the OCD Post for the Form 501, or None.
+
+        Follows the same steps as OCDPostManager.get_by_form501.
+        """
+        from calaccess_processed_elections.proxies import RawFilerToFilerTypeCdProxy
+
+        post = self.get_post_by_name(form501.office_name)
+        if post:
+            return post
+
+        filer_id_office_name = (
+            RawFilerToFilerTypeCdProxy.objects.get_office_by_filer_id_and_date(
+                form501.filer_id, election.date
+            )
+        )
+        if not filer_id_office_name:
+            return None
+        return self.get_post_by_name(filer_id_office_name)
+
+    def get_party_by_name(self, name):
+        """
+        Returns the OCD party with the provided name, or the unknown party.
+        """
+        from calaccess_processed_elections.proxies import OCDPartyProxy
+
+        try:
+            return self.party_lookup[name]
+        except KeyError:
+            party = OCDPartyProxy.objects.get_by_name(name)
+            self.party_lookup[name] = party
+            return party
+
+    def get_party(self, form501, election):
+        """
+        Returns the OCD party for the Form 501.
+
+        Follows the same steps as Form501Filing.get_party.
+        """
+        from calaccess_processed_elections import corrections
+        from calaccess_processed_elections.proxies import OCDPartyProxy
+
+        party = corrections.candidate_party(
+            "{0.last_name}, {0.first_name} {0.middle_name}".format(form501).strip(),
+            form501.election_year,
+            form501.election_type,
+            "{0.office} {0.district}".format(form501).strip().upper(),
+        )
+        if party:
+            return party
+
+        party = self.get_party_by_name(form501.party)
+        if not party.is_unknown():
+            return party
+
+        return OCDPartyProxy.objects.get_by_filer_id(
+            int(form501.filer_id), election.date
+        )
+
+    def get_or_create_contest(self, form501):
+        """
+        Get or create a CandidateContest for the Form 501.
+
+        Follows the same steps as Form501Filing.get_or_create_contest.
+
+        Returns a CandidateContest or None, if extracted info is insufficient.
+        """
+        election = self.get_election(form501)
+        if not election:
+            return None
+
+        post = self.get_post(form501, election)
+        if not post:
+            return None
+
+        # if looking for a pre-2012 primary, include party
+        party = None
+        if election.is_partisan_primary:
+            party = self.get_party(form501, election)
+
+        key = (election.id, post.id, party.id if party else None)
+        try:
+            return self.contest_lookup[key]
+        except KeyError:
+            contest = self.find_contest(election, post, party)
+            self.contest_lookup[key] = contest
+            return contest
+
+    def find_contest(self, election, post, party):
+        """
+        Works out the contest for get_or_create_contest.
+        """
+        from opencivicdata.elections.models import CandidateContest
+
+        contest_data = {
+            "posts__post": post,
+            "division": post.division,
+            "election": election,
+        }
+        if party:
+            contest_data["party"] = party
+
+        try:
+            return CandidateContest.objects.get(**contest_data)
+        except CandidateContest.DoesNotExist:
+            # if the election date is later than today, make the contest
+            if election.date > date.today():
+                contest = CandidateContest.objects.create(
+                    name=post.label.upper(),
+                    division=post.division,
+                    election=election,
+                )
+                contest.posts.create(contest=contest, post=post)
+                return contest
+            return None
+        except CandidateContest.MultipleObjectsReturned:
+            # likely a primary and a runoff on the same day we can't tell apart
+            return None
+
+    def load_form501(self, form501):
+        """
+        Load a Form 501 into an OCD Candidacy.
+
+        Returns a Form501Result, or None if no contest was found for the filing.
+        """
+        from calaccess_processed_elections.proxies import OCDCandidacyProxy
+
+        contest = self.get_or_create_contest(form501)
+        if not contest:
+            return None
+
+        candidacy, created = OCDCandidacyProxy.objects.get_or_create_from_calaccess(
+            contest, form501.parsed_name, candidate_filer_id=form501.filer_id
+        )
+        candidacy.link_form501(form501.filing_id)
+        candidacy.update_from_form501()
+        candidacy.update_party_from_form501()
+
+        return Form501Result(
+            form501.filing_id,
+            form501.filer_id,
+            form501.name,
+            candidacy.id,
+            candidacy.person_id,
+            created,
+        )
+
+    def load(self, filing_id_list):
+        """
+        Load the Form 501s with the provided ids, in order.
+
+        Returns a tuple with the list of Form501Results and the ids of the filings
+        that matched more than one existing record. Those may be duplicates another
+        process is loading at the same time, so they are left to be loaded again.
+        """
+        from calaccess_processed_filings.models import Form501Filing
+
+        result_list = []
+        deferred_list = []
+        form501_list = Form501Filing.objects.filter(
+            filing_id__in=filing_id_list
+        ).order_by("filing_id")
+        for form501 in form501_list:
+            logger.debug("Processing Form 501: {}".format(form501.filing_id))
+            try:
+                result = self.load_form501(form501)
+            except MultipleObjectsReturned:
+                deferred_list.append(form501.filing_id)
+                continue
+            if result:
+                result_list.append(result)
+        return result_list, deferred_list
+
+
+def get_partitions(form501_qs):
+    """
+    Returns lists of the ids of the Form 501s in form501_qs for each OCD Election.
+
+    Filings without an election are left out. The largest lists come first.
+    """
+    key_lookup = defaultdict(list)
+    for form501 in form501_qs.only("filing_id", "election_year", "election_type"):
+        key_lookup[(form501.election_year, form501.election_type)].append(form501)
+
+    # Find each election once, here, so any that are created aren't created twice
+    partition_lookup = defaultdict(list)
+    for form501_list in key_lookup.values():
+        election = form501_list[0].ocd_election
+        if election:
+            partition_lookup[election.id] += [f.filing_id for f in form501_list]
+    return sorted(
+        (sorted(i) for i in partition_lookup.values()), key=lambda i: (-len(i), i[0])
+    )
+
+
+def setup_worker():
+    """
+    Get a worker process ready to load elections.
+    """
+    global _worker_loader
+    if not apps.ready:
+        django.setup()
+    _worker_loader = Form501Loader()
+
+
+def load_election(filing_id_list):
+    """
+    Load the Form 501s for an election in a worker process.
+
+    Returns the same as Form501Loader.load.
+    """
+    from calaccess_processed_elections.filertypes import use_filer_type_index
+
+    # A forked worker finds the index of the process that started it already in use
+    with use_filer_type_index():
+        return _worker_loader.load(filing_id_list)
+
+
+def load_elections(partition_list, workers=1):
+    """
+    Load the Form 501s in each list of ids, on a pool of processes if workers > 1.
+
+    Each process has its own database connection and caches, and loads every filing
+    for an election, so no two processes create the same contest.
+
+    Returns a tuple with the list of Form501Results and the ids of the filings to be
+    loaded again, each sorted by filing_id.
+    """
+    result_list = []
+    deferred_list = []
+    if workers <= 1:
+        loader = Form501Loader()
+        for filing_id_list in partition_list:
+            results, deferred = loader.load(filing_id_list)
+            result_list += results
+            deferred_list += deferred
+        return sorted(result_list), sorted(deferred_list)
+
+    # Workers can't share the connections open in this process
+    connections.close_all()
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=context, initializer=setup_worker
+    ) as executor:
+        futures = [executor.submit(load_election, i) for i in partition_list]
+        for future in as_completed(futures):
+            results, deferred = future.result()
+            result_list += results
+            deferred_list += deferred
+    return sorted(result_list), sorted(deferred_list)
+
+
+def reconcile_persons(result_list, started):
+    """
+    Merge the persons created at the same time by different processes.
+
+    Loaded one after the other, a Form 501 would find the Person created for an
+    earlier filing with the same filer_id or name. The persons created since started
+    that share either are merged into the one created for the earliest filing.
+
+    Processes that find or create the same Person at once can each add the same
+    identifier or other name to it, so the copies are removed from every Person
+    in result_list, not only the new ones.
+
+    Returns a MergeResult.
+    """
+    from opencivicdata.core.models import Person, PersonIdentifier, PersonName
+    from calaccess_processed_elections.dedupe import UnionFind
+    from calaccess_processed_elections.merge import (
+        DUPLICATE_KEYS,
+        delete_duplicates,
+        merge_person_pairs,
+    )
+
+    new_person_ids = set(
+        Person.objects.filter(created_at__gte=started).values_list("id", flat=True)
+    )
+    union_find = UnionFind()
+    first_filing_ids = {}
+    key_lookup = {}
+    for result in sorted(result_list):
+        if result.person_id not in new_person_ids:
+            continue
+        first_filing_ids.setdefault(result.person_id, result.filing_id)
+        for key in [("filer_id", result.filer_id), ("name", result.name)]:
+            if key[1]:
+                person_id = key_lookup.setdefault(key, result.person_id)
+                union_find.union(person_id, result.person_id)
+
+    pair_list = []
+    for person_ids in union_find.groups():
+        person_ids.sort(key=lambda i: first_filing_ids[i])
+        pair_list += [(person_ids[0], i) for i in person_ids[1:]]
+    merge_result = merge_person_pairs(pair_list)
+
+    person_id_list = sorted(set(r.person_id for r in result_list))
+    with transaction.atomic(), connection.cursor() as c:
+        for model, fk_name, key_fields in DUPLICATE_KEYS:
+            if model in (PersonIdentifier, PersonName):
+                delete_duplicates(c, model, fk_name, key_fields, {}, person_id_list)
+    return merge_result
@@ -1,8 +1,16 @@
 """Load the OCD Candidacy model with data extracted from the Form501Filing model."""
+from django.utils import timezone
 from opencivicdata.elections.models import CandidateContest
 
 from calaccess_processed_filings.models import Form501Filing
-from calaccess_processed_elections.proxies import OCDCandidacyProxy
+from calaccess_processed_elections.filertypes import use_filer_type_index
+from calaccess_processed_elections.form501s import (
+    Form501Loader,
+    get_partitions,
+    load_elections,
+    reconcile_persons,
+)
+from calaccess_processed_elections.models import CandidacyForm501
 from calaccess_processed.management.commands import CalAccessCommand
 
 
@@ -13,11 +21,26 @@ class Command(CalAccessCommand):
         "Load the OCD Candidacy model with data extracted from the Form501Filing model"
     )
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=1,
+            help="Number of elections to load at the same time, each in its own "
+            "process with its own database connection (default: 1)",
+        )
+
     def handle(self, *args, **options):
         """
         Make it happen.
         """
         super(Command, self).handle(*args, **options)
+        self.workers = options["workers"]
 
         if not CandidateContest.objects.exists():
             error_message = (
@@ -25,44 +48,52 @@ class Command(CalAccessCommand):
             )
             self.log(error_message)
         else:
+            # Make sure every Form 501 linked in a candidacy's extras can be joined
+            CandidacyForm501.objects.load()
             form501_count = Form501Filing.objects.without_candidacy().count()
             self.header(
                 f"Processing {form501_count} Form 501 filings without candidacies"
             )
-            self.load()
+            # Look up filer types from memory rather than once per filing
+            with use_filer_type_index():
+                self.load()
             self.success("Done!")
 
     def load(self):
         """
-        Loop over each Form501Filing and attempt to load into OCD models.
-        """
-        for form501 in Form501Filing.objects.without_candidacy():
-            if self.verbosity > 2:
-                self.log(" Processing Form 501: %s" % form501.filing_id)
-                self.process_form501(form501)
-
-    def process_form501(self, form501):
-        """
-        Process a Form501Filing and attempt to load its data into OCD models.
+        Load the Form 501 filings for each election into OCD models.
         """
-        # Get a linked contest
-        contest = form501.get_or_create_contest()
-
-        # If there is no contest, skip.
-        if not contest:
-            pass
-        else:
-            candidacy, created = OCDCandidacyProxy.objects.get_or_create_from_calaccess(
-                contest,
-                form501.parsed_name,
-                candidate_filer_id=form501.filer_id
+        started = timezone.now()
+        partition_list = get_partitions(Form501Filing.objects.without_candidacy())
+        if self.verbosity > 2:
+            self.log(
+                " Loading Form 501s for {} elections with {} workers".format(
+                    len(partition_list), self.workers
+                )
             )
+        result_list, deferred_list = load_elections(
+            partition_list, workers=self.workers
+        )
 
-            if created and self.verbosity > 2:
-                self.log(" Created Candidacy: %s" % candidacy)
+        # Merge any persons that workers created for the same candidate
+        merge_result = reconcile_persons(result_list, started)
+        if merge_result.persons and self.verbosity > 2:
+            self.log(" Merged {} duplicate persons".format(merge_result.persons))
 
-            candidacy.link_form501(form501.filing_id)
-            candidacy.update_from_form501()
-            candidacy.update_party_from_form501()
+        # Then load the filings that ran into those duplicates, one at a time
+        loader = Form501Loader()
+        for form501 in Form501Filing.objects.filter(
+            filing_id__in=deferred_list
+        ).order_by("filing_id"):
+            result = loader.load_form501(form501)
+            if result:
+                result_list.append(result)
 
-        return form501
+        if self.verbosity > 2:
+            for result in sorted(result_list):
+                if result.created:
+                    self.log(
+                        " Created Candidacy {} from Form 501 {}".format(
+                            result.candidacy_id, result.filing_id
+                        )
+                    )
@@ -1,9 +1,12 @@
 """Load the OCD CandidateContest and related models with scraped CAL-ACCESS data."""
+from opencivicdata.elections.models import CandidacySource
 from calaccess_processed_elections.proxies import (
     OCDCandidateContestProxy,
     OCDCandidacyProxy,
     ScrapedCandidateProxy,
 )
+from calaccess_processed_elections.filertypes import use_filer_type_index
+from calaccess_processed_elections.resolvers import ScrapedCandidateResolver
 from calaccess_processed.management.commands import CalAccessCommand
 
 
@@ -14,17 +17,46 @@ class Command(CalAccessCommand):
         "Load the OCD CandidateContest and related models with scraped CAL-ACCESS data"
     )
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            dest="bulk",
+            default=False,
+            help="Resolve elections, posts, parties, contests and Form 501s from "
+            "indexes held in memory and insert sources in batches",
+        )
+
     def handle(self, *args, **options):
         """Make it happen."""
         super(Command, self).handle(*args, **options)
         self.header("Loading Candidate Contests")
-        if self.verbosity > 2:
-            self.log(" ...with CAL-ACCESS filer_ids")
+
+        # Look up filer types from memory rather than once per candidate
+        with use_filer_type_index():
+            if options["bulk"]:
+                if self.verbosity > 2:
+                    self.log(" Loading indexes")
+                self.resolver = ScrapedCandidateResolver()
+            else:
+                self.resolver = None
+
+            if self.verbosity > 2:
+                self.log(" ...with CAL-ACCESS filer_ids")
             self.load_candidates_with_filer_ids()
-        if self.verbosity > 2:
-            self.log(" ...without CAL-ACCESS filer_ids")
+            if self.verbosity > 2:
+                self.log(" ...without CAL-ACCESS filer_ids")
             self.load_candidates_without_filer_ids()
 
+        if self.resolver:
+            if self.verbosity > 2:
+                self.log(" Inserting sources")
+            self.resolver.flush()
+
         # connect runoffs to their previously undecided contests
         if self.verbosity > 2:
             self.log(" Linking runoffs to previous contests")
@@ -41,6 +73,13 @@ class Command(CalAccessCommand):
                 self.log(f" Loading scraped candidate: {scraped_candidate}")
             candidacy = self.load_scraped_candidate(scraped_candidate)
 
+            if self.resolver:
+                form501s = self.resolver.match_form501s_by_scraped_id(
+                    scraped_candidate
+                )
+                self.update_candidacy(scraped_candidate, candidacy, form501s)
+                continue
+
             form501s = scraped_candidate.match_form501s_by_scraped_id()
 
             if form501s.exists():
@@ -75,6 +114,11 @@ class Command(CalAccessCommand):
                 self.log(f" Loading scraped candidate: {scraped_candidate}")
             candidacy = self.load_scraped_candidate(scraped_candidate)
 
+            if self.resolver:
+                form501s = self.resolver.match_form501s_by_name(scraped_candidate)
+                self.update_candidacy(scraped_candidate, candidacy, form501s)
+                continue
+
             form501s = scraped_candidate.match_form501s_by_name()
 
             if form501s.exists():
@@ -93,10 +137,10 @@ class Command(CalAccessCommand):
         """
         # check if this scraped candidate was previously loaded into OCD
         try:
-            candidacy = scraped_candidate.get_loaded_ocd_candidacy()
+            candidacy = self.get_loaded_ocd_candidacy(scraped_candidate)
         except OCDCandidacyProxy.DoesNotExist:
             # Get contest
-            contest, contest_created = scraped_candidate.get_or_create_contest()
+            contest, contest_created = self.get_or_create_contest(scraped_candidate)
 
             # Create candidacy
             (
@@ -112,7 +156,7 @@ class Command(CalAccessCommand):
                 self.log(" Created Candidacy: %s" % candidacy)
         except OCDCandidacyProxy.MultipleObjectsReturned:
             # Get contest
-            contest, contest_created = scraped_candidate.get_or_create_contest()
+            contest, contest_created = self.get_or_create_contest(scraped_candidate)
             # Add that to what we use to filter, but do a stricter name filter
             candidacy_list = OCDCandidacyProxy.objects.filter(
                 candidate_name=scraped_candidate.parsed_name["name"]
@@ -121,7 +165,7 @@ class Command(CalAccessCommand):
             candidacy = candidacy_list[0]
         else:
             # Get contest
-            contest, contest_created = scraped_candidate.get_or_create_contest()
+            contest, contest_created = self.get_or_create_contest(scraped_candidate)
             # check if the candidacy is not part of the correct contest
             if contest != candidacy.contest:
                 old_contest = candidacy.contest
@@ -138,29 +182,75 @@ class Command(CalAccessCommand):
                 # delete it
                 if old_contest.candidacies.count() == 0:
                     old_contest.delete()
+                    if self.resolver:
+                        self.resolver.remove_contest(old_contest)
                     if self.verbosity > 2:
                         self.log(" Deleting empty %s" % old_contest)
 
         # always update the source for the candidacy
-        candidacy.sources.update_or_create(
-            url=scraped_candidate.url,
-            note="Last scraped on {dt:%Y-%m-%d}".format(
-                dt=scraped_candidate.last_modified,
-            ),
-        )
+        if self.resolver:
+            self.resolver.add_source(CandidacySource, candidacy, scraped_candidate)
+        else:
+            candidacy.sources.update_or_create(
+                url=scraped_candidate.url,
+                note="Last scraped on {dt:%Y-%m-%d}".format(
+                    dt=scraped_candidate.last_modified,
+                ),
+            )
         return candidacy
 
-    def correct_candidacy_party(self, scraped_candidate, candidacy):
+    def get_loaded_ocd_candidacy(self, scraped_candidate):
+        """
+        Get an OCD candidacy previously loaded from the scraped candidate.
+        """
+        if not self.resolver:
+            return scraped_candidate.get_loaded_ocd_candidacy()
+        return scraped_candidate.get_loaded_ocd_candidacy(
+            scraped_election=self.resolver.get_election(scraped_candidate),
+            post=self.resolver.get_post(scraped_candidate),
+        )
+
+    def get_or_create_contest(self, scraped_candidate):
+        """
+        Get or create the OCD CandidateContest for the scraped candidate.
+        """
+        if not self.resolver:
+            return scraped_candidate.get_or_create_contest()
+        return self.resolver.get_or_create_contest(scraped_candidate)
+
+    def get_party(self, scraped_candidate):
+        """
+        Returns the party we believe the scraped candidate was associated with.
+        """
+        if not self.resolver:
+            return scraped_candidate.get_party()
+        return self.resolver.get_party(scraped_candidate)
+
+    def update_candidacy(self, scraped_candidate, candidacy, form501s):
+        """
+        Link Form 501s to the candidacy and correct its party with a single save.
+        """
+        changed = self.resolver.link_form501s(candidacy, form501s)
+        if self.correct_candidacy_party(scraped_candidate, candidacy, save=False):
+            changed = True
+        if changed:
+            candidacy.save()
+
+    def correct_candidacy_party(self, scraped_candidate, candidacy, save=True):
         """
         Correct the party of the candidacy, if necessary.
+
+        Returns whether the party was changed.
         """
         # Set candidacy party
-        corrected_party = scraped_candidate.get_party()
+        corrected_party = self.get_party(scraped_candidate)
         if corrected_party:
             # if not already set
             if not candidacy.party:
                 candidacy.party = corrected_party
-                candidacy.save()
+                if save:
+                    candidacy.save()
+                return True
             # or if correction is different
             elif candidacy.party.id != corrected_party.id:
                 if self.verbosity > 2:
@@ -171,4 +261,7 @@ class Command(CalAccessCommand):
                     )
                     self.log(msg)
                 candidacy.party = corrected_party
-                candidacy.save()
+                if save:
+                    candidacy.save()
+                return True
+        return False
@@ -3,12 +3,10 @@
 """
 Load the OCD Membership model with data from the scraped Incumbent model.
 """
-from django.db.models import IntegerField
-from django.db.models.functions import Cast
-from opencivicdata.core.models import Membership
 from calaccess_processed.management.commands import CalAccessCommand
-from opencivicdata.elections.models import Candidacy, CandidateContest
+from opencivicdata.elections.models import Candidacy
 from calaccess_processed_elections.proxies import (
+    OCDCandidacyProxy,
     OCDMembershipProxy,
     ScrapedIncumbentProxy,
 )
@@ -59,67 +57,14 @@ class Command(CalAccessCommand):
         """
         Set the end_date for each Membership based on the start_date of each successor.
         """
-        for member in Membership.objects.all():
-            # Each member's end year should be the start year of their successor.
-            # Successor is the member in the same post with the earliest
-            # start year greater than the incumbent's start year
-            if member.start_date == "":
-                start_year = 0
-            else:
-                start_year = int(member.start_date)
-
-            successor_q = (
-                Membership.objects.exclude(
-                    start_date="",
-                )
-                .annotate(
-                    start_year=Cast("start_date", IntegerField()),
-                )
-                .filter(
-                    start_year__gt=start_year,
-                    post=member.post,
-                )
-                .order_by("start_year")
-            )
-
-            if successor_q.exists():
-                member.end_date = int(successor_q[0].start_date)
-                member.save()
+        rows = OCDMembershipProxy.objects.set_end_dates()
+        if self.verbosity > 2:
+            self.log(" Set end dates for {} memberships".format(rows))
 
     def set_incumbent_candidacies(self):
         """
         Set is_incumbent for candidacies within each member's start/end years.
         """
-        # For every one of the member's candidacies for the office where
-        # the election of the contest happens after the start year
-        # but before the end year, if it exists, mark as incumbent
-        for member in Membership.objects.all():
-            if not member.start_date:
-                continue
-            candidacies_q = member.person.candidacies.filter(
-                contest__election__date__year__gt=int(member.start_date),
-                post=member.post,
-            ).exclude(is_incumbent=True)
-            # Handle blank member end_date values
-            if member.end_date != "":
-                member_end_year = int(member.end_date)
-                candidacies_q = candidacies_q.filter(
-                    contest__election__date__year__lte=member_end_year
-                )
-
-            if candidacies_q.exists():
-                rows = candidacies_q.update(is_incumbent=True)
-                if self.verbosity > 2:
-                    self.log(
-                        " {0} identified as incumbent in {1} contests".format(
-                            member.person.name,
-                            rows,
-                        )
-                    )
-        # loop over all contest with an incumbent candidate
-        contests_q = CandidateContest.objects.filter(candidacies__is_incumbent=True)
-        for contest in contests_q.all():
-            # set is_incumbent False for all other candidacies in contest
-            contest.candidacies.exclude(is_incumbent=True).update(is_incumbent=False)
-
-        return
+        rows = OCDCandidacyProxy.objects.set_incumbents()
+        if self.verbosity > 2:
+            self.log(" Identified {} incumbent candidacies".format(rows))
@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Find and merge OCD Person records sharing a filer_id, or a name in a contest.
+"""
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed_elections.dedupe import PersonDeduplicator
+
+
+class Command(CalAccessCommand):
+    """
+    Find and merge OCD Person records sharing a filer_id, or a name in a contest.
+    """
+
+    help = (
+        "Find and merge OCD Person records that share a filer_id, or a name and "
+        "CandidateContest"
+    )
+
+    def handle(self, *args, **options):
+        """
+        Make it happen.
+        """
+        super(Command, self).handle(*args, **options)
+
+        self.header("Merging Persons with shared filer_id or name in same Contest")
+
+        deduplicator = PersonDeduplicator()
+        component_list = deduplicator.get_components()
+        if not component_list:
+            self.log("No persons to merge")
+        else:
+            if self.verbosity > 2:
+                self.log(" Merging {} Person sets".format(len(component_list)))
+            merged = queries = 0
+            for person_ids in component_list:
+                result = deduplicator.merge(person_ids)
+                merged += result.persons
+                queries += result.queries
+                if self.verbosity > 2:
+                    self.log(
+                        " Merged {0} Persons into {1} in {2} queries".format(
+                            result.persons, person_ids[0], result.queries
+                        )
+                    )
+            self.log(
+                " Merged {0} Persons in {1} queries ({2:.1f} per merge)".format(
+                    merged, queries, queries / merged
+                )
+            )
+
+        self.success("Done!")
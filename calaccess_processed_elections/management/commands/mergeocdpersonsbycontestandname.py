@@ -3,10 +3,12 @@
 """
 Find and merge OCD Person records that share a name and CandidateContest.
 """
-from django.db.models import Count
+from itertools import groupby
+from operator import attrgetter
+from django.db import transaction
 from calaccess_processed_elections.merge import merge_persons
 from calaccess_processed.management.commands import CalAccessCommand
-from calaccess_processed_elections.proxies import OCDCandidateContestProxy
+from calaccess_processed_elections.proxies import OCDCandidacyProxy, OCDPersonProxy
 
 
 class Command(CalAccessCommand):
@@ -16,6 +18,19 @@ class Command(CalAccessCommand):
 
     help = "Find and merge OCD Person records that share a name and CandidateContest"
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=100,
+            help="Number of groups to merge in each transaction (default: 100)",
+        )
+
     def handle(self, *args, **options):
         """
         Make it happen.
@@ -24,158 +39,115 @@ class Command(CalAccessCommand):
 
         self.header("Merging Persons in same Contest with shared name")
 
-        # Loop over all CandidateContests
-        for contest in OCDCandidateContestProxy.objects.all():
-            # handle groups by candidate_name
-            for group_q in self.group_by_candidate_name(contest.candidacies):
-                self.handle_group(group_q, field_name="candidate_name")
-            # handle groups by person_name
-            for group_q in self.group_by_person_name(contest.candidacies):
-                self.handle_group(group_q, field_name="person_name")
-            # handle groups by person_other_name
-            for group_q in self.group_by_other_name(contest.candidacies):
-                self.handle_group(group_q, field_name="other_name")
-
-        self.success("Done!")
-
-    def group_by_candidate_name(self, candidacies_q):
-        """
-        Return a list of QuerySets for Candidacies with the same candidate_name.
-        """
-        q = (
-            candidacies_q.values("candidate_name")
-            .annotate(
-                row_count=Count("id"),
+        # Find every group of candidacies sharing a name in a contest at once
+        match_list = OCDCandidacyProxy.objects.get_contest_name_matches()
+        group_list = [
+            list(group)
+            for key, group in groupby(
+                match_list, key=attrgetter("contest_id", "field_name", "name")
             )
-            .order_by()
-            .filter(row_count__gt=1)
-        )
+        ]
+        if self.verbosity > 2:
+            self.log(" Found {} groups sharing a name".format(len(group_list)))
 
-        results = []
+        # Track the Person each merged Person went into, and its filer_ids
+        self.merged_into = {}
+        self.filer_ids = dict((m.person_id, set(m.filer_ids)) for m in match_list)
 
-        for i in q.all():
-            results.append(
-                candidacies_q.filter(candidate_name=i["candidate_name"]).order_by()
-            )
+        batch_size = options["batch_size"]
+        for start in range(0, len(group_list), batch_size):
+            end = start + batch_size
+            with transaction.atomic():
+                for group in group_list[start:end]:
+                    self.handle_group(group)
 
-        return results
+        self.success("Done!")
 
-    def group_by_person_name(self, candidacies_q):
+    def get_person_id(self, person_id):
         """
-        Return a list of QuerySets for Candidacies with the same Person name.
+        Returns the id of the Person that person_id was merged into, if any.
         """
-        q = (
-            candidacies_q.values("person__name")
-            .annotate(
-                row_count=Count("id"),
-            )
-            .order_by()
-            .filter(row_count__gt=1)
-        )
-
-        results = []
-
-        for i in q.all():
-            results.append(
-                candidacies_q.filter(person__name=i["person__name"]).order_by()
-            )
+        while person_id in self.merged_into:
+            person_id = self.merged_into[person_id]
+        return person_id
 
-        return results
-
-    def group_by_other_name(self, candidacies_q):
+    def get_person_id_list(self, match_list):
         """
-        Return a list of QuerySets for Candidacies with shared other_name.
+        Return the distinct ids of the current persons in match_list, in order.
         """
-        # get the distinct count of person_ids for each other_name
-        # linked to a person who's linked to one of the contest's candidacies
-        q = (
-            candidacies_q.values("person__other_names__name")
-            .annotate(
-                row_count=Count("person_id", distinct=True),
-            )
-            .order_by()
-            .filter(row_count__gt=1)
-        )
-
-        results = []
+        person_id_list = []
+        for match in match_list:
+            person_id = self.get_person_id(match.person_id)
+            if person_id not in person_id_list:
+                person_id_list.append(person_id)
+        return person_id_list
 
-        for i in q.all():
-            if i["person__other_names__name"]:
-                results.append(
-                    candidacies_q.filter(
-                        person__other_names__name=i["person__other_names__name"]
-                    ).order_by()
-                )
-
-        return results
-
-    def group_by_party(self, candidacies_q):
+    def get_group_filer_id_count(self, match_list):
         """
-        Return a list of QuerySets for Candidacies with the same party.
+        Return the count of distinct filer_ids of the persons in match_list.
         """
-        q = (
-            candidacies_q.values("party")
-            .annotate(
-                row_count=Count("id"),
-            )
-            .order_by()
-            .filter(row_count__gt=1)
-        )
+        filer_ids = set()
+        for person_id in self.get_person_id_list(match_list):
+            filer_ids.update(self.filer_ids[person_id])
+        return len(filer_ids)
 
-        results = []
-
-        for i in q.all():
-            results.append(candidacies_q.filter(party=i["party"]).order_by())
-
-        return results
-
-    def get_group_filer_id_count(self, candidacies_q):
+    def group_by_party(self, match_list):
         """
-        Return the count of distinct filer_ids in the Candidacy QuerySet.
+        Return a list of match lists for Candidacies with the same party.
         """
-        return (
-            candidacies_q.filter(person__identifiers__scheme="calaccess_filer_id")
-            .distinct("person__identifiers__identifier")
-            .count()
-        )
+        party_list = []
+        for match in match_list:
+            if match.party_id not in party_list:
+                party_list.append(match.party_id)
+        return [[m for m in match_list if m.party_id == p] for p in party_list]
 
-    def log_merged_persons(self, group_q, field_name):
+    def log_merged_persons(self, match_list, person_id_list):
         """
-        Log the persons in group_q who will be merged.
+        Log the persons in match_list who will be merged.
         """
         self.log(
             "Merging {0} persons grouped by {1} in {2}".format(
-                group_q.count(),
-                field_name,
-                group_q.all()[0].contest,
+                len(person_id_list),
+                match_list[0].field_name,
+                match_list[0].contest_name,
             )
         )
-        for c in group_q.all():
-            self.log(" - {} ({})".format(c.person, c.person_id))
+        for match in match_list:
+            self.log(" - {} ({})".format(match.person_name, match.person_id))
 
-    def handle_group(self, group_q, field_name=None):
+    def merge_group(self, match_list):
         """
-        Handle merging of candidates in group_q.
+        Merge the current persons in match_list, if there is more than one.
+        """
+        person_id_list = self.get_person_id_list(match_list)
+        if len(person_id_list) <= 1:
+            return
+        if self.verbosity > 2:
+            self.log_merged_persons(match_list, person_id_list)
+
+        person_lookup = OCDPersonProxy.objects.in_bulk(person_id_list)
+        keep = merge_persons([person_lookup[i] for i in person_id_list])
 
-        Optional field_name is a string naming the field used to form the group.
+        for person_id in person_id_list:
+            if person_id != keep.id:
+                self.merged_into[person_id] = keep.id
+                self.filer_ids[keep.id].update(self.filer_ids.pop(person_id))
+
+    def handle_group(self, match_list):
+        """
+        Handle merging of candidates in match_list.
         """
         # if there isn't more than one party and more than one filer_id
+        party_set = set(m.party_id for m in match_list)
         if (
-            group_q.distinct("party").exclude(party__isnull=True).count() <= 1
-            and self.get_group_filer_id_count(group_q) <= 1
+            len(party_set - {None}) <= 1
+            and self.get_group_filer_id_count(match_list) <= 1
         ):
-            if self.verbosity > 2:
-                self.log_merged_persons(group_q, field_name)
-            # merge
-            merge_persons([c.person for c in group_q.all()])
+            self.merge_group(match_list)
         # handle multiple parties in the group
-        elif group_q.distinct("party").count() > 1:
+        elif len(party_set) > 1:
             # for each group with the same party in the group
-            for party_group_q in self.group_by_party(group_q):
+            for party_match_list in self.group_by_party(match_list):
                 # if there's only one filer_id
-                if self.get_group_filer_id_count(party_group_q) <= 1:
-                    if self.verbosity > 2:
-                        self.log_merged_persons(party_group_q, field_name)
-                    # merge the group
-                    merge_persons([c.person for c in party_group_q.all()])
-        return
+                if self.get_group_filer_id_count(party_match_list) <= 1:
+                    self.merge_group(party_match_list)
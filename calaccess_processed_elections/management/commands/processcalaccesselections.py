@@ -4,6 +4,8 @@ import os
 from django.apps import apps
 from django.core.management import call_command
 
+from calaccess_processed_elections.models import CandidacyForm501, FilerTypeHistory
+
 from . import LoadOCDElectionsBase
 
 
@@ -14,11 +16,36 @@ class Command(LoadOCDElectionsBase):
 
     help = "Load OCD elections models with data extracted and scraped from CAL-ACCESS"
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=1,
+            help="Number of files to archive, or elections to load Form 501s for, at "
+            "the same time, each on its own database connection (default: 1)",
+        )
+        parser.add_argument(
+            "--bulk",
+            action="store_true",
+            dest="bulk",
+            default=False,
+            help="Load candidate contests and merge persons from indexes held in "
+            "memory",
+        )
+        self.add_archive_arguments(parser)
+
     def handle(self, *args, **options):
         """
         Make it happen.
         """
         super(Command, self).handle(*args, **options)
+        self.workers = options["workers"]
+        self.bulk = options["bulk"]
 
         # create subdirectory in processed_data_dir, if missing
         filings_data_path = os.path.join(self.processed_data_dir, "relational")
@@ -30,11 +57,18 @@ class Command(LoadOCDElectionsBase):
         # archive
         if self.verbosity > 2:
             self.log(" Archiving OCD processed data files.")
-        models_to_archive = apps.get_app_config(
+        proxy_lookup = apps.get_app_config(
             "calaccess_processed_elections"
-        ).get_ocd_models_list()
-        for m in models_to_archive:
-            call_command("archivecalaccesselectionsfile", m._meta.object_name)
+        ).get_ocd_proxy_lookup()
+        self.archive_files(
+            proxy_lookup,
+            workers=self.workers,
+            compression=options["compression"],
+            zip=options["zip"],
+            format=options["format"],
+            force=options["force_archive"],
+            split_cycles=options["split_cycles"],
+        )
 
         # Wrap it up
         self.success("Done!")
@@ -53,6 +87,14 @@ class Command(LoadOCDElectionsBase):
         call_command("loadocdparties", **options)
         self.duration()
 
+        #
+        # Load the history of filer types for loaders that work in SQL
+        #
+
+        if self.verbosity > 2:
+            self.log(" Loading filer type history")
+        FilerTypeHistory.objects.load()
+
         #
         # Load elections
         #
@@ -64,7 +106,7 @@ class Command(LoadOCDElectionsBase):
         # Load contests and candidates
         #
 
-        call_command("loadocdcandidatecontests", **options)
+        call_command("loadocdcandidatecontests", bulk=self.bulk, **options)
         self.duration()
 
         call_command("loadocdballotmeasurecontests", **options)
@@ -73,7 +115,7 @@ class Command(LoadOCDElectionsBase):
         call_command("loadocdretentioncontests", **options)
         self.duration()
 
-        call_command("loadocdcandidaciesfrom501s", **options)
+        call_command("loadocdcandidaciesfrom501s", workers=self.workers, **options)
         self.duration()
 
         call_command("loadocdincumbentofficeholders", **options)
@@ -83,8 +125,20 @@ class Command(LoadOCDElectionsBase):
         # Merge duplicates
         #
 
-        call_command("mergeocdpersonsbyfilerid", **options)
-        self.duration()
+        if self.bulk:
+            call_command("mergeocdpersons", **options)
+            self.duration()
+        else:
+            call_command("mergeocdpersonsbyfilerid", **options)
+            self.duration()
 
-        call_command("mergeocdpersonsbycontestandname", **options)
-        self.duration()
+            call_command("mergeocdpersonsbycontestandname", **options)
+            self.duration()
+
+        #
+        # Rebuild the links between candidacies and Form 501s after the merges
+        #
+
+        if self.verbosity > 2:
+            self.log(" Loading candidacy Form 501 links")
+        CandidacyForm501.objects.load()
@@ -3,13 +3,14 @@
 """
 Import all of the managers from submodules and thread them together.
 """
-from .calaccess_raw import RawFilerToFilerTypeCdManager
+from .calaccess_raw import FilerTypeHistoryManager, RawFilerToFilerTypeCdManager
 from .calaccess_scraped import (
     ScrapedIncumbentElectionManager,
     ScrapedBallotMeasureManager,
     ScrapedRecallMeasureManager,
 )
 from .opencivicdata import (
+    CandidacyForm501Manager,
     OCDCandidacyQuerySet,
     OCDCandidacyManager,
     OCDCandidateContestQuerySet,
@@ -32,10 +33,12 @@ from .opencivicdata import (
 
 
 __all__ = (
+    "FilerTypeHistoryManager",
     "RawFilerToFilerTypeCdManager",
     "ScrapedIncumbentElectionManager",
     "ScrapedBallotMeasureManager",
     "ScrapedRecallMeasureManager",
+    "CandidacyForm501Manager",
     "OCDCandidacyQuerySet",
     "OCDCandidacyManager",
     "OCDCandidateContestQuerySet",
@@ -5,7 +5,10 @@ Proxy models for augmenting our source data tables with methods useful for proce
 """
 from __future__ import unicode_literals
 from django.apps import apps
+from django.db import connection
 from calaccess_processed.managers import BulkLoadSQLManager
+from calaccess_processed.telemetry import record_step
+from calaccess_processed_elections.filertypes import get_current_index
 
 
 class RawFilerToFilerTypeCdManager(BulkLoadSQLManager):
@@ -22,6 +25,12 @@ class RawFilerToFilerTypeCdManager(BulkLoadSQLManager):
         """
         LookupCodesCd = apps.get_model("calaccess_raw", "LookupCodesCd")
 
+        # Use the index for this run, if there is one
+        index = get_current_index()
+        if index is not None:
+            filer_type = index.get(filer_id, election_date)
+            return filer_type.office_name if filer_type else None
+
         # Try a straight query for it
         try:
             ftft = (
@@ -52,3 +61,36 @@ class RawFilerToFilerTypeCdManager(BulkLoadSQLManager):
 
         # If you found a district, return the string with office combined in there
         return "{} {}".format(office, district).strip()
+
+
+class FilerTypeHistoryManager(BulkLoadSQLManager):
+    """
+    Custom helpers for the FilerTypeHistory model.
+    """
+
+    app_name = "calaccess_processed_elections"
+
+    def get_sql(self):
+        """
+        Return string of raw sql for loading the model.
+        """
+        with open(self.get_sql_path("load_filertypehistory_model"), "r") as fp:
+            return fp.read()
+
+    def load(self):
+        """
+        Replace the model's rows with the latest from FilerToFilerTypeCd.
+
+        Returns the number of rows inserted.
+        """
+        with record_step(
+            "sql",
+            self.model.__name__,
+            [self.model._meta.db_table],
+            ["FILER_TO_FILER_TYPE_CD", "LOOKUP_CODES_CD"],
+        ) as step:
+            with connection.cursor() as c:
+                c.execute(f'TRUNCATE "{self.model._meta.db_table}"')
+                c.execute(self.get_sql())
+                step.rows_affected = c.rowcount
+        return step.rows_affected
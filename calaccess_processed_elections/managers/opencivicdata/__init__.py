@@ -17,6 +17,7 @@ from .core import (
     OCDSenatePostManager,
 )
 from .elections import (
+    CandidacyForm501Manager,
     OCDCandidacyQuerySet,
     OCDCandidacyManager,
     OCDCandidateContestQuerySet,
@@ -39,6 +40,7 @@ __all__ = (
     "OCDAssemblyPostManager",
     "OCDExecutivePostManager",
     "OCDSenatePostManager",
+    "CandidacyForm501Manager",
     "OCDCandidacyQuerySet",
     "OCDCandidacyManager",
     "OCDCandidateContestQuerySet",
@@ -4,8 +4,10 @@
 Custom manager for OCD organization models.
 """
 from __future__ import unicode_literals
+from django.db import connection
 from django.db.models import Count
 from calaccess_processed.managers import BulkLoadSQLManager
+from calaccess_processed.telemetry import record_step
 
 # Logging
 import logging
@@ -80,6 +82,8 @@ class OCDMembershipManager(BulkLoadSQLManager):
     Manager for custom methods on the OCDMembershipProxy model.
     """
 
+    app_name = "calaccess_processed_elections"
+
     def get_or_create_from_calaccess(self, incumbent):
         """
         Get or create and OCD Membership from a scraped incumbent.
@@ -141,3 +145,24 @@ class OCDMembershipManager(BulkLoadSQLManager):
             .annotate(row_count=Count("id"))
             .filter(row_count__gt=1)
         )
+
+    def set_end_dates(self):
+        """
+        Set the end_date of each Membership to the start_date of its successor.
+
+        The successor is the Membership in the same Post with the earliest start year
+        later than the Membership's own. Memberships without a successor are left as
+        they are.
+
+        Returns the number of Memberships updated.
+        """
+        with record_step(
+            "sql",
+            "update_membership_end_dates",
+            [self.model._meta.db_table],
+        ) as step:
+            with connection.cursor() as c:
+                with open(self.get_sql_path("update_membership_end_dates"), "r") as fp:
+                    c.execute(fp.read())
+                step.rows_affected = c.rowcount
+        return step.rows_affected
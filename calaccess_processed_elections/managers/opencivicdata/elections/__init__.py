@@ -3,13 +3,18 @@
 """
 Import all of the managers from submodules and thread them together.
 """
-from .candidacies import OCDCandidacyQuerySet, OCDCandidacyManager
+from .candidacies import (
+    CandidacyForm501Manager,
+    OCDCandidacyQuerySet,
+    OCDCandidacyManager,
+)
 from .candidatecontests import OCDCandidateContestQuerySet, OCDCandidateContestManager
 from .elections import OCDPartisanPrimaryManager, OCDElectionManager
 from .parties import OCDPartyManager
 
 
 __all__ = (
+    "CandidacyForm501Manager",
     "OCDCandidacyQuerySet",
     "OCDCandidacyManager",
     "OCDCandidateContestQuerySet",
@@ -4,9 +4,28 @@
 Proxy models for augmenting our source data tables with methods useful for processing.
 """
 from __future__ import unicode_literals
+from collections import namedtuple
+from django.db import connection, transaction
 from django.db.models import Q
 from postgres_copy import CopyQuerySet
 from calaccess_processed.managers import BulkLoadSQLManager
+from calaccess_processed.telemetry import record_step
+
+# A candidacy in a contest that shares a name with another Person's candidacy
+ContestNameMatch = namedtuple(
+    "ContestNameMatch",
+    [
+        "contest_id",
+        "contest_name",
+        "field_name",
+        "name",
+        "candidacy_id",
+        "person_id",
+        "person_name",
+        "party_id",
+        "filer_ids",
+    ],
+)
 
 
 class OCDCandidacyQuerySet(CopyQuerySet):
@@ -59,6 +78,8 @@ class OCDCandidacyManager(BulkLoadSQLManager):
     Manager for custom methods on the OCDCandidacyProxy model.
     """
 
+    app_name = "calaccess_processed_elections"
+
     def get_queryset(self):
         """
         Returns the custom QuerySet for this manager.
@@ -69,12 +90,58 @@ class OCDCandidacyManager(BulkLoadSQLManager):
         """
         Return all the Form 501 filing ids matched to a candidacy record.
         """
-        return [
-            i["extras"]["form501_filing_ids"]
-            for i in self.get_queryset()
-            .filter(extras__has_key="form501_filing_ids")
-            .values("extras")
+        from calaccess_processed_elections.models import CandidacyForm501
+
+        return list(
+            CandidacyForm501.objects.filter(candidacy__in=self.get_queryset())
+            .values_list("filing_id", flat=True)
+            .distinct()
+        )
+
+    def set_incumbents(self):
+        """
+        Set is_incumbent for candidacies that fall within a Membership's term.
+
+        A Candidacy is incumbent if its Person holds a Membership in the same Post that
+        started before the year of the election and hadn't ended before it. Every
+        other Candidacy in a contest with an incumbent that isn't already set is
+        marked as not incumbent.
+
+        Returns the number of candidacies marked as incumbent.
+        """
+        read_tables = [
+            "opencivicdata_membership",
+            "opencivicdata_candidatecontest",
+            "opencivicdata_election",
         ]
+        rows_affected = []
+        with transaction.atomic():
+            for file_name in [
+                "update_candidacy_incumbents",
+                "update_candidacy_nonincumbents",
+            ]:
+                with record_step(
+                    "sql", file_name, [self.model._meta.db_table], read_tables
+                ) as step:
+                    with connection.cursor() as c:
+                        with open(self.get_sql_path(file_name), "r") as fp:
+                            c.execute(fp.read())
+                        step.rows_affected = c.rowcount
+                rows_affected.append(step.rows_affected)
+        return rows_affected[0]
+
+    def get_contest_name_matches(self):
+        """
+        Returns candidacies for different persons who share a name in a contest.
+
+        Candidacies match on their candidate_name, their Person's name or one of their
+        Person's other names. Returns a list of ContestNameMatch tuples, one for each
+        candidacy in each match, ordered by contest, field_name and name.
+        """
+        with connection.cursor() as c:
+            with open(self.get_sql_path("select_contest_name_matches"), "r") as fp:
+                c.execute(fp.read())
+            return [ContestNameMatch(*row) for row in c.fetchall()]
 
     def get_or_create_from_calaccess(
         self,
@@ -189,3 +256,45 @@ class OCDCandidacyManager(BulkLoadSQLManager):
 
         # Pass it back out.
         return candidacy, candidacy_created
+
+
+class CandidacyForm501Manager(BulkLoadSQLManager):
+    """
+    Manager for custom methods on the CandidacyForm501 model.
+    """
+
+    app_name = "calaccess_processed_elections"
+
+    def get_sql(self):
+        """
+        Return string of raw sql for loading the model.
+        """
+        with open(self.get_sql_path("load_candidacyform501_model"), "r") as fp:
+            return fp.read()
+
+    def load(self):
+        """
+        Replace the model's rows with the Form 501 ids in each Candidacy's extras.
+
+        Returns the number of rows inserted.
+        """
+        with record_step(
+            "sql",
+            self.model.__name__,
+            [self.model._meta.db_table],
+            ["opencivicdata_candidacy"],
+        ) as step:
+            with connection.cursor() as c:
+                c.execute(f'TRUNCATE "{self.model._meta.db_table}"')
+                c.execute(self.get_sql())
+                step.rows_affected = c.rowcount
+        return step.rows_affected
+
+    def link(self, candidacy, filing_ids):
+        """
+        Link the Form 501 filing_ids to candidacy, if they aren't already.
+        """
+        self.bulk_create(
+            [self.model(candidacy_id=candidacy.id, filing_id=i) for i in filing_ids],
+            ignore_conflicts=True,
+        )
@@ -6,6 +6,7 @@ Custom manager for the OCD Organization model.
 from __future__ import unicode_literals
 from calaccess_raw.models import FilerToFilerTypeCd
 from calaccess_processed.managers import BulkLoadSQLManager
+from calaccess_processed_elections.filertypes import get_current_index
 
 
 class OCDPartyManager(BulkLoadSQLManager):
@@ -54,6 +55,14 @@ class OCDPartyManager(BulkLoadSQLManager):
 
         If not found, return the "UNKNOWN" Organization object.
         """
+        # Use the index for this run, if there is one
+        index = get_current_index()
+        if index is not None:
+            filer_type = index.get(filer_id, election_date)
+            if filer_type is None:
+                return self.unknown()
+            return self.get_by_party_code(filer_type.party_cd)
+
         # Try to see if the record exists in the raw data with a party code
         try:
             party_code = (
@@ -68,6 +77,14 @@ class OCDPartyManager(BulkLoadSQLManager):
             # If it doesn't hit just quit now
             return self.unknown()
 
+        return self.get_by_party_code(party_code)
+
+    def get_by_party_code(self, party_code):
+        """
+        Lookup the party for the given party code from CAL-ACCESS.
+
+        If not found, return the "UNKNOWN" Organization object.
+        """
         # IF we have a code, transform "INDEPENDENT" and "NON-PARTISAN" codes to "NO PARTY PREFERENCE"
         if party_code in [16007, 16009, 0]:
             party_code = 16012
@@ -4,68 +4,452 @@
 Proxy models for augmenting our source data tables with methods useful for processing.
 """
 import datetime
-from django.db import transaction
-from django.db.models import Count
+import logging
+from collections import namedtuple
+from django.db import connection, transaction
+from opencivicdata.core.models import Person, PersonIdentifier, PersonName, Membership
+from opencivicdata.elections.models import Candidacy, CandidacySource
+from .models import CandidacyForm501
 from .proxies import OCDCandidacyProxy, OCDPersonProxy
 
+logger = logging.getLogger(__name__)
 
-def merge_persons(persons):
+# The number of records merged away by merge_person_pairs, and the queries it took
+MergeResult = namedtuple("MergeResult", ["persons", "candidacies", "queries"])
+
+# The fields that make related records duplicates once they point at the same object
+DUPLICATE_KEYS = (
+    (PersonIdentifier, "person", ("scheme", "identifier")),
+    (PersonName, "person", ("name",)),
+    (Membership, "person", ("organization", "label", "end_date", "post")),
+    (CandidacySource, "candidacy", ("url",)),
+    (CandidacyForm501, "candidacy", ("filing_id",)),
+)
+
+
+class QueryCounter(object):
     """
-    Merge items in persons iterable into one Person object, which is returned.
+    Counts the queries run on a connection, when installed as an execute wrapper.
     """
-    # each person will be merged into this one
-    keep = persons.pop(0)
-    if keep.__class__ != OCDPersonProxy:
-        keep.__class__ = OCDPersonProxy
 
-    # loop over all the rest
-    for i in persons:
-        if i.__class__ != OCDPersonProxy:
-            i.__class__ = OCDPersonProxy
-        merge(keep, i)
-        keep.refresh_from_db()
+    def __init__(self):
+        """
+        Create a new object with a count of zero.
+        """
+        self.count = 0
 
-    dedupe_person_ids(keep)
-    dedupe_person_candidacies(keep)
-    keep.refresh_from_db()
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Count the query and run it.
+        """
+        self.count += 1
+        return execute(sql, params, many, context)
 
-    # make sure Person name is same as most recent candidate_name
-    latest_candidate_name = keep.candidacies.latest(
-        "contest__election__date",
-    ).candidate_name
-    if keep.name != latest_candidate_name:
-        # move current Person.name into other_names
-        keep.add_other_name(keep.name, "Updated current name in merge")
-        keep.name = latest_candidate_name
-    keep.save()
 
-    return keep
+def get_merge_lookup(pairs):
+    """
+    Returns a dictionary of the id kept for each id discarded in (keep, discard) pairs.
 
+    Pairs may be objects or ids. Chains of pairs are followed to the record finally
+    kept, and pairs of records already merged with each other are ignored.
+    """
+    lookup = {}
 
-def dedupe_person_ids(person):
+    def find(i):
+        while i in lookup:
+            i = lookup[i]
+        return i
+
+    for keep, discard in pairs:
+        keep_id = find(getattr(keep, "id", keep))
+        discard_id = find(getattr(discard, "id", discard))
+        if keep_id != discard_id:
+            lookup[discard_id] = keep_id
+    return dict((i, find(i)) for i in lookup)
+
+
+def get_merge_params(merge_lookup):
     """
-    Remove duplicate PersonIdentifier objects linked to person.
+    Returns the discarded and kept ids in merge_lookup as a pair of lists.
     """
-    filer_ids = person.identifiers.filter(scheme="calaccess_filer_id")
+    discard_ids = list(merge_lookup)
+    return discard_ids, [merge_lookup[i] for i in discard_ids]
+
 
-    dupe_filer_ids = (
-        filer_ids.values("identifier")
-        .annotate(
-            row_count=Count("id"),
+def delete_duplicates(cursor, model, fk_name, key_fields, merge_lookup, id_list):
+    """
+    Delete rows of model that would be duplicates once re-pointed with merge_lookup.
+
+    Only rows linked by fk_name to an id in id_list are checked. Rows already linked
+    to the object kept win over those moved to it, then the one with the lowest id.
+    """
+    table = model._meta.db_table
+    fk = model._meta.get_field(fk_name).column
+    key_columns = ", ".join(
+        't."{}"'.format(model._meta.get_field(f).column) for f in key_fields
+    )
+    cursor.execute(
+        f"""
+        DELETE FROM {table} x
+        USING (
+            SELECT
+                t.id,
+                ROW_NUMBER() OVER (
+                    PARTITION BY COALESCE(m.keep_id, t.{fk}), {key_columns}
+                    ORDER BY m.keep_id IS NOT NULL, t.id
+                ) AS row_number
+            FROM {table} t
+            LEFT JOIN UNNEST(%s::text[], %s::text[]) AS m(discard_id, keep_id)
+            ON m.discard_id = t.{fk}
+            WHERE t.{fk} = ANY(%s)
+        ) d
+        WHERE x.id = d.id
+        AND d.row_number > 1
+        """,
+        get_merge_params(merge_lookup) + (id_list,),
+    )
+    return cursor.rowcount
+
+
+def repoint(cursor, model, merge_lookup):
+    """
+    Point every row related to model at the objects kept in merge_lookup.
+
+    Runs one UPDATE for each table with a foreign key to model.
+    """
+    for rel in model._meta.related_objects:
+        table = rel.related_model._meta.db_table
+        fk = rel.field.column
+        cursor.execute(
+            f"""
+            UPDATE {table} t
+            SET {fk} = m.keep_id
+            FROM UNNEST(%s::text[], %s::text[]) AS m(discard_id, keep_id)
+            WHERE t.{fk} = m.discard_id
+            """,
+            get_merge_params(merge_lookup),
+        )
+
+
+def merge_candidacies(cursor, person_id_list):
+    """
+    Merge the candidacies of each Person in person_id_list that share a contest.
+
+    Keeps the "qualified" candidacy (from the scrape), or else the one with the most
+    recent filed_date. The others' Form 501 ids and links, sources, earliest filed_date,
+    incumbency and party are added to it, and their candidate names are added to the
+    Person's other names.
+
+    Returns the number of candidacies merged away.
+    """
+    cursor.execute(
+        """
+        SELECT
+            id,
+            keep_id,
+            person_id,
+            candidate_name,
+            contest_name,
+            is_new_name
+        FROM (
+            SELECT
+                c.id,
+                c.person_id,
+                c.candidate_name,
+                cc.name || ' (in ' || e.name || ')' AS contest_name,
+                FIRST_VALUE(c.id) OVER w AS keep_id,
+                c.candidate_name NOT IN (FIRST_VALUE(c.candidate_name) OVER w, p.name)
+                AND NOT EXISTS (
+                    SELECT 1
+                    FROM opencivicdata_personname n
+                    WHERE n.person_id = c.person_id
+                    AND n.name = c.candidate_name
+                ) AS is_new_name
+            FROM opencivicdata_candidacy c
+            JOIN opencivicdata_person p
+            ON p.id = c.person_id
+            JOIN opencivicdata_candidatecontest cc
+            ON cc.id = c.contest_id
+            JOIN opencivicdata_election e
+            ON e.id = cc.election_id
+            WHERE c.person_id = ANY(%s)
+            WINDOW w AS (
+                PARTITION BY c.person_id, c.contest_id
+                ORDER BY
+                    COALESCE(c.registration_status = 'qualified', FALSE) DESC,
+                    c.filed_date DESC,
+                    c.id
+            )
+        ) c
+        WHERE id <> keep_id
+        ORDER BY id
+        """,
+        [person_id_list],
+    )
+    row_list = cursor.fetchall()
+    if not row_list:
+        return 0
+    merge_lookup = dict((r[0], r[1]) for r in row_list)
+    discard_ids, keep_ids = get_merge_params(merge_lookup)
+    id_list = discard_ids + keep_ids
+
+    # Keep the candidate names, if not already somewhere else
+    PersonName.objects.bulk_create(
+        PersonName(
+            person_id=person_id,
+            name=candidate_name,
+            note="From merge of %s candidacies" % contest_name,
+        )
+        for person_id, candidate_name, contest_name in set(
+            r[2:5] for r in row_list if r[5]
         )
-        .order_by()
-        .filter(row_count__gt=1)
     )
 
-    for i in dupe_filer_ids.all():
-        # delete all rows with that filer_id
-        person.identifiers.filter(identifier=i["identifier"]).delete()
-        # then re-add the one
-        person.identifiers.create(
-            scheme="calaccess_filer_id",
-            identifier=i["identifier"],
+    # Link all the Form 501 ids, keeping their order
+    cursor.execute(
+        """
+        UPDATE opencivicdata_candidacy k
+        SET extras = JSONB_SET(k.extras, '{form501_filing_ids}', f.filing_ids)
+        FROM (
+            SELECT
+                keep_id,
+                JSONB_AGG(value ORDER BY position) AS filing_ids
+            FROM (
+                SELECT
+                    m.keep_id,
+                    x.value,
+                    MIN(m.position * 1000000 + x.ordinality) AS position
+                FROM (
+                    SELECT discard_id AS id, keep_id, 1 AS position
+                    FROM UNNEST(%s::text[], %s::text[]) AS m(discard_id, keep_id)
+                    UNION
+                    SELECT keep_id AS id, keep_id, 0 AS position
+                    FROM UNNEST(%s::text[]) AS m(keep_id)
+                ) m
+                JOIN opencivicdata_candidacy c
+                ON c.id = m.id
+                CROSS JOIN LATERAL JSONB_ARRAY_ELEMENTS(
+                    c.extras -> 'form501_filing_ids'
+                ) WITH ORDINALITY AS x(value, ordinality)
+                GROUP BY m.keep_id, x.value
+            ) ids
+            GROUP BY keep_id
+        ) f
+        WHERE k.id = f.keep_id
+        RETURNING k.id
+        """,
+        [discard_ids, keep_ids, keep_ids],
+    )
+    for candidacy in OCDCandidacyProxy.objects.filter(
+        id__in=[r[0] for r in cursor.fetchall()]
+    ):
+        candidacy.update_from_form501()
+
+    # Keep the earliest filed_date, is_incumbent if True and any party
+    cursor.execute(
+        """
+        UPDATE opencivicdata_candidacy k
+        SET
+            filed_date = LEAST(k.filed_date, d.filed_date),
+            is_incumbent = CASE WHEN d.is_incumbent THEN TRUE ELSE k.is_incumbent END,
+            party_id = COALESCE(k.party_id, d.party_id)
+        FROM (
+            SELECT
+                m.keep_id,
+                MIN(c.filed_date) AS filed_date,
+                BOOL_OR(c.is_incumbent) AS is_incumbent,
+                MIN(c.party_id) AS party_id
+            FROM UNNEST(%s::text[], %s::text[]) AS m(discard_id, keep_id)
+            JOIN opencivicdata_candidacy c
+            ON c.id = m.discard_id
+            GROUP BY m.keep_id
+        ) d
+        WHERE k.id = d.keep_id
+        """,
+        [discard_ids, keep_ids],
+    )
+
+    # Keep the candidacy sources and Form 501 links, then remove the rest
+    for model, fk_name, key_fields in DUPLICATE_KEYS:
+        if model._meta.get_field(fk_name).related_model == Candidacy:
+            delete_duplicates(cursor, model, fk_name, key_fields, merge_lookup, id_list)
+    repoint(cursor, Candidacy, merge_lookup)
+    cursor.execute(
+        "DELETE FROM opencivicdata_candidacy WHERE id = ANY(%s)", [discard_ids]
+    )
+    return len(discard_ids)
+
+
+def merge_person_pairs(pairs):
+    """
+    Merge many (keep, discard) pairs of Person objects or ids at once.
+
+    Every row in a table that references Person is moved to the kept Person with one
+    UPDATE per table, and the copies this makes of identifiers, other names and
+    memberships are removed. Each kept Person then gets the discarded persons' ids as
+    identifiers and names as other names, fills its blank fields from theirs, has its
+    candidacies in the same contest merged and is named after its latest candidacy.
+
+    Returns a MergeResult with the number of persons and candidacies merged away and
+    the number of queries it took.
+    """
+    merge_lookup = get_merge_lookup(pairs)
+    if not merge_lookup:
+        return MergeResult(0, 0, 0)
+    discard_ids, keep_ids = get_merge_params(merge_lookup)
+    id_list = discard_ids + keep_ids
+
+    counter = QueryCounter()
+    with connection.execute_wrapper(counter), transaction.atomic():
+        with connection.cursor() as c:
+            # Remember the discarded persons' ids and names
+            name_lookup = dict(
+                Person.objects.filter(id__in=id_list).values_list("id", "name")
+            )
+            PersonIdentifier.objects.bulk_create(
+                PersonIdentifier(person_id=merge_lookup[i], identifier=i)
+                for i in discard_ids
+            )
+            PersonName.objects.bulk_create(
+                PersonName(
+                    person_id=merge_lookup[i],
+                    name=name_lookup[i],
+                    note="from merge w/ " + i,
+                )
+                for i in discard_ids
+                if name_lookup[i] != name_lookup[merge_lookup[i]]
+            )
+
+            # Move everything to the persons kept, without duplicates
+            for model, fk_name, key_fields in DUPLICATE_KEYS:
+                if model._meta.get_field(fk_name).related_model == Person:
+                    delete_duplicates(
+                        c, model, fk_name, key_fields, merge_lookup, id_list
+                    )
+            repoint(c, Person, merge_lookup)
+
+            # Fill in blank fields from the persons discarded
+            field_list = [
+                f.column
+                for f in Person._meta.concrete_fields
+                if f.get_internal_type() in ("CharField", "TextField")
+                and f.name not in ("id", "name")
+            ]
+            c.execute(
+                """
+                UPDATE opencivicdata_person k
+                SET
+                    {},
+                    created_at = LEAST(k.created_at, d.created_at),
+                    updated_at = NOW()
+                FROM (
+                    SELECT
+                        m.keep_id,
+                        {},
+                        MIN(p.created_at) AS created_at
+                    FROM UNNEST(%s::text[], %s::text[]) AS m(discard_id, keep_id)
+                    JOIN opencivicdata_person p
+                    ON p.id = m.discard_id
+                    GROUP BY m.keep_id
+                ) d
+                WHERE k.id = d.keep_id
+                """.format(
+                    ", ".join(
+                        f"{f} = CASE WHEN k.{f} = '' THEN COALESCE(d.{f}, '') "
+                        f"ELSE k.{f} END"
+                        for f in field_list
+                    ),
+                    ", ".join(f"MAX(NULLIF(p.{f}, '')) AS {f}" for f in field_list),
+                ),
+                [discard_ids, keep_ids],
+            )
+            c.execute(
+                "DELETE FROM opencivicdata_person WHERE id = ANY(%s)", [discard_ids]
+            )
+
+            keep_ids = sorted(set(keep_ids))
+            candidacies = merge_candidacies(c, keep_ids)
+
+            # Make sure each Person name is same as most recent candidate_name
+            c.execute(
+                """
+                SELECT
+                    p.id,
+                    p.name,
+                    l.candidate_name,
+                    NOT EXISTS (
+                        SELECT 1
+                        FROM opencivicdata_personname n
+                        WHERE n.person_id = p.id
+                        AND n.name = p.name
+                    )
+                FROM opencivicdata_person p
+                JOIN (
+                    SELECT DISTINCT ON (c.person_id)
+                        c.person_id,
+                        c.candidate_name
+                    FROM opencivicdata_candidacy c
+                    JOIN opencivicdata_candidatecontest cc
+                    ON cc.id = c.contest_id
+                    JOIN opencivicdata_election e
+                    ON e.id = cc.election_id
+                    WHERE c.person_id = ANY(%s)
+                    ORDER BY c.person_id, e.date DESC
+                ) l
+                ON l.person_id = p.id
+                WHERE p.name <> l.candidate_name
+                """,
+                [keep_ids],
+            )
+            row_list = c.fetchall()
+            if row_list:
+                # move current Person.name into other_names
+                PersonName.objects.bulk_create(
+                    PersonName(
+                        person_id=i, name=name, note="Updated current name in merge"
+                    )
+                    for i, name, candidate_name, is_new_name in row_list
+                    if is_new_name
+                )
+                c.execute(
+                    """
+                    UPDATE opencivicdata_person p
+                    SET name = m.name
+                    FROM UNNEST(%s::text[], %s::text[]) AS m(id, name)
+                    WHERE p.id = m.id
+                    """,
+                    [[r[0] for r in row_list], [r[2] for r in row_list]],
+                )
+
+    logger.debug(
+        "Merged {0} persons in {1} queries ({2:.1f} per merge)".format(
+            len(discard_ids), counter.count, counter.count / len(discard_ids)
         )
+    )
+    return MergeResult(len(discard_ids), candidacies, counter.count)
+
+
+def merge_persons(persons):
+    """
+    Merge items in persons iterable into one Person object, which is returned.
+    """
+    # each person will be merged into this one
+    keep = persons.pop(0)
+    merge_person_pairs([(keep, i) for i in persons])
+    keep.refresh_from_db()
+    if keep.__class__ != OCDPersonProxy:
+        keep.__class__ = OCDPersonProxy
+    return keep
+
 
+def dedupe_person_ids(person):
+    """
+    Remove duplicate PersonIdentifier objects linked to person.
+    """
+    with connection.cursor() as c:
+        delete_duplicates(
+            c, PersonIdentifier, "person", ("scheme", "identifier"), {}, [person.id]
+        )
     return person
 
 
@@ -73,78 +457,8 @@ def dedupe_person_candidacies(person):
     """
     Remove duplicate Candidacy objects linked to person.
     """
-    # first, make groups by contests with more than one candidacy
-    contest_group_q = (
-        person.candidacies.values("contest")
-        .annotate(row_count=Count("id"))
-        .filter(row_count__gt=1)
-    )
-
-    # loop over each contest group
-    for group in contest_group_q.all():
-        cands = person.candidacies.filter(contest=group["contest"])
-        # preference to "qualified" candidacy (from scrape)
-        if cands.filter(registration_status="qualified").exists():
-            cand_to_keep = cands.filter(registration_status="qualified").all()[0]
-        # or the one with the most recent filed_date
-        else:
-            cand_to_keep = cands.latest("filed_date")
-
-        cand_to_keep.__class__ = OCDCandidacyProxy
-
-        # loop over all the other candidacies in the group
-        for cand_to_discard in cands.exclude(id=cand_to_keep.id).all():
-            # assuming there's nothing else to preserve in extras
-            # besides form501_filing_ids
-            if "form501_filing_ids" in cand_to_discard.extras:
-                for i in cand_to_discard.extras["form501_filing_ids"]:
-                    cand_to_keep.link_form501(i)
-            cand_to_keep.refresh_from_db()
-
-            if "form501_filing_ids" in cand_to_keep.extras:
-                cand_to_keep.update_from_form501()
-            cand_to_keep.refresh_from_db()
-
-            # keep the candidate_name, if not already somewhere else
-            if (
-                cand_to_discard.candidate_name != cand_to_keep.candidate_name
-                and cand_to_discard.candidate_name != cand_to_keep.person.name
-                and not cand_to_keep.person.other_names.filter(
-                    name=cand_to_discard.candidate_name
-                ).exists()
-            ):
-                person.other_names.create(
-                    name=cand_to_discard.candidate_name,
-                    note="From merge of %s candidacies" % cand_to_keep.contest,
-                )
-                cand_to_keep.refresh_from_db()
-
-            # keep the candidacy sources
-            if cand_to_discard.sources.exists():
-                for source in cand_to_discard.sources.all():
-                    if not cand_to_keep.sources.filter(url=source.url).exists():
-                        cand_to_keep.sources.create(
-                            url=source.url,
-                            note=source.note,
-                        )
-                    cand_to_keep.refresh_from_db()
-
-            # keep earliest filed_date
-            if cand_to_keep.filed_date and cand_to_discard.filed_date:
-                if cand_to_keep.filed_date > cand_to_discard.filed_date:
-                    cand_to_keep.filed_date = cand_to_discard.filed_date
-            elif cand_to_discard.filed_date:
-                cand_to_keep.filed_date = cand_to_discard.filed_date
-            # keep is_incumbent if True
-            if not cand_to_keep.is_incumbent and cand_to_discard.is_incumbent:
-                cand_to_keep.is_incumbent = cand_to_discard.is_incumbent
-            # assuming not trying to merge candidacies with different parties
-            if not cand_to_keep.party and cand_to_discard.party:
-                cand_to_keep.party = cand_to_discard.party
-
-            cand_to_keep.save()
-            cand_to_discard.delete()
-
+    with transaction.atomic(), connection.cursor() as c:
+        merge_candidacies(c, [person.id])
     return person
 
 
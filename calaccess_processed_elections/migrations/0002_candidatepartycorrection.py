@@ -0,0 +1,69 @@
+# Generated by Django 4.0.10 on 2026-10-18 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calaccess_processed_elections", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CandidatePartyCorrection",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "candidate_name",
+                    models.CharField(
+                        help_text="Candidate name, as scraped or as filed on Form 501",
+                        max_length=255,
+                    ),
+                ),
+                ("year", models.IntegerField(help_text="Year of the election")),
+                (
+                    "election_type",
+                    models.CharField(
+                        help_text="Type of election, e.g., PRIMARY or SPECIAL ELECTION",
+                        max_length=100,
+                    ),
+                ),
+                (
+                    "office",
+                    models.CharField(
+                        help_text="Office sought, e.g., ASSEMBLY 75", max_length=255
+                    ),
+                ),
+                (
+                    "party",
+                    models.CharField(
+                        blank=True,
+                        help_text="Name of the correct party, or blank to remove a correction",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "source",
+                    models.CharField(
+                        blank=True,
+                        help_text="Where the correction came from",
+                        max_length=2000,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {
+                    ("candidate_name", "year", "election_type", "office")
+                },
+            },
+        ),
+    ]
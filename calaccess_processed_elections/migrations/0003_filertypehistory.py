@@ -0,0 +1,80 @@
+# Generated by Django 4.0.10 on 2026-10-18 06:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calaccess_processed_elections", "0002_candidatepartycorrection"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FilerTypeHistory",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "filer_id",
+                    models.IntegerField(help_text="Filer's unique identifier"),
+                ),
+                (
+                    "effect_dt",
+                    models.DateField(
+                        help_text="The date the filer assumed the current class or type"
+                    ),
+                ),
+                (
+                    "party_cd",
+                    models.IntegerField(
+                        help_text="Code for the filer's party (from LOOKUP_CODES_CD)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "race",
+                    models.IntegerField(
+                        help_text="Code for the office sought (from LOOKUP_CODES_CD)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "office",
+                    models.CharField(
+                        help_text="Description of the race code, if it is unique in LOOKUP_CODES_CD",
+                        max_length=255,
+                        null=True,
+                    ),
+                ),
+                (
+                    "district_cd",
+                    models.IntegerField(
+                        help_text="Code for the district (from LOOKUP_CODES_CD)",
+                        null=True,
+                    ),
+                ),
+                (
+                    "district",
+                    models.CharField(
+                        help_text="Description of the district code, if it is unique in LOOKUP_CODES_CD",
+                        max_length=255,
+                        null=True,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="filertypehistory",
+            index=models.Index(
+                fields=["filer_id", "effect_dt"], name="calaccess_p_filer_i_093b0d_idx"
+            ),
+        ),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 4.0.10 on 2026-10-18 06:25
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("elections", "0008_auto_20181029_1527"),
+        ("calaccess_processed_elections", "0003_filertypehistory"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CandidacyForm501",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "filing_id",
+                    models.IntegerField(
+                        db_index=True,
+                        help_text="Unique identifier of the Form 501 filing",
+                    ),
+                ),
+                (
+                    "candidacy",
+                    models.ForeignKey(
+                        help_text="Candidacy the filing is linked to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="form501_links",
+                        to="elections.candidacy",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("candidacy", "filing_id")},
+            },
+        ),
+    ]
@@ -1,3 +1,133 @@
+from django.db import models
+from opencivicdata.elections.models import Candidacy
 from . import proxies
+from .managers import CandidacyForm501Manager, FilerTypeHistoryManager
 
-__all__ = ("proxies",)
+
+class CandidatePartyCorrection(models.Model):
+    """
+    A manual correction to a candidate's party, kept in the database.
+
+    Rows here can be edited without a new release of candidate_party.csv. They
+    take the place of any row in the file with the same key, and a blank party
+    removes that correction.
+    """
+
+    candidate_name = models.CharField(
+        max_length=255,
+        help_text="Candidate name, as scraped or as filed on Form 501",
+    )
+    year = models.IntegerField(help_text="Year of the election")
+    election_type = models.CharField(
+        max_length=100,
+        help_text="Type of election, e.g., PRIMARY or SPECIAL ELECTION",
+    )
+    office = models.CharField(
+        max_length=255,
+        help_text="Office sought, e.g., ASSEMBLY 75",
+    )
+    party = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Name of the correct party, or blank to remove a correction",
+    )
+    source = models.CharField(
+        max_length=2000,
+        blank=True,
+        help_text="Where the correction came from",
+    )
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        unique_together = (("candidate_name", "year", "election_type", "office"),)
+
+    def __str__(self):
+        return f"{self.candidate_name} ({self.year} {self.election_type} {self.office})"
+
+
+class FilerTypeHistory(models.Model):
+    """
+    Each filer's types over time, from FilerToFilerTypeCd with its codes looked up.
+
+    Indexed on filer_id and effect_dt so SQL loaders can find the record in effect
+    on an election date.
+    """
+
+    filer_id = models.IntegerField(help_text="Filer's unique identifier")
+    effect_dt = models.DateField(
+        help_text="The date the filer assumed the current class or type"
+    )
+    party_cd = models.IntegerField(
+        null=True, help_text="Code for the filer's party (from LOOKUP_CODES_CD)"
+    )
+    race = models.IntegerField(
+        null=True, help_text="Code for the office sought (from LOOKUP_CODES_CD)"
+    )
+    office = models.CharField(
+        max_length=255,
+        null=True,
+        help_text="Description of the race code, if it is unique in LOOKUP_CODES_CD",
+    )
+    district_cd = models.IntegerField(
+        null=True, help_text="Code for the district (from LOOKUP_CODES_CD)"
+    )
+    district = models.CharField(
+        max_length=255,
+        null=True,
+        help_text="Description of the district code, if it is unique in "
+        "LOOKUP_CODES_CD",
+    )
+
+    objects = FilerTypeHistoryManager()
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        indexes = [models.Index(fields=["filer_id", "effect_dt"])]
+
+    def __str__(self):
+        return f"{self.filer_id} ({self.effect_dt})"
+
+
+class CandidacyForm501(models.Model):
+    """
+    A link between an OCD Candidacy and a Form 501 filing.
+
+    Mirrors the form501_filing_ids list in the Candidacy's extras, so filings can be
+    joined to candidacies with an index.
+    """
+
+    candidacy = models.ForeignKey(
+        Candidacy,
+        on_delete=models.CASCADE,
+        related_name="form501_links",
+        help_text="Candidacy the filing is linked to",
+    )
+    filing_id = models.IntegerField(
+        db_index=True, help_text="Unique identifier of the Form 501 filing"
+    )
+
+    objects = CandidacyForm501Manager()
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        unique_together = (("candidacy", "filing_id"),)
+
+    def __str__(self):
+        return f"{self.candidacy_id} ({self.filing_id})"
+
+
+__all__ = (
+    "proxies",
+    "CandidatePartyCorrection",
+    "FilerTypeHistory",
+    "CandidacyForm501",
+)
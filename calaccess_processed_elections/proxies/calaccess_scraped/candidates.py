@@ -237,22 +237,13 @@ class ScrapedCandidateProxy(Candidate, ScrapedNameMixin):
         else:
             raise Form501Filing.DoesNotExist()
 
-    def get_or_create_contest(self):
-        """Get or create an OCD CandidateContest object.
-
-        Primary contests before 2012 were each linked to a Party. Unless the user
-        passes a value via the party keyword argument, the Party linked to the scraped
-        candidate's most recent Form501Filing will be selected.
-
-        Returns a tuple (CandidateContest object, created), where created is a boolean
-        specifying whether a CandidateContest was created.
+    def get_contest_lookup(self, scraped_election, candidate_party, post):
         """
-        # Get election data
-        scraped_election = self.election_proxy
-
-        # Get the candidate's party
-        candidate_party = self.get_party()
+        Returns the fields that identify the candidate's OCD CandidateContest.
 
+        Accepts the scraped election, the candidate's party and the Post so callers
+        that have already looked them up don't have to do it again.
+        """
         # Assume all "SPECIAL" and "RECALL" candidate elections are for contests
         # where the previous term of the office was unexpired.
         if scraped_election.is_special or scraped_election.is_recall:
@@ -296,13 +287,29 @@ class ScrapedCandidateProxy(Candidate, ScrapedNameMixin):
                 # ... and there's no need to do anything to the contest name.
                 contest_name = self.office_name
 
-        # Make it happen
-        contest, created = CandidateContest.objects.get_or_create(
+        return dict(
             election=scraped_election.get_ocd_election(),
             name=contest_name,
             previous_term_unexpired=previous_term_unexpired,
             party=contest_party,
-            division=self.post_proxy.division,
+            division=post.division,
+        )
+
+    def get_or_create_contest(self):
+        """Get or create an OCD CandidateContest object.
+
+        Primary contests before 2012 were each linked to a Party. Unless the user
+        passes a value via the party keyword argument, the Party linked to the scraped
+        candidate's most recent Form501Filing will be selected.
+
+        Returns a tuple (CandidateContest object, created), where created is a boolean
+        specifying whether a CandidateContest was created.
+        """
+        # Make it happen
+        contest, created = CandidateContest.objects.get_or_create(
+            **self.get_contest_lookup(
+                self.election_proxy, self.get_party(), self.post_proxy
+            )
         )
 
         # if contest was created, add the Post
@@ -318,7 +325,7 @@ class ScrapedCandidateProxy(Candidate, ScrapedNameMixin):
         # Return the contest and whether or not it was created
         return contest, created
 
-    def get_loaded_ocd_candidacy(self):
+    def get_loaded_ocd_candidacy(self, scraped_election=None, post=None):
         """
         Get an OCD candidacy previously loaded from the scraped Candidate.
 
@@ -334,14 +341,16 @@ class ScrapedCandidateProxy(Candidate, ScrapedNameMixin):
         criteria. Otherwise, match on candidate_name, person.name or
         person__other_name__name.
 
+        The scraped election and Post are looked up unless they are provided.
+
         Returns a Candidacy object.
         """
-        scraped_election = self.election_proxy
+        scraped_election = scraped_election or self.election_proxy
         ocd_election = scraped_election.get_ocd_election()
 
         q = OCDCandidacyProxy.objects.filter(
             contest__election=ocd_election,
-            post=self.post_proxy,
+            post=post or self.post_proxy,
         )
 
         # for special elections, filter to contests with unexpired terms
@@ -97,6 +97,9 @@ class OCDCandidacyProxy(Candidacy, OCDProxyModelMixin):
         """
         Link an id of a Form501Filing to a Candidacy, if it isn't already.
         """
+        from calaccess_processed_elections.models import CandidacyForm501
+
+        CandidacyForm501.objects.link(self, [form501_id])
         # Check if the attribute is already there
         if "form501_filing_ids" in self.extras:
             # If it is, check if we already have this id
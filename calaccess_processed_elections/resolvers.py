@@ -0,0 +1,459 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+In-memory indexes for resolving scraped candidates into OCD models in bulk.
+"""
+import datetime
+from collections import defaultdict
+from opencivicdata.elections.models import (
+    CandidateContest,
+    CandidateContestSource,
+    CandidacySource,
+)
+from calaccess_processed_elections import corrections
+from calaccess_processed_elections.filertypes import FilerTypeIndex, get_current_index
+from calaccess_processed_elections.models import CandidacyForm501
+from calaccess_processed_elections.proxies import (
+    OCDPartyProxy,
+    OCDPostProxy,
+    ScrapedCandidateProxy,
+    ScrapedCandidateElectionProxy,
+)
+
+# How many sources to insert at once
+BATCH_SIZE = 5000
+
+
+class ResolvedElection(object):
+    """
+    The values of a scraped candidate election needed to load its candidates.
+
+    Stands in for ScrapedCandidateElectionProxy, where each property runs its
+    queries again on every use.
+    """
+
+    def __init__(self, election):
+        """
+        Create a new object.
+        """
+        self.election = election
+        self.parsed_name = election.parsed_name
+        self.election_type = self.parsed_name["type"]
+        self.date = election.date
+        self.ocd_election = election.get_ocd_election()
+        self.is_special = election.is_special
+        self.is_recall = election.is_recall
+        self.is_regular = election.is_regular
+        self.is_partisan_primary = (
+            election.is_primary and self.ocd_election.date.year < 2012
+        )
+
+    def __str__(self):
+        return str(self.election)
+
+    def get_ocd_election(self):
+        """
+        Returns the OCD Election for this record.
+        """
+        return self.ocd_election
+
+
+def get_descending_key(form501):
+    """
+    Returns a sort key that orders Form 501s by date_filed like the database does.
+
+    Filings without a date come first when sorting in reverse, as they do in Postgres.
+    """
+    return (form501.date_filed is None, form501.date_filed or datetime.date.min)
+
+
+class ScrapedCandidateResolver(object):
+    """
+    Resolves scraped candidates into OCD contests, parties and Form 501s.
+
+    Everything that doesn't change while candidates are loaded is read once up front,
+    or the first time it is needed, and kept in memory. Sources are queued and
+    inserted in batches by flush().
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE):
+        """
+        Create a new object and load its indexes.
+        """
+        from calaccess_processed_filings.models import Form501Filing
+
+        self.batch_size = batch_size
+
+        # Lazy caches for the elections, posts and parties
+        self.election_list = ScrapedCandidateElectionProxy.objects.in_bulk()
+        self.election_lookup = {}
+        self.post_lookup = {}
+        self.party_name_lookup = {}
+        self.party_code_lookup = {}
+        self.candidate_party_lookup = {}
+
+        # Form 501s, by their id and by the office they sought
+        form501_list = Form501Filing.objects.only(
+            "filing_id",
+            "filer_id",
+            "office",
+            "district",
+            "election_year",
+            "election_type",
+            "last_name",
+            "first_name",
+            "middle_name",
+            "date_filed",
+            "statement_type",
+            "party",
+        )
+        self.form501_lookup = {}
+        self.form501_office_lookup = defaultdict(list)
+        for form501 in form501_list:
+            self.form501_lookup[form501.filing_id] = form501
+            office = form501.office.upper() if form501.office is not None else None
+            self.form501_office_lookup[(office, form501.district)].append(form501)
+
+        # The types of every filer we might ask about, unless the run has an index
+        filer_id_list = {
+            int(i)
+            for i in ScrapedCandidateProxy.objects.exclude(scraped_id="").values_list(
+                "scraped_id", flat=True
+            )
+            if i.isdigit()
+        }
+        filer_id_list.update(
+            int(f.filer_id)
+            for f in self.form501_lookup.values()
+            if f.filer_id and f.filer_id.isdigit()
+        )
+        self.filer_types = get_current_index() or FilerTypeIndex(filer_id_list)
+
+        # Existing contests and sources
+        self.contest_lookup = {}
+        for contest in CandidateContest.objects.all():
+            self.contest_lookup.setdefault(self.get_contest_key(contest), contest)
+        self.source_set = set(
+            CandidateContestSource.objects.values_list("contest_id", "url", "note")
+        )
+        self.source_set.update(
+            CandidacySource.objects.values_list("candidacy_id", "url", "note")
+        )
+        self.source_queue = []
+
+    def get_election(self, scraped_candidate):
+        """
+        Returns the ResolvedElection for the scraped candidate.
+        """
+        try:
+            return self.election_lookup[scraped_candidate.election_id]
+        except KeyError:
+            election = ResolvedElection(
+                self.election_list[scraped_candidate.election_id]
+            )
+            self.election_lookup[scraped_candidate.election_id] = election
+            return election
+
+    def get_post(self, scraped_candidate):
+        """
+        Returns the OCD Post for the scraped candidate's office.
+        """
+        try:
+            return self.post_lookup[scraped_candidate.office_name]
+        except KeyError:
+            post = OCDPostProxy.objects.get_or_create_by_name(
+                scraped_candidate.office_name
+            )[0]
+            # Fetch the division now so it is cached along with the post
+            post.division
+            self.post_lookup[scraped_candidate.office_name] = post
+            return post
+
+    def get_party_by_name(self, name):
+        """
+        Returns the OCD party with the provided name, or the unknown party.
+        """
+        try:
+            return self.party_name_lookup[name]
+        except KeyError:
+            party = OCDPartyProxy.objects.get_by_name(name)
+            self.party_name_lookup[name] = party
+            return party
+
+    def get_party_by_filer_id(self, filer_id, election_date):
+        """
+        Returns the OCD party for the filer_id, effective before election_date.
+        """
+        filer_type = self.filer_types.get(filer_id, election_date)
+        if filer_type is None:
+            return self.get_party_by_name("UNKNOWN")
+        party_code = filer_type.party_cd
+        try:
+            return self.party_code_lookup[party_code]
+        except KeyError:
+            party = OCDPartyProxy.objects.get_by_party_code(party_code)
+            self.party_code_lookup[party_code] = party
+            return party
+
+    def get_corrected_party(self, scraped_candidate, election):
+        """
+        Returns a manual correction to the candidate's party, if it's been made.
+        """
+        return corrections.candidate_party(
+            scraped_candidate.name,
+            election.date.year,
+            election.election_type,
+            scraped_candidate.office_name,
+        )
+
+    def get_party(self, scraped_candidate):
+        """
+        Returns the party we believe the candidate was associated with in this election.
+
+        Follows the same steps as ScrapedCandidateProxy.get_party, and only once for
+        each candidate.
+        """
+        try:
+            return self.candidate_party_lookup[scraped_candidate.id]
+        except KeyError:
+            party = self.find_party(scraped_candidate)
+            self.candidate_party_lookup[scraped_candidate.id] = party
+            return party
+
+    def find_party(self, scraped_candidate):
+        """
+        Works out the party for get_party.
+        """
+        if scraped_candidate.office_name == "SUPERINTENDENT OF PUBLIC INSTRUCTION":
+            return self.get_party_by_name("NO PARTY PREFERENCE")
+
+        election = self.get_election(scraped_candidate)
+        party = self.get_corrected_party(scraped_candidate, election)
+        if party:
+            return party
+
+        form501s = self.match_form501s_by_scraped_id(scraped_candidate) or (
+            self.match_form501s_by_name(scraped_candidate)
+        )
+        for i in sorted(form501s, key=get_descending_key, reverse=True):
+            party = self.get_party_by_name(i.party)
+            if not party.is_unknown():
+                return party
+            party = self.get_party_by_filer_id(int(i.filer_id), election.date)
+            if not party.is_unknown():
+                return party
+
+        if scraped_candidate.scraped_id:
+            return self.get_party_by_filer_id(
+                int(scraped_candidate.scraped_id), election.date
+            )
+        return self.get_party_by_name("UNKNOWN")
+
+    def filter_form501s(self, scraped_candidate):
+        """
+        Returns the Form 501s for the candidate's office filed by the election's year.
+        """
+        office_data = scraped_candidate.parse_office_name()
+        year = self.get_election(scraped_candidate).parsed_name["year"]
+        return [
+            f
+            for f in self.form501_office_lookup.get(
+                (office_data["type"], office_data["district"]), []
+            )
+            if f.election_year is not None and f.election_year <= year
+        ]
+
+    def filter_election_type(self, scraped_candidate, form501s):
+        """
+        Returns the Form 501s for the scraped election's type, if there are any.
+        """
+        election_type = self.get_election(scraped_candidate).election_type
+        return [f for f in form501s if f.election_type == election_type]
+
+    def match_form501s_by_scraped_id(self, scraped_candidate):
+        """
+        Returns a list of Form 501s with filer_ids that match the scraped_id.
+
+        Follows the same steps as ScrapedCandidateProxy.match_form501s_by_scraped_id.
+        """
+        form501s = [
+            f
+            for f in self.filter_form501s(scraped_candidate)
+            if f.filer_id == scraped_candidate.scraped_id
+        ]
+        return self.filter_election_type(scraped_candidate, form501s) or form501s
+
+    def match_form501s_by_name(self, scraped_candidate):
+        """
+        Returns a list of Form 501s with names that match the scraped candidate's name.
+
+        Follows the same steps as ScrapedCandidateProxy.match_form501s_by_name.
+        """
+        form501s = self.filter_form501s(scraped_candidate)
+        # first, try "<last_name>, <first_name> <middle_name>" format
+        last_first_middle = [
+            f
+            for f in form501s
+            if "{}, {} {}".format(
+                f.last_name or "", f.first_name or "", f.middle_name or ""
+            )
+            == scraped_candidate.name
+        ]
+        if last_first_middle:
+            return (
+                self.filter_election_type(scraped_candidate, last_first_middle)
+                or last_first_middle
+            )
+        # if not, change name format
+        last_first = [
+            f
+            for f in form501s
+            if "{}, {}".format(f.last_name or "", f.first_name or "")
+            == scraped_candidate.name
+        ]
+        return self.filter_election_type(scraped_candidate, last_first) or last_first
+
+    def get_contest_key(self, contest):
+        """
+        Returns the values that identify a CandidateContest in the lookup.
+        """
+        return (
+            contest.election_id,
+            contest.name,
+            contest.previous_term_unexpired,
+            contest.party_id,
+            contest.division_id,
+        )
+
+    def get_or_create_contest(self, scraped_candidate):
+        """
+        Get or create the OCD CandidateContest for the scraped candidate.
+
+        Returns a tuple (CandidateContest object, created), where created is a boolean
+        specifying whether a CandidateContest was created.
+        """
+        post = self.get_post(scraped_candidate)
+        fields = scraped_candidate.get_contest_lookup(
+            self.get_election(scraped_candidate),
+            self.get_party(scraped_candidate),
+            post,
+        )
+        key = (
+            fields["election"].id,
+            fields["name"],
+            fields["previous_term_unexpired"],
+            fields["party"].id if fields["party"] else None,
+            fields["division"].id,
+        )
+        try:
+            contest = self.contest_lookup[key]
+            created = False
+        except KeyError:
+            contest = CandidateContest.objects.create(**fields)
+            contest.posts.create(post=post)
+            self.contest_lookup[key] = contest
+            created = True
+
+        self.add_source(CandidateContestSource, contest, scraped_candidate)
+        return contest, created
+
+    def remove_contest(self, contest):
+        """
+        Forget a CandidateContest that has been deleted, along with its queued sources.
+        """
+        self.contest_lookup.pop(self.get_contest_key(contest), None)
+        self.source_queue = [
+            s
+            for s in self.source_queue
+            if not isinstance(s, CandidateContestSource) or s.contest_id != contest.id
+        ]
+
+    def add_source(self, model, obj, scraped_candidate):
+        """
+        Queue a source pointing obj at the scraped candidate, unless it already exists.
+        """
+        note = "Last scraped on {dt:%Y-%m-%d}".format(
+            dt=scraped_candidate.last_modified
+        )
+        key = (obj.id, scraped_candidate.url, note)
+        if key in self.source_set:
+            return
+        self.source_set.add(key)
+        parent = "contest" if model == CandidateContestSource else "candidacy"
+        self.source_queue.append(
+            model(**{parent: obj, "url": scraped_candidate.url, "note": note})
+        )
+
+    def link_form501s(self, candidacy, form501s):
+        """
+        Link Form 501s to a candidacy and update its fields and filer_ids from them.
+
+        Follows the same steps as the OCDCandidacyProxy methods link_form501,
+        update_from_form501 and link_filer_ids_from_form501s, but leaves saving the
+        candidacy to the caller.
+
+        Returns whether the candidacy was changed.
+        """
+        if not form501s:
+            return False
+        changed = False
+
+        filing_ids = candidacy.extras.setdefault("form501_filing_ids", [])
+        for form501 in form501s:
+            if form501.filing_id not in filing_ids:
+                filing_ids.append(form501.filing_id)
+                changed = True
+        CandidacyForm501.objects.link(candidacy, [f.filing_id for f in form501s])
+        filings = [
+            self.form501_lookup[i] for i in filing_ids if i in self.form501_lookup
+        ]
+
+        # keep the earliest filed_date
+        first_filed_date = min(
+            (f.date_filed for f in filings if f.date_filed is not None), default=None
+        )
+        if candidacy.filed_date != first_filed_date:
+            candidacy.filed_date = first_filed_date
+            changed = True
+
+        # set registration status to "withdrawn" based on the latest statement_type
+        latest = max(filings, key=get_descending_key)
+        if latest.statement_type == "10003":
+            if candidacy.registration_status != "withdrawn":
+                candidacy.registration_status = "withdrawn"
+                changed = True
+
+        # add any missing filer_ids to the person
+        person = candidacy.person
+        current_filer_ids = set(
+            person.identifiers.filter(scheme="calaccess_filer_id").values_list(
+                "identifier", flat=True
+            )
+        )
+        for f in filings:
+            if f.filer_id not in current_filer_ids:
+                person.identifiers.get_or_create(
+                    scheme="calaccess_filer_id",
+                    identifier=f.filer_id,
+                )
+                current_filer_ids.add(f.filer_id)
+
+        return changed
+
+    def flush(self):
+        """
+        Insert the queued sources.
+        """
+        contest_sources = [
+            s for s in self.source_queue if isinstance(s, CandidateContestSource)
+        ]
+        candidacy_sources = [
+            s for s in self.source_queue if isinstance(s, CandidacySource)
+        ]
+        CandidateContestSource.objects.bulk_create(
+            contest_sources, batch_size=self.batch_size
+        )
+        CandidacySource.objects.bulk_create(
+            candidacy_sources, batch_size=self.batch_size
+        )
+        self.source_queue = []
@@ -0,0 +1,16 @@
+INSERT INTO calaccess_processed_elections_candidacyform501 (
+    candidacy_id,
+    filing_id
+)
+SELECT DISTINCT
+    c.id,
+    f.filing_id::int
+FROM opencivicdata_candidacy c
+CROSS JOIN LATERAL JSONB_ARRAY_ELEMENTS_TEXT(
+    CASE
+        WHEN JSONB_TYPEOF(c.extras -> 'form501_filing_ids') = 'array'
+        THEN c.extras -> 'form501_filing_ids'
+        ELSE '[]'::jsonb
+    END
+) AS f(filing_id)
+ORDER BY 1, 2;
@@ -0,0 +1,32 @@
+WITH codes AS (
+    SELECT
+        "CODE_ID" AS code_id,
+        MIN("CODE_DESC") AS code_desc
+    FROM "LOOKUP_CODES_CD"
+    GROUP BY "CODE_ID"
+    HAVING COUNT(*) = 1
+)
+INSERT INTO calaccess_processed_elections_filertypehistory (
+    filer_id,
+    effect_dt,
+    party_cd,
+    race,
+    office,
+    district_cd,
+    district
+)
+SELECT
+    ftft."FILER_ID",
+    ftft."EFFECT_DT",
+    ftft."PARTY_CD",
+    ftft."RACE",
+    race.code_desc,
+    ftft."DISTRICT_CD",
+    district.code_desc
+FROM "FILER_TO_FILER_TYPE_CD" ftft
+LEFT JOIN codes race
+ON race.code_id = ftft."RACE"
+LEFT JOIN codes district
+ON district.code_id = ftft."DISTRICT_CD"
+WHERE ftft."EFFECT_DT" IS NOT NULL
+ORDER BY ftft."FILER_ID", ftft."EFFECT_DT";
@@ -0,0 +1,75 @@
+WITH candidacy_names AS (
+    SELECT
+        c.id,
+        c.contest_id,
+        c.person_id,
+        c.party_id,
+        1 AS field_order,
+        'candidate_name' AS field_name,
+        c.candidate_name AS name
+    FROM opencivicdata_candidacy c
+    UNION ALL
+    SELECT
+        c.id,
+        c.contest_id,
+        c.person_id,
+        c.party_id,
+        2 AS field_order,
+        'person_name' AS field_name,
+        p.name
+    FROM opencivicdata_candidacy c
+    JOIN opencivicdata_person p
+    ON p.id = c.person_id
+    UNION ALL
+    SELECT DISTINCT
+        c.id,
+        c.contest_id,
+        c.person_id,
+        c.party_id,
+        3 AS field_order,
+        'other_name' AS field_name,
+        n.name
+    FROM opencivicdata_candidacy c
+    JOIN opencivicdata_personname n
+    ON n.person_id = c.person_id
+    WHERE n.name <> ''
+),
+groups AS (
+    SELECT
+        contest_id,
+        field_name,
+        name
+    FROM candidacy_names
+    GROUP BY contest_id, field_name, name
+    HAVING COUNT(DISTINCT person_id) > 1
+),
+filer_ids AS (
+    SELECT
+        person_id,
+        ARRAY_AGG(DISTINCT identifier) AS filer_ids
+    FROM opencivicdata_personidentifier
+    WHERE scheme = 'calaccess_filer_id'
+    GROUP BY person_id
+)
+SELECT
+    cn.contest_id,
+    cc.name AS contest_name,
+    cn.field_name,
+    cn.name,
+    cn.id AS candidacy_id,
+    cn.person_id,
+    p.name AS person_name,
+    cn.party_id,
+    COALESCE(f.filer_ids, '{}') AS filer_ids
+FROM candidacy_names cn
+JOIN groups g
+ON g.contest_id = cn.contest_id
+AND g.field_name = cn.field_name
+AND g.name = cn.name
+JOIN opencivicdata_candidatecontest cc
+ON cc.id = cn.contest_id
+JOIN opencivicdata_person p
+ON p.id = cn.person_id
+LEFT JOIN filer_ids f
+ON f.person_id = cn.person_id
+ORDER BY cn.contest_id, cn.field_order, cn.name, cn.id;
@@ -0,0 +1,11 @@
+UPDATE opencivicdata_candidacy c
+SET is_incumbent = TRUE
+FROM opencivicdata_membership m, opencivicdata_candidatecontest cc, opencivicdata_election e
+WHERE m.person_id = c.person_id
+AND m.post_id = c.post_id
+AND m.start_date <> ''
+AND cc.id = c.contest_id
+AND e.id = cc.election_id
+AND EXTRACT(YEAR FROM e.date) > m.start_date::int
+AND (m.end_date = '' OR EXTRACT(YEAR FROM e.date) <= m.end_date::int)
+AND c.is_incumbent IS DISTINCT FROM TRUE;
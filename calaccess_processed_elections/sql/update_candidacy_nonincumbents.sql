@@ -0,0 +1,9 @@
+UPDATE opencivicdata_candidacy c
+SET is_incumbent = FALSE
+WHERE c.is_incumbent IS NULL
+AND EXISTS (
+    SELECT 1
+    FROM opencivicdata_candidacy i
+    WHERE i.contest_id = c.contest_id
+    AND i.is_incumbent
+);
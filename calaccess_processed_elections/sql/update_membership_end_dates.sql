@@ -0,0 +1,33 @@
+WITH start_years AS (
+    SELECT DISTINCT
+        post_id,
+        start_date::int AS start_year
+    FROM opencivicdata_membership
+    WHERE start_date <> ''
+    UNION
+    -- Memberships without a start year are succeeded by the first in their post
+    SELECT DISTINCT
+        post_id,
+        0 AS start_year
+    FROM opencivicdata_membership
+    WHERE start_date = ''
+),
+successors AS (
+    SELECT
+        post_id,
+        start_year,
+        LEAD(start_year) OVER (
+            PARTITION BY post_id
+            ORDER BY start_year
+        ) AS end_year
+    FROM start_years
+)
+UPDATE opencivicdata_membership m
+SET
+    end_date = s.end_year::text,
+    updated_at = NOW()
+FROM successors s
+WHERE m.post_id IS NOT DISTINCT FROM s.post_id
+AND CASE WHEN m.start_date = '' THEN 0 ELSE m.start_date::int END = s.start_year
+AND s.end_year IS NOT NULL
+AND m.end_date IS DISTINCT FROM s.end_year::text;
@@ -26,9 +26,14 @@ class CalAccessProcessedFilingsConfig(AppConfig):
         """
         Returns models from the "filings" group that mirror the structure of CAL-ACCESS forms.
         """
+        from .models import FilingBaseModel
+
         # Get all the models for this app
         model_list = self.get_models()
 
+        # Filter out any bookkeeping models that aren't loaded from CAL-ACCESS
+        model_list = [m for m in model_list if issubclass(m, FilingBaseModel)]
+
         # Filter out any abstract ones
         model_list = [m for m in model_list if not m._meta.abstract]
 
@@ -40,3 +45,17 @@ class CalAccessProcessedFilingsConfig(AppConfig):
 
         # Return what's left
         return model_list
+
+    def get_partitioned_models(self):
+        """
+        Returns the filings models whose tables can be partitioned by election cycle.
+        """
+        return [m for m in self.get_filing_models() if m.objects.partition_column]
+
+    def get_stage_models(self):
+        """
+        Returns models for the intermediate tables loaded before the filings models.
+        """
+        from .models import StageBaseModel
+
+        return [m for m in self.get_models() if issubclass(m, StageBaseModel)]
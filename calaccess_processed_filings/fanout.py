@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Load several filings models from a single scan of a shared raw table.
+"""
+import re
+
+from django.db import connection
+
+from calaccess_processed.telemetry import record_step
+from calaccess_processed_filings.graph import parse_sql_tables
+
+# Raw tables read by enough loaders that they are worth scanning only once
+FAN_OUT_TABLES = ("RCPT_CD", "EXPN_CD")
+
+
+class FanOutLoader(object):
+    """
+    Loads every model that reads a raw table with one statement.
+
+    The raw table is scanned once into a common table expression, limited to the
+    form types the models need, and each model's loading query inserts its rows
+    from there instead of scanning the raw table again.
+    """
+
+    def __init__(self, raw_table, model_list):
+        """
+        Create a new loader.
+
+        Args:
+            raw_table (str): The name of the raw table shared by the models.
+            model_list (list): The models loaded from the raw table.
+
+        Raises a ValueError if one of the models reads a table written by another,
+        since every insert in the statement sees the database as it was when it began.
+        """
+        self.raw_table = raw_table
+        self.model_list = model_list
+        self.name = f"{raw_table} fan-out"
+
+        writes = set(m._meta.db_table for m in model_list)
+        for m in model_list:
+            if parse_sql_tables(m.objects.get_sql())[1] & writes:
+                raise ValueError(f"{m.__name__} reads another table in {self.name}")
+
+    def __str__(self):
+        return self.name
+
+    @classmethod
+    def from_models(cls, model_list):
+        """
+        Group the models that share a raw table into loaders.
+
+        Returns a tuple with the list of loaders and the list of models left over.
+        """
+        loader_list = []
+        for raw_table in FAN_OUT_TABLES:
+            group = [
+                m
+                for m in model_list
+                if raw_table in parse_sql_tables(m.objects.get_sql())[1]
+            ]
+            if len(group) > 1:
+                loader_list.append(cls(raw_table, group))
+                model_list = [m for m in model_list if m not in group]
+        return loader_list, model_list
+
+    @property
+    def cte_name(self):
+        """
+        Return the name of the common table expression holding the raw rows.
+        """
+        return self.raw_table.lower()
+
+    def get_form_types(self):
+        """
+        Returns the sorted list of FORM_TYPE values the models filter the raw table on.
+
+        Returns None if any of the models reads every form type.
+        """
+        form_types = set()
+        for m in self.model_list:
+            match = re.search(
+                r'"FORM_TYPE"\s*(?:=\s*(\'[^\']*\')|IN\s*\(([^)]*)\))',
+                m.objects.get_sql(),
+                re.I,
+            )
+            if not match:
+                return None
+            values = match.group(1) or match.group(2)
+            form_types.update(v.strip() for v in values.split(","))
+        return sorted(form_types)
+
+    def get_sql(self, tables=None):
+        """
+        Return the statement that loads every model from one scan of the raw table.
+
+        Args:
+            tables (dict): Optional new names for tables in the models' queries,
+                keyed by the table they replace.
+        """
+        form_types = self.get_form_types()
+        where = f'\nWHERE "FORM_TYPE" IN ({", ".join(form_types)})' if form_types else ""
+        parts = [f'WITH {self.cte_name} AS (\nSELECT * FROM "{self.raw_table}"{where}\n)']
+
+        inserts = []
+        for m in self.model_list:
+            sql = m.objects.get_sql().strip().rstrip(";")
+            sql = re.sub(r'"%s"' % self.raw_table, self.cte_name, sql)
+            if tables:
+                sql = m.objects.rename_tables(sql, tables)
+            inserts.append(sql)
+
+        # every insert but the last goes in its own expression
+        for i, sql in enumerate(inserts[:-1]):
+            parts.append(f"load_{i} AS (\n{sql}\n)")
+        return ",\n".join(parts) + f"\n{inserts[-1]};"
+
+    def execute_sql(self, sql):
+        """
+        Execute the combined statement, recording it as a step of the current run.
+
+        The rows it affected aren't recorded, since Postgres only counts the last
+        insert in the statement.
+        """
+        writes, reads = parse_sql_tables(sql)
+        with record_step("sql", self.name, writes, reads):
+            with connection.cursor() as c:
+                c.execute(sql)
+
+    def load(self, rebuild=None):
+        """
+        Load the models, temporarily dropping their constraints and indexes.
+
+        Models with partitioned tables are built in shadow tables and swapped in,
+        like a full load of each on its own would.
+
+        If rebuild is an IndexRebuild, the other models' dropped constraints and
+        indexes are added to it instead of being restored right away.
+        """
+        partitioned = [m for m in self.model_list if m.objects.is_partitioned()]
+        tables = dict((m._meta.db_table, m.objects.shadow_table) for m in partitioned)
+
+        for m in self.model_list:
+            if m in partitioned:
+                m.objects.create_shadow()
+            else:
+                m.objects.get_queryset().drop_constraints()
+                m.objects.get_queryset().drop_indexes()
+
+        self.execute_sql(self.get_sql(tables))
+
+        for m in self.model_list:
+            if m in partitioned:
+                m.objects.finish_shadow(tables)
+                m.objects.swap_shadow()
+            elif rebuild is not None:
+                rebuild.add_model(m)
+            else:
+                m.objects.get_queryset().restore_constraints()
+                m.objects.get_queryset().restore_indexes()
+
+    def build_shadow(self, tables):
+        """
+        Load the models into their shadow tables, ready to be swapped in.
+
+        Args:
+            tables (dict): Names of the shadow tables keyed by the table they replace.
+        """
+        for m in self.model_list:
+            m.objects.create_shadow()
+
+        self.execute_sql(self.get_sql(tables))
+
+        for m in self.model_list:
+            m.objects.finish_shadow(tables)
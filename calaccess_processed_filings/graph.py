@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Dependency graph for running the filings loaders in parallel.
+"""
+import re
+import time
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+def parse_sql_tables(sql):
+    """
+    Return a tuple with the sets of tables written and read by a SQL string.
+
+    Comments are ignored and double-quotes are stripped from table names.
+    """
+    sql = re.sub(r"--[^\n]*", "", sql)
+    writes = set(
+        i.strip('"') for i in re.findall(r'INSERT\s+INTO\s+("?\w+"?)', sql, re.I)
+    )
+    reads = set(
+        i.strip('"') for i in re.findall(r'(?:FROM|JOIN)\s+("?\w+"?)', sql, re.I)
+    )
+    return writes, reads - writes
+
+
+class LoadNode(object):
+    """
+    A single step of the load, along with the tables it reads and writes.
+    """
+
+    def __init__(self, name, sql, run, model_list=None):
+        """
+        Create a new node.
+
+        Args:
+            name (str): Name used to identify the node in logs.
+            sql (str): The SQL run by the node, parsed for its dependencies.
+            run (callable): Called with no arguments to execute the node.
+            model_list (list): Optional models loaded by the node.
+        """
+        self.name = name
+        self.run = run
+        self.model_list = model_list or []
+        self.writes, self.reads = parse_sql_tables(sql)
+        self.upstream = set()
+        self.downstream = set()
+        self.started = None
+        self.finished = None
+
+    @property
+    def duration(self):
+        """
+        Returns the number of seconds the node took to run, if it has run.
+        """
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def __str__(self):
+        return self.name
+
+
+class LoadGraph(object):
+    """
+    A directed acyclic graph of load steps linked by the tables they share.
+
+    A node depends on every other node that writes to a table it reads.
+    """
+
+    def __init__(self, nodes):
+        """
+        Create a new graph and link its nodes together.
+        """
+        self.nodes = dict((n.name, n) for n in nodes)
+
+        writers = {}
+        for node in nodes:
+            for table in node.writes:
+                writers.setdefault(table, set()).add(node.name)
+
+        for node in nodes:
+            for table in node.reads:
+                for name in writers.get(table, set()):
+                    node.upstream.add(name)
+                    self.nodes[name].downstream.add(node.name)
+
+        # Fail early if the nodes can't be ordered
+        self.order = self.get_topological_order()
+
+    @classmethod
+    def from_models(cls, model_list, method="load", fan_out=False, **kwargs):
+        """
+        Create a graph with one node for each model loaded with FilingsManager.
+
+        Each node calls the named method of the model's manager with any
+        additional keyword arguments.
+
+        If fan_out is True, models that read the same large raw table share a
+        single node that loads them all with a FanOutLoader.
+        """
+        loader_list = []
+        if fan_out:
+            from calaccess_processed_filings.fanout import FanOutLoader
+
+            loader_list, model_list = FanOutLoader.from_models(model_list)
+
+        node_list = [
+            LoadNode(
+                m.__name__,
+                m.objects.get_sql(),
+                functools.partial(getattr(m.objects, method), **kwargs),
+                [m],
+            )
+            for m in model_list
+        ]
+        node_list += [
+            LoadNode(
+                loader.name,
+                loader.get_sql(),
+                functools.partial(getattr(loader, method), **kwargs),
+                loader.model_list,
+            )
+            for loader in loader_list
+        ]
+        return cls(node_list)
+
+    def get_topological_order(self):
+        """
+        Returns a list of node names ordered so every node follows its dependencies.
+
+        Raises a ValueError if the graph contains a cycle.
+        """
+        remaining = dict((name, len(n.upstream)) for name, n in self.nodes.items())
+        ready = sorted(name for name, count in remaining.items() if count == 0)
+        order = []
+        while ready:
+            name = ready.pop(0)
+            order.append(name)
+            for child in sorted(self.nodes[name].downstream):
+                remaining[child] -= 1
+                if remaining[child] == 0:
+                    ready.append(child)
+        if len(order) != len(self.nodes):
+            cycle = sorted(set(self.nodes) - set(order))
+            raise ValueError("Load graph has a cycle between: %s" % ", ".join(cycle))
+        return order
+
+    def _run_node(self, node):
+        """
+        Run a node on the current thread and record its timing.
+
+        Each worker thread gets its own database connection, which is closed
+        when the node finishes.
+        """
+        node.started = time.perf_counter()
+        try:
+            node.run()
+        finally:
+            node.finished = time.perf_counter()
+            connections.close_all()
+        return node
+
+    def run(self, workers=1, callback=None):
+        """
+        Run every node, executing those whose dependencies are met in parallel.
+
+        Args:
+            workers (int): Maximum number of nodes to run at the same time.
+            callback (callable): Optional function called with each node as it finishes.
+
+        If any node fails, no new nodes are started and the error is re-raised
+        once the running nodes have finished.
+        """
+        remaining = dict((name, len(n.upstream)) for name, n in self.nodes.items())
+        ready = [name for name in self.order if remaining[name] == 0]
+        running = set()
+        error = None
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while ready or running:
+                while ready and error is None:
+                    node = self.nodes[ready.pop(0)]
+                    logger.debug("Starting %s" % node)
+                    running.add(executor.submit(self._run_node, node))
+
+                if not running:
+                    break
+
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        node = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    if callback:
+                        callback(node)
+                    for child in sorted(node.downstream, key=self.order.index):
+                        remaining[child] -= 1
+                        if remaining[child] == 0:
+                            ready.append(child)
+
+        if error is not None:
+            raise error
+
+    def get_critical_path(self):
+        """
+        Returns the chain of nodes with the longest total duration.
+
+        Returns a tuple with the list of node names and the total number of seconds.
+        """
+        finish = {}
+        previous = {}
+        for name in self.order:
+            node = self.nodes[name]
+            upstream = [(finish[p], p) for p in node.upstream]
+            start, parent = max(upstream) if upstream else (0, None)
+            finish[name] = start + (node.duration or 0)
+            previous[name] = parent
+
+        if not finish:
+            return [], 0
+
+        total, name = max((v, k) for k, v in finish.items())
+        path = []
+        while name is not None:
+            path.insert(0, name)
+            name = previous[name]
+        return path, total
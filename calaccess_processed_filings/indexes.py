@@ -0,0 +1,178 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Rebuild the indexes and constraints dropped by a bulk load all at once.
+"""
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.db import connection, connections
+
+logger = logging.getLogger(__name__)
+
+
+class RebuildStep(object):
+    """
+    A single statement run while rebuilding, along with how long it took.
+    """
+
+    def __init__(self, sql):
+        """
+        Create a new step.
+
+        Args:
+            sql (str): The CREATE INDEX, ALTER TABLE or ANALYZE statement to run.
+        """
+        self.sql = sql
+        self.table = re.search(r'(?:\bON|TABLE|ANALYZE)\s+"?(\w+)"?', sql).group(1)
+        match = re.search(r'(?:INDEX|CONSTRAINT)\s+"?(\w+)"?', sql)
+        self.name = match.group(1) if match else self.table
+        self.started = None
+        self.finished = None
+
+    @property
+    def is_foreign_key(self):
+        """
+        Returns True if the step adds or validates a foreign key.
+        """
+        return "FOREIGN KEY" in self.sql or "VALIDATE CONSTRAINT" in self.sql
+
+    @property
+    def duration(self):
+        """
+        Returns the number of seconds the step took to run, if it has run.
+        """
+        if self.started is None or self.finished is None:
+            return None
+        return self.finished - self.started
+
+    def __str__(self):
+        return self.name
+
+
+class IndexRebuild(object):
+    """
+    Rebuilds the indexes and constraints dropped while loading models, all at once.
+
+    They are collected as each model is loaded and rebuilt once every model is. The
+    indexes are built first, then the foreign keys are added and validated, then
+    the tables are analyzed.
+    Within each phase the statements are run at the same time on a pool of database
+    connections, largest tables first.
+    """
+
+    def __init__(self, maintenance_work_mem=None, max_parallel_maintenance_workers=None):
+        """
+        Create a new rebuild.
+
+        Args:
+            maintenance_work_mem (str): Optional memory each connection can use to
+                build an index, such as "1GB".
+            max_parallel_maintenance_workers (int): Optional number of extra
+                processes Postgres can use to build each index.
+        """
+        self.settings = []
+        if maintenance_work_mem:
+            self.settings.append(("maintenance_work_mem", maintenance_work_mem))
+        if max_parallel_maintenance_workers is not None:
+            self.settings.append(
+                ("max_parallel_maintenance_workers", max_parallel_maintenance_workers)
+            )
+        self.step_list = []
+        self.table_list = []
+        self._lock = threading.Lock()
+
+    def add_model(self, model):
+        """
+        Add the indexes and constraints dropped from a model to the rebuild.
+
+        Safe to call from the threads loading other models.
+        """
+        sql_list = model.objects.get_restore_sql()
+        with self._lock:
+            self.step_list += [RebuildStep(sql) for sql in sql_list]
+            self.table_list.append(model._meta.db_table)
+
+    def add_validation(self, model):
+        """
+        Add the validation of the foreign keys a swap left NOT VALID to the rebuild.
+
+        Safe to call from the threads loading other models.
+        """
+        sql_list = model.objects.get_validate_sql()
+        with self._lock:
+            self.step_list += [RebuildStep(sql) for sql in sql_list]
+
+    def get_phases(self):
+        """
+        Returns a list with the lists of steps to run one after the other.
+        """
+        sizes = self.get_table_sizes()
+
+        def by_size(step_list):
+            return sorted(step_list, key=lambda s: sizes.get(s.table, 0), reverse=True)
+
+        return [
+            by_size(s for s in self.step_list if not s.is_foreign_key),
+            by_size(s for s in self.step_list if s.is_foreign_key),
+            by_size(RebuildStep(f'ANALYZE "{t}"') for t in self.table_list),
+        ]
+
+    def get_table_sizes(self):
+        """
+        Returns a dictionary with the size in bytes of each table, keyed by its name.
+        """
+        if not self.table_list:
+            return {}
+        with connection.cursor() as c:
+            c.execute(
+                "SELECT relname, pg_relation_size(oid) FROM pg_class "
+                "WHERE relname = ANY(%s) AND relkind = 'r'",
+                [self.table_list],
+            )
+            return dict(c.fetchall())
+
+    def _run_step(self, step):
+        """
+        Run a step on the current thread's connection with the rebuild's settings.
+        """
+        step.started = time.perf_counter()
+        try:
+            with connection.cursor() as c:
+                for name, value in self.settings:
+                    c.execute(f"SET {name} = %s", [str(value)])
+                c.execute(step.sql)
+        finally:
+            step.finished = time.perf_counter()
+            connections.close_all()
+        return step
+
+    def run(self, workers=1, callback=None):
+        """
+        Run every step, phase by phase.
+
+        Args:
+            workers (int): Number of statements to run at the same time.
+            callback (callable): Optional function called with each step as it finishes.
+
+        If a step fails, the rest of its phase is still run and the error is
+        re-raised before the next phase begins.
+        """
+        for step_list in self.get_phases():
+            error = None
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                futures = [executor.submit(self._run_step, s) for s in step_list]
+                for future in as_completed(futures):
+                    try:
+                        step = future.result()
+                    except Exception as e:
+                        error = error or e
+                        continue
+                    logger.debug(f"Rebuilt {step} in {step.duration:.2f}s")
+                    if callback:
+                        callback(step)
+            if error is not None:
+                raise error
@@ -0,0 +1,165 @@
+"""Compare the query plans for loading Form 460 summaries with and without the pivot stage."""
+import json
+
+from django.db import connection, transaction
+
+from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed_filings.models import Form460FilingVersion, Form460SummaryPivot
+
+
+class Command(CalAccessCommand):
+    """
+    Compare the query plans for loading Form 460 summaries with and without the pivot stage.
+    """
+
+    help = (
+        "Compare the query plans for loading Form 460 summaries with and without "
+        "the pivot stage."
+    )
+
+    # The table each group of summary lines is joined to, keyed by SMRY_CD.FORM_TYPE
+    drivers = (
+        (
+            "F460",
+            "f460",
+            "\"CVR_CAMPAIGN_DISCLOSURE_CD\" d WHERE d.\"FORM_TYPE\" = 'F460'",
+            ('d."FILING_ID"', 'd."AMEND_ID"'),
+        ),
+        ("A", "a", "{fv} d", ("d.filing_id", "d.amend_id")),
+        ("C", "c", "{fv} d", ("d.filing_id", "d.amend_id")),
+        ("E", "e", "{fv} d", ("d.filing_id", "d.amend_id")),
+    )
+
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            dest="analyze",
+            default=False,
+            help="Run the queries and report their actual times. Changes are rolled back.",
+        )
+
+    def handle(self, *args, **options):
+        """Make it happen."""
+        super(Command, self).handle(*args, **options)
+        self.analyze = options["analyze"]
+        self.header("Benchmarking Form 460 summary loading")
+
+        with transaction.atomic():
+            # empty the stage so the pivot can be loaded inside the transaction
+            if self.analyze:
+                with connection.cursor() as c:
+                    c.execute(f"TRUNCATE TABLE {Form460SummaryPivot._meta.db_table}")
+
+            before = [
+                self.explain(form_type, self.get_join_sql(form_type, prefix, *rest))
+                for form_type, prefix, *rest in self.drivers
+            ]
+            after = [self.explain("pivot", Form460SummaryPivot.objects.get_sql())]
+            after += [
+                self.explain(form_type, self.get_pivot_sql(prefix, *rest))
+                for form_type, prefix, *rest in self.drivers
+            ]
+            transaction.set_rollback(True)
+
+        self.log_plans("Before (one SMRY_CD join per line)", before)
+        self.log_plans("After (one SMRY_CD scan into the pivot)", after)
+
+        before_cost = sum(p["cost"] for p in before)
+        after_cost = sum(p["cost"] for p in after)
+        self.success(
+            f"Total plan cost: {before_cost:,.0f} before, {after_cost:,.0f} after "
+            f"({before_cost / max(after_cost, 1):.1f}x)"
+        )
+        if self.analyze:
+            before_time = sum(p["time"] for p in before)
+            after_time = sum(p["time"] for p in after)
+            self.success(
+                f"Total time: {before_time:,.1f}ms before, {after_time:,.1f}ms after"
+            )
+
+    def get_lines(self, prefix):
+        """
+        Return the pivot columns and line numbers for the summary with the given prefix.
+        """
+        lines = []
+        for field in Form460SummaryPivot._meta.fields:
+            if field.name.startswith(f"{prefix}_line_"):
+                lines.append((field.name, field.name.split("_")[-1]))
+        return lines
+
+    def get_from(self, table):
+        """
+        Return the FROM clause for a driving table, filling in the filing version table.
+        """
+        return table.format(fv=Form460FilingVersion._meta.db_table)
+
+    def get_join_sql(self, form_type, prefix, table, keys):
+        """
+        Return a query joining SMRY_CD once for each line, like the loaders used to.
+        """
+        filing_id, amend_id = keys
+        columns, joins = [], []
+        for name, line in self.get_lines(prefix):
+            columns.append(f'line_{line}."AMOUNT_A" AS {name}')
+            joins.append(
+                f'LEFT JOIN "SMRY_CD" line_{line} '
+                f'ON {filing_id} = line_{line}."FILING_ID" '
+                f'AND {amend_id} = line_{line}."AMEND_ID" '
+                f"AND UPPER(line_{line}.\"FORM_TYPE\") = '{form_type}' "
+                f"AND line_{line}.\"LINE_ITEM\" = '{line}'"
+            )
+        from_, _, where = self.get_from(table).partition(" WHERE ")
+        sql = f"SELECT {filing_id}, {amend_id}, {', '.join(columns)} FROM {from_} "
+        sql += " ".join(joins)
+        if where:
+            sql += f" WHERE {where}"
+        return sql
+
+    def get_pivot_sql(self, prefix, table, keys):
+        """
+        Return a query joining the pivot stage once, like the loaders do now.
+        """
+        filing_id, amend_id = keys
+        columns = ", ".join(f"smry.{name}" for name, line in self.get_lines(prefix))
+        from_, _, where = self.get_from(table).partition(" WHERE ")
+        sql = (
+            f"SELECT {filing_id}, {amend_id}, {columns} FROM {from_} "
+            f"LEFT JOIN {Form460SummaryPivot._meta.db_table} smry "
+            f"ON {filing_id} = smry.filing_id AND {amend_id} = smry.amend_id"
+        )
+        if where:
+            sql += f" WHERE {where}"
+        return sql
+
+    def explain(self, label, sql):
+        """
+        Return a dictionary with the estimated cost, and actual time if analyzed, of a query.
+        """
+        options = "ANALYZE, FORMAT JSON" if self.analyze else "FORMAT JSON"
+        with connection.cursor() as c:
+            c.execute(f"EXPLAIN ({options}) {sql.rstrip().rstrip(';')}")
+            plan = c.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        plan = plan[0]
+        return dict(
+            label=label,
+            cost=plan["Plan"]["Total Cost"],
+            time=plan.get("Execution Time"),
+        )
+
+    def log_plans(self, title, plan_list):
+        """
+        Log the cost of each query in a list of plans.
+        """
+        self.log(f" {title}")
+        for p in plan_list:
+            line = f"  {p['label']:<6} cost {p['cost']:>14,.0f}"
+            if p["time"] is not None:
+                line += f"  time {p['time']:>10,.1f}ms"
+            self.log(line)
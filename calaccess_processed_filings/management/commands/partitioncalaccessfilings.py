@@ -0,0 +1,27 @@
+"""Partition the largest filings tables by election cycle."""
+from django.apps import apps
+
+from calaccess_processed.management.commands import CalAccessCommand
+
+
+class Command(CalAccessCommand):
+    """
+    Partition the largest filings tables by election cycle.
+    """
+
+    help = "Partition the largest filings tables by election cycle."
+
+    def handle(self, *args, **options):
+        """Make it happen."""
+        super(Command, self).handle(*args, **options)
+        self.header("Partitioning filings tables by election cycle")
+
+        model_list = apps.get_app_config(
+            "calaccess_processed_filings"
+        ).get_partitioned_models()
+        for m in model_list:
+            if self.verbosity >= 2:
+                self.log(f" Partitioning {m._meta.db_table}")
+            m.objects.partition()
+
+        self.success(f"Partitioned {len(model_list)} tables.")
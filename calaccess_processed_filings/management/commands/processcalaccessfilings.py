@@ -1,11 +1,16 @@
 """Load and archive the CAL-ACCESS Filing and FilingVersion models."""
 import os
+import time
 
 from django.apps import apps
-from django.db import connection
-from django.core.management import call_command
+from django.db import connection, transaction
+from django.core.management.base import CommandError
 
 from calaccess_processed.management.commands import CalAccessCommand
+from calaccess_processed_filings.graph import LoadGraph
+from calaccess_processed_filings.indexes import IndexRebuild
+from calaccess_processed_filings.models import FilingsHighWaterMark
+from calaccess_processed_filings.partitions import get_cycle_bounds
 
 
 class Command(CalAccessCommand):
@@ -15,28 +20,272 @@ class Command(CalAccessCommand):
 
     help = "Load and archive the CAL-ACCESS Filing and FilingVersion models."
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=1,
+            help="Number of models to load at the same time, each on its own "
+            "database connection (default: 1)",
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            dest="incremental",
+            default=False,
+            help="Only reprocess filings added or amended since the last load",
+        )
+        parser.add_argument(
+            "--shadow",
+            action="store_true",
+            dest="shadow",
+            default=False,
+            help="Build every model in a shadow table and swap them in once they "
+            "are all complete, so the current tables stay readable during the load",
+        )
+        parser.add_argument(
+            "--maintenance-work-mem",
+            dest="maintenance_work_mem",
+            default=None,
+            help="Memory each connection can use to rebuild an index after a full "
+            "load, such as 1GB (default: the database's setting)",
+        )
+        parser.add_argument(
+            "--parallel-maintenance-workers",
+            dest="parallel_maintenance_workers",
+            type=int,
+            default=None,
+            help="Number of extra processes the database can use to rebuild each "
+            "index after a full load (default: the database's setting)",
+        )
+        parser.add_argument(
+            "--cycles",
+            dest="cycles",
+            nargs="+",
+            type=int,
+            help="Only reload the partitions for these election cycles, such as "
+            "2022 2024, in the tables split up by partitioncalaccessfilings",
+        )
+        self.add_archive_arguments(parser)
+
     def handle(self, *args, **options):
         """Make it happen."""
         super(Command, self).handle(*args, **options)
+        self.workers = options["workers"]
+        self.maintenance_work_mem = options["maintenance_work_mem"]
+        self.parallel_maintenance_workers = options["parallel_maintenance_workers"]
+        self.compression = options["compression"]
+        self.zip = options["zip"]
+        self.format = options["format"]
+        self.force_archive = options["force_archive"]
+        self.split_cycles = options["split_cycles"]
 
         # create subdirectory in processed_data_dir, if missing
         filings_data_path = os.path.join(self.processed_data_dir, "filings")
         os.path.isdir(filings_data_path) or os.makedirs(filings_data_path)
 
-        self.handle_models("version")
-        self.handle_models("filing")
+        # a partial reload doesn't process any new filings, so it isn't marked
+        if options["cycles"]:
+            self.handle_cycles(options["cycles"])
+            return
+
+        # snapshot the raw data before loading so the mark matches what was processed
+        mark = FilingsHighWaterMark(**FilingsHighWaterMark.objects.get_current_values())
+
+        last_mark = self.get_last_mark() if options["incremental"] else None
+        if last_mark:
+            self.handle_incremental(mark, last_mark)
+        elif options["shadow"]:
+            self.handle_shadow()
+        else:
+            self.handle_graph()
+
+        mark.save()
+
+    def handle_graph(self):
+        """
+        Load every model, following the dependencies between them.
+
+        Models that don't depend on each other are loaded in parallel when there
+        is more than one worker. Models that read RCPT_CD or EXPN_CD are loaded
+        together from a single scan of the raw table.
+
+        The indexes and constraints dropped to speed up loading are rebuilt
+        together once every model is loaded.
+        """
+        model_list = self.get_model_list("version") + self.get_model_list("filing")
+        load_list = self.get_stage_list() + model_list
+        rebuild = IndexRebuild(
+            maintenance_work_mem=self.maintenance_work_mem,
+            max_parallel_maintenance_workers=self.parallel_maintenance_workers,
+        )
+        graph = LoadGraph.from_models(load_list, fan_out=True, rebuild=rebuild)
+        if self.verbosity >= 2:
+            self.log(
+                f" Loading {len(load_list)} models in {len(graph.nodes)} steps "
+                f"with {self.workers} workers."
+            )
+
+        # flush everything first so a TRUNCATE ... CASCADE can't wipe out
+        # a table that was already loaded
+        self.truncate_model_list(load_list)
+        graph.run(workers=self.workers, callback=self.log_node)
+        self.log_critical_path(graph)
+
+        # check any foreign keys a partitioned table's swap couldn't
+        for m in load_list:
+            rebuild.add_validation(m)
+
+        if self.verbosity >= 2:
+            self.log(
+                f" Rebuilding {len(rebuild.step_list)} indexes and constraints "
+                f"with {self.workers} workers."
+            )
+        start = time.perf_counter()
+        rebuild.run(workers=self.workers, callback=self.log_step)
+        if self.verbosity >= 2:
+            self.log(f" Rebuilt in {time.perf_counter() - start:.2f}s")
+
+        self.archive_model_list(model_list)
+
+    def handle_shadow(self):
+        """
+        Build every model in a shadow table, then swap them all in at once.
+
+        The shadow tables are built in parallel, following the dependencies between
+        them, and each model reads from the shadows of the models it depends on.
+        Once every table is swapped in, the foreign keys between them are validated.
+        """
+        model_list = self.get_model_list("version") + self.get_model_list("filing")
+        load_list = self.get_stage_list() + model_list
+        tables = dict((m._meta.db_table, m.objects.shadow_table) for m in load_list)
+        graph = LoadGraph.from_models(
+            load_list, method="build_shadow", fan_out=True, tables=tables
+        )
+        if self.verbosity >= 2:
+            self.log(
+                f" Building {len(load_list)} shadow tables in {len(graph.nodes)} "
+                f"steps with {self.workers} workers."
+            )
+        graph.run(workers=self.workers, callback=self.log_node)
+        self.log_critical_path(graph)
+
+        # swap in children before the parents their foreign keys refer to
+        start = time.perf_counter()
+        with transaction.atomic():
+            for name in reversed(graph.order):
+                for m in graph.nodes[name].model_list:
+                    m.objects.swap_shadow()
+        if self.verbosity >= 2:
+            self.log(
+                f" Swapped in {len(load_list)} tables in "
+                f"{(time.perf_counter() - start) * 1000:.0f}ms"
+            )
+
+        # the foreign keys referring to each table were added back NOT VALID
+        rebuild = IndexRebuild(
+            maintenance_work_mem=self.maintenance_work_mem,
+            max_parallel_maintenance_workers=self.parallel_maintenance_workers,
+        )
+        for m in load_list:
+            rebuild.add_validation(m)
+        if self.verbosity >= 2:
+            self.log(
+                f" Validating {len(rebuild.step_list)} foreign keys "
+                f"with {self.workers} workers."
+            )
+        rebuild.run(workers=self.workers, callback=self.log_step)
+
+        self.archive_model_list(model_list)
+
+    def handle_incremental(self, mark, last_mark):
+        """
+        Reprocess only the filings added or amended since the last_mark.
+
+        The rows of every changed filing are deleted and reloaded in a single transaction.
+        """
+        model_list = self.get_model_list("version") + self.get_model_list("filing")
+        load_list = self.get_stage_list() + model_list
+        lookup = dict((m.__name__, m) for m in load_list)
+        ordered_list = [lookup[name] for name in LoadGraph.from_models(load_list).order]
+
+        with transaction.atomic():
+            mark.incremental = True
+            count = FilingsHighWaterMark.objects.create_changed_table(last_mark)
+            mark.changed_filing_count = count
+            if self.verbosity >= 2:
+                self.log(f" Reprocessing {count} changed filing versions.")
+
+            # clear out children before the parents they are loaded from
+            for m in reversed(ordered_list):
+                deleted = m.objects.delete_changed()
+                if self.verbosity > 2:
+                    self.log(f" Deleted {deleted} rows from {m._meta.db_table}")
+
+            for m in ordered_list:
+                if self.verbosity > 2:
+                    self.log(f" Loading {m._meta.db_table}")
+                m.objects.load(incremental=True)
+
+        self.archive_model_list(model_list)
+
+    def handle_cycles(self, cycles):
+        """
+        Reload the partitions for the given election cycles and nothing else.
+
+        Only the models with partitioned tables are reloaded, following the
+        dependencies between them. Their other partitions are left alone.
+        """
+        for cycle in cycles:
+            try:
+                get_cycle_bounds(cycle)
+            except ValueError as e:
+                raise CommandError(e)
 
-    def handle_models(self, model_type):
-        """Handle logic for loading models of model_type."""
-        model_list = self.get_model_list(model_type)
-        if len(model_list) > 0:
+        model_list = [
+            m for m in self.get_partitioned_list() if m.objects.is_partitioned()
+        ]
+        if not model_list:
+            raise CommandError(
+                "No tables are partitioned. Run partitioncalaccessfilings first."
+            )
+
+        graph = LoadGraph.from_models(model_list, method="load_cycles", cycles=cycles)
+        if self.verbosity >= 2:
+            self.log(
+                f" Reloading {len(cycles)} cycles in {len(model_list)} models "
+                f"with {self.workers} workers."
+            )
+        graph.run(workers=self.workers, callback=self.log_node)
+        self.log_critical_path(graph)
+
+        self.archive_model_list(model_list)
+
+    def get_last_mark(self):
+        """
+        Returns the mark recorded by the last load, or None if there isn't one.
+        """
+        try:
+            return FilingsHighWaterMark.objects.latest()
+        except FilingsHighWaterMark.DoesNotExist:
             if self.verbosity >= 2:
-                self.log(f" Loading {len(model_list)} {model_type} models.")
-            self.load_model_list(model_list)
+                self.log(" No previous load found. Loading everything.")
+            return None
+
+    def get_stage_list(self):
+        """Return a list of the stage models to be loaded before the filings models."""
+        return apps.get_app_config("calaccess_processed_filings").get_stage_models()
 
-            # archive
-            for m in model_list:
-                call_command("archivecalaccessfilingsfile", m._meta.object_name)
+    def get_partitioned_list(self):
+        """Return a list of the models whose tables can be partitioned by cycle."""
+        return apps.get_app_config(
+            "calaccess_processed_filings"
+        ).get_partitioned_models()
 
     def get_model_list(self, model_type):
         """Return a list of models of the specified type to be loaded.
@@ -55,20 +304,46 @@ class Command(CalAccessCommand):
             raise ValueError('model_type must be "version" or "filing".')
         return models_to_load
 
-    def load_model_list(self, model_list):
-        """Iterate over the given list of models, loading each one."""
-        # iterate over all of filing models
-        for m in model_list:
-
-            # flush the processed model
-            if self.verbosity > 2:
-                self.log(f" Truncating {m._meta.db_table}")
-            with connection.cursor() as c:
-                c.execute(
-                    f'TRUNCATE TABLE "{m._meta.db_table}" RESTART IDENTITY CASCADE'
-                )
-
-            # load the processed model
-            if self.verbosity > 2:
-                self.log(f" Loading {m._meta.db_table}")
-            m.objects.load()
+    def truncate_model_list(self, model_list):
+        """Truncate all of the given models in a single statement."""
+        tables = ", ".join(f'"{m._meta.db_table}"' for m in model_list)
+        if self.verbosity > 2:
+            self.log(f" Truncating {len(model_list)} tables")
+        with connection.cursor() as c:
+            c.execute(f"TRUNCATE TABLE {tables} RESTART IDENTITY CASCADE")
+
+    def archive_model_list(self, model_list):
+        """Archive a CSV file for each of the given models, several at a time."""
+        lookup = dict((m._meta.object_name, m) for m in model_list)
+        self.archive_files(
+            lookup,
+            workers=self.workers,
+            compression=self.compression,
+            zip=self.zip,
+            format=self.format,
+            force=self.force_archive,
+            split_cycles=self.split_cycles,
+        )
+
+    def log_node(self, node):
+        """Log the timing of a node in the load graph once it finishes."""
+        if self.verbosity >= 2:
+            self.log(f" Loaded {node} in {node.duration:.2f}s")
+
+    def log_step(self, step):
+        """Log the timing of an index rebuild step once it finishes."""
+        if self.verbosity < 2:
+            return
+        if step.name == step.table:
+            self.log(f" Analyzed {step.table} in {step.duration:.2f}s")
+        else:
+            self.log(f" Rebuilt {step} on {step.table} in {step.duration:.2f}s")
+
+    def log_critical_path(self, graph):
+        """Log the chain of models that determined how long the load took."""
+        if self.verbosity < 2:
+            return
+        path, total = graph.get_critical_path()
+        self.log(f" Critical path ({total:.2f}s):")
+        for name in path:
+            self.log(f"  {name} ({graph.nodes[name].duration:.2f}s)")
@@ -1,10 +1,14 @@
 """Custom manager for loading raw data in to "filings" models."""
-import itertools
+import re
+import hashlib
 
-from django.db.models import Q
-from django.db import connection
+from django.db.models import Exists, OuterRef, Q
+from django.db import connection, transaction
 
 from calaccess_processed.managers import BulkLoadSQLManager
+from calaccess_processed.telemetry import record_step
+from calaccess_processed_filings.graph import parse_sql_tables
+from calaccess_processed_filings.partitions import get_cycles, get_cycle_bounds
 
 
 class FilingsManager(BulkLoadSQLManager):
@@ -14,6 +18,12 @@ class FilingsManager(BulkLoadSQLManager):
 
     app_name = "calaccess_processed_filings"
 
+    # Temporary table with the filing_id and amend_id of filings to reprocess
+    changed_table = "calaccess_processed_filings_changed"
+
+    # Date column the model's table can be partitioned on by election cycle
+    partition_column = None
+
     def get_sql(self):
         """
         Return string of raw sql for loading the model.
@@ -30,24 +40,855 @@ class FilingsManager(BulkLoadSQLManager):
         file_name = f"load_{self.model._meta.model_name}_model"
         return self.get_sql_path(file_name)
 
-    def load(self):
+    def load(self, incremental=False, shadow=False, rebuild=None):
         """
         Load the model by executing its corresponding raw SQL query.
 
         Temporarily drops any constraints or indexes on the model.
+
+        If incremental is True, only rows for the filings in the changed table
+        are inserted, and the constraints and indexes are left in place.
+
+        If shadow is True, the model is built in a shadow table that replaces
+        the current table once it is complete. The rows on other tables that
+        refer to the model are then checked, which raises an IntegrityError if
+        any refer to a row the model no longer has.
+
+        If rebuild is an IndexRebuild, the dropped constraints and indexes are
+        added to it to be restored along with every other model's, instead of
+        being restored right away. After a shadow swap, checking the rows that
+        refer to the model is left for the caller to add to the rebuild, once
+        those tables are loaded too.
         """
+        if incremental:
+            self.execute_sql(self.get_incremental_sql())
+            return
+
+        if shadow:
+            self.build_shadow()
+            self.swap_shadow()
+            # Check the rows on tables referring to the model, unless the rebuild does
+            if rebuild is None:
+                self.validate_foreign_keys()
+            return
+
         # Drop constraints and indexes to speed loading
         self.get_queryset().drop_constraints()
         self.get_queryset().drop_indexes()
 
         # Run the actual loader SQL
-        with connection.cursor() as c:
-            c.execute(self.get_sql())
+        self.execute_sql(self.get_sql())
 
         # Restore the constraints and index that were dropped
+        if rebuild is not None:
+            rebuild.add_model(self.model)
+            return
         self.get_queryset().restore_constraints()
         self.get_queryset().restore_indexes()
 
+    def get_restore_sql(self):
+        """
+        Returns the statements that restore the model's dropped constraints and indexes.
+
+        These are what restore_constraints and restore_indexes run, collected
+        from the schema editor instead of executed. Anything else the editor
+        would do to get there, like dropping a foreign key it then adds back, is
+        left out.
+        """
+        queryset = self.get_queryset()
+        with connection.schema_editor(collect_sql=True) as schema_editor:
+            if getattr(self.model._meta, "unique_together", False):
+                schema_editor.alter_unique_together(
+                    self.model, (), self.model._meta.unique_together
+                )
+            for field in queryset.constrained_fields:
+                field_copy = field.__copy__()
+                field_copy.db_constraint = False
+                schema_editor.alter_field(self.model, field_copy, field)
+            if getattr(self.model._meta, "index_together", False):
+                schema_editor.alter_index_together(
+                    self.model, (), self.model._meta.index_together
+                )
+            for field in queryset.indexed_fields:
+                field_copy = field.__copy__()
+                field_copy.db_index = False
+                schema_editor.alter_field(self.model, field_copy, field)
+
+        sql_list = []
+        for sql in schema_editor.collected_sql:
+            if sql in sql_list:
+                continue
+            if sql.startswith("CREATE") or (
+                sql.startswith("ALTER TABLE") and "ADD CONSTRAINT" in sql
+            ):
+                sql_list.append(sql)
+        return sql_list
+
+    def execute_sql(self, sql, name=None):
+        """
+        Execute a loading query, recording it as a step of the current processing run.
+
+        Returns the number of rows it inserted.
+        """
+        writes, reads = parse_sql_tables(sql)
+        with record_step("sql", name or self.model.__name__, writes, reads) as step:
+            with connection.cursor() as c:
+                c.execute(sql)
+                step.rows_affected = c.rowcount
+        return step.rows_affected
+
+    def is_partitioned(self, table=None):
+        """
+        Returns True if the model's table, or the given table, is partitioned.
+        """
+        if not self.partition_column:
+            return False
+        with connection.cursor() as c:
+            c.execute(
+                "SELECT EXISTS (SELECT 1 FROM pg_partitioned_table "
+                "WHERE partrelid = %s::regclass)",
+                [table or self.model._meta.db_table],
+            )
+            return c.fetchone()[0]
+
+    def get_changed_filter(self, alias):
+        """
+        Return a SQL condition limiting the model's rows to the changed filings.
+
+        Version models are matched on filing_id and amend_id, either directly or
+        through their parent filing version. Other models are matched on filing_id.
+        """
+        field_names = [f.name for f in self.model._meta.fields]
+        if "filing_version" in field_names:
+            parent = self.model._meta.get_field("filing_version").related_model
+            return (
+                f"{alias}.filing_version_id IN ("
+                f"SELECT v.id FROM {parent._meta.db_table} v "
+                f"JOIN {self.changed_table} c "
+                "ON v.filing_id = c.filing_id AND v.amend_id = c.amend_id)"
+            )
+        elif "amend_id" in field_names:
+            return (
+                f"({alias}.filing_id, {alias}.amend_id) IN "
+                f"(SELECT filing_id, amend_id FROM {self.changed_table})"
+            )
+        return f"{alias}.filing_id IN (SELECT filing_id FROM {self.changed_table})"
+
+    def get_incremental_sql(self):
+        """
+        Return the model's loading query limited to the changed filings.
+        """
+        return self.get_filtered_sql(self.get_changed_filter("src"))
+
+    def get_filtered_sql(self, condition):
+        """
+        Return the model's loading query limited to the rows matching a condition.
+
+        The original SELECT is wrapped in a subquery aliased as src so its output
+        can be filtered by the insert's column names.
+        """
+        match = re.match(
+            r"\s*(INSERT\s+INTO\s+\w+\s*\(([^)]*)\))\s*(SELECT.*?);?\s*$",
+            self.get_sql(),
+            re.I | re.S,
+        )
+        if not match:
+            raise ValueError(f"Can't parse the loading query in {self.sql_path}")
+        insert, columns, select = match.groups()
+        columns = ", ".join(c.strip() for c in columns.split(","))
+        return (
+            f"{insert}\nSELECT * FROM (\n{select}\n) AS src ({columns})\n"
+            f"WHERE {condition};"
+        )
+
+    def delete_changed(self):
+        """
+        Delete the model's rows for the changed filings.
+
+        Returns the number of rows deleted.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                f'DELETE FROM "{self.model._meta.db_table}" AS src '
+                f"WHERE {self.get_changed_filter('src')}"
+            )
+            return c.rowcount
+
+    @property
+    def shadow_table(self):
+        """
+        Return the name of the table where the model is built before it is swapped in.
+        """
+        return "shadow_%s" % self.model._meta.db_table.split("calaccess_processed_")[-1]
+
+    def get_shadow_name(self, name):
+        """
+        Return the temporary name for an index or constraint copied to the shadow table.
+        """
+        digest = hashlib.md5(f"{self.shadow_table}.{name}".encode()).hexdigest()
+        return f"shadow_{digest[:24]}"
+
+    def rename_tables(self, sql, tables):
+        """
+        Return the SQL with the tables in the dictionary replaced by their new names.
+        """
+        for old, new in tables.items():
+            sql = re.sub(r'"?\b%s\b"?' % old, f'"{new}"', sql)
+        return sql
+
+    def get_indexes(self, cursor, table):
+        """
+        Returns the name and definition of each index on a table.
+
+        Includes the name of the primary key or unique constraint the index
+        enforces, if there is one.
+        """
+        cursor.execute(
+            """
+            SELECT i.relname, pg_get_indexdef(x.indexrelid), con.conname, con.contype
+            FROM pg_index x
+            JOIN pg_class i ON i.oid = x.indexrelid
+            LEFT JOIN pg_constraint con
+            ON con.conindid = x.indexrelid
+            AND con.conrelid = x.indrelid
+            AND con.contype IN ('p', 'u')
+            WHERE x.indrelid = %s::regclass
+            ORDER BY i.relname
+            """,
+            [table],
+        )
+        return cursor.fetchall()
+
+    def get_foreign_keys(self, cursor, table, referencing=False):
+        """
+        Returns the table, name and definition of the foreign keys on a table.
+
+        If referencing is True, returns the foreign keys on other tables that
+        refer to it instead. The copies of a partitioned table's foreign keys on
+        each of its partitions are left out.
+        """
+        column = "confrelid" if referencing else "conrelid"
+        cursor.execute(
+            f"""
+            SELECT conrelid::regclass::text, conname, pg_get_constraintdef(oid)
+            FROM pg_constraint
+            WHERE {column} = %s::regclass
+            AND contype = 'f'
+            AND conrelid <> confrelid
+            AND conparentid = 0
+            ORDER BY conname
+            """,
+            [table],
+        )
+        return [(t, n, d.replace(" NOT VALID", "")) for t, n, d in cursor.fetchall()]
+
+    def get_validate_sql(self):
+        """
+        Returns the statements that validate foreign keys left NOT VALID by a swap.
+
+        Only the foreign keys on other tables that refer to the model are included.
+        """
+        with connection.cursor() as c:
+            c.execute(
+                """
+                SELECT conrelid::regclass::text, conname
+                FROM pg_constraint
+                WHERE confrelid = %s::regclass
+                AND contype = 'f'
+                AND NOT convalidated
+                AND conrelid <> confrelid
+                AND conparentid = 0
+                ORDER BY conname
+                """,
+                [self.model._meta.db_table],
+            )
+            return [
+                f'ALTER TABLE {child} VALIDATE CONSTRAINT "{name}"'
+                for child, name in c.fetchall()
+            ]
+
+    def validate_foreign_keys(self):
+        """
+        Validate the foreign keys on other tables left NOT VALID by a swap.
+
+        Raises an IntegrityError if a row refers to one the model no longer has.
+        """
+        sql_list = self.get_validate_sql()
+        with connection.cursor() as c:
+            for sql in sql_list:
+                c.execute(sql)
+
+    def get_sequence(self, cursor, table):
+        """
+        Returns the name of the sequence behind the table's primary key, if it has one.
+        """
+        cursor.execute(
+            "SELECT pg_get_serial_sequence(%s, %s)", [table, self.model._meta.pk.column]
+        )
+        return cursor.fetchone()[0]
+
+    def build_shadow(self, tables=None):
+        """
+        Build the model in an UNLOGGED shadow table, ready to be swapped in.
+
+        The indexes, constraints and grants on the current table are copied to the
+        shadow after it is loaded, then it is switched to a logged table and analyzed.
+
+        Args:
+            tables (dict): Optional names of other shadow tables, keyed by the table
+                they replace, that the model's SQL and foreign keys should use.
+        """
+        tables = dict(tables or {})
+        tables[self.model._meta.db_table] = self.shadow_table
+
+        self.create_shadow()
+        self.execute_sql(self.rename_tables(self.get_sql(), tables))
+        self.finish_shadow(tables)
+
+    def create_shadow(self):
+        """
+        Create an empty UNLOGGED shadow table with the same columns as the model's table.
+        """
+        table = self.model._meta.db_table
+        shadow = self.shadow_table
+
+        with connection.cursor() as c:
+            c.execute(f'DROP TABLE IF EXISTS "{shadow}"')
+            c.execute(
+                f'CREATE UNLOGGED TABLE "{shadow}" (LIKE "{table}" '
+                "INCLUDING DEFAULTS INCLUDING IDENTITY "
+                "INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+            )
+            self.restart_sequence(c, table, shadow)
+
+    def restart_sequence(self, cursor, table, shadow):
+        """
+        Restart the serial sequence a shadow table shares with the current table.
+
+        Serial primary keys are copied to the shadow along with their default,
+        so this does what a TRUNCATE ... RESTART IDENTITY would.
+        """
+        sequence = self.get_sequence(cursor, table)
+        if sequence and not self.get_sequence(cursor, shadow):
+            cursor.execute("SELECT setval(%s, 1, false)", [sequence])
+
+    def finish_shadow(self, tables):
+        """
+        Copy the indexes, constraints and grants to a loaded shadow table and analyze it.
+
+        Args:
+            tables (dict): Names of the shadow tables, keyed by the table they
+                replace, that the copied foreign keys should refer to.
+        """
+        table = self.model._meta.db_table
+        shadow = self.shadow_table
+
+        with connection.cursor() as c:
+            self.copy_indexes(c, table, shadow)
+            self.copy_foreign_keys(c, table, shadow, tables)
+            self.copy_grants(c, table, shadow)
+            self.persist_shadow(c, table, shadow)
+
+    def copy_indexes(self, cursor, table, shadow):
+        """
+        Copy the indexes, primary key and unique constraints on a table to its shadow.
+
+        Each copy is given a temporary name until the shadow is swapped in.
+        """
+        for name, definition, constraint, kind in self.get_indexes(cursor, table):
+            temp_name = self.get_shadow_name(name)
+            cursor.execute(
+                re.sub(
+                    r"^(CREATE (?:UNIQUE )?INDEX )\S+( ON (?:ONLY )?)\S+",
+                    f'\\1"{temp_name}"\\2"{shadow}"',
+                    definition,
+                )
+            )
+            if constraint:
+                kind = "PRIMARY KEY" if kind == "p" else "UNIQUE"
+                cursor.execute(
+                    f'ALTER TABLE "{shadow}" ADD CONSTRAINT "{temp_name}" '
+                    f'{kind} USING INDEX "{temp_name}"'
+                )
+
+    def copy_foreign_keys(self, cursor, table, shadow, tables):
+        """
+        Copy the foreign keys on a table to its shadow, pointed at the other shadows.
+        """
+        for _, name, definition in self.get_foreign_keys(cursor, table):
+            cursor.execute(
+                f'ALTER TABLE "{shadow}" ADD CONSTRAINT '
+                f'"{self.get_shadow_name(name)}" '
+                f"{self.rename_tables(definition, tables)}"
+            )
+
+    def copy_grants(self, cursor, table, shadow):
+        """
+        Grant the roles with privileges on a table the same privileges on its shadow.
+        """
+        cursor.execute(
+            """
+            SELECT a.privilege_type, COALESCE(r.rolname, 'PUBLIC')
+            FROM pg_class t
+            CROSS JOIN aclexplode(t.relacl) a
+            LEFT JOIN pg_roles r ON r.oid = a.grantee
+            WHERE t.oid = %s::regclass
+            AND a.grantee <> t.relowner
+            """,
+            [table],
+        )
+        for privilege, role in cursor.fetchall():
+            role = role if role == "PUBLIC" else f'"{role}"'
+            cursor.execute(f'GRANT {privilege} ON "{shadow}" TO {role}')
+
+    def persist_shadow(self, cursor, table, shadow):
+        """
+        Switch the shadow to a logged table if the current one is, then analyze it.
+        """
+        cursor.execute(
+            "SELECT relpersistence FROM pg_class WHERE oid = %s::regclass", [table]
+        )
+        if cursor.fetchone()[0] == "p":
+            cursor.execute(f'ALTER TABLE "{shadow}" SET LOGGED')
+        cursor.execute(f'ANALYZE "{shadow}"')
+
+    def swap_shadow(self):
+        """
+        Replace the model's table with its shadow table in a single transaction.
+
+        Indexes and constraints are given back their original names. Foreign keys
+        on other tables that refer to the model are restored NOT VALID, so the swap
+        doesn't wait on checking their rows. Run validate_foreign_keys, or the
+        statements from get_validate_sql, once those tables are loaded too.
+        """
+        table = self.model._meta.db_table
+        shadow = self.shadow_table
+
+        with transaction.atomic(), connection.cursor() as c:
+            indexes = self.get_indexes(c, table)
+            shadow_constraints = set(i[2] for i in self.get_indexes(c, shadow) if i[2])
+            foreign_keys = self.get_foreign_keys(c, table)
+            referencing = self.get_foreign_keys(c, table, referencing=True)
+            sequence = self.get_sequence(c, table)
+            shadow_sequence = self.get_sequence(c, shadow)
+
+            for child, name, _ in referencing:
+                c.execute(f'ALTER TABLE {child} DROP CONSTRAINT "{name}"')
+
+            # Keep a shared serial sequence from being dropped with the current table
+            if sequence and not shadow_sequence:
+                c.execute(
+                    f"ALTER SEQUENCE {sequence} "
+                    f'OWNED BY "{shadow}"."{self.model._meta.pk.column}"'
+                )
+
+            c.execute(f'DROP TABLE "{table}"')
+            c.execute(f'ALTER TABLE "{shadow}" RENAME TO "{table}"')
+
+            # A constraint the shadow couldn't keep is left as a plain index
+            for name, _, constraint, _ in indexes:
+                if self.get_shadow_name(name) in shadow_constraints:
+                    c.execute(
+                        f'ALTER TABLE "{table}" RENAME CONSTRAINT '
+                        f'"{self.get_shadow_name(name)}" TO "{constraint}"'
+                    )
+                else:
+                    c.execute(
+                        f'ALTER INDEX "{self.get_shadow_name(name)}" RENAME TO "{name}"'
+                    )
+            for _, name, _ in foreign_keys:
+                c.execute(
+                    f'ALTER TABLE "{table}" RENAME CONSTRAINT '
+                    f'"{self.get_shadow_name(name)}" TO "{name}"'
+                )
+            if sequence and shadow_sequence:
+                sequence_name = sequence.split(".")[-1].strip('"')
+                c.execute(
+                    f'ALTER SEQUENCE {shadow_sequence} RENAME TO "{sequence_name}"'
+                )
+
+            for child, name, definition in referencing:
+                c.execute(
+                    f'ALTER TABLE {child} ADD CONSTRAINT "{name}" '
+                    f"{definition} NOT VALID"
+                )
+
+
+class PartitionedFilingsManager(FilingsManager):
+    """
+    Utilities for loading filings models that can be partitioned by election cycle.
+
+    Partitioning is optional. The model's table is only split into a partition for
+    each two-year cycle, plus a default partition for undated rows, once it is
+    converted with the partitioncalaccessfilings command. Until then the model
+    is loaded like any other.
+    """
+
+    def __init__(self, partition_column):
+        """
+        Create a new manager.
+
+        Args:
+            partition_column (str): The date column rows are partitioned on.
+        """
+        super(PartitionedFilingsManager, self).__init__()
+        self.partition_column = partition_column
+
+    def get_partition_name(self, cycle=None):
+        """
+        Return the name of the partition for an election cycle, or the default one.
+        """
+        return f"{self.model._meta.db_table}_{cycle or 'default'}"
+
+    def get_partition_list(self):
+        """
+        Returns the name and bounds of every partition the table is split into.
+        """
+        partition_list = []
+        for cycle in get_cycles():
+            start, end = get_cycle_bounds(cycle)
+            partition_list.append(
+                (
+                    self.get_partition_name(cycle),
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')",
+                )
+            )
+        partition_list.append((self.get_partition_name(), "DEFAULT"))
+        return partition_list
+
+    def get_cycle_list(self):
+        """
+        Returns the election cycles the table is split into, plus None for the default.
+        """
+        return get_cycles() + [None]
+
+    def get_cycle_filter(self, cycle=None):
+        """
+        Return a Q object matching the rows in an election cycle's partition.
+
+        Without a cycle, it matches the rows in the default partition, those that
+        are undated or dated outside every cycle.
+        """
+        column = self.partition_column
+        if cycle is not None:
+            start, end = get_cycle_bounds(cycle)
+            return Q(**{f"{column}__gte": start, f"{column}__lt": end})
+        cycle_list = get_cycles()
+        start = get_cycle_bounds(cycle_list[0])[0]
+        end = get_cycle_bounds(cycle_list[-1])[1]
+        return (
+            Q(**{f"{column}__isnull": True})
+            | Q(**{f"{column}__lt": start})
+            | Q(**{f"{column}__gte": end})
+        )
+
+    def get_shadow_partition_lookup(self):
+        """
+        Returns a dictionary with each partition's name keyed by its name in a shadow.
+        """
+        return dict((self.get_shadow_name(n), n) for n, _ in self.get_partition_list())
+
+    def get_partitions(self, cursor, table):
+        """
+        Returns the name and bounds of each partition currently attached to a table.
+        """
+        cursor.execute(
+            """
+            SELECT c.relname, pg_get_expr(c.relpartbound, c.oid)
+            FROM pg_inherits i
+            JOIN pg_class c ON c.oid = i.inhrelid
+            WHERE i.inhparent = %s::regclass
+            ORDER BY c.relname
+            """,
+            [table],
+        )
+        return cursor.fetchall()
+
+    def get_partition_index_name(self, partition, name):
+        """
+        Return the name of the copy of an index on one of the partitions.
+        """
+        digest = hashlib.md5(f"{partition}.{name}".encode()).hexdigest()
+        return f"{partition[:54]}_{digest[:8]}"
+
+    def get_index_sql(self, definition, name, table, only=False):
+        """
+        Return an index definition rewritten with a new name and table.
+
+        Unique indexes are made plain, since Postgres can only enforce them across
+        partitions if they include the partition column.
+
+        Args:
+            only (bool): Create the index on a partitioned table without
+                recursing to its partitions.
+        """
+        using = re.match(
+            r"^CREATE (?:UNIQUE )?INDEX \S+ ON (?:ONLY )?\S+ (.*)$", definition
+        ).group(1)
+        only = "ONLY " if only else ""
+        return f'CREATE INDEX "{name}" ON {only}"{table}" {using}'
+
+    def vacuum(self, cursor, table):
+        """
+        Vacuum a freshly loaded table, unless inside a transaction that won't allow it.
+        """
+        if not connection.in_atomic_block:
+            cursor.execute(f'VACUUM "{table}"')
+
+    def load(self, incremental=False, shadow=False, rebuild=None):
+        """
+        Load the model by executing its corresponding raw SQL query.
+
+        A full load of a partitioned table always builds a new partitioned shadow
+        table and swaps it in, so each partition is indexed and vacuumed on its own.
+        It is never added to a rebuild.
+        """
+        if not incremental and not shadow and self.is_partitioned():
+            shadow = True
+        super(PartitionedFilingsManager, self).load(
+            incremental=incremental, shadow=shadow, rebuild=rebuild
+        )
+
+    def partition(self):
+        """
+        Split the model's table into a partition for each election cycle.
+
+        The rows are copied into a partitioned shadow table, which is swapped in for
+        the current table. Running this on a table that's already partitioned adds
+        partitions for any new cycles.
+        """
+        self.create_shadow(partitioned=True)
+        with connection.cursor() as c:
+            c.execute(
+                f'INSERT INTO "{self.shadow_table}" '
+                f'SELECT * FROM "{self.model._meta.db_table}"'
+            )
+        self.finish_shadow({})
+        self.swap_shadow()
+        self.validate_foreign_keys()
+
+    def create_shadow(self, partitioned=None):
+        """
+        Create an empty shadow table with the same columns as the model's table.
+
+        Args:
+            partitioned (bool): Split the shadow into UNLOGGED partitions for each
+                election cycle. Defaults to True if the current table is partitioned.
+        """
+        if partitioned is None:
+            partitioned = self.is_partitioned()
+        if not partitioned:
+            return super(PartitionedFilingsManager, self).create_shadow()
+
+        table = self.model._meta.db_table
+        shadow = self.shadow_table
+
+        with connection.cursor() as c:
+            c.execute(f'DROP TABLE IF EXISTS "{shadow}"')
+            c.execute(
+                f'CREATE TABLE "{shadow}" (LIKE "{table}" '
+                "INCLUDING DEFAULTS INCLUDING IDENTITY "
+                "INCLUDING CONSTRAINTS INCLUDING STORAGE) "
+                f'PARTITION BY RANGE ("{self.partition_column}")'
+            )
+            for name, bounds in self.get_partition_list():
+                c.execute(
+                    f'CREATE UNLOGGED TABLE "{self.get_shadow_name(name)}" '
+                    f'PARTITION OF "{shadow}" {bounds}'
+                )
+            self.restart_sequence(c, table, shadow)
+
+    def copy_indexes(self, cursor, table, shadow):
+        """
+        Copy the indexes on a table to its shadow, one partition at a time.
+        """
+        if not self.is_partitioned(shadow):
+            return super(PartitionedFilingsManager, self).copy_indexes(
+                cursor, table, shadow
+            )
+
+        lookup = self.get_shadow_partition_lookup()
+        partitions = [p for p, _ in self.get_partitions(cursor, shadow)]
+        for name, definition, _, _ in self.get_indexes(cursor, table):
+            temp_name = self.get_shadow_name(name)
+            cursor.execute(self.get_index_sql(definition, temp_name, shadow, only=True))
+            for partition in partitions:
+                child = self.get_shadow_name(
+                    self.get_partition_index_name(lookup[partition], name)
+                )
+                cursor.execute(self.get_index_sql(definition, child, partition))
+                cursor.execute(f'ALTER INDEX "{temp_name}" ATTACH PARTITION "{child}"')
+
+    def persist_shadow(self, cursor, table, shadow):
+        """
+        Switch the shadow's partitions to logged tables and vacuum them, then analyze.
+        """
+        if not self.is_partitioned(shadow):
+            return super(PartitionedFilingsManager, self).persist_shadow(
+                cursor, table, shadow
+            )
+
+        cursor.execute(
+            "SELECT relpersistence FROM pg_class WHERE oid = %s::regclass", [table]
+        )
+        logged = cursor.fetchone()[0] == "p"
+        for partition, _ in self.get_partitions(cursor, shadow):
+            if logged:
+                cursor.execute(f'ALTER TABLE "{partition}" SET LOGGED')
+            self.vacuum(cursor, partition)
+        cursor.execute(f'ANALYZE "{shadow}"')
+
+    def swap_shadow(self):
+        """
+        Replace the model's table with its shadow table in a single transaction.
+
+        The partitions of a partitioned shadow, and their indexes and foreign keys,
+        are renamed after the table they now belong to.
+        """
+        table = self.model._meta.db_table
+        shadow = self.shadow_table
+        if not self.is_partitioned(shadow):
+            return super(PartitionedFilingsManager, self).swap_shadow()
+
+        lookup = self.get_shadow_partition_lookup()
+        with transaction.atomic(), connection.cursor() as c:
+            partitions = [p for p, _ in self.get_partitions(c, shadow)]
+            super(PartitionedFilingsManager, self).swap_shadow()
+
+            index_names = [i[0] for i in self.get_indexes(c, table)]
+            foreign_key_names = [n for _, n, _ in self.get_foreign_keys(c, table)]
+            for shadow_partition in partitions:
+                partition = lookup[shadow_partition]
+                c.execute(f'ALTER TABLE "{shadow_partition}" RENAME TO "{partition}"')
+                for name in index_names:
+                    child = self.get_partition_index_name(partition, name)
+                    temp_name = self.get_shadow_name(child)
+                    c.execute(f'ALTER INDEX "{temp_name}" RENAME TO "{child}"')
+                # each partition's copy of a foreign key shares its parent's name
+                for name in foreign_key_names:
+                    c.execute(
+                        f'ALTER TABLE "{partition}" RENAME CONSTRAINT '
+                        f'"{self.get_shadow_name(name)}" TO "{name}"'
+                    )
+
+    def load_cycles(self, cycles):
+        """
+        Reload the partitions for a list of election cycles, leaving the rest alone.
+        """
+        for cycle in cycles:
+            self.load_partition(cycle)
+
+    def load_partition(self, cycle):
+        """
+        Reload the partition for a single election cycle.
+
+        The partition is built in a standalone table, which is indexed and vacuumed
+        before it's attached to the model's table in place of the current partition.
+
+        Raises a ValueError if the model's table doesn't have a partition for the cycle.
+        """
+        table = self.model._meta.db_table
+        partition = self.get_partition_name(cycle)
+        shadow = self.get_shadow_name(partition)
+        start, end = get_cycle_bounds(cycle)
+
+        with connection.cursor() as c:
+            if partition not in [p for p, _ in self.get_partitions(c, table)]:
+                raise ValueError(f"{table} doesn't have a partition for {cycle}")
+
+            c.execute(f'DROP TABLE IF EXISTS "{shadow}"')
+            c.execute(
+                f'CREATE UNLOGGED TABLE "{shadow}" (LIKE "{table}" '
+                "INCLUDING DEFAULTS INCLUDING CONSTRAINTS INCLUDING STORAGE)"
+            )
+            column = f"src.{self.partition_column}"
+            sql = self.get_filtered_sql(
+                f"{column} >= '{start}' AND {column} < '{end}'"
+            )
+            self.execute_sql(
+                self.rename_tables(sql, {table: shadow}),
+                name=f"{self.model.__name__} {cycle}",
+            )
+
+            index_names = []
+            for name, definition, _, _ in self.get_indexes(c, table):
+                child = self.get_partition_index_name(partition, name)
+                c.execute(
+                    self.get_index_sql(definition, self.get_shadow_name(child), shadow)
+                )
+                index_names.append(child)
+
+            c.execute(
+                "SELECT relpersistence FROM pg_class WHERE oid = %s::regclass",
+                [partition],
+            )
+            if c.fetchone()[0] == "p":
+                c.execute(f'ALTER TABLE "{shadow}" SET LOGGED')
+            self.vacuum(c, shadow)
+            c.execute(f'ANALYZE "{shadow}"')
+
+            # Matching indexes are attached to the table's indexes, not rebuilt
+            with transaction.atomic():
+                c.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{partition}"')
+                c.execute(f'DROP TABLE "{partition}"')
+                c.execute(f'ALTER TABLE "{shadow}" RENAME TO "{partition}"')
+                for child in index_names:
+                    temp_name = self.get_shadow_name(child)
+                    c.execute(f'ALTER INDEX "{temp_name}" RENAME TO "{child}"')
+                c.execute(
+                    f'ALTER TABLE "{table}" ATTACH PARTITION "{partition}" '
+                    f"FOR VALUES FROM ('{start}') TO ('{end}')"
+                )
+
+
+class FilingsHighWaterMarkManager(BulkLoadSQLManager):
+    """
+    A custom manager for the marks recorded after each filings load.
+    """
+
+    app_name = "calaccess_processed_filings"
+
+    def _execute_sql_file(self, file_name, params=None):
+        """
+        Execute the SQL file with the given name and return the cursor's rows.
+        """
+        with open(self.get_sql_path(file_name), "r") as fp:
+            sql = fp.read()
+        with connection.cursor() as c:
+            c.execute(sql, params)
+            if c.description:
+                return c.fetchall()
+            return c.rowcount
+
+    def get_current_values(self):
+        """
+        Returns a dictionary with the mark for the raw data currently in the database.
+        """
+        max_filing_date, max_filing_id = self._execute_sql_file(
+            "select_filings_high_water_mark"
+        )[0]
+        return dict(max_filing_date=max_filing_date, max_filing_id=max_filing_id)
+
+    def create_changed_table(self, mark):
+        """
+        Create the temporary table of filings added or amended since the given mark.
+
+        The table is dropped at the end of the current transaction.
+
+        Returns the number of filing versions in the table.
+        """
+        self._execute_sql_file(
+            "create_changed_filings_table",
+            dict(
+                max_filing_date=mark.max_filing_date,
+                max_filing_id=mark.max_filing_id or 0,
+            ),
+        )
+        with connection.cursor() as c:
+            c.execute(f"ANALYZE {FilingsManager.changed_table}")
+            c.execute(f"SELECT COUNT(*) FROM {FilingsManager.changed_table}")
+            return c.fetchone()[0]
+
 
 class Form501FilingManager(FilingsManager):
     """
@@ -58,10 +899,9 @@ class Form501FilingManager(FilingsManager):
         """
         Returns Form 501 filings that do not have an OCD Candidacy yet.
         """
-        from calaccess_processed_elections.proxies import OCDCandidacyProxy
+        from calaccess_processed_elections.models import CandidacyForm501
 
-        matched_qs = OCDCandidacyProxy.objects.matched_form501_ids()
-        matched_list = [i for i in itertools.chain.from_iterable(matched_qs)]
+        matched_qs = CandidacyForm501.objects.filter(filing_id=OuterRef("filing_id"))
         return self.get_queryset().exclude(
-            Q(filing_id__in=matched_list) | Q(office__icontains="RETIREMENT")
+            Q(Exists(matched_qs)) | Q(office__icontains="RETIREMENT")
         )
@@ -0,0 +1,64 @@
+# Generated by Django 4.0.10 on 2026-10-18 04:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calaccess_processed_filings", "0011_auto_20210426_1923"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FilingsHighWaterMark",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_datetime",
+                    models.DateTimeField(
+                        auto_now_add=True, help_text="Date and time the load finished"
+                    ),
+                ),
+                (
+                    "incremental",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Indicates if the load only processed changed filings",
+                    ),
+                ),
+                (
+                    "max_filing_date",
+                    models.DateField(
+                        help_text="Latest FILING_DATE in FILER_FILINGS_CD when the load ran",
+                        null=True,
+                    ),
+                ),
+                (
+                    "max_filing_id",
+                    models.IntegerField(
+                        help_text="Largest FILING_ID in the raw cover sheet tables when the load ran",
+                        null=True,
+                    ),
+                ),
+                (
+                    "changed_filing_count",
+                    models.IntegerField(
+                        help_text="Number of filing versions reprocessed by an incremental load",
+                        null=True,
+                    ),
+                ),
+            ],
+            options={
+                "get_latest_by": "created_datetime",
+            },
+        ),
+    ]
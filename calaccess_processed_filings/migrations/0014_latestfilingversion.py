@@ -0,0 +1,178 @@
+# Generated by Django 4.0.10 on 2026-10-18 04:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("calaccess_processed_filings", "0013_form460summarypivot"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Form460LatestFilingVersion",
+            fields=[
+                (
+                    "filing_id",
+                    models.IntegerField(
+                        help_text="Unique identification number for the filing",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "amendment_count",
+                    models.IntegerField(
+                        help_text="Number of amendments to the filing, which is also the amend_id of its most recent version"
+                    ),
+                ),
+                (
+                    "latest_version_id",
+                    models.IntegerField(
+                        db_index=True,
+                        help_text="Id of the most recent version of the filing in its filing version table",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Form 460 (Campaign Disclosure) latest filing version",
+            },
+        ),
+        migrations.CreateModel(
+            name="Form461LatestFilingVersion",
+            fields=[
+                (
+                    "filing_id",
+                    models.IntegerField(
+                        help_text="Unique identification number for the filing",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "amendment_count",
+                    models.IntegerField(
+                        help_text="Number of amendments to the filing, which is also the amend_id of its most recent version"
+                    ),
+                ),
+                (
+                    "latest_version_id",
+                    models.IntegerField(
+                        db_index=True,
+                        help_text="Id of the most recent version of the filing in its filing version table",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Form 461 (Campaign Disclosure) latest filing version",
+            },
+        ),
+        migrations.CreateModel(
+            name="Form496LatestFilingVersion",
+            fields=[
+                (
+                    "filing_id",
+                    models.IntegerField(
+                        help_text="Unique identification number for the filing",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "amendment_count",
+                    models.IntegerField(
+                        help_text="Number of amendments to the filing, which is also the amend_id of its most recent version"
+                    ),
+                ),
+                (
+                    "latest_version_id",
+                    models.IntegerField(
+                        db_index=True,
+                        help_text="Id of the most recent version of the filing in its filing version table",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Form 496 (Late Independent Expenditure) latest filing version",
+            },
+        ),
+        migrations.CreateModel(
+            name="Form497LatestFilingVersion",
+            fields=[
+                (
+                    "filing_id",
+                    models.IntegerField(
+                        help_text="Unique identification number for the filing",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "amendment_count",
+                    models.IntegerField(
+                        help_text="Number of amendments to the filing, which is also the amend_id of its most recent version"
+                    ),
+                ),
+                (
+                    "latest_version_id",
+                    models.IntegerField(
+                        db_index=True,
+                        help_text="Id of the most recent version of the filing in its filing version table",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Form 497 (Late Contribution) latest filing version",
+            },
+        ),
+        migrations.CreateModel(
+            name="Form501LatestFilingVersion",
+            fields=[
+                (
+                    "filing_id",
+                    models.IntegerField(
+                        help_text="Unique identification number for the filing",
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                (
+                    "amendment_count",
+                    models.IntegerField(
+                        help_text="Number of amendments to the filing, which is also the amend_id of its most recent version"
+                    ),
+                ),
+                (
+                    "latest_version_id",
+                    models.IntegerField(
+                        db_index=True,
+                        help_text="Id of the most recent version of the filing in its filing version table",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Form 501 (Candidate Intention) latest filing version",
+            },
+        ),
+        migrations.RunSQL(
+            "ALTER TABLE calaccess_processed_filings_form460latestfilingversion SET UNLOGGED",
+            "ALTER TABLE calaccess_processed_filings_form460latestfilingversion SET LOGGED",
+        ),
+        migrations.RunSQL(
+            "ALTER TABLE calaccess_processed_filings_form461latestfilingversion SET UNLOGGED",
+            "ALTER TABLE calaccess_processed_filings_form461latestfilingversion SET LOGGED",
+        ),
+        migrations.RunSQL(
+            "ALTER TABLE calaccess_processed_filings_form496latestfilingversion SET UNLOGGED",
+            "ALTER TABLE calaccess_processed_filings_form496latestfilingversion SET LOGGED",
+        ),
+        migrations.RunSQL(
+            "ALTER TABLE calaccess_processed_filings_form497latestfilingversion SET UNLOGGED",
+            "ALTER TABLE calaccess_processed_filings_form497latestfilingversion SET LOGGED",
+        ),
+        migrations.RunSQL(
+            "ALTER TABLE calaccess_processed_filings_form501latestfilingversion SET UNLOGGED",
+            "ALTER TABLE calaccess_processed_filings_form501latestfilingversion SET LOGGED",
+        ),
+    ]
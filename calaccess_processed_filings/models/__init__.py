@@ -3,7 +3,7 @@
 """
 Submodule for all filing-related models, managers and mixins.
 """
-from .base import FilingBaseModel
+from .base import FilingBaseModel, LatestFilingVersionBaseModel, StageBaseModel
 from .campaign import (
     CampaignContributionBase,
     CampaignExpenditureItemBase,
@@ -14,6 +14,7 @@ from .campaign import (
     CampaignLoanMadeItemBase,
     Form496Filing,
     Form496FilingVersion,
+    Form496LatestFilingVersion,
     Form496Part1Item,
     Form496Part1ItemVersion,
     Form496Part2Item,
@@ -22,6 +23,7 @@ from .campaign import (
     Form496Part3ItemVersion,
     Form497Filing,
     Form497FilingVersion,
+    Form497LatestFilingVersion,
     Form497ItemBase,
     Form497Part1ItemBase,
     Form497Part1Item,
@@ -32,6 +34,8 @@ from .campaign import (
     Form460FilingBase,
     Form460Filing,
     Form460FilingVersion,
+    Form460LatestFilingVersion,
+    Form460SummaryPivot,
     Form460ScheduleASummaryBase,
     Form460ScheduleASummary,
     Form460ScheduleASummaryVersion,
@@ -80,15 +84,20 @@ from .campaign import (
     Form460ScheduleIItemVersion,
     Form461Filing,
     Form461FilingVersion,
+    Form461LatestFilingVersion,
     Form461Part5Item,
     Form461Part5ItemVersion,
     Form501FilingBase,
     Form501Filing,
     Form501FilingVersion,
+    Form501LatestFilingVersion,
 )
+from .load import FilingsHighWaterMark
 
 __all__ = (
     "FilingBaseModel",
+    "LatestFilingVersionBaseModel",
+    "StageBaseModel",
     "CampaignContributionBase",
     "CampaignExpenditureItemBase",
     "CampaignExpenditureSubItemBase",
@@ -98,6 +107,7 @@ __all__ = (
     "CampaignLoanMadeItemBase",
     "Form496Filing",
     "Form496FilingVersion",
+    "Form496LatestFilingVersion",
     "Form496Part1Item",
     "Form496Part1ItemVersion",
     "Form496Part2Item",
@@ -106,6 +116,7 @@ __all__ = (
     "Form496Part3ItemVersion",
     "Form497Filing",
     "Form497FilingVersion",
+    "Form497LatestFilingVersion",
     "Form497ItemBase",
     "Form497Part1ItemBase",
     "Form497Part1Item",
@@ -116,6 +127,8 @@ __all__ = (
     "Form460FilingBase",
     "Form460Filing",
     "Form460FilingVersion",
+    "Form460LatestFilingVersion",
+    "Form460SummaryPivot",
     "Form460ScheduleASummaryBase",
     "Form460ScheduleASummary",
     "Form460ScheduleASummaryVersion",
@@ -164,9 +177,12 @@ __all__ = (
     "Form460ScheduleIItemVersion",
     "Form461Filing",
     "Form461FilingVersion",
+    "Form461LatestFilingVersion",
     "Form461Part5Item",
     "Form461Part5ItemVersion",
     "Form501FilingBase",
     "Form501Filing",
     "Form501FilingVersion",
+    "Form501LatestFilingVersion",
+    "FilingsHighWaterMark",
 )
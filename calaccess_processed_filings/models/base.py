@@ -2,6 +2,7 @@
 from time import sleep
 
 import requests
+from django.db import models
 
 from calaccess_processed.proxies import OCDProxyModelMixin
 from calaccess_processed.models import CalAccessBaseModel
@@ -57,3 +58,53 @@ class FilingBaseModel(CalAccessBaseModel, OCDProxyModelMixin):
         sleep(0.5)
         r = requests.head(self.pdf_url)
         return r.status_code == 200
+
+
+class StageBaseModel(models.Model):
+    """
+    Base model for intermediate tables built from the raw data before the filings models.
+
+    Stages are loaded with the same SQL files as the filings models, but they aren't
+    archived or published.
+    """
+
+    objects = FilingsManager()
+
+    class Meta:
+        """
+        Meta model options.
+        """
+
+        abstract = True
+        app_label = "calaccess_processed_filings"
+
+
+class LatestFilingVersionBaseModel(StageBaseModel):
+    """
+    Base model for maps from each filing to the id of its most recent version.
+
+    The loaders for the filing and its items join to the map instead of finding the
+    latest amendment in the filing version table again.
+    """
+
+    filing_id = models.IntegerField(
+        primary_key=True,
+        help_text="Unique identification number for the filing",
+    )
+    amendment_count = models.IntegerField(
+        help_text="Number of amendments to the filing, which is also the amend_id "
+        "of its most recent version",
+    )
+    latest_version_id = models.IntegerField(
+        db_index=True,
+        help_text="Id of the most recent version of the filing in its filing "
+        "version table",
+    )
+
+    class Meta:
+        """
+        Meta model options.
+        """
+
+        abstract = True
+        app_label = "calaccess_processed_filings"
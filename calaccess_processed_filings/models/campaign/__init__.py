@@ -15,6 +15,7 @@ from .base import (
 from .form496 import (
     Form496Filing,
     Form496FilingVersion,
+    Form496LatestFilingVersion,
     Form496Part1Item,
     Form496Part1ItemVersion,
     Form496Part2Item,
@@ -25,6 +26,7 @@ from .form496 import (
 from .form497 import (
     Form497Filing,
     Form497FilingVersion,
+    Form497LatestFilingVersion,
     Form497ItemBase,
     Form497Part1ItemBase,
     Form497Part1Item,
@@ -36,7 +38,9 @@ from .form497 import (
 from .form460 import (
     Form460FilingBase,
     Form460Filing,
+    Form460SummaryPivot,
     Form460FilingVersion,
+    Form460LatestFilingVersion,
     Form460ScheduleASummaryBase,
     Form460ScheduleASummary,
     Form460ScheduleASummaryVersion,
@@ -87,6 +91,7 @@ from .form460 import (
 from .form461 import (
     Form461Filing,
     Form461FilingVersion,
+    Form461LatestFilingVersion,
     Form461Part5Item,
     Form461Part5ItemVersion,
 )
@@ -94,6 +99,7 @@ from .form501 import (
     Form501FilingBase,
     Form501Filing,
     Form501FilingVersion,
+    Form501LatestFilingVersion,
 )
 
 
@@ -107,6 +113,7 @@ __all__ = (
     "CampaignLoanMadeItemBase",
     "Form496Filing",
     "Form496FilingVersion",
+    "Form496LatestFilingVersion",
     "Form496Part1Item",
     "Form496Part1ItemVersion",
     "Form496Part2Item",
@@ -115,6 +122,7 @@ __all__ = (
     "Form496Part3ItemVersion",
     "Form497Filing",
     "Form497FilingVersion",
+    "Form497LatestFilingVersion",
     "Form497ItemBase",
     "Form497Part1ItemBase",
     "Form497Part1Item",
@@ -123,8 +131,10 @@ __all__ = (
     "Form497Part2Item",
     "Form497Part2ItemVersion",
     "Form460FilingBase",
+    "Form460SummaryPivot",
     "Form460Filing",
     "Form460FilingVersion",
+    "Form460LatestFilingVersion",
     "Form460ScheduleASummaryBase",
     "Form460ScheduleASummary",
     "Form460ScheduleASummaryVersion",
@@ -175,7 +185,9 @@ __all__ = (
     "Form461Part5ItemVersion",
     "Form461Filing",
     "Form461FilingVersion",
+    "Form461LatestFilingVersion",
     "Form501FilingBase",
     "Form501Filing",
     "Form501FilingVersion",
+    "Form501LatestFilingVersion",
 )
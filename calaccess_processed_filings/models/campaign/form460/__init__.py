@@ -4,7 +4,12 @@
 Models for storing data from Campaign Disclosure Statements (Form 460).
 """
 from .base import Form460FilingBase
-from .filing import Form460Filing, Form460FilingVersion
+from .filing import (
+    Form460Filing,
+    Form460FilingVersion,
+    Form460LatestFilingVersion,
+)
+from .summary import Form460SummaryPivot
 from .schedules import (
     Form460ScheduleASummaryBase,
     Form460ScheduleASummary,
@@ -59,6 +64,8 @@ __all__ = (
     "Form460FilingBase",
     "Form460Filing",
     "Form460FilingVersion",
+    "Form460LatestFilingVersion",
+    "Form460SummaryPivot",
     "Form460ScheduleASummaryBase",
     "Form460ScheduleASummary",
     "Form460ScheduleASummaryVersion",
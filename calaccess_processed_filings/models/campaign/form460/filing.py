@@ -5,6 +5,7 @@ Models for storing data from Campaign Disclosure Statements (Form 460).
 """
 from django.db import models
 from .base import Form460FilingBase
+from calaccess_processed_filings.models.base import LatestFilingVersionBaseModel
 
 
 class Form460Filing(Form460FilingBase):
@@ -111,3 +112,20 @@ class Form460FilingVersion(Form460FilingBase):
 
     def __str__(self):
         return "%s-%s" % (self.filing, self.amend_id)
+
+
+class Form460LatestFilingVersion(LatestFilingVersionBaseModel):
+    """
+    The most recent version of each Form 460 filing, keyed by filing_id.
+
+    Loaded from Form460FilingVersion and shared by the loaders for Form460Filing
+    and the items reported on the most recent version of each filing.
+    """
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        app_label = "calaccess_processed_filings"
+        verbose_name = "Form 460 (Campaign Disclosure) latest filing version"
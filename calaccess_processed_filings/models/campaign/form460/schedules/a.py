@@ -4,6 +4,7 @@
 Models for storing data from Campaign Disclosure Statements (Form 460).
 """
 from django.db import models
+from calaccess_processed_filings.managers import PartitionedFilingsManager
 from calaccess_processed_filings.models.base import FilingBaseModel
 from calaccess_processed_filings.models.campaign import CampaignContributionBase
 
@@ -125,6 +126,7 @@ class Form460ScheduleAItemBase(CampaignContributionBase):
         help_text="Amount received from the contributor in the period covered "
         "by the filing (from RCPT_CD.AMOUNT)",
     )
+    objects = PartitionedFilingsManager("date_received")
 
     class Meta:
         """
@@ -4,6 +4,7 @@
 Models for storing data from Campaign Disclosure Statements (Form 460).
 """
 from django.db import models
+from calaccess_processed_filings.managers import PartitionedFilingsManager
 from calaccess_processed_filings.models.base import FilingBaseModel
 from calaccess_processed_filings.models.campaign import (
     CampaignExpenditureItemBase,
@@ -145,6 +146,7 @@ class Form460ScheduleEItem(CampaignExpenditureItemBase):
         help_text="Foreign key referring to the Form 460 on which the "
         "payment was reported (from EXPN_CD.FILING_ID)",
     )
+    objects = PartitionedFilingsManager("expense_date")
 
     class Meta:
         """
@@ -191,6 +193,7 @@ class Form460ScheduleEItemVersion(CampaignExpenditureItemBase):
         help_text="Foreign key referring to the version of the Form 460 that "
         "includes the payment made",
     )
+    objects = PartitionedFilingsManager("expense_date")
 
     class Meta:
         """
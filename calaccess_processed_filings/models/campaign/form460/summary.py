@@ -0,0 +1,240 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Models for staging summary data from Campaign Disclosure Statements (Form 460).
+"""
+from django.db import models
+from calaccess_processed_filings.models.base import StageBaseModel
+
+
+class Form460SummaryPivot(StageBaseModel):
+    """
+    The summary lines reported on each version of a Form 460 filing, one row per version.
+
+    Built by scanning SMRY_CD once and pivoting the AMOUNT_A of each line of the
+    summary page and the Schedule A, C and E summaries into its own column.
+    """
+
+    filing_id = models.IntegerField(
+        help_text="Unique identification number for the Form 460 filing \
+(from SMRY_CD.FILING_ID)",
+    )
+    amend_id = models.IntegerField(
+        help_text="Identifies the version of the Form 460 filing, with 0 representing \
+the initial filing (from SMRY_CD.AMEND_ID)",
+    )
+    f460_line_1 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Monetary Contributions from line 1 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_2 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Loans Received from line 2 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_3 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Cash Contributions Sub-total from line 3 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_4 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Non-monetary Contributions from line 4 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_5 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Total Contributions from line 5 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_6 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Payments Made from line 6 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_7 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Loans Made from line 7 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_8 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Cash Payments Sub-total from line 8 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_9 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Accrued Expenses (Unpaid Bills) from line 9 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_10 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Non-monetary Adjustment from line 10 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_11 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Total Expenditures Made from line 11 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_12 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Beginning Cash Balance from line 12 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_13 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Cash Receipts from line 13 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_14 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Miscellaneous Cash Increases from line 14 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_15 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Cash Payments from line 15 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_16 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Ending Cash Balance from line 16 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_17 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Loan Guarantees Received from line 17 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_18 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Cash Equivalents from line 18 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    f460_line_19 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Outstanding Debts from line 19 of the Form 460 summary page \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'F460')",
+    )
+    a_line_1 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Itemized contributions from line 1 of the Schedule A \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'A')",
+    )
+    a_line_2 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Unitemized contributions from line 2 of the Schedule A \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'A')",
+    )
+    a_line_3 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Total contributions from line 3 of the Schedule A \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'A')",
+    )
+    c_line_1 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Itemized contributions from line 1 of the Schedule C \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'C')",
+    )
+    c_line_2 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Unitemized contributions from line 2 of the Schedule C \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'C')",
+    )
+    c_line_3 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Total contributions from line 3 of the Schedule C \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'C')",
+    )
+    e_line_1 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Itemized expenditures from line 1 of the Schedule E \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'E')",
+    )
+    e_line_2 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Unitemized expenditures from line 2 of the Schedule E \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'E')",
+    )
+    e_line_3 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Interest paid from line 3 of the Schedule E \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'E')",
+    )
+    e_line_4 = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        null=True,
+        help_text="Total expenditures from line 4 of the Schedule E \
+(from SMRY_CD.AMOUNT_A where FORM_TYPE is 'E')",
+    )
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        app_label = "calaccess_processed_filings"
+        unique_together = (("filing_id", "amend_id"),)
+        verbose_name = "Form 460 (Campaign Disclosure) summary pivot"
+
+    def __str__(self):
+        return "%s-%s" % (self.filing_id, self.amend_id)
@@ -3,12 +3,17 @@
 """
 Models for storing data from Campaign Disclosure Statements (Form 461).
 """
-from .filing import Form461Filing, Form461FilingVersion
+from .filing import (
+    Form461Filing,
+    Form461FilingVersion,
+    Form461LatestFilingVersion,
+)
 from .part5 import Form461Part5Item, Form461Part5ItemVersion
 
 __all__ = (
     "Form461Filing",
     "Form461FilingVersion",
+    "Form461LatestFilingVersion",
     "Form461Part5Item",
     "Form461Part5ItemVersion",
 )
@@ -5,6 +5,7 @@ Models for storing data from Campaign Disclosure Statements (Form 461).
 """
 from django.db import models
 from calaccess_processed_filings.models.campaign import CampaignFinanceFilingBase
+from calaccess_processed_filings.models.base import LatestFilingVersionBaseModel
 
 
 class Form461FilingBase(CampaignFinanceFilingBase):
@@ -127,3 +128,20 @@ class Form461FilingVersion(Form461FilingBase):
 
     def __str__(self):
         return "%s-%s" % (self.filing, self.amend_id)
+
+
+class Form461LatestFilingVersion(LatestFilingVersionBaseModel):
+    """
+    The most recent version of each Form 461 filing, keyed by filing_id.
+
+    Loaded from Form461FilingVersion and shared by the loaders for Form461Filing
+    and the items reported on the most recent version of each filing.
+    """
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        app_label = "calaccess_processed_filings"
+        verbose_name = "Form 461 (Campaign Disclosure) latest filing version"
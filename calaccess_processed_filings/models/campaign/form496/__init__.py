@@ -3,7 +3,11 @@
 """
 Abstract base models for Form 496 models.
 """
-from .filing import Form496Filing, Form496FilingVersion
+from .filing import (
+    Form496Filing,
+    Form496FilingVersion,
+    Form496LatestFilingVersion,
+)
 from .part1 import Form496Part1Item, Form496Part1ItemVersion
 from .part2 import Form496Part2Item, Form496Part2ItemVersion
 from .part3 import Form496Part3Item, Form496Part3ItemVersion
@@ -11,6 +15,7 @@ from .part3 import Form496Part3Item, Form496Part3ItemVersion
 __all__ = (
     "Form496Filing",
     "Form496FilingVersion",
+    "Form496LatestFilingVersion",
     "Form496Part1Item",
     "Form496Part1ItemVersion",
     "Form496Part2Item",
@@ -5,6 +5,7 @@ More about the filing: https://calaccess.californiacivicdata.org/documentation/c
 from django.db import models
 
 from calaccess_processed_filings.models.campaign import CampaignFinanceFilingBase
+from calaccess_processed_filings.models.base import LatestFilingVersionBaseModel
 
 
 class Form496Filing(CampaignFinanceFilingBase):
@@ -98,3 +99,20 @@ class Form496FilingVersion(CampaignFinanceFilingBase):
 
     def __str__(self):
         return f"{self.filing}-{self.amend_id}"
+
+
+class Form496LatestFilingVersion(LatestFilingVersionBaseModel):
+    """
+    The most recent version of each Form 496 filing, keyed by filing_id.
+
+    Loaded from Form496FilingVersion and shared by the loaders for Form496Filing
+    and the items reported on the most recent version of each filing.
+    """
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        app_label = "calaccess_processed_filings"
+        verbose_name = "Form 496 (Late Independent Expenditure) latest filing version"
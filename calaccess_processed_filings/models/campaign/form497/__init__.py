@@ -4,7 +4,11 @@
 Abstract base models for Form 497 models.
 """
 from .base import Form497ItemBase
-from .filing import Form497Filing, Form497FilingVersion
+from .filing import (
+    Form497Filing,
+    Form497FilingVersion,
+    Form497LatestFilingVersion,
+)
 from .part1 import Form497Part1ItemBase, Form497Part1Item, Form497Part1ItemVersion
 from .part2 import Form497Part2ItemBase, Form497Part2Item, Form497Part2ItemVersion
 
@@ -12,6 +16,7 @@ from .part2 import Form497Part2ItemBase, Form497Part2Item, Form497Part2ItemVersi
 __all__ = (
     "Form497Filing",
     "Form497FilingVersion",
+    "Form497LatestFilingVersion",
     "Form497ItemBase",
     "Form497Part1ItemBase",
     "Form497Part1Item",
@@ -6,6 +6,7 @@ Models for storing data from Schedule 497, the Late Contribution Reports.
 More about the filing: http://calaccess.californiacivicdata.org/documentation/calaccess-forms/f497/
 """
 from django.db import models
+from calaccess_processed_filings.managers import PartitionedFilingsManager
 from calaccess_processed_filings.models.base import FilingBaseModel
 
 
@@ -57,6 +58,7 @@ class Form497ItemBase(FilingBaseModel):
         help_text="Reference number for the memo attached to the transaction "
         "(from S497_CD.MEMO_REFNO)",
     )
+    objects = PartitionedFilingsManager("date_received")
 
     class Meta:
         """
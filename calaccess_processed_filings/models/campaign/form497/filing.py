@@ -8,6 +8,7 @@ More about the filing: http://calaccess.californiacivicdata.org/documentation/ca
 # Models
 from django.db import models
 from calaccess_processed_filings.models.campaign import CampaignFinanceFilingBase
+from calaccess_processed_filings.models.base import LatestFilingVersionBaseModel
 
 
 class Form497Filing(CampaignFinanceFilingBase):
@@ -105,3 +106,20 @@ class Form497FilingVersion(CampaignFinanceFilingBase):
 
     def __str__(self):
         return "%s-%s" % (self.filing, self.amend_id)
+
+
+class Form497LatestFilingVersion(LatestFilingVersionBaseModel):
+    """
+    The most recent version of each Form 497 filing, keyed by filing_id.
+
+    Loaded from Form497FilingVersion and shared by the loaders for Form497Filing
+    and the items reported on the most recent version of each filing.
+    """
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        app_label = "calaccess_processed_filings"
+        verbose_name = "Form 497 (Late Contribution) latest filing version"
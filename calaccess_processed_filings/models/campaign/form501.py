@@ -12,7 +12,10 @@ from calaccess_processed_filings.managers import Form501FilingManager
 # Models
 from django.db import models
 from opencivicdata.elections.models import CandidateContest
-from calaccess_processed_filings.models.base import FilingBaseModel
+from calaccess_processed_filings.models.base import (
+    FilingBaseModel,
+    LatestFilingVersionBaseModel,
+)
 
 
 class Form501FilingBase(FilingBaseModel):
@@ -458,3 +461,19 @@ class Form501FilingVersion(Form501FilingBase):
 
     def __str__(self):
         return "{}-{}".format(self.filing, self.amend_id)
+
+
+class Form501LatestFilingVersion(LatestFilingVersionBaseModel):
+    """
+    The most recent version of each Form 501 filing, keyed by filing_id.
+
+    Loaded from Form501FilingVersion and used by the loader for Form501Filing.
+    """
+
+    class Meta:
+        """
+        Model options.
+        """
+
+        app_label = "calaccess_processed_filings"
+        verbose_name = "Form 501 (Candidate Intention) latest filing version"
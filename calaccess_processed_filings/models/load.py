@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Models for tracking the loading of the filings models.
+"""
+from django.db import models
+from calaccess_processed_filings.managers import FilingsHighWaterMarkManager
+
+
+class FilingsHighWaterMark(models.Model):
+    """
+    The most recent raw filing data folded into the filings models by a load.
+
+    Incremental loads only reprocess the filings added or amended since the latest mark.
+    """
+
+    objects = FilingsHighWaterMarkManager()
+
+    created_datetime = models.DateTimeField(
+        auto_now_add=True,
+        help_text="Date and time the load finished",
+    )
+    incremental = models.BooleanField(
+        default=False,
+        help_text="Indicates if the load only processed changed filings",
+    )
+    max_filing_date = models.DateField(
+        null=True,
+        help_text="Latest FILING_DATE in FILER_FILINGS_CD when the load ran",
+    )
+    max_filing_id = models.IntegerField(
+        null=True,
+        help_text="Largest FILING_ID in the raw cover sheet tables when the load ran",
+    )
+    changed_filing_count = models.IntegerField(
+        null=True,
+        help_text="Number of filing versions reprocessed by an incremental load",
+    )
+
+    class Meta:
+        """
+        Meta model options.
+        """
+
+        app_label = "calaccess_processed_filings"
+        get_latest_by = "created_datetime"
+
+    def __str__(self):
+        return f"{self.max_filing_date} ({self.max_filing_id})"
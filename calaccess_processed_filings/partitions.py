@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Election cycles used to partition the largest filings tables.
+"""
+from datetime import date
+
+# The first two-year cycle with filings in CAL-ACCESS
+FIRST_CYCLE = 2000
+
+
+def get_cycles():
+    """
+    Returns the list of election cycles, each named for the even year it ends in.
+
+    Runs through the cycle after the current one, so items dated a little
+    in the future still land in a partition of their own.
+    """
+    today = date.today()
+    current = today.year + today.year % 2
+    return list(range(FIRST_CYCLE, current + 3, 2))
+
+
+def get_cycle_bounds(cycle):
+    """
+    Returns a tuple with the first day of an election cycle and of the cycle after it.
+
+    Raises a ValueError if the cycle isn't an even year.
+    """
+    if cycle % 2:
+        raise ValueError(f"{cycle} is not an election cycle. Cycles end in even years.")
+    return date(cycle - 1, 1, 1), date(cycle + 1, 1, 1)
@@ -0,0 +1,18 @@
+CREATE TEMPORARY TABLE calaccess_processed_filings_changed ON COMMIT DROP AS
+SELECT
+    ff."FILING_ID" AS filing_id,
+    ff."FILING_SEQUENCE" AS amend_id
+FROM "FILER_FILINGS_CD" ff
+WHERE ff."FILING_DATE" >= %(max_filing_date)s
+UNION
+SELECT
+    cvr."FILING_ID",
+    cvr."AMEND_ID"
+FROM "CVR_CAMPAIGN_DISCLOSURE_CD" cvr
+WHERE cvr."FILING_ID" > %(max_filing_id)s
+UNION
+SELECT
+    f501."FILING_ID",
+    f501."AMEND_ID"
+FROM "F501_502_CD" f501
+WHERE f501."FILING_ID" > %(max_filing_id)s;
@@ -59,12 +59,6 @@ SELECT
     f460.loan_guarantees_received,
     f460.cash_equivalents,
     f460.outstanding_debts
-FROM (
-    -- get most recent amendment for each filing
-    SELECT filing_id, MAX(amend_id) AS amendment_count
-    FROM calaccess_processed_filings_form460filingversion
-    GROUP BY 1
-) AS latest
+FROM calaccess_processed_filings_form460latestfilingversion latest
 JOIN calaccess_processed_filings_form460filingversion f460
-ON latest.filing_id = f460.filing_id
-AND latest.amendment_count = f460.amend_id;
+ON latest.latest_version_id = f460.id;
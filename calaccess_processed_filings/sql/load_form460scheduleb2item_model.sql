@@ -23,7 +23,7 @@ INSERT INTO calaccess_processed_filings_form460scheduleb2item (
     reported_on_b1
 )
 SELECT
-    filing_version.filing_id,
+    filing.filing_id,
     item_version.line_item,
     item_version.guarantor_code,
     item_version.guarantor_title,
@@ -46,8 +46,7 @@ SELECT
     item_version.memo_reference_number,
     item_version.reported_on_b1
 FROM calaccess_processed_filings_form460filing filing
-JOIN calaccess_processed_filings_form460filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+JOIN calaccess_processed_filings_form460latestfilingversion latest
+ON filing.filing_id = latest.filing_id
 JOIN calaccess_processed_filings_form460scheduleb2itemversion item_version
-ON filing_version.id = item_version.filing_version_id;
+ON latest.latest_version_id = item_version.filing_version_id;
@@ -70,8 +70,7 @@ SELECT
     item_version.cumulative_ytd_amount,
     item_version.cumulative_election_amount
 FROM calaccess_processed_filings_form460filing filing
-JOIN calaccess_processed_filings_form460filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+JOIN calaccess_processed_filings_form460latestfilingversion latest
+ON filing.filing_id = latest.filing_id
 JOIN calaccess_processed_filings_form460schedulecitemversion item_version
-ON filing_version.id = item_version.filing_version_id;
+ON latest.latest_version_id = item_version.filing_version_id;
@@ -12,8 +12,7 @@ SELECT
     summary_version.interest_paid,
     summary_version.total_expenditures
 FROM calaccess_processed_filings_form460filing filing
-JOIN calaccess_processed_filings_form460filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+JOIN calaccess_processed_filings_form460latestfilingversion latest
+ON filing.filing_id = latest.filing_id
 JOIN calaccess_processed_filings_form460scheduleesummaryversion summary_version
-ON filing_version.id = summary_version.filing_version_id;
+ON latest.latest_version_id = summary_version.filing_version_id;
@@ -0,0 +1,134 @@
+INSERT INTO calaccess_processed_filings_form460summarypivot (
+    filing_id,
+    amend_id,
+    f460_line_1,
+    f460_line_2,
+    f460_line_3,
+    f460_line_4,
+    f460_line_5,
+    f460_line_6,
+    f460_line_7,
+    f460_line_8,
+    f460_line_9,
+    f460_line_10,
+    f460_line_11,
+    f460_line_12,
+    f460_line_13,
+    f460_line_14,
+    f460_line_15,
+    f460_line_16,
+    f460_line_17,
+    f460_line_18,
+    f460_line_19,
+    a_line_1,
+    a_line_2,
+    a_line_3,
+    c_line_1,
+    c_line_2,
+    c_line_3,
+    e_line_1,
+    e_line_2,
+    e_line_3,
+    e_line_4
+)
+SELECT
+    smry.filing_id,
+    smry.amend_id,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '1'
+    ) AS f460_line_1,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '2'
+    ) AS f460_line_2,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '3'
+    ) AS f460_line_3,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '4'
+    ) AS f460_line_4,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '5'
+    ) AS f460_line_5,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '6'
+    ) AS f460_line_6,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '7'
+    ) AS f460_line_7,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '8'
+    ) AS f460_line_8,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '9'
+    ) AS f460_line_9,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '10'
+    ) AS f460_line_10,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '11'
+    ) AS f460_line_11,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '12'
+    ) AS f460_line_12,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '13'
+    ) AS f460_line_13,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '14'
+    ) AS f460_line_14,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '15'
+    ) AS f460_line_15,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '16'
+    ) AS f460_line_16,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '17'
+    ) AS f460_line_17,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '18'
+    ) AS f460_line_18,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'F460' AND smry.line_item = '19'
+    ) AS f460_line_19,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'A' AND smry.line_item = '1'
+    ) AS a_line_1,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'A' AND smry.line_item = '2'
+    ) AS a_line_2,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'A' AND smry.line_item = '3'
+    ) AS a_line_3,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'C' AND smry.line_item = '1'
+    ) AS c_line_1,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'C' AND smry.line_item = '2'
+    ) AS c_line_2,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'C' AND smry.line_item = '3'
+    ) AS c_line_3,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'E' AND smry.line_item = '1'
+    ) AS e_line_1,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'E' AND smry.line_item = '2'
+    ) AS e_line_2,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'E' AND smry.line_item = '3'
+    ) AS e_line_3,
+    MAX(smry.amount) FILTER (
+        WHERE smry.form_type = 'E' AND smry.line_item = '4'
+    ) AS e_line_4
+FROM (
+    SELECT
+        "FILING_ID" AS filing_id,
+        "AMEND_ID" AS amend_id,
+        UPPER("FORM_TYPE") AS form_type,
+        "LINE_ITEM" AS line_item,
+        "AMOUNT_A" AS amount
+    FROM "SMRY_CD"
+    WHERE UPPER("FORM_TYPE") IN ('F460', 'A', 'C', 'E')
+) smry
+GROUP BY smry.filing_id, smry.amend_id;
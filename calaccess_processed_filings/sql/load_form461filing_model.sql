@@ -21,12 +21,6 @@ SELECT
     f461.filer_lastname,
     f461.filer_firstname,
     f461.election_date
-FROM (
-    -- get most recent amendment for each filing
-    SELECT filing_id, MAX(amend_id) AS amendment_count
-    FROM calaccess_processed_filings_form461filingversion
-    GROUP BY 1
-) AS latest
+FROM calaccess_processed_filings_form461latestfilingversion latest
 JOIN calaccess_processed_filings_form461filingversion f461
-ON latest.filing_id = f461.filing_id
-AND latest.amendment_count = f461.amend_id;
+ON latest.latest_version_id = f461.id;
@@ -82,8 +82,7 @@ SELECT
     item_version.office_description,
     item_version.office_sought_held
 FROM calaccess_processed_filings_form461filing filing
-JOIN calaccess_processed_filings_form461filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+JOIN calaccess_processed_filings_form461latestfilingversion latest
+ON filing.filing_id = latest.filing_id
 JOIN calaccess_processed_filings_form461part5itemversion item_version
-ON filing_version.id = item_version.filing_version_id;
+ON latest.latest_version_id = item_version.filing_version_id;
@@ -15,12 +15,6 @@ SELECT
     f496.filer_lastname,
     f496.filer_firstname,
     f496.election_date
-FROM (
-    -- get most recent amendment for each filing
-    SELECT filing_id, MAX(amend_id) AS amendment_count
-    FROM calaccess_processed_filings_form496filingversion
-    GROUP BY 1
-) AS latest
+FROM calaccess_processed_filings_form496latestfilingversion latest
 JOIN calaccess_processed_filings_form496filingversion f496
-ON latest.filing_id = f496.filing_id
-AND latest.amendment_count = f496.amend_id;
+ON latest.latest_version_id = f496.id;
@@ -18,8 +18,7 @@ SELECT
     item_version.memo_code,
     item_version.memo_reference_number
 FROM calaccess_processed_filings_form496filing filing
-JOIN calaccess_processed_filings_form496filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+JOIN calaccess_processed_filings_form496latestfilingversion latest
+ON filing.filing_id = latest.filing_id
 JOIN calaccess_processed_filings_form496part2itemversion item_version
-ON filing_version.id = item_version.filing_version_id;
+ON latest.latest_version_id = item_version.filing_version_id;
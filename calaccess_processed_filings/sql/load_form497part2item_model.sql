@@ -64,8 +64,7 @@ SELECT
     item_version.support_opposition_code,
     item_version.election_date
 FROM calaccess_processed_filings_form497filing filing
-JOIN calaccess_processed_filings_form497filingversion filing_version
-ON filing.filing_id = filing_version.filing_id
-AND filing.amendment_count = filing_version.amend_id
+JOIN calaccess_processed_filings_form497latestfilingversion latest
+ON filing.filing_id = latest.filing_id
 JOIN calaccess_processed_filings_form497part2itemversion item_version
-ON filing_version.id = item_version.filing_version_id;
+ON latest.latest_version_id = item_version.filing_version_id;
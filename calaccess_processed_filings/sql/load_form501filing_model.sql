@@ -59,12 +59,6 @@ SELECT
     f501.limit_not_exceeded_election_date,
     f501.personal_funds_contrib_date,
     f501.executed_on
-FROM (
-    -- get most recent amendment for each filing
-    SELECT filing_id, MAX(amend_id) AS amendment_count
-    FROM calaccess_processed_filings_form501filingversion
-    GROUP BY 1
-) AS latest
+FROM calaccess_processed_filings_form501latestfilingversion latest
 JOIN calaccess_processed_filings_form501filingversion f501
-ON latest.filing_id = f501.filing_id
-AND latest.amendment_count = f501.amend_id;
+ON latest.latest_version_id = f501.id;
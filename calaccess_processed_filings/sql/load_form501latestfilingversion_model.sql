@@ -0,0 +1,18 @@
+INSERT INTO calaccess_processed_filings_form501latestfilingversion (
+    filing_id,
+    amendment_count,
+    latest_version_id
+)
+SELECT
+    latest.filing_id,
+    latest.amendment_count,
+    filing_version.id
+FROM (
+    -- get most recent amendment for each filing
+    SELECT filing_id, MAX(amend_id) AS amendment_count
+    FROM calaccess_processed_filings_form501filingversion
+    GROUP BY 1
+) AS latest
+JOIN calaccess_processed_filings_form501filingversion filing_version
+ON latest.filing_id = filing_version.filing_id
+AND latest.amendment_count = filing_version.amend_id;
@@ -0,0 +1,10 @@
+SELECT
+    (
+        SELECT MAX("FILING_DATE")::date
+        FROM "FILER_FILINGS_CD"
+        WHERE "FILING_DATE" <= CURRENT_DATE
+    ) AS max_filing_date,
+    GREATEST(
+        (SELECT MAX("FILING_ID") FROM "CVR_CAMPAIGN_DISCLOSURE_CD"),
+        (SELECT MAX("FILING_ID") FROM "F501_502_CD")
+    ) AS max_filing_id;
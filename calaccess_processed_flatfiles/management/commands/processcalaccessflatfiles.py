@@ -2,7 +2,6 @@
 import os
 
 from django.apps import apps
-from django.core.management import call_command
 
 from calaccess_processed.management.commands import CalAccessCommand
 
@@ -14,11 +13,27 @@ class Command(CalAccessCommand):
 
     help = "Archive flat files of CAL-ACCESS data"
 
+    def add_arguments(self, parser):
+        """
+        Adds custom arguments specific to this command.
+        """
+        super(Command, self).add_arguments(parser)
+        parser.add_argument(
+            "--workers",
+            dest="workers",
+            type=int,
+            default=1,
+            help="Number of files to archive at the same time, each on its own "
+            "database connection (default: 1)",
+        )
+        self.add_archive_arguments(parser)
+
     def handle(self, *args, **options):
         """
         Make it happen.
         """
         super(Command, self).handle(*args, **options)
+        self.workers = options["workers"]
 
         # then archive
         if self.verbosity > 2:
@@ -29,11 +44,18 @@ class Command(CalAccessCommand):
         os.path.isdir(filings_data_path) or os.makedirs(filings_data_path)
 
         # now do flat files
-        flat_file_list = apps.get_app_config(
+        proxy_lookup = apps.get_app_config(
             "calaccess_processed_flatfiles"
-        ).get_flat_names_list()
-        for f in flat_file_list:
-            call_command("archivecalaccessflatfile", f)
+        ).get_flat_proxy_lookup()
+        self.archive_files(
+            proxy_lookup,
+            workers=self.workers,
+            compression=options["compression"],
+            zip=options["zip"],
+            format=options["format"],
+            force=options["force_archive"],
+            split_cycles=options["split_cycles"],
+        )
 
         # Wrap it up
         self.success("Done!")
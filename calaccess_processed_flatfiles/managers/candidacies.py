@@ -4,12 +4,7 @@
 Managers for generating flatfiles that combine multiple table into a simplified file.
 """
 from __future__ import unicode_literals
-from calaccess_processed.postgres import (
-    JSONArrayLength,
-    JSONExtractPath,
-    MaxFromJSONIntegerArray,
-)
-from django.db.models import F, Q
+from django.db.models import F, OuterRef, Q, Subquery
 from django.db.models import Count, Max
 from calaccess_processed.managers import BulkLoadSQLManager
 
@@ -23,6 +18,15 @@ class OCDFlatCandidacyManager(BulkLoadSQLManager):
         """
         Returns the custom QuerySet for this manager.
         """
+        from calaccess_processed_elections.models import CandidacyForm501
+
+        # The Form 501 filings linked to each candidacy, counted in a subquery so the
+        # joins to identifiers aren't multiplied
+        form501_qs = (
+            CandidacyForm501.objects.filter(candidacy=OuterRef("pk"))
+            .order_by()
+            .values("candidacy")
+        )
         return (
             super(OCDFlatCandidacyManager, self)
             .get_queryset()
@@ -45,11 +49,11 @@ class OCDFlatCandidacyManager(BulkLoadSQLManager):
                 ocd_party_id=F("party"),
                 latest_calaccess_filer_id=Max("person__identifiers__identifier"),
                 calaccess_filer_id_count=Count("person__identifiers__identifier"),
-                latest_form501_filing_id=MaxFromJSONIntegerArray(
-                    "extras", "form501_filing_ids"
+                latest_form501_filing_id=Subquery(
+                    form501_qs.annotate(latest=Max("filing_id")).values("latest")
                 ),
-                form501_filing_count=JSONArrayLength(
-                    JSONExtractPath("extras", "form501_filing_ids")
+                form501_filing_count=Subquery(
+                    form501_qs.annotate(count=Count("filing_id")).values("count")
                 ),
             )
         )
@@ -81,6 +81,11 @@ setup(
         'django-internetarchive-storage',
         'pytz',
     ),
+    extras_require={
+        'zstd': ('zstandard',),
+        'parquet': ('pyarrow',),
+        'duckdb': ('duckdb',),
+    },
     cmdclass={'test': TestCommand,},
     classifiers=(
         'Development Status :: 5 - Production/Stable',